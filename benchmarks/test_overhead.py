@@ -0,0 +1,53 @@
+"""Offline overhead benchmarks against stub model and MCP servers.
+
+Run with ``python -m pytest benchmarks``; they are not part of ``tests/``
+because they start subprocesses and take several seconds.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from kraftbot.bench.runner import (
+    BenchConfig,
+    compare_to_baseline,
+    load_baseline,
+    run_benchmarks,
+)
+
+# p50 budgets in each result's unit, overridable for slow CI machines
+BUDGETS = {
+    "turn_overhead": float(os.environ.get("KRAFTBOT_BENCH_TURN_MS", "50")),
+    "ttft_overhead": float(os.environ.get("KRAFTBOT_BENCH_TTFT_MS", "50")),
+    "tool_call_overhead": float(os.environ.get("KRAFTBOT_BENCH_TOOL_MS", "50")),
+    "render_chunk": float(os.environ.get("KRAFTBOT_BENCH_RENDER_MS", "20")),
+    "memory_per_turn": float(os.environ.get("KRAFTBOT_BENCH_MEMORY_KIB", "512")),
+}
+
+# Results file from `kraftbot bench --output` to compare against, if any
+BASELINE = os.environ.get("KRAFTBOT_BENCH_BASELINE")
+
+
+@pytest.fixture(scope="module")
+def results():
+    """Run the benchmark suite once for every check."""
+    config = BenchConfig(turns=int(os.environ.get("KRAFTBOT_BENCH_TURNS", "10")))
+    return asyncio.run(run_benchmarks(config))
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS))
+def test_within_budget(results, name):
+    """KraftBot's own overhead stays within its budget."""
+    result = next(r for r in results if r.name == name)
+
+    assert result.p50 <= BUDGETS[name], (
+        f"{name} p50 {result.p50:.2f}{result.unit} is over its "
+        f"{BUDGETS[name]:g}{result.unit} budget"
+    )
+
+
+@pytest.mark.skipif(not BASELINE, reason="KRAFTBOT_BENCH_BASELINE is not set")
+def test_no_regression_against_baseline(results):
+    """No p50 regressed past the saved baseline."""
+    assert compare_to_baseline(results, load_baseline(BASELINE)) == []
@@ -5,13 +5,33 @@ A powerful AI agent framework that combines PydanticAI with OpenRouter for multi
 access and Model Context Protocol (MCP) for external tool integration.
 """
 
+from typing import TYPE_CHECKING, List
+
+from .utils.lazy import lazy_dir, lazy_exports
+
 __version__ = "1.0.0"
 __author__ = "KraftBot Team"
 __email__ = "kraftbot@example.com"
 
-from .config.settings import Settings
-from .core.agent import PydanticAIAgent
-from .core.models import AgentDependencies, AgentResponse
+if TYPE_CHECKING:
+    from .config.settings import Settings
+    from .core.agent import PydanticAIAgent
+    from .core.models import AgentDependencies, AgentResponse
+
+_EXPORTS = {
+    "PydanticAIAgent": ".core.agent",
+    "AgentResponse": ".core.models",
+    "AgentDependencies": ".core.models",
+    "Settings": ".config.settings",
+}
+
+# Heavy dependencies are only imported when these names are first used
+__getattr__ = lazy_exports(__name__, _EXPORTS)
+
+
+def __dir__() -> List[str]:
+    return lazy_dir(globals(), _EXPORTS)
+
 
 __all__ = [
     "PydanticAIAgent",
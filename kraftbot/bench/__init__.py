@@ -0,0 +1,41 @@
+"""
+Offline benchmarks with stub model and MCP servers.
+"""
+
+from typing import TYPE_CHECKING, List
+
+from ..utils.lazy import lazy_dir, lazy_exports
+
+if TYPE_CHECKING:
+    from .runner import BenchConfig, BenchResult, compare_to_baseline, run_benchmarks
+    from .stub_llm import StubLLMConfig, create_stub_llm_app
+    from .stub_mcp import create_stub_mcp_server, make_league
+
+_EXPORTS = {
+    "BenchConfig": ".runner",
+    "BenchResult": ".runner",
+    "compare_to_baseline": ".runner",
+    "run_benchmarks": ".runner",
+    "StubLLMConfig": ".stub_llm",
+    "create_stub_llm_app": ".stub_llm",
+    "create_stub_mcp_server": ".stub_mcp",
+    "make_league": ".stub_mcp",
+}
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
+
+
+def __dir__() -> List[str]:
+    return lazy_dir(globals(), _EXPORTS)
+
+
+__all__ = [
+    "BenchConfig",
+    "BenchResult",
+    "compare_to_baseline",
+    "run_benchmarks",
+    "StubLLMConfig",
+    "create_stub_llm_app",
+    "create_stub_mcp_server",
+    "make_league",
+]
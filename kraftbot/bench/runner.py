@@ -0,0 +1,450 @@
+"""
+Offline benchmarks of KraftBot's own overhead against stub backends.
+"""
+
+import io
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from ..core.model_stats import percentile
+from .stub_llm import StubLLMConfig
+
+if TYPE_CHECKING:
+    from ..core.agent import PydanticAIAgent
+    from ..core.models import StreamEnd
+    from ..mcp.manager import MCPManager
+
+# Model name the stub answers as; not in the catalog, so no stats mix with
+# real models
+BENCH_MODEL = "bench/stub"
+
+
+@dataclass
+class BenchConfig:
+    """Stub latencies and how many turns to measure"""
+
+    turns: int = 20
+    ttft: float = 0.05
+    tokens_per_second: float = 500.0
+    response_tokens: int = 150
+    tool_latency: float = 0.02
+    mcp_transport: str = "stdio"  # "stdio" or "sse"
+
+    def stub_llm(self) -> StubLLMConfig:
+        """Settings for the stub model"""
+        return StubLLMConfig(
+            ttft=self.ttft,
+            tokens_per_second=self.tokens_per_second,
+            response_tokens=self.response_tokens,
+        )
+
+
+class BenchResult(BaseModel):
+    """One measurement, summarized over its samples"""
+
+    name: str
+    unit: str
+    p50: float
+    p95: float
+    mean: float
+    samples: int
+    description: str = ""
+
+
+def _summarize(
+    name: str, unit: str, values: List[float], description: str
+) -> BenchResult:
+    """Summarize samples as a BenchResult"""
+    return BenchResult(
+        name=name,
+        unit=unit,
+        p50=percentile(values, 0.5) or 0.0,
+        p95=percentile(values, 0.95) or 0.0,
+        mean=sum(values) / len(values) if values else 0.0,
+        samples=len(values),
+        description=description,
+    )
+
+
+def _free_port() -> int:
+    """A port nothing is listening on right now"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = 20) -> None:
+    """Wait until a stub process accepts connections"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"Stub server exited: {process.stderr.read().decode(errors='replace')}"
+            )
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Stub server did not start on port {port}")
+
+
+@contextmanager
+def _stub_process(module: str, *args: str) -> Iterator[int]:
+    """Run a stub server module in a subprocess, yielding its port"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", module, "--port", str(port), *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        _wait_for_port(port, process)
+        yield port
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        process.stderr.close()
+
+
+def _stub_llm_args(config: BenchConfig) -> List[str]:
+    """Command line for the stub model"""
+    return [
+        "--ttft",
+        str(config.ttft),
+        "--tokens-per-second",
+        str(config.tokens_per_second),
+        "--response-tokens",
+        str(config.response_tokens),
+    ]
+
+
+class BenchRun:
+    """One benchmark session: the stub model address and throwaway stores"""
+
+    def __init__(self, config: BenchConfig, base_url: str, workdir: Path):
+        self.config = config
+        self.base_url = base_url
+        self.workdir = workdir
+
+    def make_agent(self, mcp_manager: "MCPManager") -> "PydanticAIAgent":
+        """Agent pointed at the stub model, with stores kept out of the cache dir"""
+        from ..core.agent import PydanticAIAgent
+        from ..core.model_stats import ModelStatsStore
+        from ..core.telemetry import TelemetryStore
+
+        return PydanticAIAgent(
+            openrouter_api_key="bench",
+            model_name=BENCH_MODEL,
+            enable_logfire=False,
+            mcp_manager=mcp_manager,
+            enable_cache=False,
+            model_stats=ModelStatsStore(self.workdir / "model_stats.jsonl"),
+            enable_hedging=False,
+            telemetry_store=TelemetryStore(self.workdir / "metrics.sqlite3"),
+            base_url=self.base_url,
+        )
+
+    async def turn(
+        self, agent: "PydanticAIAgent", session_id: str
+    ) -> Tuple["StreamEnd", List[str]]:
+        """Run one streamed turn, returning its end event and text deltas"""
+        from ..core.models import StreamEnd, TextDelta
+
+        deltas: List[str] = []
+        end = None
+        async for event in agent.stream_events(
+            "Who should I start in week 4?", session_id=session_id
+        ):
+            if isinstance(event, TextDelta):
+                deltas.append(event.text)
+            elif isinstance(event, StreamEnd):
+                end = event
+        if end is None or end.error:
+            raise RuntimeError(f"Benchmark turn failed: {end.error if end else None}")
+        return end, deltas
+
+
+async def _bench_turns(run: BenchRun) -> Tuple[List[BenchResult], List[str]]:
+    """Overhead of plain turns, streamed against the stub model"""
+    from ..mcp.manager import MCPManager
+
+    config = run.config
+    agent = run.make_agent(MCPManager(enable_tool_cache=False))
+    model_time = config.stub_llm().model_time()
+    overheads, ttft_overheads = [], []
+    deltas: List[str] = []
+    for index in range(config.turns + 1):
+        end, deltas = await run.turn(agent, f"bench-turn-{index}")
+        if index == 0:
+            continue  # Warm-up: connection setup and first-use imports
+        telemetry = end.telemetry
+        overheads.append((telemetry.duration - model_time) * 1000)
+        if telemetry.time_to_first_token is not None:
+            ttft_overheads.append((telemetry.time_to_first_token - config.ttft) * 1000)
+
+    return [
+        _summarize(
+            "turn_overhead",
+            "ms",
+            overheads,
+            "Turn latency minus the stub model's own TTFT and generation time",
+        ),
+        _summarize(
+            "ttft_overhead",
+            "ms",
+            ttft_overheads,
+            "Time to first token minus the stub model's TTFT",
+        ),
+    ], deltas
+
+
+async def _bench_tools(run: BenchRun, mcp_port: Optional[int]) -> List[BenchResult]:
+    """Overhead of turns that call an MCP tool on the stub server"""
+    from ..mcp.manager import MCPManager
+
+    config = run.config
+    manager = MCPManager(enable_tool_cache=False)
+    if mcp_port is None:
+        manager.add_stdio_server(
+            command=sys.executable,
+            args=[
+                "-m",
+                "kraftbot.bench.stub_mcp",
+                "--latency",
+                str(config.tool_latency),
+            ],
+            tool_prefix="sleeper",
+            name="bench_mcp",
+        )
+    else:
+        manager.add_sse_server(
+            url=f"http://127.0.0.1:{mcp_port}/sse",
+            tool_prefix="sleeper",
+            name="bench_mcp",
+        )
+
+    agent = run.make_agent(manager)
+    model_time = config.stub_llm().model_time(tool_turn=True)
+    tool_overheads, turn_overheads = [], []
+    async with manager:
+        for index in range(config.turns + 1):
+            end, _ = await run.turn(agent, f"bench-tool-{index}")
+            if index == 0:
+                continue
+            telemetry = end.telemetry
+            if not telemetry.tool_calls:
+                raise RuntimeError("The stub model did not call a tool")
+            latencies = [
+                latency
+                for calls in telemetry.tool_latencies.values()
+                for latency in calls
+            ]
+            tool_overheads.extend(
+                (latency - config.tool_latency) * 1000 for latency in latencies
+            )
+            turn_overheads.append(
+                (telemetry.duration - model_time - sum(latencies)) * 1000
+            )
+
+    return [
+        _summarize(
+            "tool_call_overhead",
+            "ms",
+            tool_overheads,
+            f"MCP tool call ({config.mcp_transport}) minus the stub tool's latency",
+        ),
+        _summarize(
+            "tool_turn_overhead",
+            "ms",
+            turn_overheads,
+            "Tool turn latency minus both model requests and the tool call",
+        ),
+    ]
+
+
+def _bench_render(deltas: List[str], repeats: int) -> List[BenchResult]:
+    """Cost of rendering a streamed answer, redrawn after every chunk"""
+    from rich.console import Console
+    from rich.panel import Panel
+
+    from ..cli.render import IncrementalMarkdown
+
+    chunk_times, turn_times = [], []
+    for _ in range(repeats):
+        console = Console(file=io.StringIO(), width=100, force_terminal=True)
+        renderer = IncrementalMarkdown()
+        turn_start = time.perf_counter()
+        for text in deltas:
+            chunk_start = time.perf_counter()
+            renderer.append(text)
+            console.print(Panel(renderer, border_style="green", padding=(0, 1)))
+            chunk_times.append((time.perf_counter() - chunk_start) * 1000)
+        turn_times.append((time.perf_counter() - turn_start) * 1000)
+
+    return [
+        _summarize(
+            "render_chunk",
+            "ms",
+            chunk_times,
+            "Appending one chunk and redrawing the response panel",
+        ),
+        _summarize(
+            "render_turn",
+            "ms",
+            turn_times,
+            "Redrawing a whole answer after every chunk (worst case for Live)",
+        ),
+    ]
+
+
+async def _bench_memory(run: BenchRun) -> List[BenchResult]:
+    """Memory allocated per turn of one growing conversation"""
+    from ..mcp.manager import MCPManager
+
+    agent = run.make_agent(MCPManager(enable_tool_cache=False))
+    await run.turn(agent, "bench-memory")
+
+    growth = []
+    tracemalloc.start()
+    try:
+        previous, _ = tracemalloc.get_traced_memory()
+        for _ in range(run.config.turns):
+            await run.turn(agent, "bench-memory")
+            current, _ = tracemalloc.get_traced_memory()
+            growth.append((current - previous) / 1024)
+            previous = current
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return [
+        _summarize(
+            "memory_per_turn",
+            "KiB",
+            growth,
+            "Memory retained per turn of one conversation (history is trimmed)",
+        ),
+        _summarize(
+            "memory_peak",
+            "MiB",
+            [peak / 1024 / 1024],
+            "Peak memory allocated while the conversation ran",
+        ),
+    ]
+
+
+async def run_benchmarks(config: Optional[BenchConfig] = None) -> List[BenchResult]:
+    """
+    Run every benchmark against freshly started stub servers
+
+    Nothing leaves the machine: the model is a local OpenAI-compatible stub
+    and tools come from a local MCP server with fixture data. Measurements
+    subtract the stubs' configured latency, so they show KraftBot's own
+    overhead.
+
+    Args:
+        config: Stub latencies and turn count (defaults to BenchConfig())
+
+    Returns:
+        List[BenchResult]: One result per measurement
+    """
+    config = config or BenchConfig()
+    if config.mcp_transport not in ("stdio", "sse"):
+        raise ValueError(f"Unknown MCP transport: {config.mcp_transport}")
+
+    from ..utils.http import close_http_clients
+
+    results: List[BenchResult] = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="kraftbot-bench-") as workdir:
+            with _stub_process(
+                "kraftbot.bench.stub_llm", *_stub_llm_args(config)
+            ) as port:
+                run = BenchRun(config, f"http://127.0.0.1:{port}/v1", Path(workdir))
+
+                turn_results, deltas = await _bench_turns(run)
+                results.extend(turn_results)
+                results.extend(_bench_render(deltas, repeats=max(config.turns // 4, 3)))
+
+                if config.mcp_transport == "sse":
+                    with _stub_process(
+                        "kraftbot.bench.stub_mcp",
+                        "--transport",
+                        "sse",
+                        "--latency",
+                        str(config.tool_latency),
+                    ) as mcp_port:
+                        results.extend(await _bench_tools(run, mcp_port))
+                else:
+                    results.extend(await _bench_tools(run, None))
+
+                results.extend(await _bench_memory(run))
+    finally:
+        # The shared pool is bound to this event loop
+        await close_http_clients()
+
+    return results
+
+
+def compare_to_baseline(
+    results: List[BenchResult], baseline: Dict[str, float], tolerance: float = 0.25
+) -> List[str]:
+    """
+    Find results whose p50 regressed past a baseline
+
+    Args:
+        results: Fresh benchmark results
+        baseline: p50 per result name, e.g. from a saved results file
+        tolerance: Allowed slowdown as a fraction of the baseline
+
+    Returns:
+        List[str]: One message per regression
+    """
+    regressions = []
+    for result in results:
+        expected = baseline.get(result.name)
+        if expected is None:
+            continue
+        # Small absolute slack so near-zero baselines don't flag noise
+        limit = expected * (1 + tolerance) + 1.0
+        if result.p50 > limit:
+            regressions.append(
+                f"{result.name}: p50 {result.p50:.2f}{result.unit} > "
+                f"{limit:.2f}{result.unit} (baseline {expected:.2f})"
+            )
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, float]:
+    """Read p50s from a results file written by `kraftbot bench --output`"""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {item["name"]: item["p50"] for item in data["results"]}
+
+
+def save_results(path: Path, config: BenchConfig, results: List[BenchResult]) -> None:
+    """Write results (and the config they ran with) as JSON"""
+    Path(path).write_text(
+        json.dumps(
+            {
+                "config": config.__dict__,
+                "results": [result.model_dump() for result in results],
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
@@ -0,0 +1,233 @@
+"""
+OpenAI-compatible stub model server with configurable latency.
+
+Run with ``python -m kraftbot.bench.stub_llm --port 8400``. Every chat
+completion waits ``ttft`` seconds, then streams a Markdown fantasy football
+answer at ``tokens_per_second``, one word per token. When the request offers
+tools and the last message is the user's, the stub first answers with a call
+to one of them, so a turn exercises the full tool loop.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Repeated to the requested length; Markdown so rendering is exercised too
+ANSWER_TEMPLATE = """## Week 4 Lineup
+
+- **Start** Bijan Robinson at RB1: 22 touches a game and a soft run defense.
+- **Start** Amon-Ra St. Brown at WR1: 9.5 targets per game since week 1.
+- **Sit** Tyreek Hill: questionable with an ankle injury, monitor Sunday.
+
+| Player | Projection | Risk |
+|--------|-----------:|------|
+| Bijan Robinson | 18.4 | Low |
+| Amon-Ra St. Brown | 16.9 | Low |
+
+"""
+
+
+@dataclass
+class StubLLMConfig:
+    """How fast the stub answers"""
+
+    ttft: float = 0.2  # Seconds before the first token
+    tokens_per_second: float = 200.0
+    response_tokens: int = 150  # Words in a text answer
+    call_tools: bool = True  # Call a tool before answering when tools are offered
+    tool_name: Optional[str] = None  # Tool to call; defaults to the first offered
+
+    def answer(self) -> List[str]:
+        """Tokens of the text answer"""
+        words = ANSWER_TEMPLATE.replace("\n", " \n ").split(" ")
+        words = [word for word in words if word]
+        tokens = [words[i % len(words)] for i in range(self.response_tokens)]
+        return [token if token == "\n" else f"{token} " for token in tokens]
+
+    def model_time(self, tool_turn: bool = False) -> float:
+        """Seconds the stub itself spends on a turn"""
+        text_time = self.ttft + self.response_tokens / self.tokens_per_second
+        return text_time + self.ttft if tool_turn else text_time
+
+
+def _pick_tool(body: Dict[str, Any], config: StubLLMConfig) -> Optional[str]:
+    """Tool to call for this request, or None to answer with text"""
+    tools = body.get("tools") or []
+    messages = body.get("messages") or []
+    if not config.call_tools or not tools or not messages:
+        return None
+    if messages[-1].get("role") != "user":
+        return None
+    names = [tool["function"]["name"] for tool in tools]
+    if config.tool_name:
+        for name in names:
+            if name == config.tool_name or name.endswith(f"_{config.tool_name}"):
+                return name
+        return None
+    return names[0]
+
+
+def _tool_call(name: str) -> Dict[str, Any]:
+    """A call to a tool with no arguments"""
+    return {
+        "id": "call_stub",
+        "type": "function",
+        "function": {"name": name, "arguments": "{}"},
+    }
+
+
+def _chunk(
+    model: str,
+    delta: Optional[Dict[str, Any]] = None,
+    finish_reason: Optional[str] = None,
+    usage: Optional[Dict[str, int]] = None,
+) -> str:
+    """One server-sent chat.completion.chunk; usage-only chunks have no choices"""
+    payload: Dict[str, Any] = {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [],
+    }
+    if delta is not None:
+        payload["choices"].append(
+            {"index": 0, "delta": delta, "finish_reason": finish_reason}
+        )
+    if usage is not None:
+        payload["usage"] = usage
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def create_stub_llm_app(config: Optional[StubLLMConfig] = None) -> Starlette:
+    """
+    Create the stub model application
+
+    Args:
+        config: Latency and answer settings (defaults to StubLLMConfig())
+
+    Returns:
+        Starlette: ASGI app serving POST /v1/chat/completions
+    """
+    config = config or StubLLMConfig()
+
+    async def completions(request: Request) -> Response:
+        body = await request.json()
+        model = body.get("model", "bench/stub")
+        tool = _pick_tool(body, config)
+        tokens = [] if tool else config.answer()
+        usage = {
+            "prompt_tokens": sum(
+                len(str(message.get("content") or "")) // 4
+                for message in body.get("messages", [])
+            ),
+            "completion_tokens": len(tokens) or 1,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        if not body.get("stream"):
+            await asyncio.sleep(config.ttft + len(tokens) / config.tokens_per_second)
+            message: Dict[str, Any] = {"role": "assistant", "content": "".join(tokens)}
+            if tool:
+                message = {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [_tool_call(tool)],
+                }
+            return JSONResponse(
+                {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": message,
+                            "finish_reason": "tool_calls" if tool else "stop",
+                        }
+                    ],
+                    "usage": usage,
+                }
+            )
+
+        async def events() -> AsyncIterator[str]:
+            await asyncio.sleep(config.ttft)
+            if tool:
+                call = {"index": 0, **_tool_call(tool)}
+                yield _chunk(model, {"role": "assistant", "tool_calls": [call]})
+                yield _chunk(model, {}, "tool_calls")
+            else:
+                for index, token in enumerate(tokens):
+                    # Pace against the start time so sleeps don't accumulate drift
+                    due = start + config.ttft + index / config.tokens_per_second
+                    delay = due - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    delta = {"content": token}
+                    if index == 0:
+                        delta["role"] = "assistant"
+                    yield _chunk(model, delta)
+                yield _chunk(model, {}, "stop")
+            yield _chunk(model, usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    return Starlette(
+        routes=[
+            Route("/v1/chat/completions", completions, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+        ]
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the stub model server"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8400)
+    parser.add_argument("--ttft", type=float, default=StubLLMConfig.ttft)
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=StubLLMConfig.tokens_per_second
+    )
+    parser.add_argument(
+        "--response-tokens", type=int, default=StubLLMConfig.response_tokens
+    )
+    parser.add_argument("--no-tools", action="store_true", help="Never call tools")
+    parser.add_argument("--tool-name", default=None)
+    args = parser.parse_args(argv)
+
+    config = StubLLMConfig(
+        ttft=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        call_tools=not args.no_tools,
+        tool_name=args.tool_name,
+    )
+    uvicorn.run(
+        create_stub_llm_app(config),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
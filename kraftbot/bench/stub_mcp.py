@@ -0,0 +1,156 @@
+"""
+Local MCP server serving Sleeper-shaped fixture data with configurable latency.
+
+Run over stdio with ``python -m kraftbot.bench.stub_mcp --latency 0.05``
+(how the benchmarks start it) or over SSE with ``--transport sse --port
+8401``. Data is generated from a fixed seed, so every run sees the same
+league.
+"""
+
+import argparse
+import asyncio
+import random
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+
+POSITIONS = ["QB", "RB", "RB", "WR", "WR", "WR", "TE", "K", "DEF"]
+TEAMS = ["ATL", "BUF", "DAL", "DET", "KC", "MIA", "PHI", "SF"]
+
+
+def make_league(teams: int = 12, roster_size: int = 16, seed: int = 4) -> Dict:
+    """
+    Build a league in the shape of the Sleeper API
+
+    Args:
+        teams: Number of rosters
+        roster_size: Players per roster
+        seed: Random seed, so the same arguments give the same league
+
+    Returns:
+        dict: players, rosters, matchups and trending lists
+    """
+    rng = random.Random(seed)
+    players = {}
+    for index in range(teams * roster_size + 50):
+        player_id = str(1000 + index)
+        players[player_id] = {
+            "player_id": player_id,
+            "full_name": f"Player {player_id}",
+            "position": rng.choice(POSITIONS),
+            "team": rng.choice(TEAMS),
+            "injury_status": rng.choice([None, None, None, "Questionable", "Out"]),
+            "years_exp": rng.randint(0, 12),
+        }
+
+    player_ids = list(players)
+    rosters = []
+    matchups = []
+    for roster_id in range(1, teams + 1):
+        roster_players = player_ids[
+            (roster_id - 1) * roster_size : roster_id * roster_size
+        ]
+        starters = roster_players[:9]
+        rosters.append(
+            {
+                "roster_id": roster_id,
+                "owner_id": f"user_{roster_id}",
+                "players": roster_players,
+                "starters": starters,
+                "settings": {
+                    "wins": rng.randint(0, 4),
+                    "losses": rng.randint(0, 4),
+                    "fpts": rng.randint(300, 550),
+                },
+            }
+        )
+        points = {pid: round(rng.uniform(0, 30), 2) for pid in roster_players}
+        matchups.append(
+            {
+                "roster_id": roster_id,
+                "matchup_id": (roster_id + 1) // 2,
+                "starters": starters,
+                "players_points": points,
+                "points": round(sum(points[pid] for pid in starters), 2),
+            }
+        )
+
+    trending = [
+        {"player_id": pid, "count": rng.randint(100, 50_000)}
+        for pid in player_ids[-25:]
+    ]
+    return {
+        "players": players,
+        "rosters": rosters,
+        "matchups": matchups,
+        "trending": trending,
+    }
+
+
+def create_stub_mcp_server(
+    latency: float = 0.05, league: Optional[Dict] = None
+) -> "FastMCP":
+    """
+    Create the stub MCP server
+
+    Args:
+        latency: Seconds every tool call waits before answering
+        league: Fixture data (defaults to make_league())
+
+    Returns:
+        FastMCP: Server with Sleeper-style tools
+    """
+    from mcp.server.fastmcp import FastMCP
+
+    league = league or make_league()
+    server = FastMCP("kraftbot-bench", log_level="WARNING")
+
+    @server.tool()
+    async def get_league_rosters(league_id: str = "bench") -> List[Dict[str, Any]]:
+        """Get every roster in the league"""
+        await asyncio.sleep(latency)
+        return league["rosters"]
+
+    @server.tool()
+    async def get_league_matchups(
+        week: int = 4, league_id: str = "bench"
+    ) -> List[Dict[str, Any]]:
+        """Get the matchups and points for a week"""
+        await asyncio.sleep(latency)
+        return league["matchups"]
+
+    @server.tool()
+    async def get_trending_players(
+        trend_type: str = "add", limit: int = 25
+    ) -> List[Dict[str, Any]]:
+        """Get the most added or dropped players"""
+        await asyncio.sleep(latency)
+        return league["trending"][:limit]
+
+    @server.tool()
+    async def get_player(player_id: str) -> Optional[Dict[str, Any]]:
+        """Get one player's details"""
+        await asyncio.sleep(latency)
+        return league["players"].get(player_id)
+
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the stub MCP server"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--transport", choices=["stdio", "sse"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8401)
+    args = parser.parse_args(argv)
+
+    server = create_stub_mcp_server(latency=args.latency)
+    server.settings.host = args.host
+    server.settings.port = args.port
+    server.run(transport=args.transport)
+
+
+if __name__ == "__main__":
+    main()
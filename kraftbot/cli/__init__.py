@@ -2,9 +2,35 @@
 CLI interface components for KraftBot.
 """
 
-from .app import create_app
-from .commands import chat, compare, mcp_info, models, status, test
-from .utils import check_environment, console, print_banner
+from typing import TYPE_CHECKING, List
+
+from ..utils.lazy import lazy_dir, lazy_exports
+
+if TYPE_CHECKING:
+    from .app import create_app
+    from .commands import chat, compare, mcp_info, models, status, test
+    from .utils import check_environment, console, print_banner
+
+_EXPORTS = {
+    "create_app": ".app",
+    "chat": ".commands",
+    "models": ".commands",
+    "test": ".commands",
+    "compare": ".commands",
+    "mcp_info": ".commands",
+    "status": ".commands",
+    "console": ".utils",
+    "print_banner": ".utils",
+    "check_environment": ".utils",
+}
+
+# Settings are built on first use, after main() has set up the environment
+__getattr__ = lazy_exports(__name__, _EXPORTS)
+
+
+def __dir__() -> List[str]:
+    return lazy_dir(globals(), _EXPORTS)
+
 
 __all__ = [
     "create_app",
@@ -2,14 +2,26 @@
 Main CLI application setup for KraftBot.
 """
 
-import typer
+import os
 
-from .commands import chat, compare, mcp_info, models, prompts, status, test
-from .utils import console
+import typer
 
 
 def create_app() -> typer.Typer:
     """Create and configure the main CLI application"""
+    from .commands import (
+        batch,
+        bench,
+        chat,
+        compare,
+        mcp_info,
+        models,
+        prompts,
+        serve,
+        stats,
+        status,
+        test,
+    )
 
     app = typer.Typer(
         name="kraftbot",
@@ -25,15 +37,28 @@ def create_app() -> typer.Typer:
     app.command(name="models")(models)
     app.command(name="test")(test)
     app.command(name="compare")(compare)
+    app.command(name="batch")(batch)
+    app.command(name="serve")(serve)
+    app.command(name="bench")(bench)
     app.command(name="mcp")(mcp_info)
     app.command(name="status")(status)
+    app.command(name="stats")(stats)
     app.command(name="prompts")(prompts)
 
     return app
 
 
-def main():
+def main() -> None:
     """Main entry point for the CLI"""
+    # Pydantic loads installed plugins the first time a model is built, and
+    # logfire's pulls in logfire and OpenTelemetry (~300ms). KraftBot never
+    # turns that plugin on, so the CLI skips it unless the user asked for it.
+    # Set here rather than at import so library users keep their plugins.
+    if "LOGFIRE_PYDANTIC_PLUGIN_RECORD" not in os.environ:
+        os.environ.setdefault("PYDANTIC_DISABLE_PLUGINS", "logfire-plugin")
+
+    from .utils import console
+
     app = create_app()
 
     try:
@@ -3,114 +3,216 @@ CLI command implementations for KraftBot.
 """
 
 import asyncio
+import sys
 import time
-from typing import List, Optional
+from contextlib import ExitStack
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, TextIO, Union
 
 import typer
-from prompt_toolkit.history import InMemoryHistory
-from prompt_toolkit.shortcuts import PromptSession
-from prompt_toolkit.styles import Style
+from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
-from rich.progress import (
-    BarColumn,
-    Progress,
-    SpinnerColumn,
-    TextColumn,
-    TimeElapsedColumn,
-)
-from rich.rule import Rule
-from rich.status import Status
 
 from ..config.settings import settings
-from ..core.agent import PydanticAIAgent
-from ..utils.prompt_loader import prompt_loader
+from ..utils.prompt_loader import CompiledPrompt, prompt_loader
 from .utils import (
     check_environment,
     console,
+    display_bench_results,
+    display_cache_status,
+    display_hedge_stats,
+    display_mcp_status,
     display_model_table,
-    display_response,
+    display_run_stats,
     display_system_status,
     print_banner,
 )
 
+# The agent stack (pydantic_ai, openai, logfire, mcp) and prompt_toolkit are
+# imported inside the commands that need them so `models`, `status`,
+# `prompts` and `stats` start without loading them
+if TYPE_CHECKING:
+    from ..core.agent import PydanticAIAgent
+    from ..core.batch import BatchResult
+    from ..core.cassette import Cassette
+    from ..core.router import RoutedAgent
+
 # Global agent instance
-agent: Optional[PydanticAIAgent] = None
+agent: Optional[Union["PydanticAIAgent", "RoutedAgent"]] = None
 
 
 async def display_streaming_response(
     user_input: str,
-    agent: PydanticAIAgent,
+    agent: Union["PydanticAIAgent", "RoutedAgent"],
     user_id: str,
     session_id: str,
     start_time: float,
 ):
     """Display streaming response with markdown formatting"""
     from rich.live import Live
-    from rich.markdown import Markdown
-    from rich.panel import Panel
 
-    console.print("🧠 [cyan]KraftBot:[/cyan]")
+    from ..core.models import StreamEnd, StreamStart
+    from .render import IncrementalMarkdown
 
-    # Try streaming first, but be ready to fallback to non-streaming
-    streaming_worked = False
-    last_response = ""
+    console.print("🧠 [cyan]KraftBot:[/cyan]")
 
     with Live(refresh_per_second=10, console=console) as live:
         try:
-            chunk_count = 0
-            async for token in agent.run_stream(user_input, user_id, session_id):
-                chunk_count += 1
-                current_text = str(token)
-                last_response = current_text
-
-                # Display current markdown content
-                markdown_content = Markdown(current_text)
+            renderer = IncrementalMarkdown()
+            async for event in agent.stream_events(user_input, user_id, session_id):
+                if isinstance(event, StreamStart):
+                    if event.resumed:
+                        # The run was retried after a dropped connection
+                        renderer = IncrementalMarkdown()
+                    elif event.route_reason:
+                        console.print(
+                            f"🧭 [dim]Routed to {event.model_name}: {event.route_reason}[/dim]"
+                        )
+                    continue
+                if isinstance(event, StreamEnd):
+                    if event.timed_out:
+                        console.print(
+                            f"⏰ [yellow]{event.error}; the response above is partial[/yellow]"
+                        )
+                    elif event.error:
+                        console.print(f"❌ [red]Error: {event.error}[/red]")
+                    elif event.usage.get("cache_read_tokens"):
+                        console.print(
+                            f"💾 [dim]Prompt cache: {event.usage['cache_read_tokens']} of "
+                            f"{event.usage['input_tokens']} input tokens read from cache[/dim]"
+                        )
+                    continue
+
+                # Only the trailing open Markdown block is re-parsed per chunk
+                renderer.append(event.text)
                 elapsed_time = time.time() - start_time
                 panel = Panel(
-                    markdown_content,
+                    renderer,
                     title=f"Response ({elapsed_time:.1f}s)",
                     border_style="green",
                     padding=(0, 1),
                 )
                 live.update(panel)
 
-                # If we get multiple chunks, streaming is working
-                if chunk_count > 3:
-                    streaming_worked = True
-
-                # Timeout protection
-                if elapsed_time > settings.request_timeout:
-                    console.print(
-                        f"\n⏰ [yellow]Response timeout after {settings.request_timeout}s[/yellow]"
-                    )
-                    break
-
         except Exception as e:
             console.print(f"❌ [red]Streaming error: {e}[/red]")
 
-    # If streaming didn't work well (too few chunks or short response), try non-streaming
-    if not streaming_worked or len(last_response) < 200:
-        console.print(
-            "🔄 [yellow]Switching to non-streaming mode for better response...[/yellow]"
+
+def check_route(
+    route: Optional[str], model: Optional[str] = None, log: Console = console
+) -> None:
+    """Validate a --route option"""
+    if route is None:
+        return
+    if route != "auto":
+        log.print(f"❌ [red]Unknown route '{route}'; use --route auto[/red]")
+        raise typer.Exit(1)
+    if model:
+        log.print("⚠️  [yellow]--route auto picks the model; ignoring --model[/yellow]")
+
+
+def open_cassette(
+    record: Optional[Path],
+    replay: Optional[Path],
+    realtime: bool = False,
+    log: Console = console,
+) -> Optional["Cassette"]:
+    """Open the cassette named by --record or --replay, if any"""
+    if record and replay:
+        log.print("❌ [red]Use either --record or --replay, not both[/red]")
+        raise typer.Exit(1)
+    if not record and not replay:
+        return None
+
+    from ..core.cassette import Cassette
+
+    try:
+        cassette = Cassette(
+            record or replay,
+            mode="record" if record else "replay",
+            realtime=realtime,
+        )
+    except (OSError, ValueError, KeyError) as e:
+        log.print(f"❌ [red]Could not open cassette: {e}[/red]")
+        raise typer.Exit(1)
+    action = "Recording to" if cassette.recording else "Replaying"
+    log.print(f"📼 [cyan]{action} {cassette.path}[/cyan]")
+    return cassette
+
+
+def is_replaying(cassette: Optional["Cassette"]) -> bool:
+    """Whether a --replay cassette stands in for the API"""
+    return cassette is not None and cassette.replaying
+
+
+def build_agent(
+    model_name: str,
+    system_prompt: Optional[str],
+    use_cache: bool = True,
+    route: Optional[str] = None,
+    cassette: Optional["Cassette"] = None,
+) -> Union["PydanticAIAgent", "RoutedAgent"]:
+    """Build a single-model agent, or a routed one for --route auto"""
+    # Replays never reach the API, so they run without a key
+    api_key = settings.openrouter_api_key
+    if not api_key and is_replaying(cassette):
+        api_key = "replay"
+
+    if route == "auto":
+        from ..core.router import RoutedAgent
+
+        return RoutedAgent(
+            openrouter_api_key=api_key,
+            system_prompt=system_prompt,
+            enable_logfire=settings.enable_logfire,
+            enable_cache=use_cache,
+            cassette=cassette,
         )
-        try:
-            response = await agent.run(user_input, user_id, session_id)
-            display_response(response, time.time() - start_time)
-        except Exception as fallback_error:
-            console.print(f"❌ [red]Fallback error: {fallback_error}[/red]")
 
+    from ..core.agent import PydanticAIAgent
+
+    return PydanticAIAgent(
+        openrouter_api_key=api_key,
+        model_name=model_name,
+        system_prompt=system_prompt,
+        enable_logfire=settings.enable_logfire,
+        enable_cache=use_cache,
+        cassette=cassette,
+    )
+
+
+async def initialize_agent(
+    model: str = None,
+    prompt: str = None,
+    use_cache: bool = True,
+    interactive: bool = False,
+    route: Optional[str] = None,
+    cassette: Optional["Cassette"] = None,
+) -> bool:
+    """
+    Initialize the agent with loading animation
+
+    Args:
+        model: Model to use (defaults to the configured default)
+        prompt: System prompt name or file path
+        use_cache: Whether the agent may serve cached responses
+        interactive: Whether a person is waiting at a chat prompt; the
+            startup animation pause only runs then
+        route: "auto" to pick a model per prompt instead of using one model
+        cassette: Cassette to record model and tool traffic to, or replay
+            it from
+    """
+    from rich.status import Status
 
-async def initialize_agent(model: str = None, prompt: str = None) -> bool:
-    """Initialize the agent with loading animation"""
     global agent
 
-    if not settings.is_api_key_configured():
+    if not settings.is_api_key_configured() and not is_replaying(cassette):
         console.print("❌ [red]OPENROUTER_API_KEY not found![/red]")
         console.print("💡 Get your API key from: https://openrouter.ai/")
         return False
 
-    model_name = model or settings.default_model
+    model_name = "auto" if route else model or settings.default_model
 
     # Load system prompt if specified
     system_prompt = None
@@ -125,13 +227,8 @@ async def initialize_agent(model: str = None, prompt: str = None) -> bool:
 
     with Status("🚀 Initializing KraftBot agent...", console=console, spinner="dots"):
         try:
-            agent = PydanticAIAgent(
-                openrouter_api_key=settings.openrouter_api_key,
-                model_name=model_name,
-                system_prompt=system_prompt,
-                enable_logfire=settings.enable_logfire,
-            )
-            if settings.cli_animations:
+            agent = build_agent(model_name, system_prompt, use_cache, route, cassette)
+            if interactive and settings.cli_animations:
                 await asyncio.sleep(1)  # Dramatic pause
 
         except Exception as e:
@@ -176,21 +273,61 @@ async def chat_async(
         "-u",
         help="User ID for session tracking (defaults to configured default)",
     ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass the response cache for this session"
+    ),
+    route: Optional[str] = typer.Option(
+        None,
+        "--route",
+        help="'auto' picks a model per prompt from its size, tool needs, latency and cost",
+    ),
+    record: Optional[Path] = typer.Option(
+        None, "--record", help="Record model and MCP traffic to this cassette file"
+    ),
+    replay: Optional[Path] = typer.Option(
+        None,
+        "--replay",
+        help="Answer from a recorded cassette instead of the model and MCP servers",
+    ),
+    realtime: bool = typer.Option(
+        False,
+        "--realtime",
+        help="Replay with the recorded latency instead of instantly",
+    ),
 ):
     """🎯 Start an interactive chat session with KraftBot"""
+    from prompt_toolkit.history import InMemoryHistory
+    from prompt_toolkit.shortcuts import PromptSession
+    from prompt_toolkit.styles import Style
+    from rich.rule import Rule
+
     print_banner()
 
-    if not check_environment():
+    cassette = open_cassette(record, replay, realtime)
+    if not check_environment() and not is_replaying(cassette):
         raise typer.Exit(1)
 
     # Initialize agent
-    if not await initialize_agent(model, prompt):
+    check_route(route, model)
+    if not await initialize_agent(
+        model,
+        prompt,
+        use_cache=not no_cache,
+        interactive=True,
+        route=route,
+        cassette=cassette,
+    ):
         raise typer.Exit(1)
 
     console.print(Rule("🎯 Interactive Chat Mode", style="bright_cyan"))
     console.print("[dim]Type 'quit', 'exit', or press Ctrl+C to end the session[/dim]")
     console.print("[dim]Use ↑/↓ arrow keys to navigate command history[/dim]\n")
 
+    # Edits to the prompt file are picked up between turns
+    loaded_prompt = prompt_loader.get_prompt(prompt) if prompt else None
+    if loaded_prompt is not None:
+        prompt_loader.start_watching()
+
     session_id = f"chat_{int(time.time())}"
     message_count = 0
     user_id = user_id or settings.default_user_id
@@ -207,44 +344,64 @@ async def chat_async(
         }
     )
 
-    try:
-        while True:
-            # Interactive prompt with history support
-            try:
-                user_input = await session.prompt_async(
-                    f"You ({message_count + 1}): ", style=prompt_style
-                )
-                user_input = user_input.strip()
-            except EOFError:
-                # Handle Ctrl+D
-                console.print(
-                    "\n👋 [yellow]Thanks for chatting with KraftBot![/yellow]"
-                )
-                break
+    # Keep MCP sessions open for the whole chat instead of reconnecting per turn
+    async with agent:
+        try:
+            while True:
+                # Interactive prompt with history support
+                try:
+                    user_input = await session.prompt_async(
+                        f"You ({message_count + 1}): ", style=prompt_style
+                    )
+                    user_input = user_input.strip()
+                except EOFError:
+                    # Handle Ctrl+D
+                    console.print(
+                        "\n👋 [yellow]Thanks for chatting with KraftBot![/yellow]"
+                    )
+                    break
 
-            if user_input.lower() in ["quit", "exit", "q"]:
-                console.print(
-                    "\n👋 [yellow]Thanks for chatting with KraftBot![/yellow]"
-                )
-                break
+                if user_input.lower() in ["quit", "exit", "q"]:
+                    console.print(
+                        "\n👋 [yellow]Thanks for chatting with KraftBot![/yellow]"
+                    )
+                    break
 
-            if not user_input:
-                continue
+                if not user_input:
+                    continue
 
-            # Stream response
-            start_time = time.time()
-            try:
-                await display_streaming_response(
-                    user_input, agent, user_id, session_id, start_time
-                )
-            except Exception as e:
-                console.print(f"❌ [red]Error: {e}[/red]")
-                continue
-            message_count += 1
-            console.print()  # Add spacing
+                if loaded_prompt is not None:
+                    loaded_prompt = reload_system_prompt(prompt, loaded_prompt)
 
-    except KeyboardInterrupt:
-        console.print("\n👋 [yellow]Session ended by user[/yellow]")
+                # Stream response
+                start_time = time.time()
+                try:
+                    await display_streaming_response(
+                        user_input, agent, user_id, session_id, start_time
+                    )
+                except Exception as e:
+                    console.print(f"❌ [red]Error: {e}[/red]")
+                    continue
+                message_count += 1
+                console.print()  # Add spacing
+
+        except KeyboardInterrupt:
+            console.print("\n👋 [yellow]Session ended by user[/yellow]")
+
+    await prompt_loader.stop_watching()
+    display_hedge_stats()
+    if cassette is not None:
+        console.print(f"📼 [dim]{cassette.summary()}[/dim]")
+
+
+def reload_system_prompt(prompt: str, loaded: CompiledPrompt) -> CompiledPrompt:
+    """Give the agent the latest version of its prompt file, if it changed"""
+    current = prompt_loader.get_prompt(prompt)
+    if current is None or current.hash == loaded.hash:
+        return loaded
+    agent.set_system_prompt(current.text)
+    console.print(f"🔄 [cyan]Reloaded system prompt: {prompt}[/cyan]")
+    return current
 
 
 def chat(
@@ -266,14 +423,59 @@ def chat(
         "-u",
         help="User ID for session tracking (defaults to configured default)",
     ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass the response cache for this session"
+    ),
+    route: Optional[str] = typer.Option(
+        None,
+        "--route",
+        help="'auto' picks a model per prompt from its size, tool needs, latency and cost",
+    ),
+    record: Optional[Path] = typer.Option(
+        None, "--record", help="Record model and MCP traffic to this cassette file"
+    ),
+    replay: Optional[Path] = typer.Option(
+        None,
+        "--replay",
+        help="Answer from a recorded cassette instead of the model and MCP servers",
+    ),
+    realtime: bool = typer.Option(
+        False,
+        "--realtime",
+        help="Replay with the recorded latency instead of instantly",
+    ),
 ):
     """🎯 Start an interactive chat session with KraftBot"""
-    asyncio.run(chat_async(model, prompt, user_id))
+    asyncio.run(
+        chat_async(model, prompt, user_id, no_cache, route, record, replay, realtime)
+    )
 
 
-def models():
-    """📋 List available models and their capabilities"""
+def models(
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Download current prices and context lengths from OpenRouter first",
+    ),
+) -> None:
+    """📋 List available models with prices and measured latency"""
     print_banner()
+
+    if refresh:
+        from ..config.catalog import load_catalog, refresh_openrouter_dump
+
+        dump_path = settings.get_openrouter_models_path()
+        try:
+            count = refresh_openrouter_dump(dump_path)
+            settings.available_models = load_catalog(
+                settings.model_catalog_file, dump_path
+            )
+            console.print(
+                f"✅ [green]Refreshed {count} OpenRouter models into {dump_path}[/green]"
+            )
+        except Exception as e:
+            console.print(f"⚠️  [yellow]Could not refresh model list: {e}[/yellow]")
+
     display_model_table()
 
 
@@ -293,19 +495,48 @@ def test(
         "-s",
         help="System prompt name (e.g., 'default', 'aggressive') or file path (e.g., '/path/to/prompt.md')",
     ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass the response cache"
+    ),
+    route: Optional[str] = typer.Option(
+        None,
+        "--route",
+        help="'auto' picks a model per prompt from its size, tool needs, latency and cost",
+    ),
+    record: Optional[Path] = typer.Option(
+        None, "--record", help="Record model and MCP traffic to this cassette file"
+    ),
+    replay: Optional[Path] = typer.Option(
+        None,
+        "--replay",
+        help="Answer from a recorded cassette instead of the model and MCP servers",
+    ),
+    realtime: bool = typer.Option(
+        False,
+        "--realtime",
+        help="Replay with the recorded latency instead of instantly",
+    ),
 ):
     """🧪 Test a specific model with a prompt"""
     print_banner()
 
-    if not check_environment():
+    cassette = open_cassette(record, replay, realtime)
+    if not check_environment() and not is_replaying(cassette):
         raise typer.Exit(1)
 
-    model_name = model or settings.default_model
+    check_route(route, model)
+    model_name = "auto" if route else model or settings.default_model
     console.print(f"🧪 [bold cyan]Testing model:[/bold cyan] {model_name}")
     console.print(f"📝 [bold cyan]Prompt:[/bold cyan] {prompt}\n")
 
     async def run_test():
-        if not await initialize_agent(model_name, system_prompt):
+        if not await initialize_agent(
+            model_name,
+            system_prompt,
+            use_cache=not no_cache,
+            route=route,
+            cassette=cassette,
+        ):
             return False
 
         start_time = time.time()
@@ -316,6 +547,9 @@ def test(
                 prompt, agent, "test_user", "test_session", start_time
             )
             console.print("\n✅ [green]Test completed successfully![/green]")
+            display_hedge_stats()
+            if cassette is not None:
+                console.print(f"📼 [dim]{cassette.summary()}[/dim]")
         except Exception as e:
             console.print(f"❌ [red]Test failed: {e}[/red]")
             return False
@@ -336,8 +570,28 @@ def compare(
     models: Optional[List[str]] = typer.Option(
         None, "--model", "-m", help="Models to compare (can be used multiple times)"
     ),
+    concurrency: int = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        help="Maximum models to run at once (defaults to configured limit)",
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass the response cache"
+    ),
 ):
     """⚖️ Compare responses from different models"""
+    from rich.progress import (
+        BarColumn,
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        TimeElapsedColumn,
+    )
+
+    from ..core.compare import CompareEngine
+    from ..core.models import ModelComparison
+
     print_banner()
 
     if not check_environment():
@@ -353,8 +607,6 @@ def compare(
     console.print(f"📝 [bold cyan]Prompt:[/bold cyan] {prompt}\n")
 
     async def run_comparison():
-        results = []
-
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -363,47 +615,48 @@ def compare(
             console=console,
         ) as progress:
 
-            task = progress.add_task("Testing models...", total=len(model_names))
-
-            for model_name in model_names:
-                progress.update(task, description=f"Testing {model_name}")
-
-                try:
-                    if not await initialize_agent(model_name):
-                        results.append((model_name, None, "Initialization failed"))
-                        continue
-
-                    start_time = time.time()
-                    response = await agent.run(
-                        prompt, "compare_user", "compare_session"
-                    )
-                    duration = time.time() - start_time
-
-                    results.append((model_name, response, duration))
-
-                except Exception as e:
-                    results.append((model_name, None, str(e)))
+            task = progress.add_task(
+                f"Running {len(model_names)} models...", total=len(model_names)
+            )
 
+            def on_complete(result: ModelComparison) -> None:
+                progress.update(task, description=f"Finished {result.model_name}")
                 progress.advance(task)
 
+            engine = CompareEngine(
+                model_names, concurrency=concurrency, use_cache=not no_cache
+            )
+            wall_start = time.time()
+            results = await engine.run(prompt, on_complete=on_complete)
+            wall_time = time.time() - wall_start
+
         # Display comparison results
         console.print("\n" + "=" * 80)
         console.print("📊 [bold cyan]Comparison Results[/bold cyan]")
+        console.print(f"[dim]Total wall-clock time: {wall_time:.1f}s[/dim]")
         console.print("=" * 80)
 
-        for i, (model_name, response, duration) in enumerate(results, 1):
-            console.print(f"\n🤖 [bold yellow]Model {i}: {model_name}[/bold yellow]")
+        for i, result in enumerate(results, 1):
+            console.print(
+                f"\n🤖 [bold yellow]Model {i}: {result.model_name}[/bold yellow]"
+            )
 
-            if response is None:
-                console.print(f"❌ [red]Error: {duration}[/red]")
+            if not result.succeeded:
+                console.print(f"❌ [red]Error: {result.error}[/red]")
                 continue
 
-            # Create a simple display - Logfire handles detailed stats automatically
-            response_text = (
-                str(response.response)
-                if not callable(response.response)
-                else str(response.response())
+            ttft = (
+                f"{result.time_to_first_token:.2f}s"
+                if result.time_to_first_token is not None
+                else "n/a"
+            )
+            console.print(
+                f"- [bold]Wall-clock[/bold]: {result.duration:.1f}s | "
+                f"[bold]Time to first token[/bold]: {ttft} | "
+                f"[bold]Total tokens[/bold]: {result.total_tokens}"
             )
+
+            response_text = result.response or ""
             response_preview = (
                 response_text[:200] + "..."
                 if len(response_text) > 200
@@ -413,7 +666,7 @@ def compare(
             console.print(
                 Panel(
                     response_preview,
-                    title=f"Response Preview ({duration:.1f}s)",
+                    title=f"Response Preview ({result.duration:.1f}s)",
                     border_style="dim",
                 )
             )
@@ -421,6 +674,195 @@ def compare(
     asyncio.run(run_comparison())
 
 
+def batch(
+    input_file: str = typer.Argument(
+        "-", help="JSONL file of prompts, or '-' to read from stdin"
+    ),
+    output: Optional[Path] = typer.Option(
+        None,
+        "--output",
+        "-o",
+        help="NDJSON file to append results to (defaults to stdout); IDs already in it are skipped",
+    ),
+    model: str = typer.Option(
+        None, "--model", "-m", help="Model to use (defaults to configured default)"
+    ),
+    system_prompt: str = typer.Option(
+        None,
+        "--system-prompt",
+        "-s",
+        help="System prompt name (e.g., 'default', 'aggressive') or file path (e.g., '/path/to/prompt.md')",
+    ),
+    concurrency: int = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        help="Maximum prompts to run at once (defaults to configured limit)",
+    ),
+    user_id: str = typer.Option(
+        None,
+        "--user",
+        "-u",
+        help="User ID for items that don't set one (defaults to configured default)",
+    ),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass the response cache"
+    ),
+    route: Optional[str] = typer.Option(
+        None,
+        "--route",
+        help="'auto' picks a model per prompt from its size, tool needs, latency and cost",
+    ),
+    record: Optional[Path] = typer.Option(
+        None, "--record", help="Record model and MCP traffic to this cassette file"
+    ),
+    replay: Optional[Path] = typer.Option(
+        None,
+        "--replay",
+        help="Answer from a recorded cassette instead of the model and MCP servers",
+    ),
+    realtime: bool = typer.Option(
+        False,
+        "--realtime",
+        help="Replay with the recorded latency instead of instantly",
+    ),
+) -> None:
+    """📦 Run prompts from a JSONL file and write NDJSON results"""
+    from ..core.batch import BatchResult, BatchRunner, completed_ids, parse_batch_lines
+    from ..core.ratelimit import get_rate_limit_stats
+
+    # Keep stdout clean for NDJSON when results go there
+    log = console if output else Console(stderr=True)
+
+    cassette = open_cassette(record, replay, realtime, log)
+    if not settings.is_api_key_configured() and not is_replaying(cassette):
+        log.print("❌ [red]OPENROUTER_API_KEY not found![/red]")
+        raise typer.Exit(1)
+    check_route(route, model, log)
+
+    skip_ids = completed_ids(output) if output else set()
+    if skip_ids:
+        log.print(f"⏭️  [dim]Skipping {len(skip_ids)} prompts already in {output}[/dim]")
+
+    prompt_text = None
+    if system_prompt:
+        prompt_text = prompt_loader.load_prompt(system_prompt)
+        if not prompt_text:
+            log.print(
+                f"⚠️  [yellow]Could not load prompt '{system_prompt}', using default[/yellow]"
+            )
+
+    async def run_batch(lines: Iterable[str], out: TextIO) -> List["BatchResult"]:
+        batch_agent = build_agent(
+            model or settings.default_model, prompt_text, not no_cache, route, cassette
+        )
+        runner = BatchRunner(batch_agent, concurrency=concurrency, user_id=user_id)
+
+        def on_result(result: BatchResult) -> None:
+            out.write(result.model_dump_json() + "\n")
+            out.flush()
+            if result.timed_out:
+                log.print(
+                    f"⏰ [yellow]{result.id}: timed out after {result.duration:.1f}s; the response is partial[/yellow]"
+                )
+            elif result.succeeded:
+                tokens = result.usage.get("total_tokens", 0)
+                cached = result.usage.get("cache_read_tokens", 0)
+                cached_note = f", {cached} from prompt cache" if cached else ""
+                log.print(
+                    f"✅ [green]{result.id}[/green] [dim]({result.duration:.1f}s, {tokens} tokens{cached_note})[/dim]"
+                )
+            else:
+                log.print(f"❌ [red]{result.id}: {result.error}[/red]")
+
+        # One MCP session for the whole batch
+        async with batch_agent:
+            return await runner.run(
+                parse_batch_lines(lines), on_result, skip_ids=skip_ids
+            )
+
+    wall_start = time.time()
+    try:
+        with ExitStack() as stack:
+            lines = (
+                sys.stdin
+                if input_file == "-"
+                else stack.enter_context(open(input_file, "r", encoding="utf-8"))
+            )
+            out = (
+                stack.enter_context(open(output, "a", encoding="utf-8"))
+                if output
+                else sys.stdout
+            )
+            results = asyncio.run(run_batch(lines, out))
+    except (OSError, ValueError) as e:
+        log.print(f"❌ [red]Batch failed: {e}[/red]")
+        raise typer.Exit(1)
+
+    failed = sum(1 for result in results if not result.succeeded)
+    timed_out = sum(1 for result in results if result.timed_out)
+    log.print(
+        f"📦 [bold cyan]Ran {len(results)} prompts in {time.time() - wall_start:.1f}s[/bold cyan]"
+        + (f" [red]({failed} failed)[/red]" if failed else "")
+        + (f" [yellow]({timed_out} timed out)[/yellow]" if timed_out else "")
+    )
+    for stats in get_rate_limit_stats():
+        if stats["throttled"] or stats["retries"]:
+            log.print(
+                f"🚦 [dim]{stats['name']}: waited {stats['wait_seconds']:.1f}s for rate limits, "
+                f"{stats['rate_limited']} 429s, {stats['retries']} retries[/dim]"
+            )
+    display_hedge_stats(log)
+    if cassette is not None:
+        log.print(f"📼 [dim]{cassette.summary()}[/dim]")
+    if failed:
+        raise typer.Exit(1)
+
+
+def serve(
+    host: str = typer.Option(
+        None, "--host", help="Interface to bind (defaults to configured host)"
+    ),
+    port: int = typer.Option(
+        None, "--port", help="Port to listen on (defaults to configured port)"
+    ),
+    pool_size: int = typer.Option(
+        None,
+        "--pool-size",
+        help="Warm agents per model and system prompt (defaults to configured size)",
+    ),
+    max_queue: int = typer.Option(
+        None,
+        "--max-queue",
+        help="Requests allowed to wait for an agent before returning 503",
+    ),
+) -> None:
+    """🌐 Serve the agent over HTTP (JSON and SSE endpoints)"""
+    try:
+        import uvicorn
+
+        from ..server.app import create_app
+        from ..server.pool import AgentPool
+    except ImportError:
+        console.print("❌ [red]Serve mode needs starlette and uvicorn[/red]")
+        console.print("💡 Install with: pip install 'kraftbot[serve]'")
+        raise typer.Exit(1)
+
+    if not settings.is_api_key_configured():
+        console.print("❌ [red]OPENROUTER_API_KEY not found![/red]")
+        raise typer.Exit(1)
+
+    host = host or settings.serve_host
+    port = port or settings.serve_port
+    app = create_app(AgentPool(size=pool_size, max_queue=max_queue))
+
+    console.print(f"🌐 [bold cyan]Serving KraftBot on http://{host}:{port}[/bold cyan]")
+    console.print(
+        "[dim]POST /run (JSON) · POST /stream (SSE) · GET /health · GET /metrics[/dim]"
+    )
+    uvicorn.run(app, host=host, port=port, log_level="warning")
+
+
 def prompts():
     """List and manage available system prompts"""
     console.print("\n📝 [bold cyan]Available System Prompts[/bold cyan]")
@@ -438,7 +880,8 @@ def prompts():
         status = "✅" if is_valid else "❌"
 
         # Load prompt to show preview
-        content = prompt_loader.load_prompt(prompt_name)
+        compiled = prompt_loader.get_prompt(prompt_name)
+        content = compiled.text if compiled else None
         preview = (
             content[:100] + "..."
             if content and len(content) > 100
@@ -447,6 +890,10 @@ def prompts():
 
         console.print(f"\n{status} [bold]{prompt_name}[/bold]")
         console.print(f"   {preview}")
+        if compiled:
+            console.print(
+                f"   [dim]~{compiled.tokens} tokens · sha256 {compiled.hash[:12]}[/dim]"
+            )
 
         if not is_valid and error:
             console.print(f"   [red]Error: {error}[/red]")
@@ -458,6 +905,95 @@ def prompts():
     )
 
 
+def bench(
+    turns: int = typer.Option(20, "--turns", "-n", help="Measured turns per benchmark"),
+    ttft: float = typer.Option(
+        0.05, "--ttft", help="Stub model seconds to first token"
+    ),
+    tokens_per_second: float = typer.Option(
+        500.0, "--tokens-per-second", help="Stub model streaming speed"
+    ),
+    response_tokens: int = typer.Option(
+        150, "--response-tokens", help="Words in each stub answer"
+    ),
+    tool_latency: float = typer.Option(
+        0.02, "--tool-latency", help="Stub MCP tool seconds per call"
+    ),
+    mcp_transport: str = typer.Option(
+        "stdio", "--mcp-transport", help="Stub MCP transport: stdio or sse"
+    ),
+    output: Optional[Path] = typer.Option(
+        None, "--output", "-o", help="Write results as JSON (usable as a baseline)"
+    ),
+    baseline: Optional[Path] = typer.Option(
+        None, "--baseline", help="Fail if a p50 regressed past this results file"
+    ),
+    tolerance: float = typer.Option(
+        0.25, "--tolerance", help="Allowed slowdown against the baseline (0.25 = 25%)"
+    ),
+) -> None:
+    """⏱️  Benchmark KraftBot's own overhead against local stub servers"""
+    try:
+        from ..bench.runner import (
+            BenchConfig,
+            compare_to_baseline,
+            load_baseline,
+            run_benchmarks,
+            save_results,
+        )
+    except ImportError:
+        console.print("❌ [red]Benchmarks need starlette and uvicorn[/red]")
+        console.print("💡 Install with: pip install 'kraftbot[serve]'")
+        raise typer.Exit(1)
+
+    print_banner()
+
+    if mcp_transport not in ("stdio", "sse"):
+        console.print(f"❌ [red]Unknown MCP transport '{mcp_transport}'[/red]")
+        raise typer.Exit(1)
+
+    config = BenchConfig(
+        turns=turns,
+        ttft=ttft,
+        tokens_per_second=tokens_per_second,
+        response_tokens=response_tokens,
+        tool_latency=tool_latency,
+        mcp_transport=mcp_transport,
+    )
+    with console.status("⏱️  Running benchmarks against stub servers..."):
+        try:
+            results = asyncio.run(run_benchmarks(config))
+        except RuntimeError as e:
+            console.print(f"❌ [red]Benchmark failed: {e}[/red]")
+            raise typer.Exit(1)
+
+    display_bench_results(results)
+
+    if output:
+        save_results(output, config, results)
+        console.print(f"💾 [green]Results saved to {output}[/green]")
+
+    if baseline:
+        regressions = compare_to_baseline(results, load_baseline(baseline), tolerance)
+        for regression in regressions:
+            console.print(f"📉 [red]{regression}[/red]")
+        if regressions:
+            raise typer.Exit(1)
+        console.print(f"✅ [green]No regressions against {baseline}[/green]")
+
+
+def stats(
+    hours: Optional[float] = typer.Option(
+        None, "--hours", help="Only include runs from the last N hours"
+    ),
+) -> None:
+    """📈 Show latency, token and tool percentiles from recorded runs"""
+    print_banner()
+
+    since = time.time() - hours * 3600 if hours else 0
+    display_run_stats(since)
+
+
 def mcp_info():
     """🔌 Show MCP (Model Context Protocol) information"""
     print_banner()
@@ -521,3 +1057,5 @@ def status():
     """📊 Show detailed system status and configuration"""
     print_banner()
     display_system_status()
+    display_cache_status()
+    display_mcp_status()
@@ -0,0 +1,178 @@
+"""
+Incremental Markdown rendering for streamed responses.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from rich.console import Console, ConsoleOptions, RenderResult
+from rich.markdown import Markdown
+from rich.segment import Segment
+
+FENCE_MARKERS = ("```", "~~~")
+
+LIST_ITEM = re.compile(r"([-*+]|\d+[.)])\s")
+
+TABLE_DELIMITER = re.compile(r"\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+# Body rows per finished table block; column widths are fixed per group
+TABLE_ROW_GROUP = 20
+
+
+class IncrementalMarkdown:
+    """
+    Rich renderable for Markdown that arrives in pieces
+
+    Text is split into top-level blocks at blank lines outside code fences.
+    Finished blocks are parsed and rendered once, then replayed from a cache
+    on every refresh; only the trailing open block is re-parsed, so the cost
+    of a refresh doesn't grow with the length of the response.
+
+    Tables have no blank lines to split at, so every TABLE_ROW_GROUP body
+    rows are finished as a block of their own. The next group repeats the
+    header, and each group sizes its columns to its own rows.
+    """
+
+    def __init__(self, text: str = "", **markdown_options: Any):
+        """
+        Initialize the renderer
+
+        Args:
+            text: Initial Markdown text
+            **markdown_options: Extra arguments passed to rich.markdown.Markdown
+        """
+        self.markdown_options = markdown_options
+        self._parts: List[str] = []
+        self._blocks: List[str] = []
+        self._rendered: Dict[int, Tuple[int, List[List[Segment]]]] = {}
+        self._open_lines: List[str] = []
+        self._partial_line = ""
+        self._blank_lines = 0
+        self._fence: Optional[str] = None
+        self._in_list = False
+        self._table_header: Optional[str] = None
+        self._table_rows = 0
+        if text:
+            self.append(text)
+
+    @property
+    def text(self) -> str:
+        """All text received so far"""
+        return "".join(self._parts)
+
+    @property
+    def finished_blocks(self) -> int:
+        """Number of blocks that will no longer change"""
+        return len(self._blocks)
+
+    def append(self, text: str) -> None:
+        """Add newly streamed text"""
+        if not text:
+            return
+        self._parts.append(text)
+
+        lines = (self._partial_line + text).split("\n")
+        self._partial_line = lines.pop()
+        for line in lines:
+            self._add_line(line + "\n")
+
+    def _add_line(self, line: str) -> None:
+        """Feed one complete line into the block splitter"""
+        stripped = line.strip()
+
+        if self._fence is not None:
+            self._open_lines.append(line)
+            if stripped.startswith(self._fence):
+                self._fence = None
+            return
+
+        if not stripped:
+            if self._open_lines:
+                self._blank_lines += 1
+            self._table_header = None
+            return
+
+        if self._table_header is not None:
+            if "|" in stripped:
+                self._add_table_row(line)
+                return
+            self._table_header = None
+
+        # A blank line ends the block unless the next line is indented (a
+        # continuation of a list item or code block) or the next list item
+        if self._blank_lines and not line[0].isspace():
+            if not (self._in_list and LIST_ITEM.match(line)):
+                self._finish_block()
+        if not self._open_lines:
+            self._in_list = bool(LIST_ITEM.match(line))
+        self._open_lines.extend("\n" * self._blank_lines)
+        self._blank_lines = 0
+        self._open_lines.append(line)
+
+        # A header row and delimiter row at the start of a block open a table
+        if (
+            len(self._open_lines) == 2
+            and "|" in self._open_lines[0]
+            and TABLE_DELIMITER.match(stripped)
+        ):
+            self._table_header = "".join(self._open_lines)
+            self._table_rows = 0
+            return
+
+        for marker in FENCE_MARKERS:
+            if stripped.startswith(marker):
+                self._fence = marker
+                break
+
+    def _add_table_row(self, line: str) -> None:
+        """Add a table body row, finishing the block after a full group"""
+        if not self._open_lines:
+            # Continue the table, repeating its header so the group parses
+            self._open_lines.append(self._table_header or "")
+            self._in_list = False
+        self._open_lines.append(line)
+        self._table_rows += 1
+        if self._table_rows >= TABLE_ROW_GROUP:
+            self._finish_block()
+            self._table_rows = 0
+
+    def _finish_block(self) -> None:
+        """Move the open block to the finished list"""
+        self._blocks.append("".join(self._open_lines))
+        self._open_lines = []
+        self._blank_lines = 0
+
+    def _render_block(
+        self, text: str, console: Console, options: ConsoleOptions
+    ) -> List[List[Segment]]:
+        """Parse and render one block of Markdown"""
+        markdown = Markdown(text, **self.markdown_options)
+        return console.render_lines(markdown, options, pad=False)
+
+    def __rich_console__(
+        self, console: Console, options: ConsoleOptions
+    ) -> RenderResult:
+        width = options.max_width
+        rendered: List[List[List[Segment]]] = []
+
+        for index, block in enumerate(self._blocks):
+            cached = self._rendered.get(index)
+            if cached is None or cached[0] != width:
+                cached = (width, self._render_block(block, console, options))
+                self._rendered[index] = cached
+            rendered.append(cached[1])
+
+        open_text = "".join(self._open_lines) + self._partial_line
+        if open_text.strip():
+            rendered.append(self._render_block(open_text, console, options))
+
+        new_line = Segment.line()
+        for index, lines in enumerate(rendered):
+            if index:
+                # Use one separator between blocks, as a single parse would
+                yield new_line
+                while lines and not Segment.get_line_length(lines[0]):
+                    lines = lines[1:]
+            for line in lines:
+                yield from line
+                yield new_line
@@ -3,7 +3,7 @@ CLI utility functions and shared components.
 """
 
 import os
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import rich.box
 from rich.align import Align
@@ -97,20 +97,67 @@ def display_response(response, thinking_time: float):
     # Stats are now handled automatically by Logfire - no need for local display
 
 
+def _format_number(value: Any, template: str, default: str = "—") -> str:
+    """Format a measurement, or a placeholder when it's missing"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return template.format(value)
+    return default
+
+
 def display_model_table():
-    """Display available models in markdown format"""
-    console.print("\n## 🤖 Available Models via OpenRouter\n")
+    """Display available models with prices and measured latency"""
+    from rich.table import Table
+
+    from ..core.model_stats import get_model_stats
+
+    stats = get_model_stats().summaries()
+
+    table = Table(
+        title="🤖 Available Models via OpenRouter",
+        box=rich.box.ROUNDED,
+        header_style="bold cyan",
+    )
+    table.add_column("Model", style="bold")
+    table.add_column("Provider")
+    table.add_column("Context", justify="right")
+    table.add_column("$/M in", justify="right")
+    table.add_column("$/M out", justify="right")
+    table.add_column("TTFT p50 / p95", justify="right")
+    table.add_column("Tok/s p50", justify="right")
+    table.add_column("Runs", justify="right")
 
     for model_name, model_config in settings.available_models.items():
-        strengths = ", ".join(model_config.strengths[:3])
-        console.print(f"### {model_name}")
-        console.print(f"- **Provider**: {model_config.provider}")
-        console.print(f"- **Strengths**: {strengths}")
-        console.print(f"- **Speed**: {model_config.speed}")
-        console.print(f"- **Cost**: {model_config.cost}")
-        console.print()
+        model_stats = stats.get(model_name)
+        if model_stats and model_stats.ttft_p50 is not None:
+            ttft = (
+                f"{model_stats.ttft_p50:.2f}s / "
+                f"{_format_number(model_stats.ttft_p95, '{:.2f}s')}"
+            )
+        else:
+            # Fall back to the catalog's label until the model has been run
+            ttft = f"[dim]{model_config.speed or '—'}[/dim]"
+
+        table.add_row(
+            model_name,
+            str(model_config.provider),
+            _format_number(model_config.context_length, "{:,}"),
+            _format_number(
+                model_config.prompt_price, "${:.2f}", model_config.cost or "—"
+            ),
+            _format_number(model_config.completion_price, "${:.2f}"),
+            ttft,
+            _format_number(
+                model_stats.tokens_per_second_p50 if model_stats else None, "{:.0f}"
+            ),
+            str(model_stats.runs) if model_stats else "0",
+        )
 
-    console.print("💡 [dim]Use --model flag to specify which model to use[/dim]")
+    console.print(table)
+    console.print(
+        "💡 [dim]Use --model flag to specify which model to use. Latency is "
+        "measured from your own streamed runs; refresh prices with "
+        "`kraftbot models --refresh`[/dim]"
+    )
 
 
 def display_system_status():
@@ -148,3 +195,201 @@ def display_system_status():
             status = "❌ Not set"
 
         console.print(f"- **{var_name}**: {status}")
+
+
+def display_cache_status() -> None:
+    """Display response cache location and usage"""
+    console.print("\n## ⚡ Response Cache\n")
+
+    if not settings.enable_response_cache:
+        console.print("- **Status**: ⚠️  Disabled")
+        return
+
+    cache_path = settings.get_cache_dir() / "responses.sqlite3"
+    console.print(f"- **Location**: {cache_path}")
+    console.print(f"- **TTL**: {settings.response_cache_ttl}s")
+
+    if not cache_path.exists():
+        console.print("- **Entries**: 0")
+        return
+
+    from ..core.cache import get_response_cache
+
+    stats = get_response_cache().stats()
+    console.print(f"- **Entries**: {stats['disk_entries']}")
+    console.print(f"- **Size**: {stats['disk_bytes'] / 1024:.1f} KB")
+
+
+def display_mcp_status() -> None:
+    """Display the MCP server's last discovered tools and health check"""
+    console.print("\n## 🔌 MCP Servers\n")
+
+    if not settings.enable_mcp_server:
+        console.print("- **Status**: ⚠️  Disabled")
+        return
+
+    from datetime import datetime
+
+    from ..mcp.discovery import load_cached_tools, open_tool_index_cache
+    from ..mcp.health import load_health, open_health_store
+    from ..mcp.servers import TOKENBOWL_MCP
+
+    def timestamp(value: float) -> str:
+        return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S")
+
+    # Read what the last discovery and health check saved, without connecting
+    console.print(f"- **{TOKENBOWL_MCP.name}**: {TOKENBOWL_MCP.url}")
+    cached = load_cached_tools(
+        open_tool_index_cache(), TOKENBOWL_MCP.name, TOKENBOWL_MCP
+    )
+    if cached is None:
+        console.print("- **Tools**: not discovered yet")
+    else:
+        tools, refreshed_at = cached
+        console.print(
+            f"- **Tools**: {len(tools)} (discovered {timestamp(refreshed_at)})"
+        )
+
+    health = load_health(open_health_store(), TOKENBOWL_MCP)
+    if health is None:
+        console.print("- **Health**: not checked in the last day")
+        return
+
+    circuit = {
+        "closed": "✅ Closed",
+        "half_open": "🟡 Half open",
+        "open": "❌ Open (left out of runs)",
+    }.get(health["circuit"], health["circuit"])
+    console.print(f"- **Circuit**: {circuit}")
+    if health["latency_p50_ms"] is not None:
+        console.print(
+            f"- **Probe Latency**: p50 {health['latency_p50_ms']:.0f} ms, "
+            f"p95 {health['latency_p95_ms']:.0f} ms "
+            f"({health['probes']} probes, {health['probe_failures']} failed)"
+        )
+    if health["last_check"] is not None:
+        console.print(f"- **Last Check**: {timestamp(health['last_check'])}")
+    if health["last_error"]:
+        console.print(f"- **Last Error**: {health['last_error']}")
+
+
+def display_hedge_stats(out: Console = console) -> None:
+    """Display how often hedged requests fired and won in this process"""
+    from ..core.hedge import get_all_hedge_stats
+
+    for stats in get_all_hedge_stats():
+        if stats["fired"]:
+            out.print(
+                f"🪃 [dim]{stats['model']}: hedged {stats['fired']} of "
+                f"{stats['requests']} requests ({stats['fire_rate']:.0%}), "
+                f"backup won {stats['won']} ({stats['win_rate']:.0%})[/dim]"
+            )
+
+
+def _prompt_names() -> Dict[str, str]:
+    """Names of the bundled system prompts, keyed by their hash"""
+    from ..utils.prompt_loader import prompt_loader
+
+    names = {}
+    for name in prompt_loader.list_available_prompts():
+        compiled = prompt_loader.get_prompt(name)
+        if compiled:
+            names.setdefault(compiled.hash, name)
+    return names
+
+
+def display_run_stats(since: float = 0) -> None:
+    """Display latency and token percentiles by model, system prompt and tool"""
+    from rich.table import Table
+
+    from ..core.telemetry import get_telemetry_store
+
+    store = get_telemetry_store()
+    prompt_names = _prompt_names()
+
+    for group_by, title in (("model", "🤖 By Model"), ("prompt", "📝 By Prompt")):
+        groups = store.run_stats(group_by=group_by, since=since)
+        if not groups:
+            console.print("📭 [yellow]No runs recorded yet[/yellow]")
+            console.print(f"💡 [dim]Metrics are stored in {store.path}[/dim]")
+            return
+
+        table = Table(title=title, box=rich.box.ROUNDED, header_style="bold cyan")
+        table.add_column(group_by.title(), style="bold")
+        table.add_column("Runs", justify="right")
+        table.add_column("Cached", justify="right")
+        table.add_column("Errors", justify="right")
+        table.add_column("TTFT p50 / p95", justify="right")
+        table.add_column("Latency p50 / p95", justify="right")
+        table.add_column("Tok/s p50", justify="right")
+        table.add_column("Avg in / out", justify="right")
+        table.add_column("Prompt cache", justify="right")
+
+        for group in groups:
+            key = group.key
+            if group_by == "prompt":
+                key = prompt_names.get(key, key[:12])
+            table.add_row(
+                key,
+                str(group.runs),
+                str(group.cached),
+                str(group.errors),
+                f"{_format_number(group.ttft_p50, '{:.2f}s')} / "
+                f"{_format_number(group.ttft_p95, '{:.2f}s')}",
+                f"{_format_number(group.latency_p50, '{:.2f}s')} / "
+                f"{_format_number(group.latency_p95, '{:.2f}s')}",
+                _format_number(group.tokens_per_second_p50, "{:.0f}"),
+                f"{group.avg_input_tokens:,.0f} / {group.avg_output_tokens:,.0f}",
+                f"{group.cache_read_share:.0%}",
+            )
+        console.print(table)
+
+    tools = store.tool_stats(since=since)
+    if tools:
+        table = Table(
+            title="🔧 By Tool", box=rich.box.ROUNDED, header_style="bold cyan"
+        )
+        table.add_column("Tool", style="bold")
+        table.add_column("Calls", justify="right")
+        table.add_column("p50", justify="right")
+        table.add_column("p95", justify="right")
+        table.add_column("Max", justify="right")
+        for tool in tools:
+            table.add_row(
+                tool.tool,
+                str(tool.calls),
+                _format_number(tool.latency_p50, "{:.3f}s"),
+                _format_number(tool.latency_p95, "{:.3f}s"),
+                _format_number(tool.latency_max, "{:.3f}s"),
+            )
+        console.print(table)
+
+    console.print(
+        "💡 [dim]Latency percentiles count uncached runs without errors; "
+        f"metrics are stored in {store.path}[/dim]"
+    )
+
+
+def display_bench_results(results: List[Any]) -> None:
+    """Display benchmark results as a table"""
+    from rich.table import Table
+
+    table = Table(
+        title="⏱️  KraftBot Overhead", box=rich.box.ROUNDED, header_style="bold cyan"
+    )
+    table.add_column("Benchmark", style="bold")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Samples", justify="right")
+    table.add_column("What it measures", style="dim")
+
+    for result in results:
+        table.add_row(
+            result.name,
+            f"{result.p50:.2f} {result.unit}",
+            f"{result.p95:.2f} {result.unit}",
+            str(result.samples),
+            result.description,
+        )
+
+    console.print(table)
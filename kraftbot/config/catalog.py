@@ -0,0 +1,171 @@
+"""
+Model catalog loaded from a JSON or TOML file.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    from .settings import ModelConfig
+
+OPENROUTER_MODELS_URL = "https://openrouter.ai/api/v1/models"
+
+# Catalog shipped with the package, used when no MODEL_CATALOG_FILE is set
+DEFAULT_CATALOG_PATH = Path(__file__).parent / "models.json"
+
+
+def _read_data(path: Path) -> Any:
+    """Parse a JSON or TOML file"""
+    if path.suffix.lower() == ".toml":
+        if sys.version_info >= (3, 11):
+            import tomllib
+        else:
+            # The tomli backport is a dependency on Python 3.10
+            try:
+                import tomli as tomllib
+            except ImportError as e:
+                raise ValueError(
+                    "TOML catalogs need Python 3.11+ or the tomli package"
+                ) from e
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _model_entries(data: Any) -> List[Dict[str, Any]]:
+    """
+    Model entries from parsed catalog data
+
+    Accepts ``{"models": [...]}`` (``[[models]]`` tables in TOML), a bare
+    list, or a mapping of model name to entry.
+    """
+    if isinstance(data, dict) and "models" in data:
+        data = data["models"]
+    if isinstance(data, dict):
+        return [{"name": name, **entry} for name, entry in data.items()]
+    if isinstance(data, list):
+        return data
+    raise ValueError("Model catalog must be a list or mapping of models")
+
+
+def load_catalog(
+    path: Optional[Union[str, Path]] = None,
+    openrouter_dump: Optional[Union[str, Path]] = None,
+) -> Dict[str, "ModelConfig"]:
+    """
+    Load the model catalog
+
+    Args:
+        path: JSON or TOML catalog file (defaults to the bundled catalog)
+        openrouter_dump: Optional saved OpenRouter models list; prices and
+            context lengths found there replace the catalog's values
+
+    Returns:
+        Dict[str, ModelConfig]: Models keyed by name, in catalog order
+
+    Raises:
+        ValueError: If the catalog is malformed
+    """
+    from .settings import ModelConfig
+
+    catalog_path = Path(path).expanduser() if path else DEFAULT_CATALOG_PATH
+    models: Dict[str, ModelConfig] = {}
+    for entry in _model_entries(_read_data(catalog_path)):
+        if not isinstance(entry, dict) or not entry.get("name"):
+            raise ValueError(f"{catalog_path}: every model needs a 'name'")
+        entry.setdefault("provider", entry["name"].split("/")[0].title())
+        models[entry["name"]] = ModelConfig(**entry)
+
+    if openrouter_dump:
+        dump_path = Path(openrouter_dump).expanduser()
+        if dump_path.exists():
+            apply_openrouter_dump(models, load_openrouter_dump(dump_path))
+
+    return models
+
+
+def _per_million(price: Any) -> Optional[float]:
+    """OpenRouter per-token price string to USD per million tokens"""
+    try:
+        value = float(price)
+    except (TypeError, ValueError):
+        return None
+    # Negative prices mark router models whose cost depends on the target
+    return round(value * 1_000_000, 6) if value >= 0 else None
+
+
+def load_openrouter_dump(path: Union[str, Path]) -> Dict[str, Dict[str, Any]]:
+    """
+    Read a saved response of the OpenRouter models endpoint
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Context length and per-million-token
+            prices keyed by model id
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    models: Dict[str, Dict[str, Any]] = {}
+    for entry in data.get("data", []) if isinstance(data, dict) else []:
+        if not isinstance(entry, dict) or "id" not in entry:
+            continue
+        pricing = entry.get("pricing") or {}
+        models[entry["id"]] = {
+            "context_length": entry.get("context_length"),
+            "prompt_price": _per_million(pricing.get("prompt")),
+            "completion_price": _per_million(pricing.get("completion")),
+        }
+    return models
+
+
+def apply_openrouter_dump(
+    models: Dict[str, "ModelConfig"], dump: Dict[str, Dict[str, Any]]
+) -> int:
+    """
+    Update catalog models with prices and context lengths from a dump
+
+    Only models already in the catalog are updated; the catalog decides
+    which models are offered.
+
+    Returns:
+        int: Number of models updated
+    """
+    updated = 0
+    for name, config in models.items():
+        live = dump.get(name)
+        if not live:
+            continue
+        for field, value in live.items():
+            if value is not None:
+                setattr(config, field, value)
+        updated += 1
+    return updated
+
+
+def refresh_openrouter_dump(path: Union[str, Path], timeout: float = 30.0) -> int:
+    """
+    Download the OpenRouter models list and save it for load_catalog()
+
+    Args:
+        path: Where to write the dump
+        timeout: Request timeout in seconds
+
+    Returns:
+        int: Number of models in the dump
+    """
+    import httpx
+
+    response = httpx.get(OPENROUTER_MODELS_URL, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+
+    path = Path(path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(data), encoding="utf-8")
+    tmp_path.replace(path)
+    return len(data.get("data", []))
@@ -3,9 +3,10 @@ Configuration settings for KraftBot application.
 """
 
 import os
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
@@ -16,9 +17,29 @@ class ModelConfig(BaseModel):
     provider: str = Field(description="Model provider")
     description: Optional[str] = Field(None, description="Model description")
     strengths: List[str] = Field(default_factory=list, description="Model strengths")
-    speed: str = Field("medium", description="Model speed rating")
-    cost: str = Field("medium", description="Model cost rating")
+    speed: Optional[str] = Field(
+        None, description="Speed label, shown only until runs are measured"
+    )
+    cost: Optional[str] = Field(None, description="Cost label, shown without prices")
     context_length: Optional[int] = Field(None, description="Maximum context length")
+    prompt_price: Optional[float] = Field(
+        None, description="USD per million prompt (input) tokens"
+    )
+    completion_price: Optional[float] = Field(
+        None, description="USD per million completion (output) tokens"
+    )
+    quality: Optional[int] = Field(
+        None, description="Relative answer quality, higher is stronger (for routing)"
+    )
+    supports_tools: bool = Field(True, description="Whether tool calling works")
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int) -> Optional[float]:
+        """Estimated USD cost of a run, or None when prices are unknown"""
+        if self.prompt_price is None or self.completion_price is None:
+            return None
+        return (
+            input_tokens * self.prompt_price + output_tokens * self.completion_price
+        ) / 1_000_000
 
     class Config:
         """Pydantic configuration"""
@@ -48,14 +69,107 @@ class Settings(BaseSettings):
 
     # Agent Configuration
     default_confidence_threshold: float = Field(0.7, env="CONFIDENCE_THRESHOLD")
-    max_response_tokens: int = Field(2000, env="MAX_RESPONSE_TOKENS")
-    request_timeout: int = Field(60, env="REQUEST_TIMEOUT")
+    max_response_tokens: int = Field(2000, env="MAX_RESPONSE_TOKENS")  # 0 = no cap
+    request_timeout: int = Field(60, env="REQUEST_TIMEOUT")  # Incl. tool calls
+    compare_concurrency: int = Field(4, env="COMPARE_CONCURRENCY")
+    batch_concurrency: int = Field(4, env="BATCH_CONCURRENCY")
+
+    # HTTP Connection Pool Configuration (shared by providers and MCP)
+    http_http2: bool = Field(True, env="HTTP_HTTP2")  # Used when h2 is installed
+    http_max_connections: int = Field(100, env="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(
+        20, env="HTTP_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    http_keepalive_expiry: float = Field(30.0, env="HTTP_KEEPALIVE_EXPIRY")
+    http_connect_timeout: float = Field(10.0, env="HTTP_CONNECT_TIMEOUT")
+    http_read_timeout: float = Field(300.0, env="HTTP_READ_TIMEOUT")
+    http_write_timeout: float = Field(30.0, env="HTTP_WRITE_TIMEOUT")
+    http_pool_timeout: float = Field(30.0, env="HTTP_POOL_TIMEOUT")
+    mcp_sse_read_timeout: float = Field(300.0, env="MCP_SSE_READ_TIMEOUT")
+
+    # Rate Limit Configuration (0 means no fixed limit)
+    enable_rate_limit: bool = Field(True, env="ENABLE_RATE_LIMIT")
+    rate_limit_rpm: int = Field(0, env="RATE_LIMIT_RPM")
+    rate_limit_tpm: int = Field(0, env="RATE_LIMIT_TPM")
+    rate_limits: Dict[str, Dict[str, int]] = Field(
+        default_factory=dict,
+        env="RATE_LIMITS",
+        description="Per-model limits, e.g. {'openai/gpt-4o': {'rpm': 60, 'tpm': 150000}}",
+    )
+    rate_limit_max_retries: int = Field(5, env="RATE_LIMIT_MAX_RETRIES")
+    rate_limit_base_delay: float = Field(1.0, env="RATE_LIMIT_BASE_DELAY")
+    rate_limit_max_delay: float = Field(60.0, env="RATE_LIMIT_MAX_DELAY")
+
+    # Hedged Requests (a backup request races a slow first response)
+    enable_hedging: bool = Field(False, env="ENABLE_HEDGING")
+    hedge_delay: float = Field(
+        0.0, env="HEDGE_DELAY"
+    )  # Seconds; 0 uses the model's measured p95 time to first response
+    hedge_models: Dict[str, str] = Field(
+        default_factory=dict, env="HEDGE_MODELS"
+    )  # Backup model per primary model; defaults to the same model
+
+    # Provider Prompt Caching (cache_control on the system prompt)
+    enable_prompt_caching: bool = Field(True, env="ENABLE_PROMPT_CACHING")
+
+    # HTTP Serve Configuration
+    serve_host: str = Field("127.0.0.1", env="SERVE_HOST")
+    serve_port: int = Field(8000, env="SERVE_PORT")
+    serve_pool_size: int = Field(4, env="SERVE_POOL_SIZE")
+    serve_max_queue: int = Field(64, env="SERVE_MAX_QUEUE")
+    serve_queue_timeout: float = Field(30.0, env="SERVE_QUEUE_TIMEOUT")
+    serve_max_pools: int = Field(
+        16, env="SERVE_MAX_POOLS"
+    )  # (model, system prompt) pairs kept warm; least recently used go first
+
+    # Cache Configuration
+    # pydantic-settings only reads env aliases; CACHE_DIR also still works
+    cache_dir: Optional[str] = Field(
+        None, validation_alias=AliasChoices("KRAFTBOT_CACHE_DIR", "cache_dir")
+    )
+    enable_response_cache: bool = Field(True, env="ENABLE_RESPONSE_CACHE")
+    response_cache_ttl: int = Field(900, env="RESPONSE_CACHE_TTL")
+    response_cache_memory_entries: int = Field(256, env="RESPONSE_CACHE_MEMORY_ENTRIES")
+    response_cache_max_bytes: int = Field(
+        50 * 1024 * 1024, env="RESPONSE_CACHE_MAX_BYTES"
+    )
+
+    enable_mcp_tool_cache: bool = Field(True, env="ENABLE_MCP_TOOL_CACHE")
+    mcp_tool_cache_ttl: int = Field(300, env="MCP_TOOL_CACHE_TTL")
+    mcp_tool_cache_stale_ttl: int = Field(3600, env="MCP_TOOL_CACHE_STALE_TTL")
+    mcp_tool_cache_ttls: Dict[str, int] = Field(
+        default_factory=dict, env="MCP_TOOL_CACHE_TTLS"
+    )  # Per-tool TTLs, e.g. {"get_league_rosters": 120, "get_trending_players": 0}
+    mcp_tool_cache_max_bytes: int = Field(
+        100 * 1024 * 1024, env="MCP_TOOL_CACHE_MAX_BYTES"
+    )
+    # Seconds before a server's cached tool list is discovered again
+    mcp_tool_index_ttl: int = Field(3600, env="MCP_TOOL_INDEX_TTL")
+    mcp_discovery_timeout: float = Field(10.0, env="MCP_DISCOVERY_TIMEOUT")
+    # Seconds between MCP server health probes (0 disables)
+    mcp_health_interval: float = Field(30.0, env="MCP_HEALTH_INTERVAL")
+    mcp_health_timeout: float = Field(5.0, env="MCP_HEALTH_TIMEOUT")
+    # Consecutive failures that leave a server out of runs, and for how long
+    mcp_breaker_failures: int = Field(3, env="MCP_BREAKER_FAILURES")
+    mcp_breaker_reset: float = Field(60.0, env="MCP_BREAKER_RESET")
+
+    # Conversation Memory Configuration
+    enable_memory: bool = Field(True, env="ENABLE_MEMORY")
+    memory_context_fraction: float = Field(0.25, env="MEMORY_CONTEXT_FRACTION")
+    memory_max_tokens: Optional[int] = Field(16000, env="MEMORY_MAX_TOKENS")
+    memory_default_context_length: int = Field(
+        32000, env="MEMORY_DEFAULT_CONTEXT_LENGTH"
+    )
+    memory_summary_chars: int = Field(300, env="MEMORY_SUMMARY_CHARS")
+    memory_max_sessions: int = Field(1000, env="MEMORY_MAX_SESSIONS")
 
     # System Prompt Configuration
     prompts_dir: Optional[str] = Field(None, env="PROMPTS_DIR")
     default_system_prompt_file: Optional[str] = Field(
         None, env="DEFAULT_SYSTEM_PROMPT_FILE"
     )
+    # Seconds between prompt file checks in chat and serve (0 disables)
+    prompt_watch_interval: float = Field(2.0, env="PROMPT_WATCH_INTERVAL")
 
     # Fantasy Football Configuration
     default_league_id: str = Field("1266471057523490816", env="FANTASY_LEAGUE_ID")
@@ -68,56 +182,44 @@ class Settings(BaseSettings):
         True, env="ENABLE_MCP_SERVER"
     )  # Enabled for Sleeper fantasy football functionality
 
-    # Available Models Configuration
-    available_models: Dict[str, ModelConfig] = Field(
-        default_factory=lambda: {
-            "anthropic/claude-3.5-sonnet": ModelConfig(
-                name="anthropic/claude-3.5-sonnet",
-                provider="Anthropic",
-                description="Advanced reasoning and code generation",
-                strengths=["Code", "Analysis", "Writing", "Reasoning"],
-                speed="fast",
-                cost="medium",
-                context_length=200000,
-            ),
-            "openai/gpt-4": ModelConfig(
-                name="openai/gpt-4",
-                provider="OpenAI",
-                description="General purpose large language model",
-                strengths=["General Purpose", "Creative Writing", "Problem Solving"],
-                speed="medium",
-                cost="high",
-                context_length=128000,
-            ),
-            "openai/gpt-4-turbo": ModelConfig(
-                name="openai/gpt-4-turbo",
-                provider="OpenAI",
-                description="Faster version of GPT-4 with improved efficiency",
-                strengths=["Speed", "Efficiency", "General Purpose"],
-                speed="fast",
-                cost="medium",
-                context_length=128000,
-            ),
-            "meta-llama/llama-3.1-70b-instruct": ModelConfig(
-                name="meta-llama/llama-3.1-70b-instruct",
-                provider="Meta",
-                description="Open source large language model",
-                strengths=["Open Source", "Reasoning", "Code"],
-                speed="medium",
-                cost="low",
-                context_length=32000,
-            ),
-            "google/gemini-pro": ModelConfig(
-                name="google/gemini-pro",
-                provider="Google",
-                description="Multimodal AI with large context window",
-                strengths=["Multimodal", "Large Context", "Analysis"],
-                speed="fast",
-                cost="low",
-                context_length=1048576,
-            ),
-        }
-    )
+    # Model Catalog Configuration
+    model_catalog_file: Optional[str] = Field(
+        None, env="MODEL_CATALOG_FILE"
+    )  # JSON or TOML; defaults to the bundled kraftbot/config/models.json
+    openrouter_models_file: Optional[str] = Field(
+        None, env="OPENROUTER_MODELS_FILE"
+    )  # Saved OpenRouter models list; defaults to <cache dir>/openrouter_models.json
+    enable_model_stats: bool = Field(True, env="ENABLE_MODEL_STATS")
+    model_stats_max_samples: int = Field(200, env="MODEL_STATS_MAX_SAMPLES")
+
+    # Per-run telemetry (TTFT, latency, tokens, tool latency) for `stats`
+    enable_metrics: bool = Field(True, env="ENABLE_METRICS")
+    metrics_max_runs: int = Field(10000, env="METRICS_MAX_RUNS")
+
+    # Local OpenTelemetry metrics (`/metrics` in serve mode), no Logfire needed
+    enable_metrics_export: bool = Field(True, env="ENABLE_METRICS_EXPORT")
+    metrics_export_file: Optional[str] = Field(
+        None, env="METRICS_EXPORT_FILE"
+    )  # Appends OTLP JSON lines
+    metrics_otlp_endpoint: Optional[str] = Field(
+        None, env="METRICS_OTLP_ENDPOINT"
+    )  # OTLP/HTTP collector, e.g. http://localhost:4318/v1/metrics
+    metrics_export_interval: float = Field(15.0, env="METRICS_EXPORT_INTERVAL")
+
+    # Automatic Model Routing (`--route auto`; 0 disables a limit)
+    route_latency_slo: float = Field(
+        0.0, env="ROUTE_LATENCY_SLO"
+    )  # Seconds of measured p95 time to first token
+    route_cost_budget: float = Field(0.0, env="ROUTE_COST_BUDGET")  # USD per request
+    route_simple_max_tokens: int = Field(
+        60, env="ROUTE_SIMPLE_MAX_TOKENS"
+    )  # Longer prompts are treated as complex
+    route_models: List[str] = Field(
+        default_factory=list, env="ROUTE_MODELS"
+    )  # Candidate models (defaults to every catalog model)
+
+    # Available Models Configuration (loaded from the catalog when not given)
+    available_models: Dict[str, ModelConfig] = Field(default_factory=dict)
 
     class Config:
         """Pydantic settings configuration"""
@@ -127,6 +229,33 @@ class Settings(BaseSettings):
         case_sensitive = False
         extra = "allow"
 
+    def model_post_init(self, __context: Any) -> None:
+        """Load the model catalog unless models were given explicitly"""
+        if not self.available_models:
+            from .catalog import load_catalog
+
+            try:
+                self.available_models = load_catalog(
+                    self.model_catalog_file, self.get_openrouter_models_path()
+                )
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not load model catalog ({e}), using bundled models")
+                self.available_models = load_catalog()
+
+    def get_openrouter_models_path(self) -> Path:
+        """Get the path of the saved OpenRouter models list"""
+        if self.openrouter_models_file:
+            return Path(self.openrouter_models_file).expanduser()
+        return self.get_cache_dir() / "openrouter_models.json"
+
+    def get_model_stats_path(self) -> Path:
+        """Get the path of the measured model latency stats"""
+        return self.get_cache_dir() / "model_stats.jsonl"
+
+    def get_metrics_path(self) -> Path:
+        """Get the path of the per-run metrics database"""
+        return self.get_cache_dir() / "metrics.sqlite3"
+
     def get_model_config(self, model_name: str) -> Optional[ModelConfig]:
         """Get configuration for a specific model"""
         return self.available_models.get(model_name)
@@ -135,6 +264,12 @@ class Settings(BaseSettings):
         """Get list of available model names"""
         return list(self.available_models.keys())
 
+    def get_cache_dir(self) -> Path:
+        """Get the directory used for on-disk caches"""
+        if self.cache_dir:
+            return Path(self.cache_dir).expanduser()
+        return Path.home() / ".cache" / "kraftbot"
+
     def is_api_key_configured(self) -> bool:
         """Check if OpenRouter API key is configured"""
         return bool(self.openrouter_api_key)
@@ -2,13 +2,42 @@
 Core components for KraftBot agent functionality.
 """
 
-from .agent import PydanticAIAgent
-from .models import AgentDependencies, AgentResponse
-from .observability import LogfireConfig
+from typing import TYPE_CHECKING, List
+
+from ..utils.lazy import lazy_dir, lazy_exports
+
+if TYPE_CHECKING:
+    from .agent import PydanticAIAgent
+    from .compare import CompareEngine
+    from .models import AgentDependencies, AgentResponse, ModelComparison
+    from .observability import LogfireConfig
+    from .router import ModelRouter, RoutedAgent
+
+_EXPORTS = {
+    "PydanticAIAgent": ".agent",
+    "AgentResponse": ".models",
+    "AgentDependencies": ".models",
+    "CompareEngine": ".compare",
+    "ModelComparison": ".models",
+    "LogfireConfig": ".observability",
+    "ModelRouter": ".router",
+    "RoutedAgent": ".router",
+}
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
+
+
+def __dir__() -> List[str]:
+    return lazy_dir(globals(), _EXPORTS)
+
 
 __all__ = [
     "PydanticAIAgent",
     "AgentResponse",
     "AgentDependencies",
+    "CompareEngine",
+    "ModelComparison",
     "LogfireConfig",
+    "ModelRouter",
+    "RoutedAgent",
 ]
@@ -3,23 +3,114 @@ Simplified KraftBot agent implementation.
 """
 
 import asyncio
-import time
 
 # Apply compatibility patch for PydanticAI
 from contextlib import nullcontext
-from typing import Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 if not hasattr(asyncio, "nullcontext"):
     asyncio.nullcontext = nullcontext
 
-from pydantic_ai import Agent
+from openai import AsyncOpenAI
+from pydantic_ai import Agent, capture_run_messages
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    PartStartEvent,
+    TextPart,
+)
+from pydantic_ai.models import Model
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.openrouter import OpenRouterProvider
+from pydantic_ai.settings import ModelSettings
 
 from ..config.settings import settings
-from ..mcp.manager import MCPManager
-from .models import AgentResponse
+from ..mcp.cache import shared_tool_calls
+from ..mcp.manager import MCPManager, is_connection_error
+from ..mcp.metrics import tool_timings
+from ..mcp.servers import TOKENBOWL_MCP
+from ..utils.http import get_http_client
+from ..utils.metrics import get_local_metrics
+from .cache import ResponseCache, get_response_cache
+from .cassette import Cassette, CassetteModel
+from .deadline import DeadlineExceeded, deadline_after, stream_until, time_left
+from .hedge import (
+    get_hedge_stats,
+    hedge_delay_for,
+    model_responded,
+    race_streams,
+    response_hook,
+)
+from .memory import ConversationMemory, with_system_prompt
+from .model_stats import ModelStatsStore, get_model_stats
+from .models import (
+    AgentDependencies,
+    AgentResponse,
+    RunTelemetry,
+    StreamEnd,
+    StreamEvent,
+    StreamStart,
+    TextDelta,
+)
 from .observability import LogfireConfig
+from .prompt_cache import PromptCachingChatModel
+from .ratelimit import RateLimitedModel, get_rate_limiter
+from .telemetry import RunRecorder, TelemetryStore, get_telemetry_store
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+def load_default_mcp_servers(mcp_manager: MCPManager) -> None:
+    """Register the configured MCP servers on a manager"""
+    if settings.enable_mcp_server:
+        try:
+            # Configure tokenbowl-mcp SSE server
+            mcp_manager.add_sse_server(
+                url=TOKENBOWL_MCP.url,
+                tool_prefix=TOKENBOWL_MCP.tool_prefix,
+                name=TOKENBOWL_MCP.name,
+            )
+            if settings.verbose_logging:
+                print(f"✅ Loaded MCP SSE server: tokenbowl-mcp at {TOKENBOWL_MCP.url}")
+        except Exception as e:
+            if settings.verbose_logging:
+                print(f"⚠️  Failed to load MCP server: {e}")
+
+
+async def stream_text(
+    events: AsyncIterator[StreamEvent], cumulative: bool = False
+) -> AsyncIterator[str]:
+    """
+    Turn stream events into text chunks
+
+    Args:
+        events: Events from stream_events()
+        cumulative: Yield the full response so far instead of deltas; a
+            resumed run starts the response over
+    """
+    text_parts: List[str] = []
+    async for event in events:
+        if isinstance(event, StreamStart) and event.resumed:
+            text_parts = []
+        elif isinstance(event, TextDelta):
+            if cumulative:
+                text_parts.append(event.text)
+                yield "".join(text_parts)
+            else:
+                yield event.text
+        elif isinstance(event, StreamEnd) and event.error:
+            yield f"Error: {event.error}"
+
+
+async def _report_responses(ctx: Any, events: AsyncIterator[Any]) -> None:
+    """Report each model response as it starts; see hedge.model_responded()"""
+    responded = False
+    async for event in events:
+        if not responded and isinstance(event, PartStartEvent):
+            responded = True
+            model_responded()
 
 
 class PydanticAIAgent:
@@ -33,12 +124,75 @@ class PydanticAIAgent:
         model_name: str = "anthropic/claude-3.5-sonnet",
         system_prompt: Optional[str] = None,
         enable_logfire: bool = True,
+        mcp_manager: Optional[MCPManager] = None,
+        http_client: Optional[Any] = None,
+        enable_cache: bool = True,
+        response_cache: Optional[ResponseCache] = None,
+        memory: Optional[ConversationMemory] = None,
+        model_stats: Optional[ModelStatsStore] = None,
+        enable_hedging: Optional[bool] = None,
+        request_timeout: Optional[float] = None,
+        telemetry_store: Optional[TelemetryStore] = None,
+        base_url: Optional[str] = None,
+        cassette: Optional[Cassette] = None,
     ):
         """
         Initialize the agent with OpenRouter provider
+
+        Args:
+            mcp_manager: Optional shared MCP manager; servers are loaded from
+                settings when not provided
+            http_client: Optional httpx.AsyncClient for the OpenRouter
+                provider (defaults to the process-wide shared client)
+            enable_cache: Serve repeated prompts from the response cache
+            response_cache: Optional cache instance (defaults to the shared one)
+            memory: Optional conversation memory (defaults to one sized for
+                the model's context length)
+            model_stats: Optional store for measured latency (defaults to the
+                shared one)
+            enable_hedging: Send a backup request when the first token is
+                slow (defaults to settings.enable_hedging)
+            request_timeout: Seconds a request may take, tool calls
+                included, before it is cancelled (defaults to
+                settings.request_timeout; 0 disables)
+            telemetry_store: Optional store for per-run metrics (defaults to
+                the shared one)
+            base_url: OpenAI-compatible API to send model requests to
+                (defaults to OpenRouter)
+            cassette: Cassette to record model and tool traffic to, or to
+                replay it from. Turns off the response cache and hedging,
+                which would bypass or race it; replayed runs are not saved
+                to the latency and metrics stores.
         """
         self.openrouter_api_key = openrouter_api_key
         self.model_name = model_name
+        self.last_usage: Dict[str, int] = {}
+        self.last_telemetry: Optional[RunTelemetry] = None
+        self.request_timeout = (
+            settings.request_timeout if request_timeout is None else request_timeout
+        )
+        self.cassette = cassette
+        replaying = cassette is not None and cassette.replaying
+
+        # Response cache for repeated prompts
+        self.response_cache = None
+        if enable_cache and settings.enable_response_cache and cassette is None:
+            self.response_cache = response_cache or get_response_cache()
+
+        # Measured TTFT and throughput of streamed runs, shown by `models`
+        self.model_stats = None
+        if settings.enable_model_stats and not replaying:
+            self.model_stats = model_stats or get_model_stats()
+
+        # Per-run latency, token and tool measurements, shown by `stats`
+        self.telemetry_store = None
+        if settings.enable_metrics and not replaying:
+            self.telemetry_store = telemetry_store or get_telemetry_store()
+
+        # Per-session conversation history, trimmed to a token budget
+        self.memory = memory
+        if self.memory is None and settings.enable_memory:
+            self.memory = ConversationMemory.for_model(model_name)
 
         # Initialize Logfire if enabled
         self.logfire = None
@@ -50,15 +204,38 @@ class PydanticAIAgent:
             except Exception as e:
                 print(f"⚠️  Logfire initialization failed: {e}")
 
-        # Initialize MCP manager and load servers
-        self.mcp_manager = MCPManager()
-        self._initialize_mcp_servers()
+        # Initialize MCP manager and load servers, unless one is shared with us
+        if mcp_manager is None:
+            self.mcp_manager = MCPManager(cassette=cassette)
+            self._initialize_mcp_servers()
+        else:
+            self.mcp_manager = mcp_manager
 
         # Configure the OpenRouter model
-        self.model = OpenAIChatModel(
-            model_name,
-            provider=OpenRouterProvider(api_key=openrouter_api_key),
+        # Every agent reuses the process-wide connection pool
+        self.http_client = http_client or get_http_client()
+        client_options: Dict[str, Any] = {}
+        if settings.enable_rate_limit:
+            # Retries are owned by the rate limiter, not the OpenAI SDK
+            client_options["max_retries"] = 0
+        self.provider = OpenRouterProvider(
+            openai_client=AsyncOpenAI(
+                base_url=base_url or OPENROUTER_BASE_URL,
+                api_key=openrouter_api_key,
+                http_client=self.http_client,
+                **client_options,
+            )
         )
+        self.model = self._build_model(model_name)
+
+        # Backup model raced against slow first tokens
+        if enable_hedging is None:
+            enable_hedging = settings.enable_hedging
+        self.hedge_model = None
+        if enable_hedging and cassette is None:
+            self.hedge_model = self._build_model(
+                settings.hedge_models.get(model_name, model_name)
+            )
 
         # Use default system prompt if none provided
         if not system_prompt:
@@ -71,32 +248,183 @@ Provide concise, actionable fantasy football advice including:
 - Risk assessment and contingency plans
 
 Format responses clearly with bullet points."""
+        self.system_prompt = system_prompt
+
+        # Every request, hedged or routed, is capped at the response budget
+        self.model_settings = None
+        if settings.max_response_tokens > 0:
+            self.model_settings = ModelSettings(max_tokens=settings.max_response_tokens)
 
         # Create the simple agent with MCP tools
-        self.agent = Agent(
+        self.agent = self._build_agent()
+
+    def _build_agent(self) -> Agent:
+        """PydanticAI agent for the current model and system prompt"""
+        return Agent(
             model=self.model,
-            system_prompt=system_prompt,
+            system_prompt=self.system_prompt,
             toolsets=self.mcp_manager.get_servers(),
+            deps_type=AgentDependencies,
+            model_settings=self.model_settings,
             retries=0,
         )
 
+    def set_system_prompt(self, system_prompt: str) -> None:
+        """
+        Swap the system prompt, e.g. after the prompt file was edited
+
+        Conversation history is kept; responses cached under the old prompt
+        are no longer served because the prompt is part of the cache key.
+        """
+        self.system_prompt = system_prompt
+        self.agent = self._build_agent()
+
+    def _build_model(self, model_name: str) -> Model:
+        """OpenRouter model on the agent's provider, rate limited if enabled"""
+        # The system prompt and tools are sent as a cacheable prefix
+        model_class = (
+            PromptCachingChatModel
+            if settings.enable_prompt_caching
+            else OpenAIChatModel
+        )
+        model: Model = model_class(model_name, provider=self.provider)
+
+        # Shared per-key and per-model budgets with 429-aware retries
+        if settings.enable_rate_limit:
+            model = RateLimitedModel(
+                model,
+                limiters=[
+                    get_rate_limiter(self.openrouter_api_key),
+                    get_rate_limiter(self.openrouter_api_key, model_name),
+                ],
+            )
+
+        # Outermost, so replays skip the rate limiter as well as the network
+        if self.cassette is not None:
+            model = CassetteModel(model, self.cassette)
+        return model
+
     def _initialize_mcp_servers(self):
         """Initialize MCP servers based on configuration"""
-        if settings.enable_mcp_server:
-            try:
-                # Configure tokenbowl-mcp SSE server
-                self.mcp_manager.add_sse_server(
-                    url="https://tokenbowl-mcp.haihai.ai/sse",
-                    tool_prefix="tokenbowl",
-                    name="tokenbowl_mcp",
-                )
-                if settings.verbose_logging:
-                    print(
-                        f"✅ Loaded MCP SSE server: tokenbowl-mcp at https://tokenbowl-mcp.haihai.ai/sse"
-                    )
-            except Exception as e:
-                if settings.verbose_logging:
-                    print(f"⚠️  Failed to load MCP server: {e}")
+        load_default_mcp_servers(self.mcp_manager)
+
+    @staticmethod
+    def _usage_to_dict(usage: Any) -> Dict[str, int]:
+        """Convert a PydanticAI usage object into a plain token count dict"""
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "requests": getattr(usage, "requests", 0) or 0,
+            "tool_calls": getattr(usage, "tool_calls", 0) or 0,
+            # Input tokens read from / written to the provider's prompt cache
+            "cache_read_tokens": getattr(usage, "cache_read_tokens", 0) or 0,
+            "cache_write_tokens": getattr(usage, "cache_write_tokens", 0) or 0,
+        }
+
+    async def __aenter__(self) -> "PydanticAIAgent":
+        """Open all MCP sessions and keep them open until the context exits"""
+        await self.mcp_manager.connect()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.mcp_manager.disconnect()
+
+    def _should_reconnect(self, error: Exception) -> bool:
+        """Whether a failed run should be retried on fresh MCP sessions"""
+        return self.mcp_manager.is_connected and is_connection_error(error)
+
+    @staticmethod
+    def _format_error(error: Exception) -> str:
+        """Turn an exception into a helpful user-facing error message"""
+        error_msg = str(error)
+        if isinstance(error, ModelHTTPError) and error.status_code == 429:
+            error_msg = "Rate Limit Error: The model provider is still rate limiting requests after retrying. Lower the concurrency or configure RATE_LIMIT_RPM/RATE_LIMITS."
+        elif "finish_reason" in error_msg and "error" in error_msg:
+            error_msg = "API Error: The model service returned an error response. This could be due to API limits, model availability, or service issues. Please try again or use a different model."
+        elif "validation error" in error_msg.lower():
+            error_msg = f"API Response Error: {error_msg}"
+        elif "api key" in error_msg.lower():
+            error_msg = "API Key Error: Please check your OpenRouter API key is valid and has sufficient credits."
+
+        return error_msg
+
+    def _finish_run(
+        self,
+        recorder: RunRecorder,
+        prompt: str,
+        user_id: str,
+        session_id: str,
+        response: str,
+        **outcome: Any,
+    ) -> RunTelemetry:
+        """
+        Measure a finished run and send it to the metrics store, the local
+        OpenTelemetry metrics and Logfire
+
+        Args:
+            outcome: cached, timed_out and error flags for RunRecorder.finish
+        """
+        telemetry = recorder.finish(self.last_usage, **outcome)
+        self.last_telemetry = telemetry
+        if self.telemetry_store is not None:
+            self.telemetry_store.record(telemetry)
+        metrics = get_local_metrics()
+        if metrics is not None:
+            metrics.record_run(telemetry)
+        if self.logfire is not None:
+            self.logfire.log_agent_interaction(
+                prompt=prompt,
+                user_id=user_id,
+                session_id=session_id,
+                model_name=self.model_name,
+                response_data={
+                    "response_length": len(response),
+                    **telemetry.model_dump(exclude={"model_name", "tool_latencies"}),
+                },
+                system_prompt=self.system_prompt,
+                usage_data={
+                    **self.last_usage,
+                    "tokens_per_second": telemetry.tokens_per_second or 0,
+                },
+            )
+        return telemetry
+
+    def _cache_key(self, prompt: str, session_id: str) -> Optional[str]:
+        """Response cache key for a prompt, or None when it can't be cached"""
+        if self.response_cache is None:
+            return None
+        # Follow-up questions depend on the conversation, so only cache openers
+        if self.memory is not None and self.memory.has_history(session_id):
+            return None
+        return self.response_cache.make_key(self.model_name, self.system_prompt, prompt)
+
+    def _deps(self, user_id: str, session_id: str) -> AgentDependencies:
+        """Per-run dependencies available to tools through RunContext.deps"""
+        return AgentDependencies(
+            user_id=user_id, session_id=session_id, http_client=self.http_client
+        )
+
+    def _history(self, session_id: str) -> Optional[List[ModelMessage]]:
+        """Message history to send for a session, if memory is enabled"""
+        if self.memory is None:
+            return None
+        history = self.memory.get_history(session_id)
+        return with_system_prompt(history, self.system_prompt) or None
+
+    def _remember_exchange(self, session_id: str, prompt: str, response: str) -> None:
+        """Record a cache-served exchange so follow-ups keep their context"""
+        if self.memory is not None:
+            self.memory.record_exchange(
+                session_id, self.system_prompt, prompt, response
+            )
+
+    def _cache_response(self, cache_key: Optional[str], response: str) -> None:
+        """Store a successful response in the cache"""
+        if cache_key is not None and response:
+            self.response_cache.set(cache_key, response)
 
     async def run(
         self, prompt: str, user_id: str = "user", session_id: str = "default"
@@ -104,63 +432,399 @@ Format responses clearly with bullet points."""
         """
         Run the agent with a given prompt - let Logfire handle all observability automatically
         """
+        recorder = RunRecorder(self.model_name, self.system_prompt)
+        cache_key = self._cache_key(prompt, session_id)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.last_usage = {}
+                self._remember_exchange(session_id, prompt, cached)
+                telemetry = self._finish_run(
+                    recorder, prompt, user_id, session_id, cached, cached=True
+                )
+                return AgentResponse(response=cached, cached=True, telemetry=telemetry)
+
+        deadline = deadline_after(self.request_timeout)
+        history = self._history(session_id)
+        run_messages: List[ModelMessage] = []
         try:
-            result = await self.agent.run(prompt)
+            deps = self._deps(user_id, session_id)
+            with tool_timings(recorder.tool_latencies):
+                with capture_run_messages() as run_messages:
+                    try:
+                        result = await asyncio.wait_for(
+                            self.agent.run(prompt, message_history=history, deps=deps),
+                            time_left(deadline),
+                        )
+                    except Exception as e:
+                        if not is_connection_error(e):
+                            raise
+                        error = e
+                        result = None
+
+                if result is None:
+                    # Transport failure: resume after the last completed request
+                    if self._should_reconnect(error):
+                        await self.mcp_manager.reconnect()
+                    run_prompt, run_history = self._resume_point(
+                        prompt, history, list(run_messages)
+                    )
+                    result = await asyncio.wait_for(
+                        self.agent.run(
+                            run_prompt, message_history=run_history, deps=deps
+                        ),
+                        time_left(deadline),
+                    )
+
+            if self.memory is not None:
+                self.memory.save(session_id, result.all_messages())
 
             # Handle potential method vs property issue with result.output
             output_text = result.output
             if callable(output_text):
                 output_text = output_text()
 
-            return AgentResponse(response=str(output_text))
+            self.last_usage = self._usage_to_dict(result.usage())
+            self._cache_response(cache_key, str(output_text))
+            telemetry = self._finish_run(
+                recorder, prompt, user_id, session_id, str(output_text)
+            )
+            return AgentResponse(
+                response=str(output_text), usage=self.last_usage, telemetry=telemetry
+            )
+
+        except asyncio.TimeoutError:
+            # The run was cancelled; return whatever text it had produced
+            self.last_usage = {}
+            error = DeadlineExceeded(self.request_timeout)
+            partial = self._partial_text(run_messages[len(history or []) :])
+            telemetry = self._finish_run(
+                recorder,
+                prompt,
+                user_id,
+                session_id,
+                partial,
+                timed_out=True,
+                error=str(error),
+            )
+            return AgentResponse(
+                response=partial or f"Error: {error}",
+                timed_out=True,
+                telemetry=telemetry,
+            )
 
         except Exception as e:
-            # Provide more helpful error messages
-            error_msg = str(e)
-            if "finish_reason" in error_msg and "error" in error_msg:
-                error_msg = "API Error: The model service returned an error response. This could be due to API limits, model availability, or service issues. Please try again or use a different model."
-            elif "validation error" in error_msg.lower():
-                error_msg = f"API Response Error: {error_msg}"
-            elif "api key" in error_msg.lower():
-                error_msg = "API Key Error: Please check your OpenRouter API key is valid and has sufficient credits."
+            error_msg = self._format_error(e)
+            self.last_usage = {}
+            telemetry = self._finish_run(
+                recorder, prompt, user_id, session_id, "", error=error_msg
+            )
+            return AgentResponse(response=f"Error: {error_msg}", telemetry=telemetry)
 
-            return AgentResponse(response=f"Error: {error_msg}")
+    @staticmethod
+    def _resume_point(
+        prompt: str,
+        history: Optional[List[ModelMessage]],
+        run_messages: List[ModelMessage],
+    ) -> Tuple[Optional[str], Optional[List[ModelMessage]]]:
+        """
+        Work out how to retry a run that failed part-way through
 
-    async def run_stream(
+        Args:
+            prompt: The original user prompt
+            history: History the failed run started from
+            run_messages: Messages captured from the failed run
+
+        Returns:
+            Tuple of the prompt and history for the retry. When the failed run
+            got past its first request, the retry continues from the last
+            completed request (reusing its tool results) with no new prompt.
+        """
+        last_request = None
+        for index, message in enumerate(run_messages):
+            if isinstance(message, ModelRequest):
+                last_request = index
+
+        if last_request is None or last_request < len(history or []):
+            return prompt, history
+        return None, run_messages[: last_request + 1]
+
+    @staticmethod
+    def _partial_text(messages: List[ModelMessage]) -> str:
+        """Text the model produced in a run's messages"""
+        return "".join(
+            part.content
+            for message in messages
+            if isinstance(message, ModelResponse)
+            for part in message.parts
+            if isinstance(part, TextPart)
+        )
+
+    @staticmethod
+    def _split_cached(response: str) -> List[str]:
+        """Split a cached response into line-sized deltas for replay"""
+        return response.splitlines(keepends=True) or [response]
+
+    async def stream_events(
         self, prompt: str, user_id: str = "user", session_id: str = "default"
-    ):
+    ) -> AsyncIterator[StreamEvent]:
         """
-        Run the agent with streaming output
+        Run the agent and stream typed events
+
+        Yields a StreamStart, then one TextDelta per new piece of text, then a
+        StreamEnd carrying the final response, token usage and any error. A run
+        that passes request_timeout is cancelled and ends with the partial
+        response and timed_out=True. The StreamEnd also carries the run's
+        telemetry.
         """
-        try:
-            # Use the main agent with MCP tools and handle streaming carefully
-            async with self.agent.run_stream(prompt) as result:
-                # Monitor for complete response by checking final result
-                full_response = ""
-                async for chunk in result.stream_output():
-                    chunk_text = str(chunk)
-                    full_response = (
-                        chunk_text  # Each chunk contains full response up to that point
+        recorder = RunRecorder(self.model_name, self.system_prompt)
+        cache_key = self._cache_key(prompt, session_id)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.last_usage = {}
+                self._remember_exchange(session_id, prompt, cached)
+                yield StreamStart(
+                    model_name=self.model_name, session_id=session_id, cached=True
+                )
+                recorder.first_token()
+                for line in self._split_cached(cached):
+                    yield TextDelta(text=line)
+                    await asyncio.sleep(0)
+                telemetry = self._finish_run(
+                    recorder, prompt, user_id, session_id, cached, cached=True
+                )
+                yield StreamEnd(response=cached, cached=True, telemetry=telemetry)
+                return
+
+        yield StreamStart(model_name=self.model_name, session_id=session_id)
+
+        text_parts: List[str] = []
+        run_prompt: Optional[str] = prompt
+        history = self._history(session_id)
+        deps = self._deps(user_id, session_id)
+        deadline = deadline_after(self.request_timeout)
+        for attempt in range(2):
+            run_messages: List[ModelMessage] = []
+            full_response: Optional[str] = None
+            telemetry: Optional[RunTelemetry] = None
+            try:
+                async for kind, value in stream_until(
+                    lambda: self._model_events(
+                        run_prompt,
+                        history,
+                        deps,
+                        run_messages,
+                        recorder.tool_latencies,
+                        recorder.first_response,
+                        hedge=attempt == 0,
+                    ),
+                    deadline,
+                    self.request_timeout,
+                ):
+                    if kind == "delta":
+                        recorder.first_token()
+                        text_parts.append(value)
+                        yield TextDelta(text=value)
+                        continue
+
+                    full_response, usage, messages, backup_won = value
+                    # The validated final output is the response of record
+                    streamed = "".join(text_parts)
+                    if full_response.startswith(streamed):
+                        if len(full_response) > len(streamed):
+                            yield TextDelta(text=full_response[len(streamed) :])
+                    elif full_response:
+                        yield StreamStart(
+                            model_name=self.model_name,
+                            session_id=session_id,
+                            resumed=True,
+                        )
+                        yield TextDelta(text=full_response)
+
+                    self.last_usage = self._usage_to_dict(usage)
+                    self._cache_response(cache_key, full_response)
+                    if self.memory is not None:
+                        self.memory.save(session_id, messages)
+                    telemetry = self._finish_run(
+                        recorder, prompt, user_id, session_id, full_response
                     )
-                    yield chunk_text
+                    # A hedge win hides the primary's real latency, so only
+                    # uncensored runs are measured
+                    if self.model_stats is not None and not backup_won:
+                        self.model_stats.record(
+                            self.model_name,
+                            telemetry.time_to_first_token,
+                            telemetry.duration,
+                            telemetry.output_tokens,
+                            recorder.time_to_first_response,
+                        )
 
-                # If response seems incomplete, try to get final result
-                if len(full_response) < 200:  # Threshold for "too short"
-                    try:
-                        final_result = result.data
-                        if final_result and len(str(final_result)) > len(full_response):
-                            yield str(final_result)
-                    except:
-                        pass  # Continue with what we have
+                if full_response is None:
+                    raise RuntimeError("The model stream ended without a response")
+                yield StreamEnd(
+                    response=full_response, usage=self.last_usage, telemetry=telemetry
+                )
+                return
 
-        except Exception as e:
-            # Provide more helpful error messages
-            error_msg = str(e)
-            if "finish_reason" in error_msg and "error" in error_msg:
-                error_msg = "API Error: The model service returned an error response. This could be due to API limits, model availability, or service issues. Please try again or use a different model."
-            elif "validation error" in error_msg.lower():
-                error_msg = f"API Response Error: {error_msg}"
-            elif "api key" in error_msg.lower():
-                error_msg = "API Key Error: Please check your OpenRouter API key is valid and has sufficient credits."
-
-            yield f"Error: {error_msg}"
+            except DeadlineExceeded as e:
+                # Keep the partial answer so a follow-up can ask to continue
+                partial = "".join(text_parts)
+                self.last_usage = {}
+                if partial:
+                    self._remember_exchange(session_id, prompt, partial)
+                telemetry = self._finish_run(
+                    recorder,
+                    prompt,
+                    user_id,
+                    session_id,
+                    partial,
+                    timed_out=True,
+                    error=str(e),
+                )
+                yield StreamEnd(
+                    response=partial,
+                    error=str(e),
+                    timed_out=True,
+                    telemetry=telemetry,
+                )
+                return
+
+            except Exception as e:
+                if attempt > 0 or not is_connection_error(e):
+                    error_msg = self._format_error(e)
+                    partial = "".join(text_parts)
+                    self.last_usage = {}
+                    telemetry = self._finish_run(
+                        recorder, prompt, user_id, session_id, partial, error=error_msg
+                    )
+                    yield StreamEnd(
+                        response=partial, error=error_msg, telemetry=telemetry
+                    )
+                    return
+                error = e
+
+            # Transport failure: resume after the last completed request so
+            # tool calls that already returned are not made again
+            if self._should_reconnect(error):
+                await self.mcp_manager.reconnect()
+            run_prompt, history = self._resume_point(prompt, history, run_messages)
+            if text_parts:
+                text_parts = []
+                yield StreamStart(
+                    model_name=self.model_name, session_id=session_id, resumed=True
+                )
+
+    async def _stream_model(
+        self,
+        model: Any,
+        run_prompt: Optional[str],
+        history: Optional[List[ModelMessage]],
+        deps: AgentDependencies,
+        run_messages: List[ModelMessage],
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        One streamed model run as ("delta", text) events, then ("done",
+        (output, usage, all_messages))
+
+        The run's messages are copied into run_messages when it ends, so a
+        failed run can be resumed.
+        """
+        with capture_run_messages() as captured:
+            try:
+                async with self.agent.run_stream(
+                    run_prompt,
+                    message_history=history,
+                    deps=deps,
+                    model=model,
+                    event_stream_handler=_report_responses,
+                ) as result:
+                    async for delta in result.stream_text(delta=True, debounce_by=None):
+                        if delta:
+                            yield "delta", delta
+                    output = str(await result.get_output())
+                    yield "done", (output, result.usage(), result.all_messages())
+            finally:
+                run_messages[:] = captured
+
+    async def _model_events(
+        self,
+        run_prompt: Optional[str],
+        history: Optional[List[ModelMessage]],
+        deps: AgentDependencies,
+        run_messages: List[ModelMessage],
+        tool_latencies: Dict[str, List[float]],
+        on_response: Optional[Callable[[], None]] = None,
+        hedge: bool = True,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Model run events, hedged with a backup request when enabled
+
+        The "done" value gains a fourth item: whether the backup won. Tool
+        call latencies are recorded into tool_latencies, and on_response is
+        called when each model response starts.
+        """
+        with tool_timings(tool_latencies), response_hook(on_response):
+            if not hedge or self.hedge_model is None:
+                async for kind, value in self._stream_model(
+                    None, run_prompt, history, deps, run_messages
+                ):
+                    yield kind, (*value, False) if kind == "done" else value
+                return
+
+            async for event in self._hedged_events(
+                run_prompt, history, deps, run_messages
+            ):
+                yield event
+
+    async def _hedged_events(
+        self,
+        run_prompt: Optional[str],
+        history: Optional[List[ModelMessage]],
+        deps: AgentDependencies,
+        run_messages: List[ModelMessage],
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Race the primary and backup models, see _model_events"""
+        attempts: Tuple[List[ModelMessage], List[ModelMessage]] = ([], [])
+        winner = 0
+        try:
+            # Both runs share tool calls, so the backup doesn't repeat MCP work
+            with shared_tool_calls():
+                async for winner, (kind, value) in race_streams(
+                    lambda: self._stream_model(
+                        None, run_prompt, history, deps, attempts[0]
+                    ),
+                    lambda: self._stream_model(
+                        self.hedge_model, run_prompt, history, deps, attempts[1]
+                    ),
+                    hedge_delay_for(self.model_name),
+                    get_hedge_stats(self.model_name),
+                ):
+                    yield kind, (*value, winner == 1) if kind == "done" else value
+        finally:
+            run_messages[:] = attempts[winner]
+
+    async def run_stream(
+        self,
+        prompt: str,
+        user_id: str = "user",
+        session_id: str = "default",
+        cumulative: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Run the agent with streaming output
+
+        Args:
+            cumulative: Yield the full response so far on every chunk instead
+                of only the new text (the pre-delta behaviour, kept for
+                compatibility; total output is quadratic in response length)
+
+        When a run resumes, cumulative chunks start over from the resumed
+        text, while deltas simply continue with it: text already yielded
+        can't be taken back, so consumers that need to drop it should use
+        stream_events() and watch for StreamStart(resumed=True).
+        """
+        async for chunk in stream_text(
+            self.stream_events(prompt, user_id, session_id), cumulative
+        ):
+            yield chunk
@@ -0,0 +1,232 @@
+"""
+Batch runner for JSONL prompt workloads.
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from ..config.settings import settings
+from .agent import PydanticAIAgent
+from .models import StreamEnd, StreamStart, TextDelta
+from .router import RoutedAgent
+
+
+class BatchItem(BaseModel):
+    """One prompt in a batch input file"""
+
+    id: str = Field(description="Stable identifier used for resuming")
+    prompt: str = Field(description="Prompt to send to the agent")
+    user_id: Optional[str] = Field(None, description="User the prompt is run for")
+    session_id: Optional[str] = Field(
+        None, description="Session to run in (defaults to a throwaway one per item)"
+    )
+
+
+class BatchResult(BaseModel):
+    """Outcome of one batch item, written as one NDJSON line"""
+
+    id: str
+    model_name: str
+    response: Optional[str] = None
+    error: Optional[str] = None
+    timed_out: bool = Field(
+        False, description="Whether the run hit the request timeout (partial response)"
+    )
+    cached: bool = False
+    started_at: float = Field(description="Unix time the run started")
+    queue_time: float = Field(0.0, description="Seconds spent waiting for a worker")
+    duration: float = Field(description="Seconds from start to final result")
+    time_to_first_token: Optional[float] = None
+    usage: Dict[str, int] = Field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the item produced a response"""
+        return self.error is None
+
+
+def parse_batch_lines(lines: Iterable[str]) -> Iterator[BatchItem]:
+    """
+    Parse JSONL batch input
+
+    Each non-empty line is a JSON object with at least a ``prompt`` (a bare
+    JSON string is accepted as the prompt). Lines without an ``id`` are
+    identified by their line number.
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no prompt
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e})") from e
+
+        if isinstance(data, str):
+            data = {"prompt": data}
+        if not isinstance(data, dict) or not data.get("prompt"):
+            raise ValueError(f"Line {line_number}: missing 'prompt'")
+
+        data["id"] = str(data.get("id", line_number))
+        yield BatchItem(**data)
+
+
+def completed_ids(output_path: Path) -> Set[str]:
+    """
+    IDs already answered in an NDJSON output file
+
+    Failed and timed-out items are left out, so a resumed batch retries them.
+    """
+    done: Set[str] = set()
+    if not output_path.exists():
+        return done
+
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A partial line from an interrupted run
+            if (
+                isinstance(record, dict)
+                and "id" in record
+                and not record.get("error")
+                and not record.get("timed_out")
+            ):
+                done.add(str(record["id"]))
+    return done
+
+
+class BatchRunner:
+    """Run many prompts through one long-lived agent
+
+    A fixed pool of workers pulls items from a small bounded queue, so input is
+    read lazily however large it is, and results are reported as they finish.
+    """
+
+    def __init__(
+        self,
+        agent: Union[PydanticAIAgent, RoutedAgent],
+        concurrency: Optional[int] = None,
+        user_id: Optional[str] = None,
+    ):
+        """
+        Initialize the batch runner
+
+        Args:
+            agent: Agent every item runs through
+            concurrency: Maximum items in flight (defaults to
+                settings.batch_concurrency)
+            user_id: Default user for items that don't name one
+        """
+        self.agent = agent
+        self.concurrency = max(1, concurrency or settings.batch_concurrency)
+        self.user_id = user_id or settings.default_user_id
+
+    async def _run_item(self, item: BatchItem, queued_at: float) -> BatchResult:
+        """Run a single item and time it"""
+        # Items without a session share nothing, so their history is dropped
+        # once they finish instead of piling up in memory for the whole batch
+        session_id = item.session_id or f"batch_{item.id}"
+        started_at = time.time()
+        start_time = time.perf_counter()
+        first_token_time = None
+        cached = False
+        model_name = self.agent.model_name
+        end = None
+
+        try:
+            async for event in self.agent.stream_events(
+                item.prompt, item.user_id or self.user_id, session_id
+            ):
+                if isinstance(event, StreamStart):
+                    # A routed agent picks the model per item
+                    cached = event.cached
+                    model_name = event.model_name
+                elif isinstance(event, TextDelta) and first_token_time is None:
+                    first_token_time = time.perf_counter() - start_time
+                elif isinstance(event, StreamEnd):
+                    end = event
+            if end is None:
+                error = "Stream ended without a result"
+            else:
+                # A timed-out run keeps its partial response instead of failing
+                error = None if end.timed_out else end.error
+        except Exception as e:
+            error = str(e)
+        finally:
+            memory = getattr(self.agent, "memory", None)
+            if item.session_id is None and memory is not None:
+                memory.clear(session_id)
+
+        return BatchResult(
+            id=item.id,
+            model_name=model_name,
+            response=end.response if end and not error else None,
+            error=error,
+            timed_out=bool(end and end.timed_out and not error),
+            cached=cached,
+            started_at=started_at,
+            queue_time=max(started_at - queued_at, 0.0),
+            duration=time.perf_counter() - start_time,
+            time_to_first_token=first_token_time,
+            usage=end.usage if end else {},
+        )
+
+    async def run(
+        self,
+        items: Iterable[BatchItem],
+        on_result: Callable[[BatchResult], None],
+        skip_ids: Optional[Set[str]] = None,
+    ) -> List[BatchResult]:
+        """
+        Run every item, reporting results in completion order
+
+        Args:
+            items: Items to run
+            on_result: Callback invoked as each item finishes
+            skip_ids: IDs to skip (e.g. already in the output file)
+
+        Returns:
+            List[BatchResult]: Results in completion order
+        """
+        skip_ids = skip_ids or set()
+        queue: "asyncio.Queue[Optional[Tuple[BatchItem, float]]]" = asyncio.Queue(
+            maxsize=self.concurrency * 2
+        )
+        results: List[BatchResult] = []
+
+        async def worker() -> None:
+            while True:
+                entry = await queue.get()
+                if entry is None:
+                    return
+                item, queued_at = entry
+                result = await self._run_item(item, queued_at)
+                results.append(result)
+                on_result(result)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            seen: Set[str] = set()
+            for item in items:
+                if item.id in skip_ids or item.id in seen:
+                    continue
+                seen.add(item.id)
+                await queue.put((item, time.time()))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        return results
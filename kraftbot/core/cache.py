@@ -0,0 +1,96 @@
+"""
+Response cache for repeated agent prompts.
+"""
+
+import hashlib
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from ..config.settings import settings
+from ..utils.cache import TieredCache
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION_RE = re.compile(r"[\s?!.]+$")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a user prompt so trivially different phrasings share a key"""
+    prompt = _WHITESPACE_RE.sub(" ", prompt.strip().lower())
+    return _TRAILING_PUNCTUATION_RE.sub("", prompt)
+
+
+def hash_text(text: Optional[str]) -> str:
+    """Stable SHA-256 hex digest of a piece of text"""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def league_state_fingerprint() -> str:
+    """
+    Fingerprint of the league state a response depends on
+
+    League data is refreshed at most daily, so the league, the manager and the
+    current UTC date identify the state an answer was produced from.
+    """
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    return hash_text(
+        f"{settings.default_league_id}:{settings.default_manager_name}:{today}"
+    )[:16]
+
+
+class ResponseCache:
+    """Cache of final agent responses keyed on model, prompts and league state"""
+
+    def __init__(self, store: Optional[TieredCache] = None):
+        """
+        Initialize the response cache
+
+        Args:
+            store: Backing store (defaults to a store configured from settings)
+        """
+        self.store = store or TieredCache(
+            namespace="responses",
+            db_path=settings.get_cache_dir() / "responses.sqlite3",
+            ttl=settings.response_cache_ttl,
+            max_memory_entries=settings.response_cache_memory_entries,
+            max_disk_bytes=settings.response_cache_max_bytes,
+        )
+
+    def make_key(
+        self,
+        model_name: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        league_state: Optional[str] = None,
+    ) -> str:
+        """Build the cache key for a request"""
+        parts = [
+            model_name,
+            hash_text(system_prompt),
+            normalize_prompt(prompt),
+            league_state or league_state_fingerprint(),
+        ]
+        return hash_text("\x1f".join(parts))
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss"""
+        return self.store.get(key)
+
+    def set(self, key: str, response: str) -> None:
+        """Store a successful response"""
+        self.store.set(key, response)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        return self.store.stats()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
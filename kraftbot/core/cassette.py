@@ -0,0 +1,491 @@
+"""
+Record and replay model and MCP tool traffic with cassette files.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic_ai.messages import (
+    BuiltinToolCallPart,
+    BuiltinToolReturnPart,
+    FinalResultEvent,
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelResponse,
+    ModelResponseStreamEvent,
+    PartDeltaEvent,
+    PartStartEvent,
+    TextPart,
+    TextPartDelta,
+    ThinkingPart,
+    ToolCallPart,
+)
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import RequestUsage
+
+from .cache import hash_text
+
+# Message fields that differ between otherwise identical requests
+_VOLATILE_FIELDS = {
+    "timestamp",
+    "usage",
+    "model_name",
+    "provider_name",
+    "provider_details",
+    "provider_response_id",
+    "finish_reason",
+}
+
+# A streamed chunk: [seconds since the request, part index, text or None for
+# a part that is replayed whole]
+Chunk = List[Any]
+
+
+class CassetteMissError(Exception):
+    """Raised when replaying a request the cassette has no recording for"""
+
+    def __init__(self, kind: str, description: str, path: Path):
+        super().__init__(
+            f"No recorded {kind} for {description} in {path}; "
+            "record the cassette again with --record"
+        )
+        self.kind = kind
+        self.path = path
+
+
+def _without_volatile(value: Any) -> Any:
+    """A serialized message with its volatile fields removed"""
+    if isinstance(value, dict):
+        return {
+            key: _without_volatile(item)
+            for key, item in value.items()
+            if key not in _VOLATILE_FIELDS
+        }
+    if isinstance(value, list):
+        return [_without_volatile(item) for item in value]
+    return value
+
+
+def model_request_key(model_name: str, messages: List[ModelMessage]) -> str:
+    """
+    Cassette key of a model request
+
+    Args:
+        model_name: Model the request is sent to
+        messages: The request's messages
+
+    Returns:
+        str: Hash of the model and message contents, ignoring timestamps,
+            usage and other fields that change on every run
+    """
+    dumped = ModelMessagesTypeAdapter.dump_python(messages, mode="json")
+    raw = json.dumps(
+        [model_name, _without_volatile(dumped)], sort_keys=True, default=str
+    )
+    return hash_text(raw)
+
+
+def dump_response(response: ModelResponse) -> Dict[str, Any]:
+    """Serialize a model response for a cassette"""
+    return ModelMessagesTypeAdapter.dump_python([response], mode="json")[0]
+
+
+def load_response(data: Dict[str, Any]) -> ModelResponse:
+    """Rebuild a model response from a cassette"""
+    return ModelMessagesTypeAdapter.validate_python([data])[0]
+
+
+class Cassette:
+    """
+    Model responses and MCP tool calls stored in a JSON Lines file
+
+    In record mode the file is truncated, and each interaction is appended
+    as soon as it completes, so an interrupted session still leaves a usable
+    cassette. In replay mode the file is loaded once and interactions are
+    looked up by request key. Identical requests are replayed in recorded
+    order, and the last recording repeats once they run out. Replays are
+    instant unless ``realtime`` is set, in which case the recorded time to
+    each chunk and tool result is reproduced.
+    """
+
+    def __init__(self, path: Path, mode: str = "replay", realtime: bool = False):
+        """
+        Open a cassette
+
+        Args:
+            path: Cassette file
+            mode: "record" to capture live traffic, "replay" to serve it back
+            realtime: Reproduce the recorded timing when replaying
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path).expanduser()
+        self.mode = mode
+        self.realtime = realtime
+        self.counts: Dict[str, int] = {"model": 0, "tool": 0}
+
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._positions: Dict[Tuple[str, str], int] = {}
+        self._tool_defs: Dict[str, List[Dict[str, Any]]] = {}
+
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+        else:
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        """Whether live traffic is being recorded"""
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        """Whether recorded traffic is being served"""
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        """Read every interaction in the file"""
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["type"] == "tools":
+                    self._tool_defs[entry["server"]] = entry["tools"]
+                else:
+                    key = (entry["type"], entry["key"])
+                    self._entries.setdefault(key, []).append(entry)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        """Write one interaction to the file"""
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _next(self, kind: str, key: str, description: str) -> Dict[str, Any]:
+        """The next recording for a key"""
+        entries = self._entries.get((kind, key))
+        if not entries:
+            raise CassetteMissError(kind, description, self.path)
+        index = self._positions.get((kind, key), 0)
+        self._positions[(kind, key)] = index + 1
+        self.counts[kind] += 1
+        return entries[min(index, len(entries) - 1)]
+
+    def record_model(
+        self,
+        key: str,
+        response: ModelResponse,
+        duration: float,
+        chunks: Optional[List[Chunk]] = None,
+    ) -> None:
+        """
+        Store a model response
+
+        Args:
+            key: model_request_key() of the request
+            response: The complete response
+            duration: Seconds from sending the request to the last chunk
+            chunks: When each part of a streamed response arrived
+        """
+        entry: Dict[str, Any] = {
+            "type": "model",
+            "key": key,
+            "duration": round(duration, 4),
+            "response": dump_response(response),
+        }
+        if chunks:
+            entry["chunks"] = chunks
+        self.counts["model"] += 1
+        self._append(entry)
+
+    def replay_model(self, key: str, model_name: str) -> Dict[str, Any]:
+        """The recorded response to a model request"""
+        return self._next("model", key, f"a {model_name} request")
+
+    def record_tool(
+        self,
+        key: str,
+        name: str,
+        duration: float,
+        result: Any = None,
+        error: Optional[str] = None,
+        retry: bool = False,
+    ) -> None:
+        """
+        Store a tool call
+
+        Args:
+            key: Hash of the server, tool name and arguments
+            name: Tool name, kept for people reading the cassette
+            duration: Seconds the call took
+            result: JSON-compatible result of a successful call
+            error: Message of a failed call
+            retry: Whether the failure asked the model to retry
+        """
+        entry: Dict[str, Any] = {
+            "type": "tool",
+            "key": key,
+            "name": name,
+            "duration": round(duration, 4),
+        }
+        if error is None:
+            entry["result"] = result
+        else:
+            entry["error"] = error
+            entry["retry"] = retry
+        self.counts["tool"] += 1
+        self._append(entry)
+
+    def replay_tool(self, key: str, name: str) -> Dict[str, Any]:
+        """The recorded outcome of a tool call"""
+        return self._next("tool", key, f"call to {name}")
+
+    def record_tool_defs(self, server: str, tool_defs: List[Dict[str, Any]]) -> None:
+        """Store a server's tool definitions, once per change"""
+        if self._tool_defs.get(server) == tool_defs:
+            return
+        self._tool_defs[server] = tool_defs
+        self._append({"type": "tools", "server": server, "tools": tool_defs})
+
+    def tool_defs(self, server: str) -> List[Dict[str, Any]]:
+        """Recorded tool definitions of a server"""
+        return self._tool_defs.get(server, [])
+
+    async def pace(self, start: float, offset: float) -> None:
+        """In realtime mode, wait until ``offset`` seconds after ``start``"""
+        if not self.realtime:
+            return
+        delay = start + offset - asyncio.get_running_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def summary(self) -> str:
+        """What was recorded or replayed, for the CLI"""
+        verb = "Recorded" if self.recording else "Replayed"
+        return (
+            f"{verb} {self.counts['model']} model responses and "
+            f"{self.counts['tool']} tool calls ({self.path})"
+        )
+
+
+@dataclass
+class _RecordingStream(StreamedResponse):
+    """Passes a live stream through, noting when each part arrived"""
+
+    _stream: StreamedResponse
+    _started: float
+    chunks: List[Chunk] = field(default_factory=list)
+    duration: Optional[float] = None
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        async for event in self._stream:
+            # This stream emits its own FinalResultEvent
+            if isinstance(event, FinalResultEvent):
+                continue
+            offset = round(time.perf_counter() - self._started, 4)
+            if isinstance(event, PartStartEvent):
+                text = event.part.content if isinstance(event.part, TextPart) else None
+                self.chunks.append([offset, event.index, text])
+            elif isinstance(event, PartDeltaEvent) and isinstance(
+                event.delta, TextPartDelta
+            ):
+                self.chunks.append([offset, event.index, event.delta.content_delta])
+            yield event
+        self.duration = time.perf_counter() - self._started
+
+    def get(self) -> ModelResponse:
+        return self._stream.get()
+
+    def usage(self) -> RequestUsage:
+        return self._stream.usage()
+
+    @property
+    def model_name(self) -> str:
+        return self._stream.model_name
+
+    @property
+    def provider_name(self) -> Optional[str]:
+        return self._stream.provider_name
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._stream.timestamp
+
+
+@dataclass
+class _ReplayStream(StreamedResponse):
+    """Streams a recorded response, chunk by chunk"""
+
+    _response: ModelResponse
+    _entry: Dict[str, Any]
+    _cassette: Cassette
+    _timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        start = asyncio.get_running_loop().time()
+        parts = self._response.parts
+        started = set()
+        for offset, index, text in self._entry.get("chunks", []):
+            if index >= len(parts):
+                continue
+            await self._cassette.pace(start, offset)
+            if text is not None:
+                event = self._parts_manager.handle_text_delta(
+                    vendor_part_id=index, content=text
+                )
+            elif index not in started:
+                event = self._start_part(index, parts[index])
+            else:
+                event = None
+            started.add(index)
+            if event is not None:
+                yield event
+
+        # Parts of a non-streamed recording arrive together at the end
+        await self._cassette.pace(start, self._entry["duration"])
+        for index, part in enumerate(parts):
+            if index not in started:
+                event = self._start_part(index, part)
+                if event is not None:
+                    yield event
+
+        self._usage = self._response.usage
+        self.finish_reason = self._response.finish_reason
+        self.provider_response_id = self._response.provider_response_id
+
+    def _start_part(self, index: int, part: Any) -> Optional[ModelResponseStreamEvent]:
+        """Emit a whole recorded part"""
+        if isinstance(part, TextPart):
+            return self._parts_manager.handle_text_delta(
+                vendor_part_id=index, content=part.content
+            )
+        if isinstance(part, ToolCallPart):
+            return self._parts_manager.handle_tool_call_part(
+                vendor_part_id=index,
+                tool_name=part.tool_name,
+                args=part.args,
+                tool_call_id=part.tool_call_id,
+            )
+        if isinstance(part, ThinkingPart):
+            return self._parts_manager.handle_thinking_delta(
+                vendor_part_id=index,
+                content=part.content,
+                id=part.id,
+                signature=part.signature,
+                provider_name=part.provider_name,
+            )
+        if isinstance(part, BuiltinToolCallPart):
+            return self._parts_manager.handle_builtin_tool_call_part(
+                vendor_part_id=index, part=part
+            )
+        if isinstance(part, BuiltinToolReturnPart):
+            return self._parts_manager.handle_builtin_tool_return_part(
+                vendor_part_id=index, part=part
+            )
+        return None
+
+    @property
+    def model_name(self) -> str:
+        return self._response.model_name or ""
+
+    @property
+    def provider_name(self) -> Optional[str]:
+        return self._response.provider_name
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._timestamp
+
+
+class CassetteModel(WrapperModel):
+    """
+    Model wrapper that records responses to a cassette or replays them
+
+    When replaying, the wrapped model is never called, so no API key or
+    network access is needed.
+    """
+
+    def __init__(self, wrapped: Model, cassette: Cassette):
+        """
+        Initialize the wrapper
+
+        Args:
+            wrapped: Model to record, or whose name keys the replayed requests
+            cassette: Cassette to record to or replay from
+        """
+        super().__init__(wrapped)
+        self.cassette = cassette
+
+    def _key(self, messages: List[ModelMessage]) -> str:
+        """Cassette key of a request to this model"""
+        return model_request_key(self.model_name, messages)
+
+    async def request(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        key = self._key(messages)
+        if self.cassette.replaying:
+            entry = self.cassette.replay_model(key, self.model_name)
+            start = asyncio.get_running_loop().time()
+            await self.cassette.pace(start, entry["duration"])
+            return load_response(entry["response"])
+
+        start = time.perf_counter()
+        response = await self.wrapped.request(
+            messages, model_settings, model_request_parameters
+        )
+        self.cassette.record_model(key, response, time.perf_counter() - start)
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+        run_context: Any = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        key = self._key(messages)
+        if self.cassette.replaying:
+            entry = self.cassette.replay_model(key, self.model_name)
+            yield _ReplayStream(
+                model_request_parameters=model_request_parameters,
+                _response=load_response(entry["response"]),
+                _entry=entry,
+                _cassette=self.cassette,
+            )
+            return
+
+        start = time.perf_counter()
+        async with self.wrapped.request_stream(
+            messages, model_settings, model_request_parameters, run_context
+        ) as stream:
+            recording = _RecordingStream(
+                model_request_parameters=model_request_parameters,
+                _stream=stream,
+                _started=start,
+            )
+            yield recording
+        # Only complete responses are recorded; a cancelled stream raises above
+        duration = recording.duration
+        if duration is None:
+            duration = time.perf_counter() - start
+        self.cassette.record_model(key, stream.get(), duration, recording.chunks)
@@ -0,0 +1,146 @@
+"""
+Concurrent multi-model comparison engine.
+"""
+
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+from ..config.settings import settings
+from ..mcp.manager import MCPManager
+from .agent import PydanticAIAgent, load_default_mcp_servers
+from .models import ModelComparison, StreamEnd, TextDelta
+
+
+class CompareEngine:
+    """Run one prompt against several models at once
+
+    All runs share a single MCP manager (and therefore a single MCP connection
+    per server) and the process-wide HTTP connection pool, so comparing N
+    models costs roughly as much wall-clock time as the slowest model.
+    """
+
+    def __init__(
+        self,
+        model_names: List[str],
+        system_prompt: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        agent_factory: Optional[Callable[..., PydanticAIAgent]] = None,
+        use_cache: bool = True,
+    ):
+        """
+        Initialize the comparison engine
+
+        Args:
+            model_names: Models to compare
+            system_prompt: Optional system prompt shared by every model
+            concurrency: Maximum number of models running at once
+                (defaults to settings.compare_concurrency)
+            agent_factory: Callable used to build agents, mainly for testing
+            use_cache: Whether models may answer from the response cache
+        """
+        self.model_names = model_names
+        self.system_prompt = system_prompt
+        self.concurrency = max(1, concurrency or settings.compare_concurrency)
+        self.agent_factory = agent_factory or PydanticAIAgent
+        self.use_cache = use_cache
+
+    def _build_mcp_manager(self) -> MCPManager:
+        """Create the MCP manager shared by every model in the comparison"""
+        manager = MCPManager()
+        load_default_mcp_servers(manager)
+        return manager
+
+    async def _run_model(
+        self,
+        model_name: str,
+        prompt: str,
+        semaphore: asyncio.Semaphore,
+        mcp_manager: MCPManager,
+        on_complete: Optional[Callable[[ModelComparison], None]],
+    ) -> ModelComparison:
+        """Run a single model under the concurrency cap"""
+        async with semaphore:
+            start_time = time.perf_counter()
+            first_token_time = None
+
+            try:
+                agent = self.agent_factory(
+                    openrouter_api_key=settings.openrouter_api_key,
+                    model_name=model_name,
+                    system_prompt=self.system_prompt,
+                    enable_logfire=settings.enable_logfire,
+                    mcp_manager=mcp_manager,
+                    enable_cache=self.use_cache,
+                )
+
+                end = None
+                async for event in agent.stream_events(
+                    prompt, "compare_user", f"compare_{model_name}"
+                ):
+                    if isinstance(event, TextDelta) and first_token_time is None:
+                        first_token_time = time.perf_counter() - start_time
+                    elif isinstance(event, StreamEnd):
+                        end = event
+
+                duration = time.perf_counter() - start_time
+
+                if end is None or end.error:
+                    result = ModelComparison(
+                        model_name=model_name,
+                        error=end.error if end else "Stream ended without a result",
+                        duration=duration,
+                    )
+                else:
+                    result = ModelComparison(
+                        model_name=model_name,
+                        response=end.response,
+                        duration=duration,
+                        time_to_first_token=first_token_time,
+                        total_tokens=end.usage.get("total_tokens", 0),
+                    )
+
+            except Exception as e:
+                result = ModelComparison(
+                    model_name=model_name,
+                    error=str(e),
+                    duration=time.perf_counter() - start_time,
+                )
+
+        if on_complete:
+            on_complete(result)
+
+        return result
+
+    async def run(
+        self,
+        prompt: str,
+        on_complete: Optional[Callable[[ModelComparison], None]] = None,
+    ) -> List[ModelComparison]:
+        """
+        Run the prompt against every model concurrently
+
+        Args:
+            prompt: Prompt to send to each model
+            on_complete: Optional callback invoked as each model finishes
+
+        Returns:
+            List[ModelComparison]: One result per model, in the requested order
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        mcp_manager = self._build_mcp_manager()
+
+        # Open every MCP server once so concurrent runs share the session
+        async with mcp_manager:
+            return await asyncio.gather(
+                *(
+                    self._run_model(
+                        model_name,
+                        prompt,
+                        semaphore,
+                        mcp_manager,
+                        on_complete,
+                    )
+                    for model_name in self.model_names
+                )
+            )
@@ -0,0 +1,85 @@
+"""
+Request deadlines that cancel the work behind a stream.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs past its deadline"""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Request timed out after {timeout:g}s")
+        self.timeout = timeout
+
+
+def deadline_after(timeout: Optional[float]) -> Optional[float]:
+    """Event loop time ``timeout`` seconds from now, or None when disabled"""
+    if not timeout or timeout <= 0:
+        return None
+    return asyncio.get_running_loop().time() + timeout
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until a deadline (never negative), or None without one"""
+    if deadline is None:
+        return None
+    return max(deadline - asyncio.get_running_loop().time(), 0.0)
+
+
+async def stream_until(
+    stream: Callable[[], AsyncIterator[T]],
+    deadline: Optional[float],
+    timeout: float,
+) -> AsyncIterator[T]:
+    """
+    Iterate a stream, cancelling it if it runs past a deadline
+
+    The stream runs in its own task so that hitting the deadline cancels the
+    work itself (the model request and any tool calls in flight) rather than
+    only the wait for the next item. Items are handed over one at a time, so a
+    slow consumer still slows the stream down.
+
+    Args:
+        stream: Factory for the stream
+        deadline: Event loop time to stop at (None runs to completion)
+        timeout: The request timeout the deadline came from, for the error
+
+    Raises:
+        DeadlineExceeded: If the deadline passes before the stream ends
+    """
+    if deadline is None:
+        async for item in stream():
+            yield item
+        return
+
+    handoff: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue(maxsize=1)
+
+    async def pump() -> None:
+        try:
+            async for item in stream():
+                await handoff.put(("item", item))
+            await handoff.put(("end", None))
+        except Exception as e:
+            await handoff.put(("error", e))
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            try:
+                kind, payload = await asyncio.wait_for(
+                    handoff.get(), time_left(deadline)
+                )
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(timeout) from None
+            if kind == "end":
+                return
+            if kind == "error":
+                raise payload
+            yield payload
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
@@ -0,0 +1,211 @@
+"""
+Hedged model requests: race a backup request against a slow first token.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from ..config.settings import settings
+
+T = TypeVar("T")
+
+# Hedge delay used until a model has a measured first response time
+DEFAULT_HEDGE_DELAY = 2.0
+
+# Called when a model response starts streaming in the current task
+_response_hook: ContextVar[Optional[Callable[[], None]]] = ContextVar(
+    "kraftbot_response_hook", default=None
+)
+
+
+@contextmanager
+def response_hook(callback: Optional[Callable[[], None]]) -> Iterator[None]:
+    """
+    Call ``callback`` whenever a model response starts inside the block
+
+    Tasks created inside the block inherit the hook.
+    """
+    token = _response_hook.set(callback)
+    try:
+        yield
+    finally:
+        _response_hook.reset(token)
+
+
+def model_responded() -> None:
+    """Report that a model response started streaming (text or a tool call)"""
+    callback = _response_hook.get()
+    if callback is not None:
+        callback()
+
+
+class HedgeStats:
+    """How often hedged requests fire and win, for one primary model"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self.requests = 0
+        self.fired = 0
+        self.won = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters for status displays"""
+        return {
+            "model": self.model_name,
+            "requests": self.requests,
+            "fired": self.fired,
+            "won": self.won,
+            "fire_rate": self.fired / self.requests if self.requests else 0.0,
+            "win_rate": self.won / self.fired if self.fired else 0.0,
+        }
+
+
+_hedge_stats: Dict[str, HedgeStats] = {}
+
+
+def get_hedge_stats(model_name: str) -> HedgeStats:
+    """Process-wide hedge counters for a primary model"""
+    stats = _hedge_stats.get(model_name)
+    if stats is None:
+        stats = _hedge_stats[model_name] = HedgeStats(model_name)
+    return stats
+
+
+def get_all_hedge_stats() -> List[Dict[str, Any]]:
+    """Counters for every model that has made hedged requests"""
+    return [stats.metrics() for stats in _hedge_stats.values()]
+
+
+def hedge_delay_for(model_name: str) -> float:
+    """
+    Seconds to wait for a first response before sending the backup request
+
+    Uses HEDGE_DELAY when set, otherwise the model's measured p95 time to
+    its first response event, so only the slowest ~5% of requests are
+    hedged. Time to first token is not used: it includes the MCP tool calls
+    made before the model starts writing text.
+    """
+    if settings.hedge_delay > 0:
+        return settings.hedge_delay
+
+    from .model_stats import get_model_stats
+
+    stats = get_model_stats().summary(model_name)
+    if stats is not None and stats.first_response_p95:
+        return stats.first_response_p95
+    return DEFAULT_HEDGE_DELAY
+
+
+async def race_streams(
+    primary: Callable[[], AsyncIterator[T]],
+    backup: Callable[[], AsyncIterator[T]],
+    delay: float,
+    stats: Optional[HedgeStats] = None,
+) -> AsyncIterator[Tuple[int, T]]:
+    """
+    Stream from primary, racing a backup stream if primary is slow to start
+
+    The backup starts once ``delay`` seconds pass without an item from the
+    primary, unless the primary reported a model response first (see
+    model_responded()): a run busy with tool calls is not slow to start, and
+    a backup would only wait on the same calls. Whichever stream produces an
+    item first wins and the other is cancelled, so it stops consuming
+    tokens. An error before the first item only ends the race if no other
+    stream is still running.
+
+    Args:
+        primary: Factory for the primary stream
+        backup: Factory for the backup stream
+        delay: Seconds to wait for the primary's first item
+        stats: Optional counters to update
+
+    Yields:
+        Tuple of the winning stream's index (0 primary, 1 backup) and item
+    """
+    merged: "asyncio.Queue[Tuple[int, str, Any]]" = asyncio.Queue()
+    tasks: List["asyncio.Task[None]"] = []
+
+    def start(factory: Callable[[], AsyncIterator[T]]) -> None:
+        index = len(tasks)
+        outer_hook = _response_hook.get()
+
+        def responded() -> None:
+            merged.put_nowait((index, "response", None))
+            if outer_hook is not None:
+                outer_hook()
+
+        async def pump() -> None:
+            _response_hook.set(responded)
+            try:
+                async for item in factory():
+                    await merged.put((index, "item", item))
+                await merged.put((index, "end", None))
+            except Exception as e:
+                await merged.put((index, "error", e))
+
+        tasks.append(asyncio.create_task(pump()))
+
+    if stats is not None:
+        stats.requests += 1
+    start_time = time.perf_counter()
+    start(primary)
+    winner: Optional[int] = None
+    failed = 0
+    hedged = False
+    primary_responded = False
+
+    try:
+        while True:
+            timeout = None
+            if winner is None and not hedged and not primary_responded:
+                timeout = max(delay - (time.perf_counter() - start_time), 0)
+            try:
+                index, kind, payload = await asyncio.wait_for(merged.get(), timeout)
+            except asyncio.TimeoutError:
+                hedged = True
+                if stats is not None:
+                    stats.fired += 1
+                start(backup)
+                continue
+
+            if kind == "response":
+                primary_responded = primary_responded or index == 0
+                continue
+
+            if winner is None:
+                if kind == "error":
+                    failed += 1
+                    if failed < len(tasks):
+                        continue  # The other request may still answer
+                    raise payload
+                winner = index
+                for loser_index, task in enumerate(tasks):
+                    if loser_index != winner:
+                        task.cancel()
+                if winner == 1 and stats is not None:
+                    stats.won += 1
+
+            if index != winner:
+                continue
+            if kind == "end":
+                return
+            if kind == "error":
+                raise payload
+            yield index, payload
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,237 @@
+"""
+Token-budgeted conversation memory for multi-turn sessions.
+"""
+
+import json
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, List, Optional
+
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from ..config.settings import settings
+from ..utils.tokens import estimate_tokens
+
+# Prefix marking a tool return that has already been compacted
+COMPACTED_MARKER = "[compacted tool result]"
+
+
+def _content_text(content: Any) -> str:
+    """Render message part content as text"""
+    if isinstance(content, str):
+        return content
+    try:
+        return json.dumps(content, default=str)
+    except (TypeError, ValueError):
+        return str(content)
+
+
+def estimate_message_tokens(message: ModelMessage) -> int:
+    """Estimate the tokens a message contributes to a request"""
+    total = 0
+    for part in message.parts:
+        content = getattr(part, "content", None)
+        if content is None:
+            content = getattr(part, "args", None)
+        total += estimate_tokens(_content_text(content)) if content is not None else 1
+    return total
+
+
+def with_system_prompt(
+    messages: List[ModelMessage], system_prompt: Optional[str]
+) -> List[ModelMessage]:
+    """
+    History whose leading system prompt is ``system_prompt``
+
+    PydanticAI reuses the system prompt stored in the history rather than the
+    agent's, so a prompt swapped mid-session is written into the history here.
+    """
+    if not messages or not system_prompt or not isinstance(messages[0], ModelRequest):
+        return messages
+    first = messages[0]
+    system_parts = [part for part in first.parts if isinstance(part, SystemPromptPart)]
+    if [part.content for part in system_parts] == [system_prompt]:
+        return messages
+    other_parts = [
+        part for part in first.parts if not isinstance(part, SystemPromptPart)
+    ]
+    return [
+        replace(first, parts=[SystemPromptPart(content=system_prompt), *other_parts]),
+        *messages[1:],
+    ]
+
+
+def _is_turn_start(message: ModelMessage) -> bool:
+    """Whether a message opens a new user turn"""
+    return isinstance(message, ModelRequest) and any(
+        isinstance(part, UserPromptPart) for part in message.parts
+    )
+
+
+def split_turns(messages: List[ModelMessage]) -> List[List[ModelMessage]]:
+    """Group a message history into user turns"""
+    turns: List[List[ModelMessage]] = []
+    for message in messages:
+        if _is_turn_start(message) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+class ConversationMemory:
+    """
+    Per-session message history kept within a token budget
+
+    Tool returns from older turns are compacted into short summaries, and the
+    oldest turns are dropped once the history exceeds the budget. The system
+    prompt is always carried over to the first remaining request.
+    """
+
+    def __init__(
+        self,
+        token_budget: int,
+        summary_chars: Optional[int] = None,
+        keep_full_turns: int = 1,
+        max_sessions: Optional[int] = None,
+    ):
+        """
+        Initialize conversation memory
+
+        Args:
+            token_budget: Maximum estimated tokens of history sent per request
+            summary_chars: Characters of each compacted tool result to keep
+            keep_full_turns: Most recent turns whose tool results stay intact
+            max_sessions: Sessions kept before the least recently used is dropped
+        """
+        self.token_budget = token_budget
+        self.summary_chars = summary_chars or settings.memory_summary_chars
+        self.keep_full_turns = keep_full_turns
+        self.max_sessions = max_sessions or settings.memory_max_sessions
+        self._sessions: "OrderedDict[str, List[ModelMessage]]" = OrderedDict()
+
+    @classmethod
+    def for_model(cls, model_name: str) -> "ConversationMemory":
+        """Create memory sized from a model's configured context length"""
+        model_config = settings.get_model_config(model_name)
+        context_length = (
+            model_config.context_length
+            if model_config and model_config.context_length
+            else settings.memory_default_context_length
+        )
+        budget = int(context_length * settings.memory_context_fraction)
+        if settings.memory_max_tokens:
+            budget = min(budget, settings.memory_max_tokens)
+        return cls(token_budget=max(budget, 0))
+
+    def get_history(self, session_id: str) -> List[ModelMessage]:
+        """Get the history to send with the next request in a session"""
+        messages = self._sessions.get(session_id)
+        if messages is None:
+            return []
+        self._sessions.move_to_end(session_id)
+        return list(messages)
+
+    def has_history(self, session_id: str) -> bool:
+        """Whether a session has any remembered messages"""
+        return bool(self._sessions.get(session_id))
+
+    def save(self, session_id: str, messages: List[ModelMessage]) -> None:
+        """Store a session's full message history after a completed run"""
+        self._sessions[session_id] = self._fit(list(messages))
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def record_exchange(
+        self,
+        session_id: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        response: str,
+    ) -> None:
+        """Remember an exchange that didn't go through the model (e.g. a cache hit)"""
+        messages = self.get_history(session_id)
+        parts = [UserPromptPart(content=prompt)]
+        if not messages and system_prompt:
+            parts.insert(0, SystemPromptPart(content=system_prompt))
+        messages.append(ModelRequest(parts=parts))
+        messages.append(ModelResponse(parts=[TextPart(content=response)]))
+        self.save(session_id, messages)
+
+    def clear(self, session_id: Optional[str] = None) -> None:
+        """Forget one session, or every session"""
+        if session_id is None:
+            self._sessions.clear()
+        else:
+            self._sessions.pop(session_id, None)
+
+    def estimate_tokens(self, session_id: str) -> int:
+        """Estimated token size of a session's history"""
+        return sum(
+            estimate_message_tokens(message)
+            for message in self._sessions.get(session_id, [])
+        )
+
+    def _fit(self, messages: List[ModelMessage]) -> List[ModelMessage]:
+        """Compact old tool results and drop old turns until within budget"""
+        turns = split_turns(messages)
+        if not turns:
+            return []
+
+        system_parts = [
+            part for part in turns[0][0].parts if isinstance(part, SystemPromptPart)
+        ]
+
+        compact_until = max(len(turns) - self.keep_full_turns, 0)
+        turns = [
+            [self._compact(message) for message in turn] if i < compact_until else turn
+            for i, turn in enumerate(turns)
+        ]
+
+        turn_tokens = [
+            sum(estimate_message_tokens(message) for message in turn) for turn in turns
+        ]
+        system_tokens = sum(estimate_tokens(part.content) for part in system_parts)
+        while len(turns) > 1 and sum(turn_tokens) + system_tokens > self.token_budget:
+            turns.pop(0)
+            turn_tokens.pop(0)
+
+        fitted = [message for turn in turns for message in turn]
+        first = fitted[0]
+        if system_parts and isinstance(first, ModelRequest):
+            other_parts = [
+                part for part in first.parts if not isinstance(part, SystemPromptPart)
+            ]
+            fitted[0] = replace(first, parts=[*system_parts, *other_parts])
+        return fitted
+
+    def _compact(self, message: ModelMessage) -> ModelMessage:
+        """Replace full tool results in a request with short summaries"""
+        if not isinstance(message, ModelRequest):
+            return message
+
+        changed = False
+        parts = []
+        for part in message.parts:
+            if isinstance(part, ToolReturnPart):
+                text = _content_text(part.content)
+                if not text.startswith(COMPACTED_MARKER) and (
+                    len(text) > self.summary_chars
+                ):
+                    summary = (
+                        f"{COMPACTED_MARKER} {part.tool_name} returned {len(text)} "
+                        f"chars; excerpt: {text[: self.summary_chars]}..."
+                    )
+                    part = replace(part, content=summary)
+                    changed = True
+            parts.append(part)
+
+        return replace(message, parts=parts) if changed else message
@@ -0,0 +1,214 @@
+"""
+Measured model latency and throughput from our own runs.
+"""
+
+import json
+import os
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from ..config.settings import settings
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Linearly interpolated percentile of a list, or None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class ModelStats(BaseModel):
+    """Latency and throughput summary for one model"""
+
+    model_name: str
+    runs: int = 0
+    ttft_p50: Optional[float] = None
+    ttft_p95: Optional[float] = None
+    first_response_p50: Optional[float] = None
+    first_response_p95: Optional[float] = None
+    tokens_per_second_p50: Optional[float] = None
+    tokens_per_second_p95: Optional[float] = None
+    last_run: Optional[float] = None
+
+
+class ModelStatsStore:
+    """
+    Append-only JSONL file of per-run measurements
+
+    Each completed run appends one short line, which is safe from several
+    processes at once (batch workers, serve). Summaries use the most recent
+    ``max_samples`` runs per model, and the file is compacted to those runs
+    once it grows well past them.
+
+    The file is read once and then kept in memory, updated by record(), so
+    lookups on the request path (hedge delays, routing) don't touch the disk.
+    It is read again when it is compacted, picking up other processes' runs.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_samples: Optional[int] = None):
+        """
+        Initialize the store
+
+        Args:
+            path: JSONL file (defaults to model_stats.jsonl in the cache dir)
+            max_samples: Recent runs kept per model
+        """
+        self.path = Path(path) if path else settings.get_model_stats_path()
+        self.max_samples = max(1, max_samples or settings.model_stats_max_samples)
+        self._samples: Optional[Dict[str, Deque[dict]]] = None
+        self._summaries: Dict[str, ModelStats] = {}
+        self._lines = 0
+
+    def record(
+        self,
+        model_name: str,
+        time_to_first_token: Optional[float],
+        duration: float,
+        output_tokens: int,
+        time_to_first_response: Optional[float] = None,
+    ) -> None:
+        """
+        Record one completed, uncached run
+
+        Args:
+            model_name: Model that produced the response
+            time_to_first_token: Seconds until the first text arrived
+            duration: Seconds from request to final output
+            output_tokens: Completion tokens reported by the provider
+            time_to_first_response: Seconds until the model's first response
+                event, text or tool call (no tool round trips included)
+        """
+        # Throughput is measured over generation, after the first token
+        generation_time = duration - (time_to_first_token or 0.0)
+        tokens_per_second = (
+            output_tokens / generation_time
+            if output_tokens and generation_time > 0
+            else None
+        )
+        record = {
+            "model": model_name,
+            "ts": time.time(),
+            "ttft": time_to_first_token,
+            "ttfr": time_to_first_response,
+            "tps": tokens_per_second,
+        }
+        samples = self._loaded()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            pass  # Stats are best effort and never fail a run
+
+        samples[model_name].append(record)
+        self._summaries.pop(model_name, None)
+        self._lines += 1
+        kept = sum(len(records) for records in samples.values())
+        if self._lines > 2 * kept + 100:
+            # Compact now, after a run, rather than on a later lookup
+            self._samples = self._load()
+            self._summaries.clear()
+
+    def _loaded(self) -> Dict[str, Deque[dict]]:
+        """Recent records per model, read from the file on first use"""
+        if self._samples is None:
+            self._samples = self._load()
+        return self._samples
+
+    def _load(self) -> Dict[str, Deque[dict]]:
+        """Read recent records per model, compacting the file when it has grown"""
+        samples: Dict[str, Deque[dict]] = defaultdict(
+            lambda: deque(maxlen=self.max_samples)
+        )
+        lines = 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A partial line from an interrupted write
+                    if isinstance(record, dict) and record.get("model"):
+                        samples[record["model"]].append(record)
+        except OSError:
+            self._lines = 0
+            return samples
+
+        kept = sum(len(records) for records in samples.values())
+        self._lines = lines
+        if lines > 2 * kept + 100 and self._compact(samples):
+            self._lines = kept
+        return samples
+
+    def _compact(self, samples: Dict[str, Deque[dict]]) -> bool:
+        """Rewrite the file with only the runs still used for summaries"""
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for records in samples.values():
+                    for record in records:
+                        f.write(json.dumps(record) + "\n")
+            tmp_path.replace(self.path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return False
+        return True
+
+    def summaries(self) -> Dict[str, ModelStats]:
+        """
+        Summaries for every measured model
+
+        Returns:
+            Dict[str, ModelStats]: Stats keyed by model name
+        """
+        summaries: Dict[str, ModelStats] = {}
+        for model_name in list(self._loaded()):
+            summary = self.summary(model_name)
+            if summary is not None:
+                summaries[model_name] = summary
+        return summaries
+
+    def summary(self, model_name: str) -> Optional[ModelStats]:
+        """Summary for one model, or None if it was never measured"""
+        cached = self._summaries.get(model_name)
+        if cached is not None:
+            return cached
+        records = self._loaded().get(model_name)
+        if not records:
+            return None
+
+        ttfts = [r["ttft"] for r in records if r.get("ttft") is not None]
+        ttfrs = [r["ttfr"] for r in records if r.get("ttfr") is not None]
+        rates = [r["tps"] for r in records if r.get("tps") is not None]
+        summary = self._summaries[model_name] = ModelStats(
+            model_name=model_name,
+            runs=len(records),
+            ttft_p50=percentile(ttfts, 0.5),
+            ttft_p95=percentile(ttfts, 0.95),
+            first_response_p50=percentile(ttfrs, 0.5),
+            first_response_p95=percentile(ttfrs, 0.95),
+            tokens_per_second_p50=percentile(rates, 0.5),
+            tokens_per_second_p95=percentile(rates, 0.95),
+            last_run=max(r.get("ts", 0) for r in records),
+        )
+        return summary
+
+
+_model_stats: Optional[ModelStatsStore] = None
+
+
+def get_model_stats() -> ModelStatsStore:
+    """Get the process-wide model stats store"""
+    global _model_stats
+    if _model_stats is None:
+        _model_stats = ModelStatsStore()
+    return _model_stats
@@ -3,8 +3,9 @@ Pydantic models for KraftBot agent data structures.
 """
 
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Literal, Optional, Union
 
+import httpx
 from pydantic import BaseModel, Field
 
 
@@ -15,13 +16,110 @@ class AgentDependencies:
     user_id: str
     session_id: str
     metadata: Dict[str, Any] = None
+    http_client: Optional[httpx.AsyncClient] = None  # Shared connection pool
 
     def __post_init__(self):
         if self.metadata is None:
             self.metadata = {}
 
 
+class RunTelemetry(BaseModel):
+    """Where one run's time and tokens went"""
+
+    model_name: str = Field(description="Model that answered")
+    system_prompt_hash: str = Field(description="SHA-256 of the system prompt")
+    started_at: float = Field(description="Unix time the run started")
+    time_to_first_token: Optional[float] = Field(
+        None, description="Seconds until the first text arrived"
+    )
+    duration: float = Field(0.0, description="Seconds from request to final output")
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = Field(0, description="Input tokens read from cache")
+    tokens_per_second: Optional[float] = Field(
+        None, description="Output tokens per second after the first token"
+    )
+    tool_calls: int = 0
+    tool_latencies: Dict[str, List[float]] = Field(
+        default_factory=dict, description="Seconds per call, keyed by tool name"
+    )
+    cached: bool = Field(False, description="Whether the response came from cache")
+    timed_out: bool = False
+    error: Optional[str] = None
+
+
 class AgentResponse(BaseModel):
     """Simplified response from the agent - let Logfire handle all observability"""
 
     response: str = Field(description="The main response to the user")
+    usage: Dict[str, int] = Field(
+        default_factory=dict, description="Token usage for the run, if known"
+    )
+    cached: bool = Field(False, description="Whether the response came from cache")
+    timed_out: bool = Field(
+        False, description="Whether the run hit its deadline; response is partial"
+    )
+    telemetry: Optional[RunTelemetry] = Field(
+        None, description="Latency, token and tool measurements for the run"
+    )
+
+
+class StreamStart(BaseModel):
+    """First event of a streamed run, repeated with resumed=True on a retry"""
+
+    type: Literal["start"] = "start"
+    model_name: str = Field(description="Model answering the request")
+    session_id: str = Field(description="Session the run belongs to")
+    cached: bool = Field(False, description="Whether the response is a cache replay")
+    resumed: bool = Field(
+        False, description="Whether the run restarted; discard text received so far"
+    )
+    route_reason: Optional[str] = Field(
+        None, description="Why the router picked this model, when routing is on"
+    )
+
+
+class TextDelta(BaseModel):
+    """New text produced since the previous event"""
+
+    type: Literal["delta"] = "delta"
+    text: str = Field(description="Newly generated text")
+
+
+class StreamEnd(BaseModel):
+    """Last event of a streamed run, with the final response and usage"""
+
+    type: Literal["end"] = "end"
+    response: str = Field("", description="The complete response text")
+    usage: Dict[str, int] = Field(
+        default_factory=dict, description="Token usage for the run, if known"
+    )
+    cached: bool = Field(False, description="Whether the response came from cache")
+    error: Optional[str] = Field(None, description="Error message if the run failed")
+    timed_out: bool = Field(
+        False, description="Whether the run hit its deadline; response is partial"
+    )
+    telemetry: Optional[RunTelemetry] = Field(
+        None, description="Latency, token and tool measurements for the run"
+    )
+
+
+StreamEvent = Union[StreamStart, TextDelta, StreamEnd]
+
+
+class ModelComparison(BaseModel):
+    """Outcome of running one model as part of a comparison"""
+
+    model_name: str = Field(description="Model that produced the response")
+    response: Optional[str] = Field(None, description="Final response text")
+    error: Optional[str] = Field(None, description="Error message if the run failed")
+    duration: float = Field(0.0, description="Wall-clock time of the run in seconds")
+    time_to_first_token: Optional[float] = Field(
+        None, description="Seconds until the first streamed chunk arrived"
+    )
+    total_tokens: int = Field(0, description="Input plus output tokens for the run")
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the model produced a response"""
+        return self.error is None
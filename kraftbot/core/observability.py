@@ -108,11 +108,9 @@ class LogfireConfig:
                     "tokens_per_second": usage_data.get("tokens_per_second", 0),
                     "estimated_cost_usd": usage_data.get("estimated_cost", 0),
                     "cache_creation_input_tokens": usage_data.get(
-                        "cache_creation_input_tokens", 0
-                    ),
-                    "cache_read_input_tokens": usage_data.get(
-                        "cache_read_input_tokens", 0
+                        "cache_write_tokens", 0
                     ),
+                    "cache_read_input_tokens": usage_data.get("cache_read_tokens", 0),
                 }
             )
 
@@ -0,0 +1,71 @@
+"""
+Provider prompt caching for the static system prompt and tool definitions.
+"""
+
+from typing import Any, Dict, List
+
+from pydantic_ai.messages import ModelMessage
+from pydantic_ai.models.openai import OpenAIChatModel
+
+# Providers that only cache prompts marked with cache_control breakpoints.
+# OpenAI, DeepSeek and Grok models cache long prefixes automatically.
+CACHE_CONTROL_PREFIXES = ("anthropic/", "google/gemini")
+
+# Roles the system prompt can be sent with, see OpenAIModelProfile
+SYSTEM_ROLES = ("system", "developer")
+
+
+def needs_cache_control(model_name: str) -> bool:
+    """Whether a model only caches prompts with explicit breakpoints"""
+    return model_name.startswith(CACHE_CONTROL_PREFIXES)
+
+
+def mark_cache_breakpoint(messages: List[Dict[str, Any]]) -> bool:
+    """
+    Mark the end of the leading system messages as a cache breakpoint
+
+    Providers cache everything up to a breakpoint: the tool definitions and
+    the system prompt. Per-request content (the conversation and the user's
+    question) comes after it, so the cached prefix is the same for every
+    request with the same prompt and tools.
+
+    Args:
+        messages: OpenAI-format chat messages, changed in place
+
+    Returns:
+        bool: Whether a breakpoint was added
+    """
+    last_system = None
+    for index, message in enumerate(messages):
+        if message.get("role") not in SYSTEM_ROLES:
+            break
+        last_system = index
+    if last_system is None:
+        return False
+
+    message = messages[last_system]
+    content = message.get("content")
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    if not content:
+        return False
+    content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+    messages[last_system] = {**message, "content": content}
+    return True
+
+
+class PromptCachingChatModel(OpenAIChatModel):
+    """
+    OpenRouter chat model that marks the system prompt as a cacheable prefix
+
+    For providers that need explicit breakpoints (Anthropic, Gemini) the
+    system message is sent as a text block with ``cache_control``, so
+    repeated requests read the prompt and tools from the provider's cache at
+    a fraction of the input price. Other models are sent unchanged.
+    """
+
+    async def _map_messages(self, messages: List[ModelMessage]) -> List[Any]:
+        openai_messages = await super()._map_messages(messages)
+        if needs_cache_control(self.model_name):
+            mark_cache_breakpoint(openai_messages)
+        return openai_messages
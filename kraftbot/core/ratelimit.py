@@ -0,0 +1,404 @@
+"""
+Client-side rate limiting and 429-aware retries for model requests.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import Model, ModelRequestParameters, StreamedResponse
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+
+from ..config.settings import settings
+from .cache import hash_text
+from .memory import estimate_message_tokens
+
+# Status codes worth retrying: rate limits and transient upstream failures
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate
+
+    The balance may go negative when a debit turns out larger than the
+    amount reserved; later callers then wait for the deficit to refill.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize the bucket
+
+        Args:
+            per_minute: Refill rate in units per minute
+            capacity: Maximum balance (defaults to one minute's worth)
+        """
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(
+            self.capacity,
+            self._level + (now - self._updated) * self.per_minute / 60.0,
+        )
+        self._updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) * 60.0 / self.per_minute
+
+    def take(self, amount: float) -> None:
+        """Remove ``amount`` from the bucket, possibly going negative"""
+        self._refill()
+        self._level -= amount
+
+    def set_rate(self, per_minute: float) -> None:
+        """Change the refill rate, keeping the current balance"""
+        self._refill()
+        self.per_minute = per_minute
+        self._level = min(self._level, per_minute)
+        self.capacity = per_minute
+
+
+class RateLimiter:
+    """
+    Request and token budgets for one model or API key
+
+    Requests wait until both the requests-per-minute and tokens-per-minute
+    buckets have room. A 429 blocks every caller until its Retry-After has
+    passed and halves the request rate; successes then raise it again one
+    request per minute at a time (AIMD), so concurrent workloads settle just
+    under the provider's real limit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        adaptive: bool = True,
+    ):
+        """
+        Initialize the limiter
+
+        Args:
+            name: Label used in metrics
+            rpm: Requests per minute ceiling (None or 0 for no fixed limit)
+            tpm: Tokens per minute ceiling (None or 0 for no limit)
+            adaptive: Lower the request rate on 429s and recover on success
+        """
+        self.name = name
+        self.rpm = rpm or None
+        self.tpm = tpm or None
+        self.adaptive = adaptive
+        self.requests = TokenBucket(self.rpm) if self.rpm else None
+        self.tokens = TokenBucket(self.tpm) if self.tpm else None
+        self.blocked_until = 0.0
+        self._recent: Deque[float] = deque()
+        self._metrics: Dict[str, float] = {
+            "requests": 0,
+            "throttled": 0,
+            "wait_seconds": 0.0,
+            "rate_limited": 0,
+            "retries": 0,
+            "tokens": 0,
+        }
+
+    @property
+    def current_rpm(self) -> Optional[float]:
+        """Request rate currently enforced, if any"""
+        return self.requests.per_minute if self.requests else None
+
+    async def acquire(self, estimated_tokens: int = 0) -> None:
+        """Wait until a request of roughly ``estimated_tokens`` may be sent"""
+        waited = 0.0
+        while True:
+            delay = max(self.blocked_until - time.monotonic(), 0.0)
+            if self.requests:
+                delay = max(delay, self.requests.delay_for(1))
+            if self.tokens and estimated_tokens:
+                delay = max(delay, self.tokens.delay_for(estimated_tokens))
+            if delay <= 0:
+                break
+            waited += delay
+            await asyncio.sleep(delay)
+
+        # No await between the check above and taking budget, so concurrent
+        # callers can't both spend the same tokens
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens and estimated_tokens:
+            self.tokens.take(estimated_tokens)
+
+        now = time.monotonic()
+        self._recent.append(now)
+        while self._recent and self._recent[0] < now - 60:
+            self._recent.popleft()
+
+        self._metrics["requests"] += 1
+        if waited:
+            self._metrics["throttled"] += 1
+            self._metrics["wait_seconds"] += waited
+
+    def record_tokens(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once a response reports its real usage"""
+        self._metrics["tokens"] += actual_tokens
+        if self.tokens and actual_tokens:
+            self.tokens.take(actual_tokens - estimated_tokens)
+
+    def on_success(self) -> None:
+        """Additive increase back towards the configured ceiling"""
+        if not (self.adaptive and self.requests):
+            return
+        ceiling = self.rpm
+        if ceiling is not None and self.requests.per_minute >= ceiling:
+            return
+        new_rate = self.requests.per_minute + 1
+        if ceiling is None and new_rate > max(len(self._recent), 1) * 2:
+            # Far above observed demand: drop the learned limit entirely
+            self.requests = None
+            return
+        self.requests.set_rate(min(new_rate, ceiling or new_rate))
+
+    def on_rate_limited(self, retry_after: float) -> None:
+        """Block callers until ``retry_after`` seconds from now and back off"""
+        self._metrics["rate_limited"] += 1
+        self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+        if not self.adaptive:
+            return
+        current = self.current_rpm or max(len(self._recent), 2)
+        new_rate = max(current / 2, 1.0)
+        if self.requests:
+            self.requests.set_rate(new_rate)
+        else:
+            self.requests = TokenBucket(new_rate)
+            self.requests.take(self.requests.capacity)
+
+    def on_retry(self) -> None:
+        """Count a retried request"""
+        self._metrics["retries"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters and current limits for this limiter"""
+        return {
+            "name": self.name,
+            **self._metrics,
+            "wait_seconds": round(self._metrics["wait_seconds"], 3),
+            "rpm_limit": self.rpm,
+            "tpm_limit": self.tpm,
+            "current_rpm": (
+                round(self.current_rpm, 2) if self.current_rpm is not None else None
+            ),
+        }
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(api_key: str, model_name: Optional[str] = None) -> RateLimiter:
+    """
+    Shared limiter for an API key, or for one model on that key
+
+    Limiters are process-wide so every agent using the same key and model
+    draws from the same budget.
+    """
+    key_hash = hash_text(api_key or "")[:12]
+    key = (key_hash, model_name or "")
+    limiter = _limiters.get(key)
+    if limiter is None:
+        if model_name is None:
+            limiter = RateLimiter(
+                f"key:{key_hash}",
+                rpm=settings.rate_limit_rpm,
+                tpm=settings.rate_limit_tpm,
+                adaptive=False,
+            )
+        else:
+            limits = settings.rate_limits.get(model_name, {})
+            limiter = RateLimiter(
+                model_name, rpm=limits.get("rpm"), tpm=limits.get("tpm")
+            )
+        _limiters[key] = limiter
+    return limiter
+
+
+def get_rate_limit_stats() -> List[Dict[str, Any]]:
+    """Metrics for every limiter created in this process"""
+    return [limiter.metrics() for limiter in _limiters.values()]
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read Retry-After (or OpenRouter's X-RateLimit-Reset) from an HTTP error"""
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        response = getattr(current, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers is not None:
+            retry_after = headers.get("retry-after")
+            if retry_after:
+                try:
+                    return max(float(retry_after), 0.0)
+                except ValueError:
+                    try:
+                        when = parsedate_to_datetime(retry_after)
+                        now = datetime.now(timezone.utc)
+                        return max((when - now).total_seconds(), 0.0)
+                    except (TypeError, ValueError):
+                        pass
+            reset = headers.get("x-ratelimit-reset")
+            if reset:
+                try:
+                    # Milliseconds since the epoch
+                    return max(float(reset) / 1000.0 - time.time(), 0.0)
+                except ValueError:
+                    pass
+        current = current.__cause__ or current.__context__
+    return None
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(maximum, base * (2**attempt)))
+
+
+class RateLimitedModel(WrapperModel):
+    """
+    Model wrapper that waits for rate limit budget and retries 429s
+
+    Each request first waits on the API key's limiter and the model's
+    limiter. Retryable HTTP errors are retried after the server's
+    Retry-After, or a jittered exponential backoff when none is given.
+    """
+
+    def __init__(
+        self,
+        wrapped: Model,
+        limiters: List[RateLimiter],
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+    ):
+        """
+        Initialize the wrapper
+
+        Args:
+            wrapped: Model to send requests to
+            limiters: Limiters every request must pass
+            max_retries: Retries for retryable errors (defaults to settings)
+            base_delay: First backoff delay in seconds (defaults to settings)
+            max_delay: Longest backoff delay in seconds (defaults to settings)
+        """
+        super().__init__(wrapped)
+        self.limiters = limiters
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.rate_limit_max_retries
+        )
+        self.base_delay = base_delay or settings.rate_limit_base_delay
+        self.max_delay = max_delay or settings.rate_limit_max_delay
+
+    async def _acquire(self, messages: List[ModelMessage]) -> int:
+        """Wait for budget on every limiter; returns the token estimate"""
+        estimated = sum(estimate_message_tokens(message) for message in messages)
+        for limiter in self.limiters:
+            await limiter.acquire(estimated)
+        return estimated
+
+    def _record(self, estimated: int, response: Optional[ModelResponse]) -> None:
+        """Report real usage and success to every limiter"""
+        actual = response.usage.total_tokens if response is not None else 0
+        for limiter in self.limiters:
+            limiter.record_tokens(estimated, actual or 0)
+            limiter.on_success()
+
+    async def _should_retry(self, error: Exception, attempt: int) -> bool:
+        """Back off after a retryable error; False when out of retries"""
+        if not isinstance(error, ModelHTTPError):
+            return False
+        if error.status_code not in RETRYABLE_STATUS_CODES:
+            return False
+        if attempt >= self.max_retries:
+            return False
+
+        retry_after = retry_after_seconds(error)
+        delay = (
+            min(retry_after, self.max_delay)
+            if retry_after is not None
+            else backoff_delay(attempt, self.base_delay, self.max_delay)
+        )
+        for limiter in self.limiters:
+            limiter.on_retry()
+            if error.status_code == 429:
+                limiter.on_rate_limited(delay)
+
+        await asyncio.sleep(delay)
+        return True
+
+    async def request(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        attempt = 0
+        while True:
+            estimated = await self._acquire(messages)
+            try:
+                response = await self.wrapped.request(
+                    messages, model_settings, model_request_parameters
+                )
+            except Exception as e:
+                if await self._should_retry(e, attempt):
+                    attempt += 1
+                    continue
+                raise
+            self._record(estimated, response)
+            return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: List[ModelMessage],
+        model_settings: Optional[ModelSettings],
+        model_request_parameters: ModelRequestParameters,
+        run_context: Any = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        attempt = 0
+        while True:
+            estimated = await self._acquire(messages)
+            stack = AsyncExitStack()
+            try:
+                # Errors such as 429 surface when the stream is opened, before
+                # any output, so only that step is retried
+                stream = await stack.enter_async_context(
+                    self.wrapped.request_stream(
+                        messages, model_settings, model_request_parameters, run_context
+                    )
+                )
+            except Exception as e:
+                await stack.aclose()
+                if await self._should_retry(e, attempt):
+                    attempt += 1
+                    continue
+                raise
+            break
+
+        async with stack:
+            yield stream
+        self._record(estimated, stream.get())
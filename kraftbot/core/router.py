@@ -0,0 +1,368 @@
+"""
+Cost- and latency-aware model routing.
+"""
+
+import math
+import re
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from ..config.settings import ModelConfig, settings
+from ..mcp.manager import MCPManager
+from .agent import PydanticAIAgent, load_default_mcp_servers, stream_text
+from .cassette import Cassette
+from .memory import ConversationMemory, estimate_tokens
+from .model_stats import ModelStats, get_model_stats
+from .models import AgentResponse, StreamEnd, StreamEvent, StreamStart
+
+# Wording that signals multi-step reasoning rather than a lookup
+COMPLEX_RE = re.compile(
+    r"\b(trade|trades|trading|analy[sz]e|analysis|compare|comparison|versus|vs\.?|"
+    r"strateg\w*|evaluate|evaluation|rank|ranking|rest of (the )?season|ros|"
+    r"playoffs?|long[- ]term|pros and cons|explain|why|plan|optimi[sz]e|"
+    r"breakdown|deep dive|should i)\b",
+    re.IGNORECASE,
+)
+
+# Wording that refers to live league data, which needs the MCP tools
+TOOLS_RE = re.compile(
+    r"\b(my|our|league|roster|team|lineup|waivers?|matchups?|standings|trending|"
+    r"injur\w*|playing|status|questionable|doubtful|score|points|week|available|"
+    r"free agents?)\b",
+    re.IGNORECASE,
+)
+
+# Expected response sizes used to estimate cost before the run
+SIMPLE_OUTPUT_TOKENS = 200
+COMPLEX_OUTPUT_TOKENS = 1200
+
+# Rough prompt overhead of the MCP tool definitions sent with a request
+TOOL_SCHEMA_TOKENS = 1500
+
+# Short follow-ups in a complex conversation stay with the stronger model
+FOLLOW_UP_MAX_TOKENS = 20
+
+# (name, config, estimated cost, ttft p50, ttft p95) for a model that fits
+Candidate = Tuple[str, ModelConfig, Optional[float], Optional[float], Optional[float]]
+
+
+class RouteDecision(BaseModel):
+    """The model picked for a request and why"""
+
+    model_name: str = Field(description="Model the request is sent to")
+    complexity: Literal["simple", "complex"]
+    needs_tools: bool = Field(description="Whether the prompt likely needs tools")
+    input_tokens: int = Field(description="Estimated prompt tokens incl. history")
+    estimated_cost: Optional[float] = Field(None, description="Estimated USD cost")
+    ttft_p95: Optional[float] = Field(None, description="Measured p95 TTFT, seconds")
+    reason: str = Field(description="Human-readable routing explanation")
+
+
+class ModelRouter:
+    """
+    Pick a model per request from ModelConfig prices and measured latency
+
+    Prompts are classified as simple lookups or complex analysis. Simple
+    prompts go to the cheapest model that meets the latency SLO and cost
+    budget; complex prompts go to the highest-quality model that does. Models
+    whose context is too small, or that can't call tools when tools are
+    likely needed, are never picked. Limits are relaxed (SLO first, then
+    budget) rather than failing when no model meets them.
+    """
+
+    def __init__(
+        self,
+        models: Optional[Dict[str, ModelConfig]] = None,
+        stats: Optional[Dict[str, ModelStats]] = None,
+        system_prompt: Optional[str] = None,
+        latency_slo: Optional[float] = None,
+        cost_budget: Optional[float] = None,
+    ):
+        """
+        Initialize the router
+
+        Args:
+            models: Candidate models (defaults to settings.route_models, or
+                every catalog model)
+            stats: Measured latency per model (defaults to the stats file)
+            system_prompt: System prompt sent with every request
+            latency_slo: Maximum measured p95 TTFT in seconds (0 disables)
+            cost_budget: Maximum estimated USD per request (0 disables)
+        """
+        if models is None:
+            models = {
+                name: config
+                for name, config in settings.available_models.items()
+                if not settings.route_models or name in settings.route_models
+            }
+        self.models = models
+        self.stats = stats if stats is not None else get_model_stats().summaries()
+        self.system_tokens = estimate_tokens(system_prompt) if system_prompt else 0
+        self.latency_slo = (
+            settings.route_latency_slo if latency_slo is None else latency_slo
+        )
+        self.cost_budget = (
+            settings.route_cost_budget if cost_budget is None else cost_budget
+        )
+
+    @staticmethod
+    def classify(
+        prompt: str, previous: Optional[RouteDecision] = None
+    ) -> Tuple[str, bool]:
+        """
+        Classify a prompt
+
+        Args:
+            prompt: The user's prompt
+            previous: The last decision in the same session, if any
+
+        Returns:
+            Tuple of the complexity ("simple" or "complex") and whether tools
+            are likely needed
+        """
+        tokens = estimate_tokens(prompt)
+        needs_tools = bool(TOOLS_RE.search(prompt))
+
+        complex_ = (
+            bool(COMPLEX_RE.search(prompt))
+            or tokens > settings.route_simple_max_tokens
+            or prompt.count("?") > 1
+        )
+        if previous is not None and previous.complexity == "complex":
+            # "What about Jefferson?" continues the analysis before it
+            complex_ = complex_ or tokens <= FOLLOW_UP_MAX_TOKENS
+            needs_tools = needs_tools or previous.needs_tools
+
+        return ("complex" if complex_ else "simple"), needs_tools
+
+    def route(
+        self,
+        prompt: str,
+        history_tokens: int = 0,
+        previous: Optional[RouteDecision] = None,
+    ) -> RouteDecision:
+        """
+        Pick a model for a prompt
+
+        Args:
+            prompt: The user's prompt
+            history_tokens: Estimated tokens of conversation history sent too
+            previous: The last decision in the same session, if any
+
+        Returns:
+            RouteDecision: The chosen model with the estimates behind it
+        """
+        complexity, needs_tools = self.classify(prompt, previous)
+        input_tokens = estimate_tokens(prompt) + history_tokens + self.system_tokens
+        if needs_tools:
+            input_tokens += TOOL_SCHEMA_TOKENS
+        output_tokens = (
+            SIMPLE_OUTPUT_TOKENS if complexity == "simple" else COMPLEX_OUTPUT_TOKENS
+        )
+        if settings.max_response_tokens > 0:  # 0 means no cap
+            output_tokens = min(output_tokens, settings.max_response_tokens)
+
+        candidates: List[Candidate] = []
+        for name, config in self.models.items():
+            if config.context_length and config.context_length < (
+                input_tokens + output_tokens
+            ):
+                continue
+            if needs_tools and not config.supports_tools:
+                continue
+            stats = self.stats.get(name)
+            candidates.append(
+                (
+                    name,
+                    config,
+                    config.estimate_cost(input_tokens, output_tokens),
+                    stats.ttft_p50 if stats else None,
+                    stats.ttft_p95 if stats else None,
+                )
+            )
+
+        if not candidates:
+            return RouteDecision(
+                model_name=settings.default_model,
+                complexity=complexity,
+                needs_tools=needs_tools,
+                input_tokens=input_tokens,
+                reason="no candidate model fits; using the default model",
+            )
+
+        def within_slo(candidate: Candidate) -> bool:
+            p95 = candidate[4]
+            return not self.latency_slo or p95 is None or p95 <= self.latency_slo
+
+        def within_budget(candidate: Candidate) -> bool:
+            cost = candidate[2]
+            return not self.cost_budget or cost is None or cost <= self.cost_budget
+
+        pool = [c for c in candidates if within_slo(c) and within_budget(c)]
+        relaxed = ""
+        if not pool:
+            pool = [c for c in candidates if within_budget(c)]
+            relaxed = " (no model meets the latency SLO)"
+        if not pool:
+            pool = candidates
+            relaxed = " (no model meets the latency SLO and cost budget)"
+
+        def sort_key(candidate: Candidate) -> Tuple[float, float, float]:
+            _, config, cost, ttft_p50, _ = candidate
+            cost = math.inf if cost is None else cost
+            ttft = math.inf if ttft_p50 is None else ttft_p50
+            quality = config.quality or 0
+            if complexity == "simple":
+                return (cost, ttft, -quality)
+            return (-quality, cost, ttft)
+
+        name, config, cost, _, ttft_p95 = min(pool, key=sort_key)
+        goal = "cheapest" if complexity == "simple" else "strongest"
+        return RouteDecision(
+            model_name=name,
+            complexity=complexity,
+            needs_tools=needs_tools,
+            input_tokens=input_tokens,
+            estimated_cost=cost,
+            ttft_p95=ttft_p95,
+            reason=f"{complexity} prompt → {goal} eligible model{relaxed}",
+        )
+
+
+class RoutedAgent:
+    """
+    Agent facade that routes every request through a ModelRouter
+
+    Per-model PydanticAIAgents are built on first use and share one MCP
+    manager and one conversation memory, so a session keeps its history when
+    consecutive turns are answered by different models.
+    """
+
+    def __init__(
+        self,
+        openrouter_api_key: str,
+        system_prompt: Optional[str] = None,
+        enable_logfire: bool = True,
+        enable_cache: bool = True,
+        router: Optional[ModelRouter] = None,
+        mcp_manager: Optional[MCPManager] = None,
+        agent_factory: Optional[Callable[..., PydanticAIAgent]] = None,
+        cassette: Optional[Cassette] = None,
+    ):
+        """
+        Initialize the routed agent
+
+        Args:
+            router: Router used to pick models (defaults to one built from
+                settings)
+            mcp_manager: Optional shared MCP manager (defaults to the
+                configured servers)
+            agent_factory: Callable used to build agents, mainly for testing
+            cassette: Cassette every agent records to or replays from
+        """
+        self.openrouter_api_key = openrouter_api_key
+        self.system_prompt = system_prompt
+        self.enable_logfire = enable_logfire
+        self.enable_cache = enable_cache
+        self.router = router or ModelRouter(system_prompt=system_prompt)
+        self.agent_factory = agent_factory or PydanticAIAgent
+        self.cassette = cassette
+        self.model_name = "auto"
+        self.last_usage: Dict[str, int] = {}
+
+        if mcp_manager is None:
+            mcp_manager = MCPManager(cassette=cassette)
+            load_default_mcp_servers(mcp_manager)
+        self.mcp_manager = mcp_manager
+
+        # One history per session whichever model answers; sized for the
+        # default model
+        self.memory = (
+            ConversationMemory.for_model(settings.default_model)
+            if settings.enable_memory
+            else None
+        )
+        self._agents: Dict[str, PydanticAIAgent] = {}
+        self._decisions: Dict[str, RouteDecision] = {}
+
+    async def __aenter__(self) -> "RoutedAgent":
+        """Open all MCP sessions and keep them open until the context exits"""
+        await self.mcp_manager.connect()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.mcp_manager.disconnect()
+
+    def set_system_prompt(self, system_prompt: str) -> None:
+        """Swap the system prompt on every agent built so far"""
+        self.system_prompt = system_prompt
+        self.router.system_tokens = estimate_tokens(system_prompt)
+        for agent in self._agents.values():
+            agent.set_system_prompt(system_prompt)
+
+    def agent_for(self, model_name: str) -> PydanticAIAgent:
+        """Get the agent for a model, building it on first use"""
+        agent = self._agents.get(model_name)
+        if agent is None:
+            agent = self.agent_factory(
+                openrouter_api_key=self.openrouter_api_key,
+                model_name=model_name,
+                system_prompt=self.system_prompt,
+                enable_logfire=self.enable_logfire and not self._agents,
+                mcp_manager=self.mcp_manager,
+                enable_cache=self.enable_cache,
+                memory=self.memory,
+                cassette=self.cassette,
+            )
+            self._agents[model_name] = agent
+        return agent
+
+    def route(self, prompt: str, session_id: str) -> RouteDecision:
+        """Pick the model for the next turn of a session"""
+        history_tokens = (
+            self.memory.estimate_tokens(session_id) if self.memory is not None else 0
+        )
+        decision = self.router.route(
+            prompt, history_tokens, previous=self._decisions.get(session_id)
+        )
+        self._decisions.pop(session_id, None)
+        self._decisions[session_id] = decision
+        if len(self._decisions) > settings.memory_max_sessions:
+            self._decisions.pop(next(iter(self._decisions)))
+        return decision
+
+    async def stream_events(
+        self, prompt: str, user_id: str = "user", session_id: str = "default"
+    ) -> AsyncIterator[StreamEvent]:
+        """Route the prompt and stream the chosen agent's events"""
+        decision = self.route(prompt, session_id)
+        agent = self.agent_for(decision.model_name)
+        async for event in agent.stream_events(prompt, user_id, session_id):
+            if isinstance(event, StreamStart):
+                event.route_reason = decision.reason
+            elif isinstance(event, StreamEnd):
+                self.last_usage = agent.last_usage
+            yield event
+
+    async def run(
+        self, prompt: str, user_id: str = "user", session_id: str = "default"
+    ) -> AgentResponse:
+        """Route the prompt and run it on the chosen agent"""
+        agent = self.agent_for(self.route(prompt, session_id).model_name)
+        response = await agent.run(prompt, user_id, session_id)
+        self.last_usage = agent.last_usage
+        return response
+
+    async def run_stream(
+        self,
+        prompt: str,
+        user_id: str = "user",
+        session_id: str = "default",
+        cumulative: bool = False,
+    ) -> AsyncIterator[str]:
+        """Route the prompt and stream text as PydanticAIAgent.run_stream does"""
+        async for chunk in stream_text(
+            self.stream_events(prompt, user_id, session_id), cumulative
+        ):
+            yield chunk
@@ -0,0 +1,351 @@
+"""
+Per-run performance telemetry and the local SQLite metrics store.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from ..config.settings import settings
+from .model_stats import percentile
+from .models import RunTelemetry
+
+# Grouping columns `kraftbot stats` can break runs down by
+GROUP_COLUMNS = {"model": "model", "prompt": "prompt_hash"}
+
+
+class RunRecorder:
+    """Measures one run from request to final output"""
+
+    def __init__(self, model_name: str, system_prompt: Optional[str]):
+        self.model_name = model_name
+        self.system_prompt_hash = hashlib.sha256(
+            (system_prompt or "").encode("utf-8")
+        ).hexdigest()
+        self.started_at = time.time()
+        self.tool_latencies: Dict[str, List[float]] = {}
+        self._start = time.perf_counter()
+        self.time_to_first_token: Optional[float] = None
+        self.time_to_first_response: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the run started"""
+        return time.perf_counter() - self._start
+
+    def first_token(self) -> None:
+        """Mark the arrival of text, keeping the first time it happened"""
+        if self.time_to_first_token is None:
+            self.time_to_first_token = self.elapsed
+
+    def first_response(self) -> None:
+        """Mark the start of a model response, keeping the first time it happened"""
+        if self.time_to_first_response is None:
+            self.time_to_first_response = self.elapsed
+
+    def finish(
+        self,
+        usage: Dict[str, int],
+        cached: bool = False,
+        timed_out: bool = False,
+        error: Optional[str] = None,
+    ) -> RunTelemetry:
+        """
+        Summarize the run
+
+        Args:
+            usage: Token usage dict from the agent
+            cached: Whether the response came from the response cache
+            timed_out: Whether the run hit its deadline
+            error: Error message if the run failed
+
+        Returns:
+            RunTelemetry: The run's measurements
+        """
+        duration = self.elapsed
+        output_tokens = usage.get("output_tokens", 0)
+        # Throughput is measured over generation, after the first token
+        generation_time = duration - (self.time_to_first_token or 0.0)
+        return RunTelemetry(
+            model_name=self.model_name,
+            system_prompt_hash=self.system_prompt_hash,
+            started_at=self.started_at,
+            time_to_first_token=self.time_to_first_token,
+            duration=duration,
+            input_tokens=usage.get("input_tokens", 0),
+            output_tokens=output_tokens,
+            cache_read_tokens=usage.get("cache_read_tokens", 0),
+            tokens_per_second=(
+                output_tokens / generation_time
+                if output_tokens and generation_time > 0
+                else None
+            ),
+            tool_calls=usage.get(
+                "tool_calls", sum(len(calls) for calls in self.tool_latencies.values())
+            ),
+            tool_latencies=self.tool_latencies,
+            cached=cached,
+            timed_out=timed_out,
+            error=error,
+        )
+
+
+class RunGroupStats(BaseModel):
+    """Percentiles for the runs of one model or system prompt"""
+
+    key: str
+    runs: int = 0
+    cached: int = 0
+    errors: int = 0
+    ttft_p50: Optional[float] = None
+    ttft_p95: Optional[float] = None
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    tokens_per_second_p50: Optional[float] = None
+    avg_input_tokens: float = 0.0
+    avg_output_tokens: float = 0.0
+    cache_read_share: float = 0.0  # Input tokens served from the prompt cache
+
+
+class ToolStats(BaseModel):
+    """Latency percentiles for one tool"""
+
+    tool: str
+    calls: int = 0
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_max: Optional[float] = None
+
+
+class TelemetryStore:
+    """
+    SQLite file of per-run measurements
+
+    One row per run plus one row per tool call. Writes are small single
+    transactions, safe from several processes at once; the oldest runs are
+    pruned once the store holds more than ``max_runs``.
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_runs: Optional[int] = None):
+        """
+        Initialize the store
+
+        Args:
+            path: SQLite file (defaults to metrics.sqlite3 in the cache dir)
+            max_runs: Runs kept before the oldest are pruned
+        """
+        self.path = Path(path) if path else settings.get_metrics_path()
+        self.max_runs = max(1, max_runs or settings.metrics_max_runs)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._failed = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use; None if it can't be opened"""
+        if self._db is None and not self._failed:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS runs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        started_at REAL NOT NULL,
+                        model TEXT NOT NULL,
+                        prompt_hash TEXT NOT NULL,
+                        ttft REAL,
+                        duration REAL NOT NULL,
+                        input_tokens INTEGER NOT NULL,
+                        output_tokens INTEGER NOT NULL,
+                        cache_read_tokens INTEGER NOT NULL,
+                        tokens_per_second REAL,
+                        tool_calls INTEGER NOT NULL,
+                        cached INTEGER NOT NULL,
+                        timed_out INTEGER NOT NULL,
+                        error TEXT
+                    );
+                    CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at);
+                    CREATE TABLE IF NOT EXISTS tool_calls (
+                        run_id INTEGER NOT NULL,
+                        tool TEXT NOT NULL,
+                        duration REAL NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS tool_calls_run_id ON tool_calls (run_id);
+                    """
+                )
+                db.commit()
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️  Run metrics disabled ({self.path}): {e}")
+                self._failed = True
+        return self._db
+
+    def record(self, telemetry: RunTelemetry) -> None:
+        """Append a run; failures are reported once and never fail the run"""
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                cursor = db.execute(
+                    "INSERT INTO runs (started_at, model, prompt_hash, ttft, duration, "
+                    "input_tokens, output_tokens, cache_read_tokens, tokens_per_second, "
+                    "tool_calls, cached, timed_out, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        telemetry.started_at,
+                        telemetry.model_name,
+                        telemetry.system_prompt_hash,
+                        telemetry.time_to_first_token,
+                        telemetry.duration,
+                        telemetry.input_tokens,
+                        telemetry.output_tokens,
+                        telemetry.cache_read_tokens,
+                        telemetry.tokens_per_second,
+                        telemetry.tool_calls,
+                        int(telemetry.cached),
+                        int(telemetry.timed_out),
+                        telemetry.error,
+                    ),
+                )
+                run_id = cursor.lastrowid
+                db.executemany(
+                    "INSERT INTO tool_calls (run_id, tool, duration) VALUES (?, ?, ?)",
+                    [
+                        (run_id, tool, duration)
+                        for tool, durations in telemetry.tool_latencies.items()
+                        for duration in durations
+                    ],
+                )
+                if run_id % 100 == 0:
+                    self._prune(db, run_id)
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Could not record run metrics: {e}")
+
+    def _prune(self, db: sqlite3.Connection, last_id: int) -> None:
+        """Drop runs (and their tool calls) beyond the newest max_runs"""
+        cutoff = last_id - self.max_runs
+        db.execute("DELETE FROM runs WHERE id <= ?", (cutoff,))
+        db.execute("DELETE FROM tool_calls WHERE run_id <= ?", (cutoff,))
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return []
+            return db.execute(sql, params).fetchall()
+
+    def run_stats(
+        self, group_by: str = "model", since: float = 0
+    ) -> List[RunGroupStats]:
+        """
+        Percentiles per model or system prompt
+
+        Latency percentiles only count uncached runs that finished without an
+        error; cached and failed runs are counted separately.
+
+        Args:
+            group_by: "model" or "prompt" (system prompt hash)
+            since: Only include runs started after this Unix time
+
+        Returns:
+            List[RunGroupStats]: One entry per group, most runs first
+        """
+        column = GROUP_COLUMNS[group_by]
+        rows = self._query(
+            f"SELECT {column}, ttft, duration, tokens_per_second, input_tokens, "
+            "output_tokens, cache_read_tokens, cached, error FROM runs "
+            "WHERE started_at >= ?",
+            (since,),
+        )
+
+        grouped: Dict[str, List[tuple]] = {}
+        for row in rows:
+            grouped.setdefault(row[0], []).append(row)
+
+        stats = []
+        for key, runs in grouped.items():
+            measured = [r for r in runs if not r[7] and r[8] is None]
+            ttfts = [r[1] for r in measured if r[1] is not None]
+            durations = [r[2] for r in measured]
+            rates = [r[3] for r in measured if r[3] is not None]
+            input_tokens = sum(r[4] for r in measured)
+            stats.append(
+                RunGroupStats(
+                    key=key,
+                    runs=len(runs),
+                    cached=sum(1 for r in runs if r[7]),
+                    errors=sum(1 for r in runs if r[8] is not None),
+                    ttft_p50=percentile(ttfts, 0.5),
+                    ttft_p95=percentile(ttfts, 0.95),
+                    latency_p50=percentile(durations, 0.5),
+                    latency_p95=percentile(durations, 0.95),
+                    tokens_per_second_p50=percentile(rates, 0.5),
+                    avg_input_tokens=input_tokens / len(measured) if measured else 0.0,
+                    avg_output_tokens=(
+                        sum(r[5] for r in measured) / len(measured) if measured else 0.0
+                    ),
+                    cache_read_share=(
+                        sum(r[6] for r in measured) / input_tokens
+                        if input_tokens
+                        else 0.0
+                    ),
+                )
+            )
+        return sorted(stats, key=lambda s: (-s.runs, s.key))
+
+    def tool_stats(self, since: float = 0) -> List[ToolStats]:
+        """
+        Latency percentiles per tool
+
+        Args:
+            since: Only include calls from runs started after this Unix time
+
+        Returns:
+            List[ToolStats]: One entry per tool, most calls first
+        """
+        rows = self._query(
+            "SELECT tool, tool_calls.duration FROM tool_calls "
+            "JOIN runs ON runs.id = tool_calls.run_id WHERE runs.started_at >= ?",
+            (since,),
+        )
+        grouped: Dict[str, List[float]] = {}
+        for tool, duration in rows:
+            grouped.setdefault(tool, []).append(duration)
+
+        stats = [
+            ToolStats(
+                tool=tool,
+                calls=len(durations),
+                latency_p50=percentile(durations, 0.5),
+                latency_p95=percentile(durations, 0.95),
+                latency_max=max(durations),
+            )
+            for tool, durations in grouped.items()
+        ]
+        return sorted(stats, key=lambda s: (-s.calls, s.tool))
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_telemetry_store: Optional[TelemetryStore] = None
+
+
+def get_telemetry_store() -> TelemetryStore:
+    """Get the process-wide run metrics store"""
+    global _telemetry_store
+    if _telemetry_store is None:
+        _telemetry_store = TelemetryStore()
+    return _telemetry_store
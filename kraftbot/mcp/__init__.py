@@ -2,8 +2,26 @@
 Model Context Protocol (MCP) integration for KraftBot.
 """
 
-from .manager import MCPManager
-from .servers import MCPServerConfig
+from typing import TYPE_CHECKING, List
+
+from ..utils.lazy import lazy_dir, lazy_exports
+
+if TYPE_CHECKING:
+    from .manager import MCPManager
+    from .servers import MCPServerConfig
+
+_EXPORTS = {
+    "MCPManager": ".manager",
+    "MCPServerConfig": ".servers",
+}
+
+# The manager imports pydantic_ai and mcp; `status` only reads the tool index
+__getattr__ = lazy_exports(__name__, _EXPORTS)
+
+
+def __dir__() -> List[str]:
+    return lazy_dir(globals(), _EXPORTS)
+
 
 __all__ = [
     "MCPManager",
@@ -0,0 +1,197 @@
+"""
+Caching toolset wrapper for MCP tool results.
+"""
+
+import asyncio
+import hashlib
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Set
+
+from pydantic_ai.toolsets import WrapperToolset
+
+from ..utils.cache import TieredCache
+from ..utils.metrics import get_local_metrics
+
+# Uncached tool calls shared by concurrent runs of one request, see
+# shared_tool_calls()
+_shared_calls: ContextVar[Optional[Dict[str, "asyncio.Task[Any]"]]] = ContextVar(
+    "kraftbot_shared_tool_calls", default=None
+)
+
+
+@contextmanager
+def shared_tool_calls() -> Iterator[None]:
+    """
+    Share identical tool calls between runs started inside the block
+
+    Used for hedged requests, where two runs answer the same prompt: tools
+    with a TTL of 0 (never cached) are still called only once per set of
+    arguments, and the second run reuses the first run's result. Tasks
+    created inside the block inherit the sharing.
+    """
+    token = _shared_calls.set({})
+    try:
+        yield
+    finally:
+        _shared_calls.reset(token)
+
+
+def canonicalize_args(args: Dict[str, Any]) -> str:
+    """Serialize tool arguments so equivalent calls produce the same string"""
+    return json.dumps(args or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+@dataclass
+class CachingToolset(WrapperToolset[Any]):
+    """
+    Toolset wrapper that caches tool results with per-tool TTLs
+
+    Fresh results are served from the cache. Results that expired less than
+    ``stale_ttl`` seconds ago are served immediately while a background call
+    refreshes them. Concurrent identical calls share one in-flight request.
+    """
+
+    server_name: str = ""
+    store: Optional[TieredCache] = None
+    tool_ttls: Dict[str, float] = field(default_factory=dict)
+    default_ttl: float = 300
+    stale_ttl: float = 0
+    tool_prefix: Optional[str] = None
+
+    _inflight: Dict[str, "asyncio.Task[Any]"] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _refreshing: Set[str] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
+    _background: Set["asyncio.Task[Any]"] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
+
+    def ttl_for(self, name: str) -> float:
+        """TTL for a tool, looked up by full or unprefixed name"""
+        if name in self.tool_ttls:
+            return self.tool_ttls[name]
+        if self.tool_prefix and name.startswith(f"{self.tool_prefix}_"):
+            short_name = name[len(self.tool_prefix) + 1 :]
+            if short_name in self.tool_ttls:
+                return self.tool_ttls[short_name]
+        return self.default_ttl
+
+    def cache_key(self, name: str, tool_args: Dict[str, Any]) -> str:
+        """Cache key for a tool call"""
+        raw = f"{self.server_name}\x1f{name}\x1f{canonicalize_args(tool_args)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def call_tool(
+        self, name: str, tool_args: Dict[str, Any], ctx: Any, tool: Any
+    ) -> Any:
+        ttl = self.ttl_for(name)
+        if self.store is None or ttl <= 0:
+            shared = _shared_calls.get()
+            if shared is None:
+                return await self.wrapped.call_tool(name, tool_args, ctx, tool)
+            return await self._call_shared(shared, name, tool_args, ctx, tool)
+
+        key = self.cache_key(name, tool_args)
+        entry = self.store.get_entry(key, max_stale=self.stale_ttl)
+        metrics = get_local_metrics()
+
+        if entry is not None:
+            if metrics is not None:
+                metrics.record_tool_cache("stale" if entry.is_expired else "hit")
+            if entry.is_expired and key not in self._refreshing:
+                self._refresh_in_background(key, name, tool_args, ctx, tool, ttl)
+            return entry.value
+
+        if metrics is not None:
+            metrics.record_tool_cache("miss")
+        return await self._fetch(key, name, tool_args, ctx, tool, ttl)
+
+    async def _call_shared(
+        self,
+        shared: Dict[str, "asyncio.Task[Any]"],
+        name: str,
+        tool_args: Dict[str, Any],
+        ctx: Any,
+        tool: Any,
+    ) -> Any:
+        """Call an uncached tool once per request group"""
+        key = self.cache_key(name, tool_args)
+        task = shared.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self.wrapped.call_tool(name, tool_args, ctx, tool)
+            )
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            shared[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        key: str,
+        name: str,
+        tool_args: Dict[str, Any],
+        ctx: Any,
+        tool: Any,
+        ttl: float,
+    ) -> Any:
+        """Call the wrapped tool once per key, sharing the result with waiters"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._call_and_store(key, name, tool_args, ctx, tool, ttl)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_inflight(key, done))
+
+        # Shield the shared call so one cancelled caller doesn't cancel the rest
+        return await asyncio.shield(task)
+
+    async def _call_and_store(
+        self,
+        key: str,
+        name: str,
+        tool_args: Dict[str, Any],
+        ctx: Any,
+        tool: Any,
+        ttl: float,
+    ) -> Any:
+        """Call the wrapped tool and cache its result"""
+        result = await self.wrapped.call_tool(name, tool_args, ctx, tool)
+        self.store.set(key, result, ttl=ttl)
+        return result
+
+    def _finish_inflight(self, key: str, task: "asyncio.Task[Any]") -> None:
+        """Forget a finished in-flight call"""
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark errors as retrieved even if every caller went away
+            task.exception()
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        name: str,
+        tool_args: Dict[str, Any],
+        ctx: Any,
+        tool: Any,
+        ttl: float,
+    ) -> None:
+        """Schedule a refresh of a stale entry"""
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                await self._fetch(key, name, tool_args, ctx, tool, ttl)
+            except Exception:
+                pass  # Keep serving the stale value; the next call retries
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
@@ -0,0 +1,112 @@
+"""
+Cassette recording and replay of MCP tool calls.
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from pydantic_ai.exceptions import ModelRetry
+from pydantic_ai.mcp import TOOL_SCHEMA_VALIDATOR
+from pydantic_ai.tools import ToolDefinition
+from pydantic_ai.toolsets import ToolsetTool, WrapperToolset
+from pydantic_core import to_jsonable_python
+
+from .cache import canonicalize_args
+
+if TYPE_CHECKING:
+    from ..core.cassette import Cassette
+
+
+class RecordedToolError(Exception):
+    """A replayed tool call that failed when it was recorded"""
+
+
+@dataclass
+class CassetteToolset(WrapperToolset[Any]):
+    """
+    Toolset wrapper that records tool calls to a cassette or replays them
+
+    When replaying, the wrapped server is never started: tool definitions
+    and results both come from the cassette.
+    """
+
+    cassette: Optional["Cassette"] = None
+    server_name: str = ""
+
+    @property
+    def _replaying(self) -> bool:
+        return self.cassette is not None and self.cassette.replaying
+
+    def cassette_key(self, name: str, tool_args: Dict[str, Any]) -> str:
+        """Cassette key for a tool call"""
+        raw = f"{self.server_name}\x1f{name}\x1f{canonicalize_args(tool_args)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def __aenter__(self) -> "CassetteToolset":
+        if self._replaying:
+            return self
+        return await super().__aenter__()
+
+    async def __aexit__(self, *args: Any) -> Optional[bool]:
+        if self._replaying:
+            return None
+        return await super().__aexit__(*args)
+
+    async def get_tools(self, ctx: Any) -> Dict[str, ToolsetTool[Any]]:
+        if self._replaying:
+            return {
+                tool_def["name"]: ToolsetTool(
+                    toolset=self,
+                    tool_def=ToolDefinition(**tool_def),
+                    max_retries=1,
+                    args_validator=TOOL_SCHEMA_VALIDATOR,
+                )
+                for tool_def in self.cassette.tool_defs(self.server_name)
+            }
+
+        tools = await super().get_tools(ctx)
+        if self.cassette is not None:
+            self.cassette.record_tool_defs(
+                self.server_name,
+                [to_jsonable_python(asdict(tool.tool_def)) for tool in tools.values()],
+            )
+        return tools
+
+    async def call_tool(
+        self, name: str, tool_args: Dict[str, Any], ctx: Any, tool: Any
+    ) -> Any:
+        if self.cassette is None:
+            return await self.wrapped.call_tool(name, tool_args, ctx, tool)
+
+        key = self.cassette_key(name, tool_args)
+        if self._replaying:
+            entry = self.cassette.replay_tool(key, name)
+            await self.cassette.pace(
+                asyncio.get_running_loop().time(), entry["duration"]
+            )
+            if "error" not in entry:
+                return entry["result"]
+            if entry.get("retry"):
+                raise ModelRetry(entry["error"])
+            raise RecordedToolError(entry["error"])
+
+        start = time.perf_counter()
+        try:
+            result = await self.wrapped.call_tool(name, tool_args, ctx, tool)
+        except ModelRetry as e:
+            self.cassette.record_tool(
+                key, name, time.perf_counter() - start, error=e.message, retry=True
+            )
+            raise
+        except Exception as e:
+            self.cassette.record_tool(
+                key, name, time.perf_counter() - start, error=str(e)
+            )
+            raise
+        self.cassette.record_tool(
+            key, name, time.perf_counter() - start, result=to_jsonable_python(result)
+        )
+        return result
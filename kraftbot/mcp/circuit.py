@@ -0,0 +1,134 @@
+"""
+Circuit breaker toolset wrapper for MCP servers.
+"""
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic_ai.exceptions import ModelRetry
+from pydantic_ai.toolsets import ToolsetTool, WrapperToolset
+
+from .health import CircuitBreaker, ServerHealth, describe_error, is_connection_error
+from .timeout import ToolTimeoutError
+
+# How each breaker toolset entered by the current run was entered, keyed by
+# toolset id. Kept per task so a run's exit only undoes that run's enter.
+_run_modes: ContextVar[Dict[int, Tuple[str, ...]]] = ContextVar(
+    "kraftbot_circuit_run_modes", default={}
+)
+
+ENTERED = "entered"
+SKIPPED = "skipped"
+TRIAL = "trial"  # Entered as the half-open circuit's single trial
+
+
+@dataclass
+class CircuitBreakerToolset(WrapperToolset[Any]):
+    """
+    Toolset wrapper that leaves out a server whose circuit is open
+
+    While the circuit is open the server is not entered and offers no tools,
+    so runs go ahead without it instead of waiting on it. While it is half
+    open, only the run holding the trial reaches the server. A server that fails
+    to connect opens its circuit at once; dropped connections and timed-out
+    calls count towards the breaker's failure threshold.
+    """
+
+    health: ServerHealth
+
+    @property
+    def available(self) -> bool:
+        """Whether the server's circuit lets calls through"""
+        return self.health.breaker.available
+
+    def _allowed(self) -> bool:
+        """Whether the current run may reach the server"""
+        mode = self._run_mode()
+        if mode == SKIPPED:
+            return False
+        if mode is None:
+            # Used without entering, e.g. by a direct call_tool()
+            return self.health.breaker.allow_request()
+        state = self.health.breaker.state
+        if state == CircuitBreaker.HALF_OPEN:
+            return mode == TRIAL
+        return state == CircuitBreaker.CLOSED
+
+    def _run_mode(self) -> Optional[str]:
+        """How the current run entered this toolset, if it did"""
+        modes = _run_modes.get().get(id(self))
+        return modes[-1] if modes else None
+
+    def _push_mode(self, mode: str) -> None:
+        """Remember how the current run entered this toolset"""
+        modes = dict(_run_modes.get())
+        modes[id(self)] = modes.get(id(self), ()) + (mode,)
+        _run_modes.set(modes)
+
+    def _pop_mode(self) -> Optional[str]:
+        """Forget the current run's latest enter and return how it was made"""
+        modes = dict(_run_modes.get())
+        stack = modes.pop(id(self), ())
+        if not stack:
+            return None
+        if len(stack) > 1:
+            modes[id(self)] = stack[:-1]
+        _run_modes.set(modes)
+        return stack[-1]
+
+    async def __aenter__(self) -> "CircuitBreakerToolset":
+        breaker = self.health.breaker
+        half_open = breaker.state == CircuitBreaker.HALF_OPEN
+        if not breaker.allow_request():
+            self._push_mode(SKIPPED)
+            return self
+        try:
+            await self.wrapped.__aenter__()
+        except Exception as e:
+            self.health.record_failure(describe_error(e), trip=True)
+            self._push_mode(SKIPPED)
+            return self
+        self._push_mode(TRIAL if half_open else ENTERED)
+        return self
+
+    async def __aexit__(self, *args: Any) -> Optional[bool]:
+        if self._pop_mode() == SKIPPED:
+            return None
+        return await self.wrapped.__aexit__(*args)
+
+    async def get_tools(self, ctx: Any) -> Dict[str, ToolsetTool[Any]]:
+        if not self._allowed():
+            return {}
+        try:
+            tools = await self.wrapped.get_tools(ctx)
+        except Exception as e:
+            if not is_connection_error(e):
+                raise
+            self.health.record_failure(describe_error(e), trip=True)
+            return {}
+        self.health.record_success()
+        return tools
+
+    async def call_tool(
+        self, name: str, tool_args: Dict[str, Any], ctx: Any, tool: Any
+    ) -> Any:
+        if not self._allowed():
+            raise ModelRetry(
+                f"The {self.health.name} server is unavailable; "
+                "answer without this tool"
+            )
+
+        self.health.last_used = time.time()
+        try:
+            result = await self.wrapped.call_tool(name, tool_args, ctx, tool)
+        except ToolTimeoutError as e:
+            self.health.record_failure(describe_error(e))
+            raise
+        except Exception as e:
+            if is_connection_error(e):
+                self.health.record_failure(describe_error(e))
+            raise
+        self.health.record_success()
+        return result
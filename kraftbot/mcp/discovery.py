@@ -0,0 +1,202 @@
+"""
+Tool discovery index for MCP servers.
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config.settings import settings
+from ..utils.cache import TieredCache
+from .servers import MCPServerConfig
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    """Stable hash of a tool's JSON schema"""
+    raw = json.dumps(schema or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def server_cache_key(config: MCPServerConfig) -> str:
+    """
+    Key of a server's tool list in the persistent index cache
+
+    Servers are identified by URL (or command line) and the configured
+    version, so a new version or a moved server is discovered again.
+    """
+    if config.url:
+        identity = [config.url]
+    else:
+        identity = [config.command or "", *(config.args or [])]
+    raw = json.dumps(
+        [config.transport_type.value, identity, config.tool_prefix, config.version]
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def open_tool_index_cache() -> TieredCache:
+    """Open the persistent store of discovered tool lists"""
+    return TieredCache(
+        namespace="mcp_tool_index",
+        db_path=settings.get_cache_dir() / "mcp_tools.sqlite3",
+        ttl=settings.mcp_tool_index_ttl,
+    )
+
+
+def load_cached_tools(
+    store: TieredCache, name: str, config: MCPServerConfig
+) -> Optional[Tuple[List["ToolIndexEntry"], float]]:
+    """
+    Read a server's last discovered tools, however old
+
+    Returns:
+        Tuple[List[ToolIndexEntry], float]: The tools and when they were
+            fetched, or None if the server was never discovered
+    """
+    entry = store.get_entry(server_cache_key(config), max_stale=float("inf"))
+    if entry is None:
+        return None
+    tools = [
+        ToolIndexEntry.create(
+            tool["name"], name, tool.get("description"), tool.get("schema")
+        )
+        for tool in entry.value["tools"]
+    ]
+    return tools, entry.value["refreshed_at"]
+
+
+def store_tools(
+    store: TieredCache,
+    config: MCPServerConfig,
+    entries: List["ToolIndexEntry"],
+    refreshed_at: float,
+) -> None:
+    """Persist a server's discovered tools"""
+    store.set(
+        server_cache_key(config),
+        {
+            "refreshed_at": refreshed_at,
+            "tools": [entry.to_dict() for entry in entries],
+        },
+    )
+
+
+@dataclass
+class ToolIndexEntry:
+    """A discovered tool, named as the agent sees it"""
+
+    name: str
+    server: str
+    description: Optional[str]
+    schema: Dict[str, Any]
+    schema_hash: str
+
+    @classmethod
+    def create(
+        cls,
+        name: str,
+        server: str,
+        description: Optional[str] = None,
+        schema: Optional[Dict[str, Any]] = None,
+    ) -> "ToolIndexEntry":
+        """Create an entry, hashing its schema"""
+        schema = schema or {}
+        return cls(
+            name=name,
+            server=server,
+            description=description,
+            schema=schema,
+            schema_hash=schema_hash(schema),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form stored in the persistent cache"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "schema": self.schema,
+        }
+
+
+class ToolIndex:
+    """In-memory index of every discovered tool, by name and by server"""
+
+    def __init__(self) -> None:
+        """Initialize an empty index"""
+        self._tools: Dict[str, ToolIndexEntry] = {}
+        self._server_tools: Dict[str, List[str]] = {}
+        self.refreshed_at: Dict[str, float] = {}
+        self.sources: Dict[str, str] = {}
+
+    def update(
+        self,
+        server: str,
+        entries: Iterable[ToolIndexEntry],
+        refreshed_at: Optional[float] = None,
+        source: str = "server",
+    ) -> None:
+        """
+        Replace a server's tools
+
+        Args:
+            server: Server name
+            entries: The server's tools
+            refreshed_at: When the list was fetched from the server
+            source: "server" for a live listing, "cache" or "cassette" otherwise
+        """
+        self.remove(server)
+        names = []
+        for entry in entries:
+            self._tools[entry.name] = entry
+            names.append(entry.name)
+        self._server_tools[server] = names
+        self.refreshed_at[server] = (
+            time.time() if refreshed_at is None else refreshed_at
+        )
+        self.sources[server] = source
+
+    def remove(self, server: str) -> None:
+        """Drop a server's tools"""
+        for name in self._server_tools.pop(server, []):
+            entry = self._tools.get(name)
+            if entry is not None and entry.server == server:
+                del self._tools[name]
+        self.refreshed_at.pop(server, None)
+        self.sources.pop(server, None)
+
+    def clear(self) -> None:
+        """Drop every tool"""
+        self._tools.clear()
+        self._server_tools.clear()
+        self.refreshed_at.clear()
+        self.sources.clear()
+
+    def get(self, name: str) -> Optional[ToolIndexEntry]:
+        """Look up a tool by name"""
+        return self._tools.get(name)
+
+    def names(self) -> List[str]:
+        """Names of all indexed tools"""
+        return [name for names in self._server_tools.values() for name in names]
+
+    def server_tools(self, server: str) -> List[ToolIndexEntry]:
+        """Tools of one server"""
+        names = self._server_tools.get(server, [])
+        return [self._tools[name] for name in names if name in self._tools]
+
+    def has_server(self, server: str) -> bool:
+        """Whether a server's tools have been indexed"""
+        return server in self._server_tools
+
+    def age(self, server: str) -> Optional[float]:
+        """Seconds since a server's tools were fetched"""
+        refreshed_at = self.refreshed_at.get(server)
+        return None if refreshed_at is None else time.time() - refreshed_at
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
@@ -0,0 +1,225 @@
+"""
+Health tracking and circuit breaking for MCP servers.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import anyio
+import httpx
+
+from ..config.settings import settings
+from ..core.model_stats import percentile
+from ..utils.cache import TieredCache
+from .discovery import server_cache_key
+from .servers import MCPServerConfig
+
+# Errors that indicate an MCP transport went away rather than a tool failing
+CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    httpx.TransportError,
+    ConnectionError,
+)
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Check whether an exception (or anything it wraps) is a dropped connection"""
+    seen = set()
+    pending = [error]
+    while pending:
+        current = pending.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, CONNECTION_ERRORS):
+            return True
+        pending.extend(getattr(current, "exceptions", ()))
+        pending.extend([current.__cause__, current.__context__])
+    return False
+
+
+def describe_error(error: BaseException) -> str:
+    """Short description of an exception for status output"""
+    # Transports fail inside task groups; report the first real error
+    while getattr(error, "exceptions", None):
+        error = error.exceptions[0]
+    return str(error) or type(error).__name__
+
+
+class CircuitBreaker:
+    """
+    Per-server circuit breaker
+
+    The circuit opens after ``failure_threshold`` consecutive failures (or at
+    once when tripped) and the server is left out of agent runs. After
+    ``reset_timeout`` seconds it is half open: a single trial (the next run
+    or health probe) is let through while everyone else is still turned
+    away. The trial closes the circuit on success and reopens it on failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 60):
+        """
+        Initialize a closed breaker
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open"""
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    @property
+    def available(self) -> bool:
+        """Whether the circuit is not open (a half-open trial may be running)"""
+        return self.state != self.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may reach the server, claiming the trial if half open
+
+        Returns:
+            bool: True when closed, or for the one caller that gets the trial
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN:
+            return False
+
+        # A trial that never reported back is given up after reset_timeout
+        now = time.monotonic()
+        if (
+            self.trial_started_at is not None
+            and now - self.trial_started_at < self.reset_timeout
+        ):
+            return False
+        self.trial_started_at = now
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit"""
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self, trip: bool = False) -> None:
+        """Count a failure, opening the circuit past the threshold"""
+        half_open = self.state == self.HALF_OPEN
+        self.failures += 1
+        self.trial_started_at = None
+        if trip or half_open or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class ServerHealth:
+    """Probe latencies, errors and circuit state of one MCP server"""
+
+    def __init__(
+        self,
+        name: str,
+        breaker: Optional[CircuitBreaker] = None,
+        max_samples: int = 100,
+    ):
+        """
+        Initialize the health record
+
+        Args:
+            name: Server name
+            breaker: Circuit breaker (built from settings if None)
+            max_samples: Probe latencies kept for percentiles
+        """
+        self.name = name
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=settings.mcp_breaker_failures,
+            reset_timeout=settings.mcp_breaker_reset,
+        )
+        self.latencies: Deque[float] = deque(maxlen=max_samples)
+        self.probes = 0
+        self.probe_failures = 0
+        self.last_check: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def record_probe(
+        self, latency: Optional[float], error: Optional[str] = None
+    ) -> None:
+        """Record a health probe, successful if ``error`` is None"""
+        self.probes += 1
+        self.last_check = time.time()
+        if error is None:
+            self.latencies.append(latency)
+            self.record_success()
+        else:
+            self.probe_failures += 1
+            self.record_failure(error)
+
+    def record_success(self) -> None:
+        """Record a successful call or connection"""
+        self.last_error = None
+        self.breaker.record_success()
+
+    def record_failure(self, error: str, trip: bool = False) -> None:
+        """Record a failed call, probe or connection"""
+        self.last_error = error
+        self.breaker.record_failure(trip=trip)
+
+    def latency_percentile(self, fraction: float) -> Optional[float]:
+        """Probe latency percentile in seconds"""
+        return percentile(list(self.latencies), fraction)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serializable summary for status output"""
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        return {
+            "circuit": self.breaker.state,
+            "failures": self.breaker.failures,
+            "probes": self.probes,
+            "probe_failures": self.probe_failures,
+            "latency_p50_ms": None if p50 is None else round(p50 * 1000, 1),
+            "latency_p95_ms": None if p95 is None else round(p95 * 1000, 1),
+            "last_check": self.last_check,
+            "last_error": self.last_error,
+        }
+
+
+def open_health_store() -> TieredCache:
+    """Open the store of the last health snapshot of each server"""
+    return TieredCache(
+        namespace="mcp_health",
+        db_path=settings.get_cache_dir() / "mcp_tools.sqlite3",
+        ttl=24 * 3600,
+    )
+
+
+def save_health(
+    store: TieredCache, config: MCPServerConfig, health: ServerHealth
+) -> None:
+    """Persist a server's health snapshot"""
+    store.set(server_cache_key(config), health.snapshot())
+
+
+def load_health(
+    store: TieredCache, config: MCPServerConfig
+) -> Optional[Dict[str, Any]]:
+    """Read a server's last health snapshot, or None if it was never probed"""
+    return store.get(server_cache_key(config))
@@ -2,20 +2,106 @@
 MCP server manager for handling multiple MCP server connections.
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set
 
 from pydantic_ai.mcp import MCPServerSSE, MCPServerStdio
 
+from ..config.settings import settings
+from ..utils.cache import TieredCache
+from ..utils.http import get_mcp_http_client
+from .cache import CachingToolset
+from .cassette import CassetteToolset
+from .circuit import CircuitBreakerToolset
+from .discovery import (
+    ToolIndex,
+    ToolIndexEntry,
+    load_cached_tools,
+    open_tool_index_cache,
+    store_tools,
+)
+from .health import (  # noqa: F401 - connection checks are re-exported
+    CONNECTION_ERRORS,
+    CircuitBreaker,
+    ServerHealth,
+    describe_error,
+    is_connection_error,
+    open_health_store,
+    save_health,
+)
+from .metrics import TimedToolset
 from .servers import MCPServerConfig, MCPServerInfo, MCPTransportType
+from .timeout import TimeoutToolset
+
+if TYPE_CHECKING:
+    from ..core.cassette import Cassette
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    """Local ISO 8601 time of a Unix timestamp"""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds")
 
 
 class MCPManager:
     """Manager for MCP server connections and lifecycle"""
 
-    def __init__(self):
-        """Initialize the MCP manager"""
+    def __init__(
+        self,
+        enable_tool_cache: Optional[bool] = None,
+        tool_cache: Optional[TieredCache] = None,
+        cassette: Optional["Cassette"] = None,
+        tool_index_cache: Optional[TieredCache] = None,
+        health_store: Optional[TieredCache] = None,
+    ):
+        """
+        Initialize the MCP manager
+
+        Args:
+            enable_tool_cache: Wrap servers in a tool result cache
+                (defaults to settings.enable_mcp_tool_cache)
+            tool_cache: Optional backing store for tool results
+            cassette: Record tool calls to this cassette, or replay them
+                from it without starting the servers
+            tool_index_cache: Optional persistent store for discovered tool lists
+            health_store: Optional persistent store for health snapshots
+        """
         self._servers: Dict[str, Any] = {}
         self._configs: Dict[str, MCPServerConfig] = {}
+        self._toolsets: Dict[str, Any] = {}
+
+        if enable_tool_cache is None:
+            enable_tool_cache = settings.enable_mcp_tool_cache
+        self._enable_tool_cache = enable_tool_cache
+        self._tool_cache = tool_cache
+        self.cassette = cassette
+
+        # Discovered tools; cached lists are loaded on registration and
+        # refreshed in the background once the sessions are open
+        self.tool_index = ToolIndex()
+        self._tool_index_cache = tool_index_cache
+        self._discovery_task: Optional[asyncio.Task] = None
+        self._discovery_errors: Dict[str, str] = {}
+
+        # Health probes and circuit breakers, one per server
+        self._health: Dict[str, ServerHealth] = {}
+        self._health_store = health_store
+        self._monitor_task: Optional[asyncio.Task] = None
+
+        # Persistent session state, owned by a single background task so the
+        # transports are always entered and exited from the same task
+        self._session_users = 0
+        self._session_task: Optional[asyncio.Task] = None
+        self._session_ready = asyncio.Event()
+        self._session_wake = asyncio.Event()
+        self._session_rejoin = asyncio.Event()
+        self._session_closing = False
+        self._connected: Set[str] = set()
+        self._connection_errors: Dict[str, str] = {}
 
     def add_stdio_server(
         self,
@@ -56,8 +142,7 @@ class MCPManager:
             allow_sampling=config.allow_sampling,
         )
 
-        self._servers[server_name] = server
-        self._configs[server_name] = config
+        self._register(server_name, server, config)
 
         return server_name
 
@@ -92,13 +177,108 @@ class MCPManager:
             **kwargs,
         )
 
-        server = MCPServerSSE(url=url, tool_prefix=tool_prefix)
+        # Ride on the process-wide connection pool instead of a new client
+        server = MCPServerSSE(
+            url=url, tool_prefix=tool_prefix, http_client=get_mcp_http_client()
+        )
 
-        self._servers[server_name] = server
-        self._configs[server_name] = config
+        self._register(server_name, server, config)
 
         return server_name
 
+    def _register(self, name: str, server: Any, config: MCPServerConfig) -> None:
+        """Store a server behind the call timeout, result cache and call timing"""
+        self._servers[name] = server
+        self._configs[name] = config
+
+        if self.replaying:
+            # Tools and results come from the cassette; the server never starts
+            toolset = CassetteToolset(
+                wrapped=server, cassette=self.cassette, server_name=name
+            )
+            self._toolsets[name] = TimedToolset(wrapped=toolset)
+            self.tool_index.update(
+                name,
+                [
+                    ToolIndexEntry.create(
+                        tool_def["name"],
+                        name,
+                        tool_def.get("description"),
+                        tool_def.get("parameters_json_schema"),
+                    )
+                    for tool_def in self.cassette.tool_defs(name)
+                ],
+                source="cassette",
+            )
+            return
+
+        self._load_cached_tools(name, config)
+
+        toolset = server
+        if config.timeout and config.timeout > 0:
+            toolset = TimeoutToolset(wrapped=server, timeout=config.timeout)
+
+        if self._enable_tool_cache:
+            tool_ttls = dict(settings.mcp_tool_cache_ttls)
+            tool_ttls.update(config.tool_cache_ttls or {})
+            toolset = CachingToolset(
+                wrapped=toolset,
+                server_name=config.url or name,
+                store=self._get_tool_cache(),
+                tool_ttls=tool_ttls,
+                default_ttl=settings.mcp_tool_cache_ttl,
+                stale_ttl=settings.mcp_tool_cache_stale_ttl,
+                tool_prefix=config.tool_prefix,
+            )
+
+        # Recorded as the agent sees them, cache hits included
+        if self.cassette is not None:
+            toolset = CassetteToolset(
+                wrapped=toolset, cassette=self.cassette, server_name=name
+            )
+
+        health = ServerHealth(name)
+        self._health[name] = health
+        toolset = CircuitBreakerToolset(wrapped=toolset, health=health)
+        self._toolsets[name] = TimedToolset(wrapped=toolset)
+
+    @property
+    def replaying(self) -> bool:
+        """Whether tool calls are served from a cassette"""
+        return self.cassette is not None and self.cassette.replaying
+
+    def _get_tool_cache(self) -> TieredCache:
+        """Get (creating on first use) the tool result store"""
+        if self._tool_cache is None:
+            self._tool_cache = TieredCache(
+                namespace="mcp_tools",
+                db_path=settings.get_cache_dir() / "mcp_tools.sqlite3",
+                ttl=settings.mcp_tool_cache_ttl,
+                max_disk_bytes=settings.mcp_tool_cache_max_bytes,
+            )
+        return self._tool_cache
+
+    def _get_tool_index_cache(self) -> TieredCache:
+        """Get (creating on first use) the persistent tool list store"""
+        if self._tool_index_cache is None:
+            self._tool_index_cache = open_tool_index_cache()
+        return self._tool_index_cache
+
+    def _load_cached_tools(self, name: str, config: MCPServerConfig) -> None:
+        """Index a server's tools from the persistent cache, however old"""
+        cached = load_cached_tools(self._get_tool_index_cache(), name, config)
+        if cached is not None:
+            tools, refreshed_at = cached
+            self.tool_index.update(
+                name, tools, refreshed_at=refreshed_at, source="cache"
+            )
+
+    def get_tool_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit/miss counters for the tool result cache, if enabled"""
+        if self._tool_cache is None:
+            return None
+        return self._tool_cache.stats()
+
     def remove_server(self, name: str) -> bool:
         """
         Remove an MCP server
@@ -112,12 +292,18 @@ class MCPManager:
         if name in self._servers:
             del self._servers[name]
             del self._configs[name]
+            self._toolsets.pop(name, None)
+            self.tool_index.remove(name)
+            self._discovery_errors.pop(name, None)
+            self._health.pop(name, None)
             return True
         return False
 
     def get_servers(self) -> List[Any]:
-        """Get list of all server instances for PydanticAI agent"""
-        return list(self._servers.values())
+        """Get list of all server toolsets for PydanticAI agent"""
+        return [
+            self._toolsets.get(name, server) for name, server in self._servers.items()
+        ]
 
     def get_server_names(self) -> List[str]:
         """Get list of all server names"""
@@ -130,12 +316,31 @@ class MCPManager:
 
         config = self._configs[name]
 
+        if name in self._connection_errors:
+            status = "error"
+        elif name in self._connected:
+            status = "connected"
+        else:
+            status = "disconnected"
+
+        health = self._health.get(name)
+        snapshot = health.snapshot() if health is not None else {}
+
         return MCPServerInfo(
             name=config.name,
             transport_type=config.transport_type.value,
             tool_prefix=config.tool_prefix,
-            status="connected",  # TODO: Implement actual status checking
-            tools_count=0,  # TODO: Implement tool counting
+            status=status,
+            tools_count=len(self.tool_index.server_tools(name)),
+            last_used=_isoformat(health.last_used if health else None),
+            last_refresh=_isoformat(self.tool_index.refreshed_at.get(name)),
+            last_check=_isoformat(snapshot.get("last_check")),
+            circuit=snapshot.get("circuit"),
+            latency_p50_ms=snapshot.get("latency_p50_ms"),
+            latency_p95_ms=snapshot.get("latency_p95_ms"),
+            error_message=self._connection_errors.get(name)
+            or snapshot.get("last_error")
+            or self._discovery_errors.get(name),
         )
 
     def get_all_server_info(self) -> List[MCPServerInfo]:
@@ -143,14 +348,150 @@ class MCPManager:
         return [self.get_server_info(name) for name in self._servers.keys()]
 
     def get_available_tools(self) -> List[str]:
-        """Get list of all available tools from all servers"""
-        # TODO: Implement actual tool discovery from MCP servers
-        tools = []
-        for name, config in self._configs.items():
-            prefix = config.tool_prefix or ""
-            # This is a placeholder - in reality we'd query the server for its tools
-            tools.append(f"{prefix}_example_tool" if prefix else "example_tool")
-        return tools
+        """Get list of all discovered (or cached) tools from all servers"""
+        return self.tool_index.names()
+
+    async def refresh_tools(
+        self, names: Optional[Iterable[str]] = None
+    ) -> Dict[str, int]:
+        """
+        Query servers for their tools concurrently and update the tool index
+
+        Servers that fail keep their previously indexed tools.
+
+        Args:
+            names: Servers to query (all registered servers by default)
+
+        Returns:
+            Dict[str, int]: Number of tools on each server that answered
+        """
+        names = [
+            name
+            for name in (self._configs if names is None else names)
+            if name in self._configs
+        ]
+        counts = await asyncio.gather(*(self._discover(name) for name in names))
+        return {name: count for name, count in zip(names, counts) if count is not None}
+
+    async def _discover(self, name: str) -> Optional[int]:
+        """List one server's tools into the index and the persistent cache"""
+        config = self._configs[name]
+        try:
+            tools = await asyncio.wait_for(
+                self._servers[name].list_tools(), settings.mcp_discovery_timeout
+            )
+        except Exception as e:
+            self._discovery_errors[name] = str(e) or type(e).__name__
+            return None
+
+        prefix = f"{config.tool_prefix}_" if config.tool_prefix else ""
+        entries = [
+            ToolIndexEntry.create(
+                f"{prefix}{tool.name}", name, tool.description, tool.inputSchema
+            )
+            for tool in tools
+        ]
+        refreshed_at = time.time()
+        self.tool_index.update(name, entries, refreshed_at=refreshed_at)
+        self._discovery_errors.pop(name, None)
+        store_tools(self._get_tool_index_cache(), config, entries, refreshed_at)
+        return len(entries)
+
+    def _start_discovery(self) -> None:
+        """Refresh the tool lists of connected servers that are out of date"""
+        ttl = settings.mcp_tool_index_ttl
+        stale = []
+        for name in self._connected:
+            age = self.tool_index.age(name)
+            if name in self._configs and (age is None or age >= ttl):
+                stale.append(name)
+        if stale:
+            self._discovery_task = asyncio.create_task(self.refresh_tools(stale))
+
+    async def _stop_session_tasks(self) -> None:
+        """Cancel discovery and health checks before their sessions close"""
+        tasks = [self._discovery_task, self._monitor_task]
+        self._discovery_task = self._monitor_task = None
+        for task in tasks:
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.wait([task])
+
+    def get_server_health(self, name: str) -> Optional[ServerHealth]:
+        """Health record and circuit breaker of a server"""
+        return self._health.get(name)
+
+    async def check_health(self, names: Optional[Iterable[str]] = None) -> None:
+        """
+        Probe servers concurrently, updating their latencies and breakers
+
+        Servers whose circuit is open are skipped until it is half open, and
+        then only probed when no run holds the trial.
+
+        Args:
+            names: Servers to probe (all registered servers by default)
+        """
+        names = [
+            name
+            for name in (self._health if names is None else names)
+            if name in self._health and self._health[name].breaker.allow_request()
+        ]
+        await asyncio.gather(*(self._probe(name) for name in names))
+
+    async def _probe(self, name: str) -> None:
+        """Time one round trip to a server"""
+        server = self._servers[name]
+        health = self._health[name]
+        timeout = settings.mcp_health_timeout
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._ping(server), timeout)
+        except asyncio.TimeoutError:
+            health.record_probe(None, f"No response within {timeout:g}s")
+        except Exception as e:
+            health.record_probe(None, describe_error(e))
+        else:
+            health.record_probe(time.perf_counter() - start)
+        self._save_health(name)
+
+    @staticmethod
+    async def _ping(server: Any) -> None:
+        """Round trip to a server, connecting first if its session is down"""
+        async with server:
+            await server.list_tools()
+
+    async def _monitor_health(self) -> None:
+        """Background task that probes every server on an interval"""
+        while True:
+            await asyncio.sleep(settings.mcp_health_interval)
+            await self.check_health()
+            if self._recovered_servers():
+                self._session_rejoin.set()
+
+    def _recovered_servers(self) -> Dict[str, Any]:
+        """Servers whose circuit closed again but that aren't in the held sessions"""
+        return {
+            name: server
+            for name, server in self._servers.items()
+            if name not in self._connected
+            and name in self._health
+            and self._health[name].breaker.state == CircuitBreaker.CLOSED
+        }
+
+    def _save_health(self, name: str) -> None:
+        """Persist a server's health snapshot for `kraftbot status`"""
+        save_health(self._get_health_store(), self._configs[name], self._health[name])
+
+    def _get_health_store(self) -> TieredCache:
+        """Get (creating on first use) the persistent health snapshot store"""
+        if self._health_store is None:
+            self._health_store = open_health_store()
+        return self._health_store
+
+    async def wait_for_discovery(self) -> None:
+        """Wait for the background tool discovery started by connect()"""
+        if self._discovery_task is not None:
+            await asyncio.wait([self._discovery_task])
 
     def get_server_by_name(self, name: str) -> Optional[Any]:
         """Get server instance by name"""
@@ -160,6 +501,131 @@ class MCPManager:
         """Remove all servers"""
         self._servers.clear()
         self._configs.clear()
+        self._toolsets.clear()
+        self.tool_index.clear()
+        self._discovery_errors.clear()
+        self._health.clear()
+
+    async def connect(self) -> None:
+        """
+        Open every registered server and keep the sessions open
+
+        Calls are reference counted, so nested users share one set of
+        connections until the last of them calls disconnect().
+        """
+        self._session_users += 1
+        if self._session_task is None or self._session_task.done():
+            self._session_ready = asyncio.Event()
+            self._session_wake = asyncio.Event()
+            self._session_rejoin = asyncio.Event()
+            self._session_closing = False
+            self._session_task = asyncio.create_task(self._hold_sessions())
+        await self._session_ready.wait()
+
+    async def disconnect(self) -> None:
+        """Release one connect() call, closing the sessions after the last one"""
+        if self._session_users == 0:
+            return
+        self._session_users -= 1
+        if self._session_users > 0 or self._session_task is None:
+            return
+
+        self._session_closing = True
+        self._session_wake.set()
+        try:
+            await self._session_task
+        finally:
+            self._session_task = None
+
+    async def reconnect(self) -> None:
+        """Drop and re-open every persistent session"""
+        if not self.is_connected:
+            return
+        self._session_ready.clear()
+        self._session_wake.set()
+        await self._session_ready.wait()
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether persistent sessions are currently held open"""
+        return self._session_task is not None and not self._session_task.done()
+
+    async def _enter_servers(
+        self, stack: AsyncExitStack, servers: Dict[str, Any]
+    ) -> None:
+        """Open servers into the held sessions, tripping those that fail"""
+        for name, server in servers.items():
+            try:
+                await stack.enter_async_context(server)
+                self._connected.add(name)
+                self._connection_errors.pop(name, None)
+                if name in self._health:
+                    self._health[name].record_success()
+            except Exception as e:
+                self._connection_errors[name] = describe_error(e)
+                # Leave it out of runs until a probe succeeds
+                if name in self._health:
+                    self._health[name].record_failure(describe_error(e), trip=True)
+                    self._save_health(name)
+
+    async def _hold_until_woken(self, stack: AsyncExitStack) -> None:
+        """Keep the sessions open, re-entering servers whose circuit recovered"""
+        while not self._session_wake.is_set():
+            waiters = [
+                asyncio.ensure_future(self._session_wake.wait()),
+                asyncio.ensure_future(self._session_rejoin.wait()),
+            ]
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+            if self._session_rejoin.is_set() and not self._session_wake.is_set():
+                self._session_rejoin.clear()
+                await self._enter_servers(stack, self._recovered_servers())
+
+    async def _hold_sessions(self) -> None:
+        """Background task that owns the server sessions"""
+        while not self._session_closing:
+            woken = False
+            try:
+                async with AsyncExitStack() as stack:
+                    # Replayed servers are never started
+                    servers = {} if self.replaying else dict(self._servers)
+                    await self._enter_servers(stack, servers)
+
+                    self._session_ready.set()
+                    self._start_discovery()
+                    if settings.mcp_health_interval > 0 and self._health:
+                        self._monitor_task = asyncio.create_task(self._monitor_health())
+                    try:
+                        await self._hold_until_woken(stack)
+                        woken = True
+                    finally:
+                        await self._stop_session_tasks()
+            except Exception as e:
+                # A transport died underneath us; record it and reconnect
+                for name in self._connected:
+                    self._connection_errors[name] = str(e)
+                    if name in self._health:
+                        self._health[name].record_failure(describe_error(e))
+            finally:
+                self._connected.clear()
+                self._session_wake.clear()
+                self._session_rejoin.clear()
+
+            if not woken and not self._session_closing:
+                await asyncio.sleep(1)
+
+        self._session_ready.set()
+
+    async def __aenter__(self) -> "MCPManager":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.disconnect()
 
     def __len__(self) -> int:
         """Get number of connected servers"""
@@ -0,0 +1,63 @@
+"""
+Latency of MCP tool calls, collected per run.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+from pydantic_ai.toolsets import WrapperToolset
+
+from ..utils.metrics import get_local_metrics
+
+# Tool latencies of the run in progress, see tool_timings()
+_tool_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar(
+    "kraftbot_tool_timings", default=None
+)
+
+
+@contextmanager
+def tool_timings(timings: Dict[str, List[float]]) -> Iterator[Dict[str, List[float]]]:
+    """
+    Record the latency of every tool call made inside the block
+
+    Args:
+        timings: Dict filled with seconds per call, keyed by tool name. Tasks
+            created inside the block record into it too.
+    """
+    token = _tool_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _tool_timings.reset(token)
+
+
+@dataclass
+class TimedToolset(WrapperToolset[Any]):
+    """
+    Toolset wrapper that times tool calls as the agent sees them
+
+    Sits outside the result cache, so cache hits are recorded as the fast
+    calls they are. Calls are also counted in the local OpenTelemetry
+    metrics, whether or not a run is collecting timings.
+    """
+
+    async def call_tool(
+        self, name: str, tool_args: Dict[str, Any], ctx: Any, tool: Any
+    ) -> Any:
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await self.wrapped.call_tool(name, tool_args, ctx, tool)
+            ok = True
+            return result
+        finally:
+            duration = time.perf_counter() - start
+            timings = _tool_timings.get()
+            if timings is not None:
+                timings.setdefault(name, []).append(duration)
+            metrics = get_local_metrics()
+            if metrics is not None:
+                metrics.record_tool_call(name, duration, ok)
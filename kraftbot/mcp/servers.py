@@ -4,7 +4,7 @@ MCP server configurations and utilities.
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -36,6 +36,13 @@ class MCPServerConfig:
     timeout: int = 30
     allow_sampling: bool = True
 
+    # Server version; part of the tool index cache key, so bumping it
+    # forces the server's tools to be discovered again
+    version: Optional[str] = None
+
+    # Per-tool cache TTLs in seconds, overriding the global settings (0 disables)
+    tool_cache_ttls: Optional[Dict[str, int]] = None
+
     def __post_init__(self):
         """Validate configuration after initialization"""
         if self.transport_type == MCPTransportType.STDIO:
@@ -55,9 +62,23 @@ class MCPServerInfo(BaseModel):
     status: str  # "connected", "disconnected", "error"
     tools_count: int
     last_used: Optional[str] = None
+    last_refresh: Optional[str] = None  # When the tool list was fetched (ISO 8601)
+    last_check: Optional[str] = None  # Last health probe (ISO 8601)
+    circuit: Optional[str] = None  # "closed", "open" or "half_open"
+    latency_p50_ms: Optional[float] = None  # Health probe round trips
+    latency_p95_ms: Optional[float] = None
     error_message: Optional[str] = None
 
     class Config:
         """Pydantic configuration"""
 
         use_enum_values = True
+
+
+# Sleeper fantasy football tools served by tokenbowl-mcp
+TOKENBOWL_MCP = MCPServerConfig(
+    name="tokenbowl_mcp",
+    transport_type=MCPTransportType.SSE,
+    url="https://tokenbowl-mcp.haihai.ai/sse",
+    tool_prefix="tokenbowl",
+)
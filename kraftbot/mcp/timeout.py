@@ -0,0 +1,40 @@
+"""
+Per-tool call timeouts for MCP servers.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from pydantic_ai.toolsets import WrapperToolset
+
+
+class ToolTimeoutError(Exception):
+    """Raised when an MCP tool call runs past its server's timeout"""
+
+    def __init__(self, tool_name: str, timeout: float):
+        super().__init__(f"Tool '{tool_name}' timed out after {timeout:g}s")
+        self.tool_name = tool_name
+        self.timeout = timeout
+
+
+@dataclass
+class TimeoutToolset(WrapperToolset[Any]):
+    """
+    Toolset wrapper that cancels tool calls running longer than ``timeout``
+
+    A timed-out call raises ToolTimeoutError, which ends the run with the
+    output produced so far instead of leaving it waiting on a hung server.
+    """
+
+    timeout: float = 30
+
+    async def call_tool(
+        self, name: str, tool_args: Dict[str, Any], ctx: Any, tool: Any
+    ) -> Any:
+        try:
+            return await asyncio.wait_for(
+                self.wrapped.call_tool(name, tool_args, ctx, tool), self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise ToolTimeoutError(name, self.timeout) from None
@@ -0,0 +1,10 @@
+"""
+HTTP serving for KraftBot.
+"""
+
+from .pool import AgentPool, PoolFullError
+
+__all__ = [
+    "AgentPool",
+    "PoolFullError",
+]
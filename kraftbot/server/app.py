@@ -0,0 +1,236 @@
+"""
+HTTP application exposing the agent as JSON and SSE endpoints.
+"""
+
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import (
+    ContentStream,
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+from ..config.settings import settings
+from ..core.hedge import get_all_hedge_stats
+from ..core.models import StreamEnd, StreamEvent
+from ..core.ratelimit import get_rate_limit_stats
+from ..utils.metrics import get_local_metrics
+from ..utils.prompt_loader import prompt_loader
+from .pool import AgentPool, PoolFullError
+
+
+class ServeRequest(BaseModel):
+    """Body of a /run or /stream request"""
+
+    prompt: str = Field(min_length=1, description="The user's question")
+    model: Optional[str] = Field(None, description="Model to use")
+    system_prompt: Optional[str] = Field(
+        None, description="Name of a prompt in the prompts directory"
+    )
+    user_id: Optional[str] = Field(None, description="User the request is for")
+    session_id: Optional[str] = Field(
+        None, description="Session for multi-turn conversations"
+    )
+
+
+class RequestError(Exception):
+    """A request that can't be served, with its HTTP status"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _error(message: str, status_code: int) -> JSONResponse:
+    """JSON error response"""
+    headers = {"Retry-After": "1"} if status_code == 503 else None
+    return JSONResponse({"error": message}, status_code=status_code, headers=headers)
+
+
+async def _parse_request(request: Request) -> ServeRequest:
+    """Validate a request body and resolve its model and system prompt"""
+    try:
+        body = ServeRequest.model_validate(await request.json())
+    except (ValueError, ValidationError) as e:
+        raise RequestError(f"Invalid request: {e}")
+
+    model_name = body.model or settings.default_model
+    if settings.available_models and model_name not in settings.available_models:
+        raise RequestError(f"Unknown model: {model_name}")
+    body.model = model_name
+
+    if body.system_prompt:
+        # Only named prompts; never read arbitrary paths on behalf of clients
+        if "/" in body.system_prompt or "\\" in body.system_prompt:
+            raise RequestError("system_prompt must be a prompt name")
+        text = prompt_loader.load_prompt(body.system_prompt)
+        if text is None:
+            raise RequestError(f"Unknown system prompt: {body.system_prompt}")
+        body.system_prompt = text
+
+    return body
+
+
+def _session_id(body: ServeRequest) -> str:
+    """Session id for a request, one per request when not given"""
+    return body.session_id or f"serve_{time.time_ns()}"
+
+
+def create_app(pool: Optional[AgentPool] = None) -> Starlette:
+    """
+    Create the HTTP application
+
+    Args:
+        pool: Agent pool to serve from (defaults to one built from settings)
+
+    Returns:
+        Starlette: The ASGI application
+    """
+    pool = pool or AgentPool()
+
+    async def run(request: Request) -> JSONResponse:
+        """Run a prompt and return the full response as JSON"""
+        try:
+            body = await _parse_request(request)
+            start_time = time.perf_counter()
+            async with pool.acquire(body.model, body.system_prompt) as agent:
+                end = None
+                async for event in agent.stream_events(
+                    body.prompt,
+                    body.user_id or settings.default_user_id,
+                    _session_id(body),
+                ):
+                    if isinstance(event, StreamEnd):
+                        end = event
+        except RequestError as e:
+            return _error(str(e), e.status_code)
+        except PoolFullError as e:
+            return _error(str(e), 503)
+
+        if end is None or end.error:
+            if end is not None and end.timed_out:
+                return _error(end.error, 504)
+            return _error(end.error if end else "No response", 502)
+
+        return JSONResponse(
+            {
+                "model": body.model,
+                "response": end.response,
+                "usage": end.usage,
+                "cached": end.cached,
+                "duration": time.perf_counter() - start_time,
+            }
+        )
+
+    async def stream(request: Request) -> Response:
+        """Run a prompt and stream start/delta/end events over SSE"""
+        try:
+            body = await _parse_request(request)
+            # Reserve an agent before answering so a full queue is a 503
+            # rather than a stream that never starts
+            agent = await pool.checkout(body.model, body.system_prompt)
+        except RequestError as e:
+            return _error(str(e), e.status_code)
+        except PoolFullError as e:
+            return _error(str(e), 503)
+
+        async def events() -> AsyncIterator[str]:
+            async for event in agent.stream_events(
+                body.prompt,
+                body.user_id or settings.default_user_id,
+                _session_id(body),
+            ):
+                # Each yield waits for the client to take the previous chunk,
+                # so a slow reader slows the model stream instead of growing
+                # a buffer
+                yield _sse(event)
+
+        return _LeasedStreamingResponse(
+            events(),
+            release=lambda: pool.checkin(body.model, body.system_prompt, agent),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    async def health(request: Request) -> JSONResponse:
+        """Pool occupancy and MCP connection and server health state"""
+        return JSONResponse(
+            {
+                "status": "ok",
+                "mcp_connected": bool(
+                    pool.mcp_manager and pool.mcp_manager.is_connected
+                ),
+                "mcp_servers": (
+                    [
+                        info.model_dump()
+                        for info in pool.mcp_manager.get_all_server_info()
+                    ]
+                    if pool.mcp_manager
+                    else []
+                ),
+                "pool": pool.stats(),
+                "rate_limits": get_rate_limit_stats(),
+                "hedging": get_all_hedge_stats(),
+            }
+        )
+
+    def metrics(request: Request) -> PlainTextResponse:
+        """Local OpenTelemetry metrics for Prometheus to scrape"""
+        # A plain function, so Starlette renders it in a worker thread
+        local_metrics = get_local_metrics()
+        if local_metrics is None:
+            return PlainTextResponse("Metrics export is disabled\n", status_code=404)
+        return PlainTextResponse(
+            local_metrics.prometheus_text(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with pool:
+            # Prompt edits reach new requests without a restart
+            prompt_loader.start_watching()
+            try:
+                yield
+            finally:
+                await prompt_loader.stop_watching()
+
+    return Starlette(
+        routes=[
+            Route("/run", run, methods=["POST"]),
+            Route("/stream", stream, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+class _LeasedStreamingResponse(StreamingResponse):
+    """Streaming response that returns its pooled agent however it ends"""
+
+    def __init__(
+        self, content: ContentStream, release: Callable[[], None], **kwargs: Any
+    ) -> None:
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+def _sse(event: StreamEvent) -> str:
+    """Encode a stream event as a server-sent event"""
+    return f"event: {event.type}\ndata: {event.model_dump_json()}\n\n"
@@ -0,0 +1,221 @@
+"""
+Pool of warm agents shared by concurrent HTTP requests.
+"""
+
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from ..config.settings import settings
+from ..core.agent import PydanticAIAgent, load_default_mcp_servers
+from ..core.cache import hash_text
+from ..core.memory import ConversationMemory
+from ..mcp.manager import MCPManager
+from ..utils.http import close_http_clients
+
+
+class PoolFullError(Exception):
+    """Raised when the request queue in front of the pool is full"""
+
+
+@dataclass
+class _AgentSlot:
+    """Warm agents for one (model, system prompt) pair"""
+
+    idle: "asyncio.Queue[PydanticAIAgent]" = field(default_factory=asyncio.Queue)
+    created: int = 0
+    waiting: int = 0
+    memory: Optional[ConversationMemory] = None
+
+    @property
+    def unused(self) -> bool:
+        """Whether every agent is idle and no request is waiting for one"""
+        return self.waiting == 0 and self.idle.qsize() == self.created
+
+
+class AgentPool:
+    """
+    Warm PydanticAIAgent instances keyed by model and system prompt
+
+    Every agent shares one MCP manager (so one open session per server), the
+    process-wide HTTP connection pool and, per key, one conversation memory. Each agent
+    serves one request at a time; requests wait in a bounded queue for a free
+    agent and are rejected with PoolFullError once the queue is full.
+
+    At most ``max_pools`` keys are kept. Past that, the least recently used
+    key with no agent in use is dropped with its agents and memory, so
+    clients that send ever-changing system prompts can't grow the pool
+    without bound.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        agent_factory: Optional[Callable[..., PydanticAIAgent]] = None,
+        mcp_manager: Optional[MCPManager] = None,
+        max_pools: Optional[int] = None,
+    ):
+        """
+        Initialize the pool
+
+        Args:
+            size: Maximum agents per (model, system prompt) pair
+            max_queue: Maximum requests waiting for an agent across the pool
+            queue_timeout: Seconds a request may wait before PoolFullError
+            agent_factory: Callable used to build agents, mainly for testing
+            mcp_manager: Optional shared MCP manager (defaults to the
+                configured servers)
+            max_pools: Maximum (model, system prompt) pairs kept warm
+        """
+        self.size = max(1, size or settings.serve_pool_size)
+        self.max_queue = max(
+            0, max_queue if max_queue is not None else settings.serve_max_queue
+        )
+        self.queue_timeout = (
+            queue_timeout if queue_timeout is not None else settings.serve_queue_timeout
+        )
+        self.agent_factory = agent_factory or PydanticAIAgent
+        self.mcp_manager = mcp_manager
+        self.max_pools = max(1, max_pools or settings.serve_max_pools)
+        self._slots: "OrderedDict[Tuple[str, str], _AgentSlot]" = OrderedDict()
+        self.evicted = 0
+        self._waiting = 0
+        self._active = 0
+
+    async def start(self) -> None:
+        """Open the MCP sessions"""
+        if self.mcp_manager is None:
+            self.mcp_manager = MCPManager()
+            load_default_mcp_servers(self.mcp_manager)
+        await self.mcp_manager.connect()
+
+    async def close(self) -> None:
+        """Close MCP sessions and the shared HTTP pool"""
+        if self.mcp_manager is not None:
+            await self.mcp_manager.disconnect()
+        await close_http_clients()
+        self._slots.clear()
+
+    async def __aenter__(self) -> "AgentPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @staticmethod
+    def pool_key(model_name: str, system_prompt: Optional[str]) -> Tuple[str, str]:
+        """Key agents by model and a hash of the system prompt"""
+        return model_name, hash_text(system_prompt or "")
+
+    def _create_agent(
+        self, model_name: str, system_prompt: Optional[str], slot: _AgentSlot
+    ) -> PydanticAIAgent:
+        """Build a new agent for a slot"""
+        agent = self.agent_factory(
+            openrouter_api_key=settings.openrouter_api_key,
+            model_name=model_name,
+            system_prompt=system_prompt,
+            enable_logfire=settings.enable_logfire,
+            mcp_manager=self.mcp_manager,
+            memory=slot.memory,
+        )
+        # Agents for the same key share one memory so sessions survive
+        # being served by a different agent on the next turn
+        if slot.memory is None:
+            slot.memory = getattr(agent, "memory", None)
+        slot.created += 1
+        return agent
+
+    def _slot(self, key: Tuple[str, str]) -> _AgentSlot:
+        """Get or create the slot for a key, evicting unused slots past max_pools"""
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._slots.move_to_end(key)
+            return slot
+
+        slot = self._slots[key] = _AgentSlot()
+        for old_key in list(self._slots):
+            if len(self._slots) <= self.max_pools:
+                break
+            if old_key != key and self._slots[old_key].unused:
+                del self._slots[old_key]
+                self.evicted += 1
+        return slot
+
+    async def checkout(
+        self, model_name: str, system_prompt: Optional[str] = None
+    ) -> PydanticAIAgent:
+        """
+        Take an agent out of the pool; return it with checkin()
+
+        Raises:
+            PoolFullError: If too many requests are already waiting, or no
+                agent became free within the queue timeout
+        """
+        slot = self._slot(self.pool_key(model_name, system_prompt))
+
+        if slot.idle.empty() and slot.created < self.size:
+            agent = self._create_agent(model_name, system_prompt, slot)
+        elif not slot.idle.empty():
+            agent = slot.idle.get_nowait()
+        else:
+            if self._waiting >= self.max_queue:
+                raise PoolFullError("Request queue is full")
+            self._waiting += 1
+            slot.waiting += 1
+            try:
+                agent = await asyncio.wait_for(slot.idle.get(), self.queue_timeout)
+            except asyncio.TimeoutError as e:
+                raise PoolFullError("Timed out waiting for a free agent") from e
+            finally:
+                self._waiting -= 1
+                slot.waiting -= 1
+
+        self._active += 1
+        return agent
+
+    def checkin(
+        self, model_name: str, system_prompt: Optional[str], agent: PydanticAIAgent
+    ) -> None:
+        """Return an agent taken with checkout()"""
+        self._active -= 1
+        slot = self._slots.get(self.pool_key(model_name, system_prompt))
+        if slot is not None:
+            slot.idle.put_nowait(agent)
+
+    @asynccontextmanager
+    async def acquire(
+        self, model_name: str, system_prompt: Optional[str] = None
+    ) -> AsyncIterator[PydanticAIAgent]:
+        """Borrow an agent for the duration of a block"""
+        agent = await self.checkout(model_name, system_prompt)
+        try:
+            yield agent
+        finally:
+            self.checkin(model_name, system_prompt, agent)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy for health checks"""
+        pools: List[Dict[str, Any]] = [
+            {
+                "model": model_name,
+                "system_prompt_hash": prompt_hash[:12],
+                "agents": slot.created,
+                "idle": slot.idle.qsize(),
+            }
+            for (model_name, prompt_hash), slot in self._slots.items()
+        ]
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_queue": self.max_queue,
+            "size": self.size,
+            "max_pools": self.max_pools,
+            "evicted_pools": self.evicted,
+            "pools": pools,
+        }
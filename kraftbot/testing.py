@@ -0,0 +1,55 @@
+"""
+Pytest plugin for replaying recorded KraftBot sessions.
+
+Enable it with ``pytest_plugins = ["kraftbot.testing"]`` in a conftest.py.
+A test that asks for the ``cassette`` fixture replays
+``cassettes/<test name>.jsonl`` next to its test file, or the name given
+with ``@pytest.mark.cassette("week4")``. Pass the cassette to
+``PydanticAIAgent(cassette=...)`` or ``MCPManager(cassette=...)``. Run
+pytest with ``--record-cassettes`` (and a real OPENROUTER_API_KEY) to
+record the cassettes again.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from .core.cassette import Cassette
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("kraftbot")
+    group.addoption(
+        "--record-cassettes",
+        action="store_true",
+        help="Record KraftBot cassettes from live traffic instead of replaying them",
+    )
+    group.addoption(
+        "--cassette-realtime",
+        action="store_true",
+        help="Replay KraftBot cassettes with their recorded latency",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers", "cassette(name): KraftBot cassette the test replays"
+    )
+
+
+def cassette_path(request: pytest.FixtureRequest) -> Path:
+    """Cassette file of a test"""
+    marker = request.node.get_closest_marker("cassette")
+    name = marker.args[0] if marker and marker.args else request.node.name
+    return Path(request.node.path).parent / "cassettes" / f"{name}.jsonl"
+
+
+@pytest.fixture
+def cassette(request: pytest.FixtureRequest) -> Cassette:
+    """The test's cassette, replayed unless --record-cassettes is given"""
+    record = request.config.getoption("record_cassettes")
+    return Cassette(
+        cassette_path(request),
+        mode="record" if record else "replay",
+        realtime=request.config.getoption("cassette_realtime"),
+    )
@@ -0,0 +1,315 @@
+"""
+Two-tier (in-memory LRU + SQLite) TTL cache used by KraftBot's caching layers.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its expiry information"""
+
+    value: Any
+    created_at: float
+    expires_at: float
+
+    @property
+    def is_expired(self) -> bool:
+        """Whether the entry is past its TTL"""
+        return time.time() >= self.expires_at
+
+
+def _dumps(value: Any) -> Optional[str]:
+    """Serialize a value to JSON, returning None if it can't be persisted"""
+    try:
+        return json.dumps(value, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+
+
+class TieredCache:
+    """
+    TTL cache with an in-memory LRU tier in front of a SQLite tier
+
+    Values that can be serialized to JSON are written through to disk; others
+    only live in memory. Expired entries can still be read for up to
+    ``max_stale`` seconds to support stale-while-revalidate callers.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        db_path: Optional[Path] = None,
+        ttl: float = 900,
+        max_memory_entries: int = 256,
+        max_disk_bytes: int = 50 * 1024 * 1024,
+        access_resolution: float = 300,
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            namespace: Name that separates this cache's rows from others in a shared database
+            db_path: SQLite file for the disk tier (memory only if None)
+            ttl: Default time-to-live in seconds
+            max_memory_entries: Maximum entries kept in the LRU tier
+            max_disk_bytes: Maximum total value size kept in the disk tier
+            access_resolution: Seconds a disk row's access time may lag before
+                a hit rewrites it (it only orders size evictions)
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.access_resolution = access_resolution
+
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.db_path = db_path
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        if db_path is not None:
+            try:
+                self._db = self._open_db(db_path)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️  Cache disk tier disabled ({db_path}): {e}")
+                self._db = None
+
+    def _open_db(self, db_path: Path) -> sqlite3.Connection:
+        """Open the SQLite database and create the schema"""
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(db_path), check_same_thread=False, timeout=5)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        db.commit()
+        return db
+
+    def get_entry(self, key: str, max_stale: float = 0) -> Optional[CacheEntry]:
+        """
+        Look up an entry, allowing it to be up to ``max_stale`` seconds expired
+
+        Returns:
+            CacheEntry: The entry, or None on a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now < entry.expires_at + max_stale:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return entry
+                if now >= entry.expires_at:
+                    del self._memory[key]
+
+            entry = self._read_disk(key, now, max_stale)
+            if entry is not None:
+                self._remember(key, entry)
+                self.hits += 1
+                self.disk_hits += 1
+                return entry
+
+            self.misses += 1
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a fresh value, or None on a miss"""
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value with the given (or default) TTL"""
+        now = time.time()
+        entry = CacheEntry(
+            value=value,
+            created_at=now,
+            expires_at=now + (self.ttl if ttl is None else ttl),
+        )
+
+        with self._lock:
+            self._remember(key, entry)
+            self._write_disk(key, entry, now)
+
+    def delete(self, key: str) -> None:
+        """Remove a key from both tiers"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,)
+                )
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        disk_entries, disk_bytes = 0, 0
+        with self._lock:
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries "
+                    "WHERE namespace = ?",
+                    (self.namespace,),
+                ).fetchone()
+                disk_entries, disk_bytes = row
+            memory_entries = len(self._memory)
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "memory_entries": memory_entries,
+            "disk_entries": disk_entries,
+            "disk_bytes": disk_bytes,
+        }
+
+    def close(self) -> None:
+        """Close the disk tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries"""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(
+        self, key: str, now: float, max_stale: float
+    ) -> Optional[CacheEntry]:
+        """Read an entry from SQLite, dropping it if it is too old"""
+        if self._db is None:
+            return None
+
+        row = self._db.execute(
+            "SELECT value, created_at, expires_at, accessed_at FROM cache_entries "
+            "WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at, expires_at, accessed_at = row
+        if now >= expires_at + max_stale:
+            if now >= expires_at:
+                self._db.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                self._db.commit()
+            return None
+
+        # Hits run on the event loop, so a hit only writes (and waits on a
+        # commit) when the stored access time is too old to order evictions
+        if now - accessed_at >= self.access_resolution:
+            self._db.execute(
+                "UPDATE cache_entries SET accessed_at = ? "
+                "WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            self._db.commit()
+        return CacheEntry(
+            value=json.loads(value), created_at=created_at, expires_at=expires_at
+        )
+
+    def _write_disk(self, key: str, entry: CacheEntry, now: float) -> None:
+        """Write an entry to SQLite and enforce the size budget"""
+        if self._db is None:
+            return
+
+        payload = _dumps(entry.value)
+        if payload is None:
+            return
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache_entries "
+            "(namespace, key, value, size, created_at, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                self.namespace,
+                key,
+                payload,
+                len(payload),
+                entry.created_at,
+                entry.expires_at,
+                now,
+            ),
+        )
+        self._evict_disk(now)
+        self._db.commit()
+
+    def _evict_disk(self, now: float) -> None:
+        """Drop long-expired rows, then least recently used rows over the size budget"""
+        # Expired rows are kept for a day so stale-while-revalidate reads work
+        self._db.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now - 86400),
+        )
+
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        if total <= self.max_disk_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? "
+            "ORDER BY accessed_at ASC",
+            (self.namespace,),
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            self._db.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            total -= size
+            self.evictions += 1
@@ -0,0 +1,128 @@
+"""
+Process-wide HTTP connection pool shared by model providers and MCP transports.
+"""
+
+import importlib.util
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..config.settings import settings
+
+
+def http2_available() -> bool:
+    """Whether HTTP/2 support (the h2 package) is installed"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Transport that forwards to the shared pool and never closes it"""
+
+    def __init__(self, pool: httpx.AsyncBaseTransport):
+        self._pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass  # The pool outlives every client built on it
+
+
+class SharedAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient over the shared pool that ignores close requests
+
+    Libraries like the MCP SSE transport close the client they are given when
+    a session ends; with a shared client that would break every other user,
+    so closing is a no-op and the pool is closed by close_http_clients().
+    """
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+_pool: Optional[httpx.AsyncHTTPTransport] = None
+_clients: Dict[str, SharedAsyncClient] = {}
+
+
+def _get_pool() -> httpx.AsyncHTTPTransport:
+    """The connection pool every shared client sends through"""
+    global _pool
+    if _pool is None:
+        _pool = httpx.AsyncHTTPTransport(
+            http2=settings.http_http2 and http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry,
+            ),
+        )
+    return _pool
+
+
+def _build_timeout(read: float) -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=settings.http_connect_timeout,
+        read=read,
+        write=settings.http_write_timeout,
+        pool=settings.http_pool_timeout,
+    )
+
+
+def get_http_client(name: str = "default") -> SharedAsyncClient:
+    """
+    Get a shared HTTP client for model provider requests
+
+    Args:
+        name: Registry key; clients with different names share connections
+            but can carry their own defaults
+
+    Returns:
+        SharedAsyncClient: Client over the process-wide connection pool
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = SharedAsyncClient(
+            transport=_SharedTransport(_get_pool()),
+            timeout=_build_timeout(settings.http_read_timeout),
+        )
+        _clients[name] = client
+    return client
+
+
+def get_mcp_http_client() -> SharedAsyncClient:
+    """Shared client for MCP SSE transports, with the long SSE read timeout"""
+    client = _clients.get("mcp")
+    if client is None or client.is_closed:
+        client = SharedAsyncClient(
+            transport=_SharedTransport(_get_pool()),
+            timeout=_build_timeout(settings.mcp_sse_read_timeout),
+        )
+        _clients["mcp"] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close the shared pool (e.g. on server shutdown)"""
+    global _pool
+    _clients.clear()
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.aclose()
+
+
+def get_http_pool_stats() -> Dict[str, object]:
+    """Connection pool settings and current connection count"""
+    connections = 0
+    if _pool is not None:
+        connections = len(getattr(_pool._pool, "connections", []))
+    return {
+        "http2": settings.http_http2 and http2_available(),
+        "max_connections": settings.http_max_connections,
+        "max_keepalive_connections": settings.http_max_keepalive_connections,
+        "open_connections": connections,
+        "clients": sorted(_clients),
+    }
@@ -0,0 +1,38 @@
+"""
+Lazy attribute loading for package ``__init__`` modules.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Build a module ``__getattr__`` that imports exported names on first use
+
+    Keeps ``import kraftbot`` (and therefore CLI startup) from pulling in
+    pydantic_ai, openai, logfire and mcp until something actually needs them.
+
+    Args:
+        package: ``__name__`` of the package doing the exporting
+        exports: Map of exported name to the relative module defining it
+
+    Returns:
+        Callable: Function to assign to the package's ``__getattr__``
+    """
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        # Cache on the package so later lookups skip this hook
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    return __getattr__
+
+
+def lazy_dir(module_globals: Dict[str, Any], exports: Dict[str, str]) -> List[str]:
+    """``__dir__`` listing both loaded globals and lazy exports"""
+    return sorted(set(module_globals) | set(exports))
@@ -0,0 +1,303 @@
+"""
+Local OpenTelemetry metrics, exported without Logfire.
+"""
+
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from google.protobuf.json_format import MessageToJson
+from opentelemetry.exporter.otlp.proto.common.metrics_encoder import encode_metrics
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    Histogram,
+    InMemoryMetricReader,
+    MetricExporter,
+    MetricExportResult,
+    MetricsData,
+    PeriodicExportingMetricReader,
+    Sum,
+)
+from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+from opentelemetry.sdk.resources import Resource
+
+from ..config.settings import settings
+
+if TYPE_CHECKING:
+    from ..core.models import RunTelemetry
+
+# Histogram buckets in seconds: whole runs, and single MCP tool calls
+RUN_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+TOOL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Prometheus name suffixes for OpenTelemetry units
+_UNIT_SUFFIXES = {"s": "_seconds"}
+
+
+class OTLPFileExporter(MetricExporter):
+    """Appends each export to a file as one line of OTLP JSON"""
+
+    def __init__(self, path: Path):
+        super().__init__()
+        self.path = Path(path).expanduser()
+        self._lock = threading.Lock()
+
+    def export(
+        self, metrics_data: MetricsData, timeout_millis: float = 10_000, **kwargs: Any
+    ) -> MetricExportResult:
+        line = MessageToJson(encode_metrics(metrics_data), indent=None)
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            print(f"⚠️  Could not write metrics to {self.path}: {e}")
+            return MetricExportResult.FAILURE
+        return MetricExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: float = 10_000) -> bool:
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000, **kwargs: Any) -> None:
+        pass
+
+
+class LocalMetrics:
+    """
+    Request, token, cache and MCP tool metrics on a private MeterProvider
+
+    Recording only updates in-memory aggregates. Exports happen on the SDK's
+    background thread every ``export_interval`` seconds, and the Prometheus
+    text is built when it is scraped, so neither ever waits on the agent.
+    The provider is separate from the global one Logfire configures, so
+    both can run at once.
+    """
+
+    def __init__(
+        self,
+        export_file: Optional[str] = None,
+        otlp_endpoint: Optional[str] = None,
+        export_interval: Optional[float] = None,
+    ):
+        """
+        Initialize the metrics
+
+        Args:
+            export_file: File to append OTLP JSON lines to
+            otlp_endpoint: OTLP/HTTP collector URL for metrics
+            export_interval: Seconds between exports (defaults to
+                settings.metrics_export_interval)
+        """
+        if export_interval is None:
+            export_interval = settings.metrics_export_interval
+        interval_ms = max(export_interval, 1) * 1000
+
+        self._scrape_reader = InMemoryMetricReader()
+        readers: List[Any] = [self._scrape_reader]
+        if export_file:
+            readers.append(
+                PeriodicExportingMetricReader(
+                    OTLPFileExporter(Path(export_file)),
+                    export_interval_millis=interval_ms,
+                )
+            )
+        if otlp_endpoint:
+            from opentelemetry.exporter.otlp.proto.http.metric_exporter import (
+                OTLPMetricExporter,
+            )
+
+            readers.append(
+                PeriodicExportingMetricReader(
+                    OTLPMetricExporter(endpoint=otlp_endpoint),
+                    export_interval_millis=interval_ms,
+                )
+            )
+
+        self.provider = MeterProvider(
+            metric_readers=readers,
+            resource=Resource.create({"service.name": "kraftbot"}),
+            views=[
+                View(
+                    instrument_name="kraftbot.run.*",
+                    aggregation=ExplicitBucketHistogramAggregation(RUN_BUCKETS),
+                ),
+                View(
+                    instrument_name="kraftbot.mcp.tool.duration",
+                    aggregation=ExplicitBucketHistogramAggregation(TOOL_BUCKETS),
+                ),
+            ],
+        )
+        meter = self.provider.get_meter("kraftbot")
+
+        self.runs = meter.create_counter(
+            "kraftbot.runs", description="Agent runs by model and outcome"
+        )
+        self.run_duration = meter.create_histogram(
+            "kraftbot.run.duration", unit="s", description="Agent run latency"
+        )
+        self.time_to_first_token = meter.create_histogram(
+            "kraftbot.run.time_to_first_token",
+            unit="s",
+            description="Time from request to the first streamed text",
+        )
+        self.tokens = meter.create_counter(
+            "kraftbot.tokens",
+            description="Tokens by model and type (input, output, cache_read)",
+        )
+        self.tool_calls = meter.create_counter(
+            "kraftbot.mcp.tool_calls", description="MCP tool calls by outcome"
+        )
+        self.tool_duration = meter.create_histogram(
+            "kraftbot.mcp.tool.duration", unit="s", description="MCP tool call latency"
+        )
+        self.tool_cache = meter.create_counter(
+            "kraftbot.mcp.tool_cache",
+            description="MCP tool result cache lookups (hit, stale, miss)",
+        )
+
+    def record_run(self, telemetry: "RunTelemetry") -> None:
+        """Count a finished agent run and its tokens"""
+        if telemetry.error is None:
+            status = "ok"
+        else:
+            status = "timeout" if telemetry.timed_out else "error"
+        model = {"model": telemetry.model_name}
+        self.runs.add(
+            1, {**model, "status": status, "cached": str(telemetry.cached).lower()}
+        )
+        if telemetry.cached:
+            return
+
+        self.run_duration.record(telemetry.duration, {**model, "status": status})
+        if telemetry.time_to_first_token is not None:
+            self.time_to_first_token.record(telemetry.time_to_first_token, model)
+        for token_type, count in (
+            ("input", telemetry.input_tokens),
+            ("output", telemetry.output_tokens),
+            ("cache_read", telemetry.cache_read_tokens),
+        ):
+            if count:
+                self.tokens.add(count, {**model, "type": token_type})
+
+    def record_tool_call(self, tool: str, duration: float, ok: bool = True) -> None:
+        """Count an MCP tool call and its latency"""
+        self.tool_calls.add(1, {"tool": tool, "status": "ok" if ok else "error"})
+        self.tool_duration.record(duration, {"tool": tool})
+
+    def record_tool_cache(self, result: str) -> None:
+        """Count a tool result cache lookup ("hit", "stale" or "miss")"""
+        self.tool_cache.add(1, {"result": result})
+
+    def prometheus_text(self) -> str:
+        """Current values in the Prometheus text exposition format"""
+        return render_prometheus(self._scrape_reader.get_metrics_data())
+
+    def shutdown(self) -> None:
+        """Export pending data and stop the export threads"""
+        self.provider.shutdown()
+
+
+def _prometheus_name(name: str, unit: str) -> str:
+    """Prometheus metric name for an OpenTelemetry instrument"""
+    return name.replace(".", "_") + _UNIT_SUFFIXES.get(unit, "")
+
+
+def _labels(attributes: Dict[str, Any], **extra: str) -> str:
+    """Prometheus label set for a data point"""
+    pairs = {**{str(k): str(v) for k, v in (attributes or {}).items()}, **extra}
+    if not pairs:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items())
+        + "}"
+    )
+
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Sample value, keeping integers as integers"""
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(metrics_data: Optional[MetricsData]) -> str:
+    """
+    Render collected metrics in the Prometheus text exposition format
+
+    Args:
+        metrics_data: Cumulative metrics from an OpenTelemetry reader
+
+    Returns:
+        str: One HELP/TYPE block per metric
+    """
+    if metrics_data is None:
+        return ""
+
+    lines: List[str] = []
+    for resource_metrics in metrics_data.resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                name = _prometheus_name(metric.name, metric.unit)
+                data = metric.data
+                if isinstance(data, Histogram):
+                    kind = "histogram"
+                elif isinstance(data, Sum) and data.is_monotonic:
+                    kind = "counter"
+                    name += "_total"
+                else:
+                    kind = "gauge"
+                if metric.description:
+                    lines.append(f"# HELP {name} {metric.description}")
+                lines.append(f"# TYPE {name} {kind}")
+
+                for point in data.data_points:
+                    attributes = dict(point.attributes or {})
+                    if kind == "histogram":
+                        lines.extend(_histogram_lines(name, attributes, point))
+                    else:
+                        lines.append(
+                            f"{name}{_labels(attributes)} {_format_value(point.value)}"
+                        )
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _histogram_lines(name: str, attributes: Dict[str, Any], point: Any) -> List[str]:
+    """Cumulative _bucket, _sum and _count lines for one histogram point"""
+    lines = []
+    cumulative = 0
+    bounds: Sequence[float] = point.explicit_bounds
+    for bound, count in zip(bounds, point.bucket_counts):
+        cumulative += count
+        lines.append(
+            f"{name}_bucket{_labels(attributes, le=_format_value(float(bound)))} "
+            f"{cumulative}"
+        )
+    lines.append(f'{name}_bucket{_labels(attributes, le="+Inf")} {point.count}')
+    lines.append(f"{name}_sum{_labels(attributes)} {_format_value(point.sum)}")
+    lines.append(f"{name}_count{_labels(attributes)} {point.count}")
+    return lines
+
+
+_local_metrics: Optional[LocalMetrics] = None
+_local_metrics_lock = threading.Lock()
+
+
+def get_local_metrics() -> Optional[LocalMetrics]:
+    """Get the process-wide metrics, or None when disabled"""
+    global _local_metrics
+    if not settings.enable_metrics_export:
+        return None
+    if _local_metrics is None:
+        with _local_metrics_lock:
+            if _local_metrics is None:
+                _local_metrics = LocalMetrics(
+                    export_file=settings.metrics_export_file,
+                    otlp_endpoint=settings.metrics_otlp_endpoint,
+                )
+    return _local_metrics
@@ -2,10 +2,36 @@
 Simple prompt loading utilities for KraftBot.
 """
 
+import asyncio
+import hashlib
 import os
 import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+from ..config.settings import settings
+from .tokens import estimate_tokens
+
+# Markdown formatting that might interfere with LLM processing
+_HEADER_RE = re.compile(r"^#+\s*(.+)$", re.MULTILINE)
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC_RE = re.compile(r"\*(.+?)\*")
+_INLINE_CODE_RE = re.compile(r"`(.+?)`")
+_CODE_FENCE_RE = re.compile(r"^```.*$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n")
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """A prompt file cleaned once and cached until the file changes"""
+
+    path: Path
+    text: str
+    tokens: int  # Estimated tokens the prompt adds to every request
+    hash: str  # SHA-256 of text, the same digest as core.cache.hash_text
+    mtime_ns: int
+    size: int
 
 
 class PromptLoader:
@@ -14,6 +40,8 @@ class PromptLoader:
     def __init__(self, prompts_dir: Optional[Path] = None):
         """Initialize prompt loader with prompts directory"""
         self.prompts_dir = prompts_dir or self._get_default_prompts_dir()
+        self._compiled: Dict[Path, CompiledPrompt] = {}
+        self._watch_task: Optional[asyncio.Task] = None
 
     def _get_default_prompts_dir(self) -> Path:
         """Get the default prompts directory"""
@@ -21,18 +49,8 @@ class PromptLoader:
         package_dir = Path(__file__).parent.parent
         return package_dir / "prompts"
 
-    def load_prompt(self, prompt_name_or_path: str) -> Optional[str]:
-        """
-        Load a system prompt from a Markdown file
-
-        Args:
-            prompt_name_or_path: Either:
-                - Name of a prompt file in the prompts directory (with or without .md extension)
-                - Full path to a prompt file anywhere on the filesystem
-
-        Returns:
-            str: The loaded prompt content, or None if not found
-        """
+    def resolve_path(self, prompt_name_or_path: str) -> Path:
+        """Path of a prompt given by name or file path"""
         # Check if it's an absolute path
         if (
             os.path.isabs(prompt_name_or_path)
@@ -40,44 +58,162 @@ class PromptLoader:
             or "\\" in prompt_name_or_path
         ):
             # It's a file path
-            prompt_path = Path(prompt_name_or_path)
-        else:
-            # It's a prompt name - look in prompts directory
-            if not prompt_name_or_path.endswith(".md"):
-                prompt_name_or_path += ".md"
-            prompt_path = self.prompts_dir / prompt_name_or_path
-
-        if not prompt_path.exists():
-            return None
+            return Path(prompt_name_or_path)
+
+        # It's a prompt name - look in prompts directory
+        if not prompt_name_or_path.endswith(".md"):
+            prompt_name_or_path += ".md"
+        return self.prompts_dir / prompt_name_or_path
+
+    def get_prompt(self, prompt_name_or_path: str) -> Optional[CompiledPrompt]:
+        """
+        Load a prompt with its token count and hash, from cache when unchanged
+
+        Files are re-checked (one stat) on every call, unless the watcher is
+        running, in which case it keeps the cache fresh and cached prompts
+        are returned without touching the filesystem.
+
+        Args:
+            prompt_name_or_path: Prompt name or file path, as for load_prompt
+
+        Returns:
+            CompiledPrompt: The cleaned prompt, or None if not found
+        """
+        prompt_path = self.resolve_path(prompt_name_or_path)
+
+        cached = self._compiled.get(prompt_path)
+        if cached is not None and self.is_watching:
+            return cached
 
         try:
-            content = prompt_path.read_text(encoding="utf-8")
-            # Clean markdown formatting for LLM consumption
-            content = self._clean_markdown(content)
-            return content.strip()
+            stat = prompt_path.stat()
+        except OSError:
+            self._compiled.pop(prompt_path, None)
+            return None
 
+        if (
+            cached is not None
+            and cached.mtime_ns == stat.st_mtime_ns
+            and cached.size == stat.st_size
+        ):
+            return cached
+
+        try:
+            compiled = self._compile(prompt_path, stat)
         except Exception as e:
             print(f"⚠️  Error loading prompt from {prompt_path}: {e}")
             return None
 
+        self._compiled[prompt_path] = compiled
+        return compiled
+
+    def load_prompt(self, prompt_name_or_path: str) -> Optional[str]:
+        """
+        Load a system prompt from a Markdown file
+
+        Args:
+            prompt_name_or_path: Either:
+                - Name of a prompt file in the prompts directory (with or without .md extension)
+                - Full path to a prompt file anywhere on the filesystem
+
+        Returns:
+            str: The loaded prompt content, or None if not found
+        """
+        compiled = self.get_prompt(prompt_name_or_path)
+        return compiled.text if compiled is not None else None
+
+    def _compile(self, prompt_path: Path, stat: os.stat_result) -> CompiledPrompt:
+        """Read and clean a prompt file"""
+        content = prompt_path.read_text(encoding="utf-8")
+        # Clean markdown formatting for LLM consumption
+        text = self._clean_markdown(content).strip()
+        return CompiledPrompt(
+            path=prompt_path,
+            text=text,
+            tokens=estimate_tokens(text),
+            hash=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+
     def _clean_markdown(self, content: str) -> str:
         """Clean markdown formatting that might interfere with LLM processing"""
         # Remove markdown headers but keep the text
-        content = re.sub(r"^#+\s*(.+)$", r"\1", content, flags=re.MULTILINE)
+        content = _HEADER_RE.sub(r"\1", content)
 
         # Convert markdown emphasis to plain text
-        content = re.sub(r"\*\*(.+?)\*\*", r"\1", content)  # Bold
-        content = re.sub(r"\*(.+?)\*", r"\1", content)  # Italic
-        content = re.sub(r"`(.+?)`", r"\1", content)  # Inline code
+        content = _BOLD_RE.sub(r"\1", content)
+        content = _ITALIC_RE.sub(r"\1", content)
+        content = _INLINE_CODE_RE.sub(r"\1", content)
 
         # Remove code block markers but keep content
-        content = re.sub(r"^```.*$", "", content, flags=re.MULTILINE)
+        content = _CODE_FENCE_RE.sub("", content)
 
         # Clean up excessive whitespace
-        content = re.sub(r"\n\s*\n\s*\n", "\n\n", content)
+        content = _BLANK_LINES_RE.sub("\n\n", content)
 
         return content
 
+    def refresh(self) -> List[CompiledPrompt]:
+        """
+        Recompile cached prompts whose files changed
+
+        Returns:
+            list: The prompts that were reloaded; deleted files are dropped
+        """
+        changed = []
+        for prompt_path, cached in list(self._compiled.items()):
+            try:
+                stat = prompt_path.stat()
+                if cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                    continue
+                compiled = self._compile(prompt_path, stat)
+            except OSError:
+                self._compiled.pop(prompt_path, None)
+                continue
+            except Exception as e:
+                # Keep serving the last good version of a broken edit
+                print(f"⚠️  Error reloading prompt from {prompt_path}: {e}")
+                continue
+            self._compiled[prompt_path] = compiled
+            changed.append(compiled)
+        return changed
+
+    @property
+    def is_watching(self) -> bool:
+        """Whether the background watcher is keeping the cache fresh"""
+        return self._watch_task is not None and not self._watch_task.done()
+
+    def start_watching(self, interval: Optional[float] = None) -> None:
+        """
+        Reload changed prompt files in the background
+
+        For long-running modes (chat, serve); must be called with an event
+        loop running. Does nothing when the interval is 0.
+
+        Args:
+            interval: Seconds between checks (defaults to
+                settings.prompt_watch_interval)
+        """
+        if interval is None:
+            interval = settings.prompt_watch_interval
+        if interval <= 0 or self.is_watching:
+            return
+
+        async def watch() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                self.refresh()
+
+        self._watch_task = asyncio.create_task(watch())
+
+    async def stop_watching(self) -> None:
+        """Stop the background watcher"""
+        task, self._watch_task = self._watch_task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
     def list_available_prompts(self) -> List[str]:
         """Get list of available prompt files"""
         if not self.prompts_dir.exists():
@@ -0,0 +1,11 @@
+"""
+Cheap token estimates that don't need a tokenizer.
+"""
+
+# Rough characters-per-token ratio used for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for budgeting purposes"""
+    return len(text) // CHARS_PER_TOKEN + 1
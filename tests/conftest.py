@@ -1,10 +1,13 @@
 """Pytest configuration and fixtures."""
 
-import pytest
-import tempfile
 import os
+import tempfile
 from pathlib import Path
 
+import pytest
+
+pytest_plugins = ["kraftbot.testing"]
+
 
 @pytest.fixture
 def temp_dir():
@@ -63,4 +66,38 @@ def disable_logfire():
     with pytest.MonkeyPatch().context() as m:
         # Mock logfire to prevent actual initialization
         m.setattr("kraftbot.core.observability.logfire", None)
-        yield
\ No newline at end of file
+        yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_model_stats(tmp_path, monkeypatch):
+    """Keep measured model latency from tests out of the user's cache dir."""
+    from kraftbot.core.model_stats import ModelStatsStore
+
+    store = ModelStatsStore(tmp_path / "model_stats.jsonl")
+    monkeypatch.setattr("kraftbot.core.model_stats._model_stats", store)
+    yield store
+
+
+@pytest.fixture(autouse=True)
+def isolated_telemetry(tmp_path, monkeypatch):
+    """Keep run metrics from tests out of the user's cache dir."""
+    from kraftbot.core.telemetry import TelemetryStore
+
+    store = TelemetryStore(tmp_path / "metrics.sqlite3")
+    monkeypatch.setattr("kraftbot.core.telemetry._telemetry_store", store)
+    yield store
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep response, tool, tool index and health caches out of the user cache."""
+    from kraftbot.config.settings import settings
+
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(settings, "cache_dir", str(cache_dir))
+    # Subprocesses started by tests read it from the environment
+    monkeypatch.setenv("KRAFTBOT_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr("kraftbot.core.cache._response_cache", None)
+    yield cache_dir
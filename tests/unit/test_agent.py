@@ -0,0 +1,199 @@
+"""Tests for PydanticAIAgent streaming."""
+
+import asyncio
+
+import httpx
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import DeltaToolCall, FunctionModel
+
+from kraftbot.core.models import StreamEnd, StreamStart, TextDelta
+from kraftbot.utils.cache import TieredCache
+
+
+def make_agent(monkeypatch, pieces):
+    """Build an agent whose model streams the given text pieces."""
+    from kraftbot.core.agent import PydanticAIAgent
+    from kraftbot.core.cache import ResponseCache
+
+    monkeypatch.setattr("kraftbot.core.agent.settings.enable_mcp_server", False)
+    agent = PydanticAIAgent(
+        openrouter_api_key="test",
+        model_name="test/model",
+        enable_logfire=False,
+        response_cache=ResponseCache(store=TieredCache("responses")),
+    )
+
+    async def stream_function(messages, info):
+        for piece in pieces:
+            yield piece
+
+    agent.agent = Agent(FunctionModel(stream_function=stream_function))
+    return agent
+
+
+def collect(stream):
+    """Drain an async iterator."""
+
+    async def drain():
+        return [item async for item in stream]
+
+    return asyncio.run(drain())
+
+
+class TestStreamEvents:
+    """Test PydanticAIAgent.stream_events."""
+
+    def test_yields_start_deltas_and_end(self, monkeypatch):
+        """Each new piece of text arrives once, followed by the final result."""
+        agent = make_agent(monkeypatch, ["Start ", "your ", "RB2"])
+
+        events = collect(agent.stream_events("Who should I start?"))
+
+        assert isinstance(events[0], StreamStart)
+        assert not events[0].cached
+        deltas = [event.text for event in events if isinstance(event, TextDelta)]
+        assert "".join(deltas) == "Start your RB2"
+        assert len(deltas) > 1
+        end = events[-1]
+        assert isinstance(end, StreamEnd)
+        assert end.response == "Start your RB2"
+        assert end.error is None
+        assert end.usage["total_tokens"] > 0
+
+    def test_run_stream_deltas_and_cumulative(self, monkeypatch):
+        """run_stream yields deltas by default and full text when asked."""
+        agent = make_agent(monkeypatch, ["a", "b", "c"])
+
+        deltas = collect(agent.run_stream("q1", session_id="s1"))
+        cumulative = collect(agent.run_stream("q2", session_id="s2", cumulative=True))
+
+        assert "".join(deltas) == "abc"
+        assert cumulative[-1] == "abc"
+        assert all(cumulative[-1].startswith(chunk) for chunk in cumulative)
+
+    def test_errors_end_the_stream(self, monkeypatch):
+        """Failures are reported on the end event instead of raising."""
+        agent = make_agent(monkeypatch, [])
+
+        async def failing_stream(messages, info):
+            raise RuntimeError("model unavailable")
+            yield  # pragma: no cover
+
+        agent.agent = Agent(FunctionModel(stream_function=failing_stream))
+
+        events = collect(agent.stream_events("q"))
+
+        assert isinstance(events[-1], StreamEnd)
+        assert "model unavailable" in events[-1].error
+        assert collect(agent.run_stream("q", session_id="s2"))[-1].startswith("Error: ")
+
+
+class TestTransportRetry:
+    """Test resuming a run after a dropped connection."""
+
+    def make_flaky_agent(self, monkeypatch):
+        """Agent whose model drops the connection right after a tool returns."""
+        agent = make_agent(monkeypatch, [])
+        tool_calls = []
+        model_calls = []
+
+        def respond(messages):
+            model_calls.append(len(messages))
+            last_part = messages[-1].parts[-1]
+            if isinstance(last_part, ToolReturnPart):
+                if len(model_calls) == 2:
+                    raise httpx.ConnectError("connection reset")
+                return "Start Bijan"
+            return None
+
+        async def stream_function(messages, info):
+            text = respond(messages)
+            if text is None:
+                yield {0: DeltaToolCall(name="get_roster", json_args="{}")}
+            else:
+                yield text
+
+        def function(messages, info):
+            text = respond(messages)
+            if text is None:
+                return ModelResponse(parts=[ToolCallPart("get_roster", {})])
+            return ModelResponse(parts=[TextPart(text)])
+
+        agent.agent = Agent(FunctionModel(function, stream_function=stream_function))
+
+        @agent.agent.tool_plain
+        def get_roster() -> str:
+            tool_calls.append(1)
+            return "Bijan Robinson, RB"
+
+        return agent, tool_calls, model_calls
+
+    def test_stream_resumes_without_repeating_tools(self, monkeypatch):
+        """The retry continues from the tool result instead of starting over."""
+        agent, tool_calls, model_calls = self.make_flaky_agent(monkeypatch)
+
+        events = collect(agent.stream_events("Who should I start?"))
+
+        assert events[-1].response == "Start Bijan"
+        assert events[-1].error is None
+        assert len(tool_calls) == 1
+        assert len(model_calls) == 3
+
+    def test_cumulative_stream_starts_over_on_resume(self, monkeypatch):
+        """Text streamed before a dropped connection is not kept on resume."""
+        agent = make_agent(monkeypatch, [])
+        calls = []
+
+        async def stream_function(messages, info):
+            calls.append(1)
+            if len(calls) == 1:
+                yield "Sit "
+                raise httpx.ConnectError("connection reset")
+            yield "Start "
+            yield "Bijan"
+
+        agent.agent = Agent(FunctionModel(stream_function=stream_function))
+
+        chunks = collect(agent.run_stream("Who should I start?", cumulative=True))
+
+        assert chunks[0] == "Sit "
+        assert chunks[-1] == "Start Bijan"
+        assert all(chunk.startswith("Start") for chunk in chunks[1:])
+
+    def test_run_resumes_without_repeating_tools(self, monkeypatch):
+        """Non-streaming runs resume the same way."""
+        agent, tool_calls, _ = self.make_flaky_agent(monkeypatch)
+
+        response = asyncio.run(agent.run("Who should I start?"))
+
+        assert response.response == "Start Bijan"
+        assert len(tool_calls) == 1
+
+
+def test_set_system_prompt_rebuilds_agent(monkeypatch):
+    """A reloaded prompt is sent with the next request, history included."""
+    from kraftbot.core.agent import PydanticAIAgent
+
+    monkeypatch.setattr("kraftbot.core.agent.settings.enable_mcp_server", False)
+    agent = PydanticAIAgent(
+        openrouter_api_key="test",
+        model_name="test/model",
+        system_prompt="Be brief",
+        enable_logfire=False,
+        enable_cache=False,
+    )
+    seen = []
+
+    async def record(messages, info):
+        seen.append(messages[0].parts[0].content)
+        yield "ok"
+
+    with agent.agent.override(model=FunctionModel(stream_function=record)):
+        collect(agent.stream_events("Who should I start?"))
+    agent.set_system_prompt("Be thorough")
+    with agent.agent.override(model=FunctionModel(stream_function=record)):
+        collect(agent.stream_events("And at flex?"))
+
+    # The follow-up's history carries the new prompt, not the stored one
+    assert seen == ["Be brief", "Be thorough"]
@@ -0,0 +1,153 @@
+"""Tests for the JSONL batch runner."""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from kraftbot.core.batch import BatchRunner, completed_ids, parse_batch_lines
+from kraftbot.core.models import StreamEnd, StreamStart, TextDelta
+
+
+class FakeMemory:
+    """Records which sessions were cleared."""
+
+    def __init__(self):
+        self.cleared = []
+
+    def clear(self, session_id=None):
+        self.cleared.append(session_id)
+
+
+class FakeAgent:
+    """Stand-in for PydanticAIAgent whose runs take as long as the prompt says."""
+
+    model_name = "test/model"
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.sessions = []
+        self.memory = FakeMemory()
+
+    async def stream_events(self, prompt, user_id="user", session_id="default"):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.sessions.append(session_id)
+        try:
+            yield StreamStart(model_name=self.model_name, session_id=session_id)
+            if prompt == "late":
+                yield TextDelta(text="Start Bij")
+                yield StreamEnd(
+                    response="Start Bij", error="Timed out after 60s", timed_out=True
+                )
+                return
+            await asyncio.sleep(float(prompt))
+            if prompt == "0.0":
+                yield StreamEnd(error="model unavailable")
+                return
+            yield TextDelta(text=f"slept {prompt}")
+            yield StreamEnd(response=f"slept {prompt}", usage={"total_tokens": 7})
+        finally:
+            self.active -= 1
+
+
+class TestParseBatchLines:
+    """Test parse_batch_lines."""
+
+    def test_ids_default_to_line_numbers(self):
+        """Items without an id are numbered by line; bare strings are prompts."""
+        lines = ['{"id": "a", "prompt": "one"}', "", '"two"', '{"prompt": "three"}']
+
+        items = list(parse_batch_lines(lines))
+
+        assert [item.id for item in items] == ["a", "3", "4"]
+        assert items[1].prompt == "two"
+
+    def test_missing_prompt_is_an_error(self):
+        """Lines without a prompt are rejected with their line number."""
+        with pytest.raises(ValueError, match="Line 1"):
+            list(parse_batch_lines(['{"id": "a"}']))
+
+
+class TestBatchRunner:
+    """Test BatchRunner."""
+
+    def test_completion_order_and_concurrency(self):
+        """Results arrive as they finish and in-flight items are capped."""
+        agent = FakeAgent()
+        items = parse_batch_lines(
+            json.dumps({"id": str(i), "prompt": delay})
+            for i, delay in enumerate(["0.2", "0.05", "0.1", "0.01"])
+        )
+        seen = []
+
+        results = asyncio.run(BatchRunner(agent, concurrency=2).run(items, seen.append))
+
+        assert [result.id for result in seen] == ["1", "2", "3", "0"]
+        assert results == seen
+        assert agent.peak == 2
+        assert all(result.usage["total_tokens"] == 7 for result in results)
+        assert agent.sessions[0] == "batch_0"
+
+    def test_errors_are_reported(self):
+        """Failed runs are recorded with their error instead of a response."""
+        items = parse_batch_lines(['{"id": "x", "prompt": "0.0"}'])
+
+        (result,) = asyncio.run(BatchRunner(FakeAgent()).run(items, lambda r: None))
+
+        assert not result.succeeded
+        assert result.error == "model unavailable"
+        assert result.response is None
+
+    def test_timed_out_items_keep_partial_response(self, temp_dir):
+        """A timed-out run is written with its partial text and retried on resume."""
+        items = parse_batch_lines(['{"id": "x", "prompt": "late"}'])
+
+        (result,) = asyncio.run(BatchRunner(FakeAgent()).run(items, lambda r: None))
+
+        assert result.timed_out
+        assert result.error is None
+        assert result.response == "Start Bij"
+        output = Path(temp_dir) / "results.ndjson"
+        output.write_text(result.model_dump_json() + "\n")
+        assert completed_ids(output) == set()
+
+    def test_item_sessions_are_forgotten(self):
+        """Default per-item sessions are cleared; named sessions are kept."""
+        agent = FakeAgent()
+        items = parse_batch_lines(
+            [
+                '{"id": "a", "prompt": "0.01"}',
+                '{"id": "b", "prompt": "0.01", "session_id": "league"}',
+            ]
+        )
+
+        asyncio.run(BatchRunner(agent).run(items, lambda r: None))
+
+        assert agent.memory.cleared == ["batch_a"]
+
+    def test_resume_skips_completed_ids(self, temp_dir):
+        """Answered IDs in the output file are skipped; failed ones are retried."""
+        output = Path(temp_dir) / "results.ndjson"
+        output.write_text(
+            '{"id": "a", "response": "done"}\n'
+            '{"id": "c", "error": "timeout"}\n'
+            '{"id": "b", "resp'
+        )
+        items = parse_batch_lines(
+            [
+                '{"id": "a", "prompt": "0.01"}',
+                '{"id": "b", "prompt": "0.01"}',
+                '{"id": "c", "prompt": "0.02"}',
+            ]
+        )
+
+        results = asyncio.run(
+            BatchRunner(FakeAgent()).run(
+                items, lambda r: None, skip_ids=completed_ids(output)
+            )
+        )
+
+        assert [result.id for result in results] == ["b", "c"]
@@ -0,0 +1,136 @@
+"""Tests for the benchmark stubs and baseline comparison."""
+
+import asyncio
+import json
+
+import httpx
+from starlette.testclient import TestClient
+
+from kraftbot.bench.runner import BenchResult, compare_to_baseline
+from kraftbot.bench.stub_llm import StubLLMConfig, create_stub_llm_app
+from kraftbot.bench.stub_mcp import make_league
+from kraftbot.core.agent import PydanticAIAgent
+from kraftbot.core.models import StreamEnd, TextDelta
+from kraftbot.mcp.manager import MCPManager
+
+FAST = StubLLMConfig(ttft=0, tokens_per_second=10_000, response_tokens=20)
+TOOLS = [{"type": "function", "function": {"name": "sleeper_get_player"}}]
+
+
+def stream_chunks(client: TestClient, body: dict) -> list:
+    """POST a streaming completion and parse its chunks."""
+    response = client.post("/v1/chat/completions", json={**body, "stream": True})
+    lines = [line[6:] for line in response.text.splitlines() if line]
+    assert lines[-1] == "[DONE]"
+    return [json.loads(line) for line in lines[:-1]]
+
+
+class TestStubLLM:
+    """Test the OpenAI-compatible stub model server."""
+
+    def test_streams_text_answer(self):
+        """A plain request gets the configured number of tokens and usage."""
+        client = TestClient(create_stub_llm_app(FAST))
+
+        chunks = stream_chunks(
+            client, {"messages": [{"role": "user", "content": "hi"}]}
+        )
+
+        text = [c["choices"][0]["delta"].get("content") for c in chunks if c["choices"]]
+        assert len([t for t in text if t]) == 20
+        assert chunks[-1]["usage"]["completion_tokens"] == 20
+
+    def test_calls_offered_tool_once(self):
+        """Tools are called for the user's message, then answered with text."""
+        client = TestClient(create_stub_llm_app(FAST))
+        user = {"role": "user", "content": "hi"}
+        tool_result = {"role": "tool", "tool_call_id": "call_stub", "content": "{}"}
+
+        first = stream_chunks(client, {"messages": [user], "tools": TOOLS})
+        second = stream_chunks(
+            client, {"messages": [user, tool_result], "tools": TOOLS}
+        )
+
+        call = first[0]["choices"][0]["delta"]["tool_calls"][0]
+        assert call["function"]["name"] == "sleeper_get_player"
+        assert first[1]["choices"][0]["finish_reason"] == "tool_calls"
+        assert second[-2]["choices"][0]["finish_reason"] == "stop"
+
+    def test_tool_name_matches_prefixed_tools(self):
+        """--tool-name finds a tool behind its server prefix."""
+        client = TestClient(
+            create_stub_llm_app(StubLLMConfig(ttft=0, tool_name="get_player"))
+        )
+
+        response = client.post(
+            "/v1/chat/completions",
+            json={"messages": [{"role": "user", "content": "hi"}], "tools": TOOLS},
+        )
+
+        message = response.json()["choices"][0]["message"]
+        assert message["tool_calls"][0]["function"]["name"] == "sleeper_get_player"
+
+    def test_agent_streams_from_stub(self):
+        """The agent talks to the stub through its base_url."""
+        http_client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=create_stub_llm_app(FAST))
+        )
+        agent = PydanticAIAgent(
+            openrouter_api_key="bench",
+            model_name="bench/stub",
+            enable_logfire=False,
+            mcp_manager=MCPManager(),
+            enable_cache=False,
+            enable_hedging=False,
+            http_client=http_client,
+            base_url="http://stub/v1",
+        )
+
+        async def run():
+            return [event async for event in agent.stream_events("Start who?")]
+
+        events = asyncio.run(run())
+
+        text = "".join(e.text for e in events if isinstance(e, TextDelta))
+        assert text.startswith("## Week 4 Lineup")
+        assert isinstance(events[-1], StreamEnd) and events[-1].error is None
+
+
+class TestStubLeague:
+    """Test the stub MCP server's fixture data."""
+
+    def test_league_shape_is_deterministic(self):
+        """Rosters, matchups and players line up and repeat across runs."""
+        league = make_league(teams=4, roster_size=10)
+
+        assert len(league["rosters"]) == len(league["matchups"]) == 4
+        assert all(len(r["players"]) == 10 for r in league["rosters"])
+        assert all(
+            pid in league["players"] for r in league["rosters"] for pid in r["players"]
+        )
+        assert league == make_league(teams=4, roster_size=10)
+
+
+class TestCompareToBaseline:
+    """Test regression detection against saved results."""
+
+    def test_flags_only_regressions(self):
+        """Results past the tolerance are reported; missing baselines are skipped."""
+        results = [
+            BenchResult(
+                name="turn_overhead", unit="ms", p50=20, p95=25, mean=21, samples=5
+            ),
+            BenchResult(
+                name="render_chunk", unit="ms", p50=2.1, p95=3, mean=2, samples=5
+            ),
+            BenchResult(
+                name="new_bench", unit="ms", p50=99, p95=99, mean=99, samples=5
+            ),
+        ]
+
+        regressions = compare_to_baseline(
+            results, {"turn_overhead": 10, "render_chunk": 2}, tolerance=0.25
+        )
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("turn_overhead: p50 20.00ms")
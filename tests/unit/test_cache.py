@@ -0,0 +1,182 @@
+"""Tests for the tiered cache and the response cache."""
+
+import asyncio
+import time
+from pathlib import Path
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+
+from kraftbot.core.cache import ResponseCache, normalize_prompt
+from kraftbot.utils.cache import TieredCache
+
+
+class TestTieredCache:
+    """Test TieredCache."""
+
+    def test_memory_roundtrip_and_counters(self):
+        """Values are returned until they expire and lookups are counted."""
+        cache = TieredCache("test", ttl=60)
+        cache.set("a", {"x": 1})
+
+        assert cache.get("a") == {"x": 1}
+        assert cache.get("missing") is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["memory_hits"] == 1
+
+    def test_ttl_expiry_and_stale_reads(self):
+        """Expired entries are misses unless a stale window is allowed."""
+        cache = TieredCache("test", ttl=60)
+        cache.set("a", "value", ttl=0.01)
+        time.sleep(0.02)
+
+        entry = cache.get_entry("a", max_stale=60)
+        assert entry is not None and entry.is_expired
+        assert cache.get("a") is None
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted from memory first."""
+        cache = TieredCache("test", max_memory_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_disk_tier_survives_restart(self, temp_dir):
+        """Entries persisted to SQLite are visible to a new cache instance."""
+        db_path = Path(temp_dir) / "cache.sqlite3"
+        first = TieredCache("test", db_path=db_path)
+        first.set("a", "persisted")
+        first.close()
+
+        second = TieredCache("test", db_path=db_path)
+        assert second.get("a") == "persisted"
+        assert second.stats()["disk_hits"] == 1
+
+    def test_disk_hits_skip_recent_access_writes(self, temp_dir):
+        """A disk hit only rewrites the access time once it is out of date."""
+        db_path = Path(temp_dir) / "cache.sqlite3"
+        TieredCache("test", db_path=db_path).set("a", "persisted")
+
+        def accessed_at():
+            return cache._db.execute(
+                "SELECT accessed_at FROM cache_entries"
+            ).fetchone()[0]
+
+        cache = TieredCache("test", db_path=db_path, max_memory_entries=0)
+        written = accessed_at()
+        assert cache.get("a") == "persisted"
+        assert accessed_at() == written
+
+        cache.access_resolution = 0
+        assert cache.get("a") == "persisted"
+        assert accessed_at() > written
+
+    def test_disk_size_eviction(self, temp_dir):
+        """The disk tier stays under its byte budget."""
+        cache = TieredCache(
+            "test", db_path=Path(temp_dir) / "cache.sqlite3", max_disk_bytes=100
+        )
+        for i in range(10):
+            cache.set(f"key{i}", "x" * 30)
+
+        assert cache.stats()["disk_bytes"] <= 100
+
+
+class TestResponseCache:
+    """Test ResponseCache keying."""
+
+    def test_normalize_prompt(self):
+        """Case, whitespace and trailing punctuation are ignored."""
+        assert normalize_prompt("  Who should I START  at flex?? ") == (
+            "who should i start at flex"
+        )
+
+    def test_key_components(self):
+        """Keys change with the model, system prompt and league state."""
+        cache = ResponseCache(store=TieredCache("responses"))
+        base = cache.make_key("model-a", "system", "Hello?", league_state="s1")
+
+        assert base == cache.make_key("model-a", "system", "hello", league_state="s1")
+        assert base != cache.make_key("model-b", "system", "hello", league_state="s1")
+        assert base != cache.make_key("model-a", "other", "hello", league_state="s1")
+        assert base != cache.make_key("model-a", "system", "hello", league_state="s2")
+
+
+class TestAgentResponseCache:
+    """Test the cache in front of PydanticAIAgent."""
+
+    def make_agent(self, monkeypatch):
+        """Build an agent with no MCP servers and a counting fake run."""
+        from kraftbot.core.agent import PydanticAIAgent
+
+        monkeypatch.setattr("kraftbot.core.agent.settings.enable_mcp_server", False)
+        agent = PydanticAIAgent(
+            openrouter_api_key="test",
+            model_name="test/model",
+            enable_logfire=False,
+            response_cache=ResponseCache(store=TieredCache("responses")),
+        )
+        calls = []
+
+        class FakeResult:
+            output = "line one\nline two"
+
+            def usage(self):
+                return None
+
+            def all_messages(self):
+                return [
+                    ModelRequest(parts=[UserPromptPart(content="question")]),
+                    ModelResponse(parts=[TextPart(content=self.output)]),
+                ]
+
+        async def fake_run(prompt, **kwargs):
+            calls.append(prompt)
+            return FakeResult()
+
+        monkeypatch.setattr(agent.agent, "run", fake_run)
+        return agent, calls
+
+    def test_run_hits_cache(self, monkeypatch):
+        """A repeated prompt is served without calling the model."""
+        agent, calls = self.make_agent(monkeypatch)
+
+        first = asyncio.run(agent.run("Who should I start?", session_id="s1"))
+        second = asyncio.run(agent.run("who should i start", session_id="s2"))
+
+        assert len(calls) == 1
+        assert second.response == first.response
+        assert second.cached
+
+    def test_stream_replays_cached_response(self, monkeypatch):
+        """Cached hits replay through run_stream as line deltas."""
+        agent, _ = self.make_agent(monkeypatch)
+        asyncio.run(agent.run("Who should I start?", session_id="s1"))
+
+        async def collect(session_id, **kwargs):
+            stream = agent.run_stream(
+                "Who should I start?", session_id=session_id, **kwargs
+            )
+            return [chunk async for chunk in stream]
+
+        assert asyncio.run(collect("s2")) == ["line one\n", "line two"]
+        assert asyncio.run(collect("s3", cumulative=True)) == [
+            "line one\n",
+            "line one\nline two",
+        ]
+
+    def test_follow_ups_skip_cache(self, monkeypatch):
+        """Follow-up questions in a session always go to the model."""
+        agent, calls = self.make_agent(monkeypatch)
+
+        asyncio.run(agent.run("Who should I start?", session_id="s1"))
+        asyncio.run(agent.run("Who should I start?", session_id="s1"))
+
+        assert len(calls) == 2
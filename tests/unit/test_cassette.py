@@ -0,0 +1,245 @@
+"""Tests for recording and replaying model and MCP traffic."""
+
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from pydantic_ai.exceptions import ModelRetry
+from pydantic_ai.messages import ModelRequest, UserPromptPart
+
+from kraftbot.bench.stub_llm import StubLLMConfig, create_stub_llm_app
+from kraftbot.core.agent import PydanticAIAgent
+from kraftbot.core.cassette import Cassette, CassetteMissError, model_request_key
+from kraftbot.core.models import StreamEnd
+from kraftbot.mcp.cassette import CassetteToolset, RecordedToolError
+from kraftbot.mcp.manager import MCPManager
+
+SYSTEM_PROMPT = "You are KraftBot, a fantasy football assistant."
+
+
+def stub_client(**kwargs) -> httpx.AsyncClient:
+    """HTTP client answered by the in-process stub model."""
+    config = StubLLMConfig(
+        **{"ttft": 0, "tokens_per_second": 10_000, "response_tokens": 40, **kwargs}
+    )
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_stub_llm_app(config))
+    )
+
+
+def offline_client() -> httpx.AsyncClient:
+    """HTTP client that fails every request, to prove replays stay local."""
+
+    def refuse(request):
+        raise httpx.ConnectError("network used during replay", request=request)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(refuse))
+
+
+def make_agent(cassette, http_client, mcp_manager=None) -> PydanticAIAgent:
+    """Agent on the stub model's API, recording to or replaying a cassette."""
+    return PydanticAIAgent(
+        openrouter_api_key="test",
+        model_name="bench/stub",
+        system_prompt=SYSTEM_PROMPT,
+        enable_logfire=False,
+        mcp_manager=mcp_manager or MCPManager(cassette=cassette),
+        http_client=http_client,
+        base_url="http://stub/v1",
+        cassette=cassette,
+    )
+
+
+async def turn(agent, prompt, session_id="default") -> StreamEnd:
+    """Stream one turn and return its end event."""
+    events = [event async for event in agent.stream_events(prompt, "user", session_id)]
+    return events[-1]
+
+
+class TestCassette:
+    """Test the cassette file and request keys."""
+
+    def test_request_key_ignores_timestamps(self):
+        """Identical requests sent at different times share a key."""
+
+        def request(prompt, year):
+            part = UserPromptPart(
+                prompt, timestamp=datetime(year, 1, 1, tzinfo=timezone.utc)
+            )
+            return [ModelRequest(parts=[part])]
+
+        assert model_request_key("m", request("hi", 2024)) == model_request_key(
+            "m", request("hi", 2025)
+        )
+        assert model_request_key("m", request("hi", 2024)) != model_request_key(
+            "m", request("bye", 2024)
+        )
+        assert model_request_key("m", request("hi", 2024)) != model_request_key(
+            "other", request("hi", 2024)
+        )
+
+    def test_missing_file_raises(self, tmp_path):
+        """Replaying a cassette that was never recorded fails clearly."""
+        with pytest.raises(FileNotFoundError):
+            Cassette(tmp_path / "missing.jsonl")
+
+    def test_repeated_calls_replay_in_order(self, tmp_path):
+        """Identical calls get their recordings in order, then the last repeats."""
+        path = tmp_path / "tools.jsonl"
+        recorder = Cassette(path, mode="record")
+        recorder.record_tool("k", "get_week", 0.1, result=1)
+        recorder.record_tool("k", "get_week", 0.1, result=2)
+
+        player = Cassette(path)
+
+        results = [player.replay_tool("k", "get_week")["result"] for _ in range(3)]
+        assert results == [1, 2, 2]
+        with pytest.raises(CassetteMissError):
+            player.replay_tool("other", "get_week")
+
+
+class TestCassetteModel:
+    """Test recording and replaying model requests through the agent."""
+
+    def test_replay_needs_no_network(self, tmp_path):
+        """A recorded turn replays with the same text and usage, offline."""
+        path = tmp_path / "turn.jsonl"
+        recorded = asyncio.run(
+            turn(make_agent(Cassette(path, mode="record"), stub_client()), "Start?")
+        )
+
+        cassette = Cassette(path)
+        replayed = asyncio.run(turn(make_agent(cassette, offline_client()), "Start?"))
+
+        assert replayed.error is None
+        assert replayed.response == recorded.response
+        assert replayed.usage["output_tokens"] == recorded.usage["output_tokens"]
+        assert cassette.counts == {"model": 1, "tool": 0}
+
+    def test_realtime_replay_keeps_timing(self, tmp_path):
+        """Replays are instant unless realtime reproduces the recorded latency."""
+        path = tmp_path / "slow.jsonl"
+        asyncio.run(
+            turn(
+                make_agent(Cassette(path, mode="record"), stub_client(ttft=0.3)),
+                "Start?",
+            )
+        )
+
+        instant = asyncio.run(
+            turn(make_agent(Cassette(path), offline_client()), "Start?")
+        )
+        realtime = asyncio.run(
+            turn(make_agent(Cassette(path, realtime=True), offline_client()), "Start?")
+        )
+
+        assert instant.telemetry.duration < 0.25
+        assert realtime.telemetry.time_to_first_token >= 0.25
+
+    def test_unrecorded_request_fails(self, tmp_path):
+        """A prompt missing from the cassette ends the run with an error."""
+        path = tmp_path / "turn.jsonl"
+        asyncio.run(
+            turn(make_agent(Cassette(path, mode="record"), stub_client()), "Start?")
+        )
+
+        end = asyncio.run(turn(make_agent(Cassette(path), offline_client()), "Sit?"))
+
+        assert "No recorded model" in end.error
+
+
+class FlakyToolset:
+    """Stand-in for an MCP server with one working and two failing tools."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def call_tool(self, name, tool_args, ctx, tool):
+        self.calls += 1
+        if name == "get_player":
+            raise ModelRetry("player_id is required")
+        if name == "get_week":
+            raise RuntimeError("server error")
+        return {"rosters": tool_args["league"]}
+
+
+class TestCassetteToolset:
+    """Test recording and replaying MCP tool calls."""
+
+    def test_results_and_errors_replay(self, tmp_path):
+        """Results, retries and failures come back without calling the server."""
+        path = tmp_path / "tools.jsonl"
+        server = FlakyToolset()
+
+        async def calls(toolset):
+            outcomes = [
+                await toolset.call_tool("get_rosters", {"league": 1}, None, None)
+            ]
+            for name, error in (("get_player", ModelRetry), ("get_week", Exception)):
+                with pytest.raises(error) as info:
+                    await toolset.call_tool(name, {}, None, None)
+                outcomes.append(type(info.value))
+            return outcomes
+
+        recorded = asyncio.run(
+            calls(CassetteToolset(wrapped=server, cassette=Cassette(path, "record")))
+        )
+        replayed = asyncio.run(
+            calls(CassetteToolset(wrapped=server, cassette=Cassette(path)))
+        )
+
+        assert recorded == [{"rosters": 1}, ModelRetry, RuntimeError]
+        assert replayed == [{"rosters": 1}, ModelRetry, RecordedToolError]
+        assert server.calls == 3
+
+    def test_replaying_manager_never_starts_servers(self, tmp_path):
+        """Servers behind a replaying manager are not launched."""
+        path = tmp_path / "empty.jsonl"
+        path.write_text("")
+        manager = MCPManager(cassette=Cassette(path))
+        manager.add_stdio_server("kraftbot-no-such-command", [], name="tokenbowl_mcp")
+
+        async def connect():
+            async with manager:
+                return dict(manager._connection_errors)
+
+        assert asyncio.run(connect()) == {}
+
+
+@pytest.mark.cassette("week4")
+def test_week4_session_replays(cassette):
+    """A recorded two-turn session with tool calls replays in milliseconds."""
+    manager = MCPManager(enable_tool_cache=False, cassette=cassette)
+    manager.add_stdio_server(
+        sys.executable,
+        ["-m", "kraftbot.bench.stub_mcp", "--latency", "0.05"],
+        tool_prefix="tokenbowl",
+        name="tokenbowl_mcp",
+    )
+    # `pytest --record-cassettes` records this session from the stub servers
+    http_client = (
+        stub_client(ttft=0.2, tool_name="get_trending_players")
+        if cassette.recording
+        else offline_client()
+    )
+    agent = make_agent(cassette, http_client, manager)
+
+    async def session():
+        async with agent:
+            return [
+                await turn(agent, "Who should I start in week 4?", "week4"),
+                await turn(agent, "Anyone worth picking up?", "week4"),
+            ]
+
+    start = time.perf_counter()
+    ends = asyncio.run(session())
+    elapsed = time.perf_counter() - start
+
+    assert [end.error for end in ends] == [None, None]
+    assert all(end.response.startswith("## Week 4 Lineup") for end in ends)
+    assert [end.telemetry.tool_calls for end in ends] == [1, 1]
+    if cassette.replaying:
+        assert elapsed < 0.4
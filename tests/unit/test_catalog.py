@@ -0,0 +1,174 @@
+"""Tests for the model catalog."""
+
+import json
+import sys
+
+import pytest
+
+from kraftbot.config.catalog import (
+    apply_openrouter_dump,
+    load_catalog,
+    load_openrouter_dump,
+)
+from kraftbot.config.settings import ModelConfig, Settings
+
+
+class TestLoadCatalog:
+    """Test loading catalogs from disk."""
+
+    def test_bundled_catalog(self):
+        """The bundled catalog has prices and context lengths."""
+        models = load_catalog()
+
+        assert "anthropic/claude-3.5-sonnet" in models
+        for config in models.values():
+            assert config.context_length
+            assert config.prompt_price is not None
+            assert config.completion_price is not None
+
+    def test_json_mapping(self, tmp_path):
+        """A mapping of name to entry is accepted, keeping file order."""
+        path = tmp_path / "models.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "b/model": {"provider": "B", "context_length": 8000},
+                    "a/model": {"prompt_price": 1.0, "completion_price": 2.0},
+                }
+            )
+        )
+
+        models = load_catalog(path)
+
+        assert list(models) == ["b/model", "a/model"]
+        assert models["a/model"].provider == "A"
+        assert models["b/model"].context_length == 8000
+
+    def test_toml(self, tmp_path):
+        """TOML catalogs use [[models]] tables."""
+        path = tmp_path / "models.toml"
+        path.write_text(
+            "[[models]]\n"
+            'name = "x/fast"\n'
+            'provider = "X"\n'
+            "context_length = 32000\n"
+            "prompt_price = 0.1\n"
+            "completion_price = 0.2\n"
+        )
+
+        models = load_catalog(path)
+
+        assert models["x/fast"].completion_price == 0.2
+
+    def test_toml_without_parser(self, tmp_path, monkeypatch, capsys):
+        """On Python 3.10 without tomli a TOML catalog is a ValueError, not a crash."""
+        path = tmp_path / "models.toml"
+        path.write_text('[[models]]\nname = "x/fast"\n')
+        monkeypatch.setattr(sys, "version_info", (3, 10, 0))
+        monkeypatch.setitem(sys.modules, "tomli", None)
+
+        with pytest.raises(ValueError, match="Python 3.11"):
+            load_catalog(path)
+
+        settings = Settings(model_catalog_file=str(path))
+        assert settings.available_models == load_catalog()
+        assert "Could not load model catalog" in capsys.readouterr().out
+
+    def test_missing_name(self, tmp_path):
+        """Entries without a name are rejected."""
+        path = tmp_path / "models.json"
+        path.write_text(json.dumps({"models": [{"provider": "X"}]}))
+
+        with pytest.raises(ValueError):
+            load_catalog(path)
+
+    def test_bad_catalog_falls_back(self, tmp_path, capsys):
+        """Settings fall back to the bundled catalog if the file is broken."""
+        path = tmp_path / "models.json"
+        path.write_text("{not json")
+
+        settings = Settings(model_catalog_file=str(path))
+
+        assert settings.available_models == load_catalog()
+        assert "Could not load model catalog" in capsys.readouterr().out
+
+
+class TestOpenRouterDump:
+    """Test refreshing prices from an OpenRouter models list."""
+
+    def write_dump(self, tmp_path):
+        path = tmp_path / "openrouter_models.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "data": [
+                        {
+                            "id": "x/fast",
+                            "context_length": 64000,
+                            "pricing": {
+                                "prompt": "0.0000005",
+                                "completion": "0.0000015",
+                            },
+                        },
+                        {
+                            "id": "openrouter/auto",
+                            "pricing": {"prompt": "-1", "completion": "-1"},
+                        },
+                        {"id": "y/unlisted", "context_length": 1000},
+                    ]
+                }
+            )
+        )
+        return path
+
+    def test_load_dump(self, tmp_path):
+        """Per-token price strings become prices per million tokens."""
+        dump = load_openrouter_dump(self.write_dump(tmp_path))
+
+        assert dump["x/fast"] == {
+            "context_length": 64000,
+            "prompt_price": 0.5,
+            "completion_price": 1.5,
+        }
+        assert dump["openrouter/auto"]["prompt_price"] is None
+
+    def test_apply_dump_updates_catalog_models_only(self, tmp_path):
+        """Only catalog models are updated and unknown values are kept."""
+        models = {
+            "x/fast": ModelConfig(name="x/fast", provider="X", context_length=8000),
+            "openrouter/auto": ModelConfig(
+                name="openrouter/auto", provider="OpenRouter", prompt_price=9.0
+            ),
+        }
+
+        updated = apply_openrouter_dump(
+            models, load_openrouter_dump(self.write_dump(tmp_path))
+        )
+
+        assert updated == 2
+        assert models["x/fast"].context_length == 64000
+        assert models["x/fast"].prompt_price == 0.5
+        assert models["openrouter/auto"].prompt_price == 9.0
+        assert "y/unlisted" not in models
+
+    def test_load_catalog_with_dump(self, tmp_path):
+        """load_catalog applies a dump when one exists."""
+        catalog = tmp_path / "models.json"
+        catalog.write_text(json.dumps({"models": [{"name": "x/fast"}]}))
+
+        models = load_catalog(catalog, self.write_dump(tmp_path))
+        assert models["x/fast"].completion_price == 1.5
+
+        models = load_catalog(catalog, tmp_path / "missing.json")
+        assert models["x/fast"].completion_price is None
+
+
+def test_estimate_cost():
+    """Run cost comes from per-million-token prices."""
+    config = ModelConfig(
+        name="x/fast", provider="X", prompt_price=3.0, completion_price=15.0
+    )
+
+    assert config.estimate_cost(1_000_000, 0) == 3.0
+    assert config.estimate_cost(1000, 2000) == pytest.approx(0.033)
+    assert ModelConfig(name="y", provider="Y").estimate_cost(10, 10) is None
@@ -0,0 +1,110 @@
+"""Tests for the concurrent compare engine."""
+
+import asyncio
+import time
+
+import pytest
+
+from kraftbot.core.compare import CompareEngine
+from kraftbot.core.models import StreamEnd, StreamStart, TextDelta
+
+
+class FakeAgent:
+    """Minimal stand-in for PydanticAIAgent that streams a canned answer."""
+
+    active = 0
+    peak = 0
+
+    def __init__(self, model_name, mcp_manager=None, http_client=None, **kwargs):
+        self.model_name = model_name
+        self.mcp_manager = mcp_manager
+        self.http_client = http_client
+
+    async def stream_events(self, prompt, user_id="user", session_id="default"):
+        FakeAgent.active += 1
+        FakeAgent.peak = max(FakeAgent.peak, FakeAgent.active)
+        try:
+            if self.model_name == "broken":
+                raise RuntimeError("boom")
+            yield StreamStart(model_name=self.model_name, session_id=session_id)
+            await asyncio.sleep(0.1)
+            yield TextDelta(text=f"{self.model_name} says")
+            await asyncio.sleep(0.05)
+            yield TextDelta(text=" hello")
+            yield StreamEnd(
+                response=f"{self.model_name} says hello", usage={"total_tokens": 42}
+            )
+        finally:
+            FakeAgent.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_agent(monkeypatch):
+    """Reset counters and keep the engine away from real MCP servers."""
+    FakeAgent.active = 0
+    FakeAgent.peak = 0
+    monkeypatch.setattr(
+        "kraftbot.core.compare.load_default_mcp_servers", lambda m: None
+    )
+    agents = []
+
+    def factory(**kwargs):
+        agent = FakeAgent(**kwargs)
+        agents.append(agent)
+        return agent
+
+    yield factory, agents
+
+
+class TestCompareEngine:
+    """Test CompareEngine."""
+
+    def test_runs_models_concurrently(self, reset_fake_agent):
+        """All models run at once and take about as long as one."""
+        factory, _ = reset_fake_agent
+        engine = CompareEngine(["a", "b", "c"], concurrency=3, agent_factory=factory)
+
+        start = time.perf_counter()
+        results = asyncio.run(engine.run("hi"))
+        elapsed = time.perf_counter() - start
+
+        assert [r.model_name for r in results] == ["a", "b", "c"]
+        assert all(r.succeeded for r in results)
+        assert results[0].response == "a says hello"
+        assert results[0].total_tokens == 42
+        assert results[0].time_to_first_token is not None
+        assert FakeAgent.peak == 3
+        assert elapsed < 0.4
+
+    def test_concurrency_cap(self, reset_fake_agent):
+        """No more than the configured number of models run at once."""
+        factory, _ = reset_fake_agent
+        engine = CompareEngine(
+            ["a", "b", "c", "d"], concurrency=2, agent_factory=factory
+        )
+
+        asyncio.run(engine.run("hi"))
+
+        assert FakeAgent.peak == 2
+
+    def test_shared_resources(self, reset_fake_agent):
+        """Every agent receives the same MCP manager and HTTP client."""
+        factory, agents = reset_fake_agent
+        engine = CompareEngine(["a", "b"], agent_factory=factory)
+
+        asyncio.run(engine.run("hi"))
+
+        assert agents[0].mcp_manager is agents[1].mcp_manager
+        assert agents[0].http_client is agents[1].http_client
+
+    def test_errors_are_reported_per_model(self, reset_fake_agent):
+        """A failing model does not abort the rest of the comparison."""
+        factory, _ = reset_fake_agent
+        engine = CompareEngine(["broken", "ok"], agent_factory=factory)
+        completed = []
+
+        results = asyncio.run(engine.run("hi", on_complete=completed.append))
+
+        assert results[0].error == "boom"
+        assert results[1].succeeded
+        assert len(completed) == 2
@@ -0,0 +1,150 @@
+"""Tests for request deadlines, response token caps and tool timeouts."""
+
+import asyncio
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+
+from kraftbot.core.deadline import DeadlineExceeded, deadline_after, stream_until
+from kraftbot.core.models import StreamEnd, TextDelta
+from kraftbot.mcp.manager import MCPManager
+from kraftbot.mcp.timeout import TimeoutToolset, ToolTimeoutError
+from tests.unit.test_agent import collect, make_agent
+from tests.unit.test_mcp_cache import FakeToolset
+
+
+class TestStreamUntil:
+    """Test stream_until."""
+
+    def test_passes_items_through(self):
+        """A stream that finishes in time is unchanged."""
+
+        async def numbers():
+            for number in range(3):
+                yield number
+
+        async def run():
+            deadline = deadline_after(1.0)
+            return [item async for item in stream_until(numbers, deadline, 1.0)]
+
+        assert asyncio.run(run()) == [0, 1, 2]
+
+    def test_cancels_stream_at_deadline(self):
+        """The work behind the stream is cancelled, not just abandoned."""
+        log = []
+
+        async def hangs():
+            yield "first"
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                log.append("cancelled")
+                raise
+            yield "never"
+
+        async def run():
+            items = []
+            with pytest.raises(DeadlineExceeded, match="timed out after 0.05s"):
+                async for item in stream_until(hangs, deadline_after(0.05), 0.05):
+                    items.append(item)
+            return items
+
+        assert asyncio.run(run()) == ["first"]
+        assert log == ["cancelled"]
+
+
+class TestAgentDeadline:
+    """Test request_timeout and max_response_tokens in the agent."""
+
+    def test_stream_returns_partial_output(self, monkeypatch):
+        """A run past its deadline ends with the text produced so far."""
+        agent = make_agent(monkeypatch, [])
+        agent.request_timeout = 0.1
+
+        async def stalls(messages, info):
+            yield "Start Jefferson, "
+            await asyncio.sleep(5)
+            yield "bench Adams"
+
+        agent.agent = Agent(FunctionModel(stream_function=stalls))
+
+        events = collect(agent.stream_events("Who should I start?"))
+
+        deltas = "".join(e.text for e in events if isinstance(e, TextDelta))
+        assert deltas == "Start Jefferson, "
+        end = events[-1]
+        assert isinstance(end, StreamEnd)
+        assert end.timed_out
+        assert end.response == "Start Jefferson, "
+        assert "timed out" in end.error
+        assert agent.memory.has_history("default")
+
+    def test_run_times_out(self, monkeypatch):
+        """Non-streamed runs are cancelled at the deadline too."""
+        agent = make_agent(monkeypatch, [])
+        agent.request_timeout = 0.05
+
+        async def slow(messages, info):
+            await asyncio.sleep(5)
+            return ModelResponse(parts=[TextPart("too late")])
+
+        agent.agent = Agent(FunctionModel(slow))
+
+        response = asyncio.run(agent.run("Who should I start?"))
+
+        assert response.timed_out
+        assert "timed out" in response.response
+
+    def test_max_tokens_sent_with_every_request(self, monkeypatch):
+        """The response token budget reaches the model settings."""
+        from kraftbot.core.agent import PydanticAIAgent
+
+        monkeypatch.setattr("kraftbot.core.agent.settings.enable_mcp_server", False)
+        monkeypatch.setattr("kraftbot.core.agent.settings.max_response_tokens", 321)
+        agent = PydanticAIAgent(
+            openrouter_api_key="test",
+            model_name="test/model",
+            enable_logfire=False,
+            enable_cache=False,
+        )
+        seen = []
+
+        async def record(messages, info):
+            seen.append(info.model_settings)
+            yield "ok"
+
+        with agent.agent.override(model=FunctionModel(stream_function=record)):
+            collect(agent.stream_events("Hi"))
+
+        assert seen[0]["max_tokens"] == 321
+
+
+class TestToolTimeout:
+    """Test per-tool timeouts from MCPServerConfig.timeout."""
+
+    def test_hung_tool_times_out(self):
+        """A tool slower than its server's timeout is cancelled."""
+        toolset = TimeoutToolset(wrapped=FakeToolset(delay=5), timeout=0.05)
+
+        with pytest.raises(ToolTimeoutError, match="'get_rosters' timed out"):
+            asyncio.run(toolset.call_tool("get_rosters", {}, None, None))
+
+    def test_fast_tool_passes_through(self):
+        """Tools that answer in time are unaffected."""
+        toolset = TimeoutToolset(wrapped=FakeToolset(), timeout=1)
+
+        result = asyncio.run(toolset.call_tool("get_rosters", {}, None, None))
+
+        assert result == {"tool": "get_rosters", "call": 1}
+
+    def test_manager_applies_server_timeout(self):
+        """Servers are wrapped with their configured timeout."""
+        manager = MCPManager(enable_tool_cache=False)
+        manager.add_sse_server(url="http://localhost:9/sse", name="local", timeout=7)
+
+        (timed,) = manager.get_servers()
+        toolset = timed.wrapped.wrapped
+        assert isinstance(toolset, TimeoutToolset)
+        assert toolset.timeout == 7
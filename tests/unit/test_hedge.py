@@ -0,0 +1,145 @@
+"""Tests for hedged model requests."""
+
+import asyncio
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.models.function import FunctionModel
+
+from kraftbot.core.hedge import (
+    HedgeStats,
+    hedge_delay_for,
+    model_responded,
+    race_streams,
+)
+from kraftbot.core.models import StreamEnd, TextDelta
+from tests.unit.test_agent import collect, make_agent
+
+
+def stream(items, delay=0.0, fail=False, log=None, responded=False):
+    """Factory for a stream that waits, then yields items or fails."""
+
+    async def generate():
+        try:
+            if responded:
+                model_responded()  # e.g. the model asked for a tool first
+            await asyncio.sleep(delay)
+            if fail:
+                raise RuntimeError("upstream failed")
+            for item in items:
+                yield item
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append("cancelled")
+            raise
+
+    return generate
+
+
+def race(primary, backup, delay=0.05, stats=None):
+    async def run():
+        return [item async for item in race_streams(primary, backup, delay, stats)]
+
+    return asyncio.run(run())
+
+
+class TestRaceStreams:
+    """Test race_streams."""
+
+    def test_fast_primary_never_hedges(self):
+        """A primary that starts within the delay runs alone."""
+        stats = HedgeStats("x")
+
+        items = race(stream(["a", "b"]), stream(["backup"]), stats=stats)
+
+        assert items == [(0, "a"), (0, "b")]
+        assert (stats.requests, stats.fired, stats.won) == (1, 0, 0)
+
+    def test_slow_primary_loses_and_is_cancelled(self):
+        """The backup wins when it starts first, and the primary is cancelled."""
+        stats = HedgeStats("x")
+        log = []
+
+        items = race(
+            stream(["slow"], delay=1.0, log=log), stream(["fast"]), stats=stats
+        )
+
+        assert items == [(1, "fast")]
+        assert log == ["cancelled"]
+        assert (stats.fired, stats.won) == (1, 1)
+
+    def test_primary_can_still_win_after_hedge(self):
+        """A hedge that fires but starts later loses."""
+        stats = HedgeStats("x")
+
+        items = race(
+            stream(["primary"], delay=0.1), stream(["backup"], delay=1.0), stats=stats
+        )
+
+        assert items == [(0, "primary")]
+        assert (stats.fired, stats.won) == (1, 0)
+
+    def test_responded_primary_is_not_hedged(self):
+        """A primary busy with tool calls after responding is left to finish."""
+        stats = HedgeStats("x")
+
+        items = race(
+            stream(["primary"], delay=0.1, responded=True),
+            stream(["backup"]),
+            stats=stats,
+        )
+
+        assert items == [(0, "primary")]
+        assert stats.fired == 0
+
+    def test_error_before_hedge_is_raised(self):
+        """Errors are not hedged; they end the race straight away."""
+        with pytest.raises(RuntimeError):
+            race(stream([], fail=True), stream(["backup"]))
+
+    def test_backup_covers_failed_primary(self):
+        """Once hedged, a failing primary leaves the backup to answer."""
+        items = race(
+            stream([], delay=0.1, fail=True), stream(["backup"], delay=0.2), delay=0.05
+        )
+
+        assert items == [(1, "backup")]
+
+
+def test_delay_uses_first_response_not_first_token(monkeypatch, isolated_model_stats):
+    """Measured hedge delays leave out tool calls made before the first token."""
+    monkeypatch.setattr("kraftbot.core.hedge.settings.hedge_delay", 0)
+    for _ in range(3):
+        isolated_model_stats.record("x/tools", 5.0, 6.0, 10, 0.3)
+
+    assert hedge_delay_for("x/tools") == pytest.approx(0.3)
+
+
+def test_agent_hedges_slow_first_token(monkeypatch):
+    """A slow primary model is beaten by the backup model."""
+    monkeypatch.setattr("kraftbot.core.hedge.settings.hedge_delay", 0.05)
+    agent = make_agent(monkeypatch, [])
+
+    async def slow(messages, info):
+        await asyncio.sleep(5)
+        yield "slow answer"
+
+    async def fast(messages, info):
+        yield "fast "
+        yield "answer"
+
+    agent.agent = Agent(FunctionModel(stream_function=slow))
+    agent.hedge_model = FunctionModel(stream_function=fast)
+
+    events = collect(agent.stream_events("Is Davante Adams playing?"))
+
+    deltas = "".join(e.text for e in events if isinstance(e, TextDelta))
+    assert deltas == "fast answer"
+    end = events[-1]
+    assert isinstance(end, StreamEnd)
+    assert (end.response, end.usage, end.error) == (
+        "fast answer",
+        agent.last_usage,
+        None,
+    )
+    assert agent.memory.has_history("default")
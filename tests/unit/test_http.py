@@ -0,0 +1,84 @@
+"""Tests for the shared HTTP connection pool."""
+
+import asyncio
+
+from pydantic_ai import RunContext
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import FunctionModel
+
+from kraftbot.config.settings import settings
+from kraftbot.core.models import AgentDependencies
+from kraftbot.mcp.manager import MCPManager
+from kraftbot.utils.http import get_http_client, get_mcp_http_client
+
+
+class TestSharedClients:
+    """Test the HTTP client registry."""
+
+    def test_clients_are_shared(self):
+        """Repeated lookups return the same client over one pool."""
+        client = get_http_client()
+        mcp_client = get_mcp_http_client()
+
+        assert get_http_client() is client
+        assert client._transport._pool is mcp_client._transport._pool
+        assert mcp_client.timeout.read == settings.mcp_sse_read_timeout
+
+    def test_closing_is_ignored(self):
+        """Libraries closing the client don't break other users."""
+        client = get_http_client()
+
+        async def scenario():
+            async with client:
+                pass
+            await client.aclose()
+
+        asyncio.run(scenario())
+        assert not client.is_closed
+        assert get_http_client() is client
+
+    def test_mcp_servers_use_shared_client(self):
+        """SSE servers are built on the shared MCP client."""
+        manager = MCPManager(enable_tool_cache=False)
+        manager.add_sse_server(url="http://localhost:9/sse", name="local")
+
+        assert manager.get_server_by_name("local").http_client is (
+            get_mcp_http_client()
+        )
+
+
+class TestAgentHttpClient:
+    """Test that agents and tools get the shared client."""
+
+    def test_tools_receive_client_in_deps(self, monkeypatch):
+        """Tool code can reach the shared client through RunContext.deps."""
+        from pydantic_ai import Agent
+
+        from kraftbot.core.agent import PydanticAIAgent
+
+        monkeypatch.setattr("kraftbot.core.agent.settings.enable_mcp_server", False)
+        agent = PydanticAIAgent(
+            openrouter_api_key="test",
+            model_name="test/model",
+            enable_logfire=False,
+            enable_cache=False,
+        )
+        assert agent.http_client is get_http_client()
+
+        def respond(messages, info):
+            if isinstance(messages[-1].parts[-1], ToolReturnPart):
+                return ModelResponse(parts=[TextPart(messages[-1].parts[-1].content)])
+            return ModelResponse(parts=[ToolCallPart("client_info", {})])
+
+        agent.agent = Agent(FunctionModel(respond), deps_type=AgentDependencies)
+        seen = []
+
+        @agent.agent.tool
+        def client_info(ctx: RunContext[AgentDependencies]) -> str:
+            seen.append(ctx.deps)
+            return ctx.deps.user_id
+
+        response = asyncio.run(agent.run("q", user_id="manager-7"))
+
+        assert response.response == "manager-7"
+        assert seen[0].http_client is get_http_client()
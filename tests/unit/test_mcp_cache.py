@@ -0,0 +1,160 @@
+"""Tests for the MCP tool result cache."""
+
+import asyncio
+import time
+
+from kraftbot.mcp.cache import CachingToolset, canonicalize_args, shared_tool_calls
+from kraftbot.mcp.circuit import CircuitBreakerToolset
+from kraftbot.mcp.manager import MCPManager
+from kraftbot.utils.cache import TieredCache
+
+
+class FakeToolset:
+    """Stand-in for an MCP server that counts tool calls."""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    async def call_tool(self, name, tool_args, ctx, tool):
+        self.calls.append((name, tool_args))
+        await asyncio.sleep(self.delay)
+        return {"tool": name, "call": len(self.calls)}
+
+
+def make_toolset(**kwargs):
+    """Build a caching wrapper around a fake toolset."""
+    wrapped = FakeToolset(delay=kwargs.pop("delay", 0.0))
+    toolset = CachingToolset(
+        wrapped=wrapped,
+        server_name="fake",
+        store=TieredCache("mcp_tools"),
+        tool_prefix="tokenbowl",
+        **kwargs,
+    )
+    return toolset, wrapped
+
+
+class TestCachingToolset:
+    """Test CachingToolset."""
+
+    def test_canonicalize_args(self):
+        """Argument order does not change the canonical form."""
+        assert canonicalize_args({"b": 1, "a": 2}) == canonicalize_args(
+            {"a": 2, "b": 1}
+        )
+
+    def test_repeated_calls_hit_cache(self):
+        """Identical calls only reach the server once."""
+        toolset, wrapped = make_toolset()
+
+        async def scenario():
+            first = await toolset.call_tool(
+                "tokenbowl_get_league", {"id": 1}, None, None
+            )
+            second = await toolset.call_tool(
+                "tokenbowl_get_league", {"id": 1}, None, None
+            )
+            other = await toolset.call_tool(
+                "tokenbowl_get_league", {"id": 2}, None, None
+            )
+            return first, second, other
+
+        first, second, other = asyncio.run(scenario())
+        assert first == second
+        assert other != first
+        assert len(wrapped.calls) == 2
+
+    def test_per_tool_ttl_zero_disables_cache(self):
+        """Tools configured with a TTL of 0 are never cached."""
+        toolset, wrapped = make_toolset(tool_ttls={"get_trending": 0})
+
+        async def scenario():
+            for _ in range(2):
+                await toolset.call_tool("tokenbowl_get_trending", {}, None, None)
+
+        asyncio.run(scenario())
+        assert len(wrapped.calls) == 2
+
+    def test_concurrent_calls_are_deduplicated(self):
+        """Concurrent identical calls share one in-flight request."""
+        toolset, wrapped = make_toolset(delay=0.05)
+
+        async def scenario():
+            return await asyncio.gather(
+                *(
+                    toolset.call_tool("tokenbowl_get_players", {}, None, None)
+                    for _ in range(5)
+                )
+            )
+
+        results = asyncio.run(scenario())
+        assert len(wrapped.calls) == 1
+        assert all(result == results[0] for result in results)
+
+    def test_stale_while_revalidate(self):
+        """Stale entries are served immediately and refreshed in the background."""
+        toolset, wrapped = make_toolset(default_ttl=0.01, stale_ttl=60)
+
+        async def scenario():
+            first = await toolset.call_tool("tokenbowl_get_rosters", {}, None, None)
+            time.sleep(0.02)
+            stale = await toolset.call_tool("tokenbowl_get_rosters", {}, None, None)
+            await asyncio.sleep(0.01)
+            return first, stale
+
+        first, stale = asyncio.run(scenario())
+        assert stale == first
+        assert len(wrapped.calls) == 2
+
+    def test_uncached_tools_shared_between_hedged_runs(self):
+        """Inside shared_tool_calls, TTL 0 tools run once per argument set."""
+        toolset, wrapped = make_toolset(tool_ttls={"get_trending": 0}, delay=0.01)
+
+        async def run():
+            return await toolset.call_tool("tokenbowl_get_trending", {}, None, None)
+
+        async def scenario():
+            with shared_tool_calls():
+                # Two concurrent runs, as in a hedged request
+                hedged = await asyncio.gather(
+                    asyncio.create_task(run()), asyncio.create_task(run())
+                )
+            return hedged, await run()
+
+        hedged, later = asyncio.run(scenario())
+        assert hedged[0] == hedged[1]
+        # Outside the block the tool is uncached again
+        assert later != hedged[0]
+        assert len(wrapped.calls) == 2
+
+
+class TestMCPManagerToolCache:
+    """Test that the manager wraps servers in the cache."""
+
+    def test_servers_are_wrapped(self):
+        """Registered servers are exposed to agents through the cache."""
+        manager = MCPManager(enable_tool_cache=True, tool_cache=TieredCache("t"))
+        manager.add_sse_server(
+            url="http://localhost:9/sse",
+            tool_prefix="local",
+            name="local",
+            tool_cache_ttls={"get_rosters": 60},
+        )
+
+        (timed,) = manager.get_servers()
+        breaker = timed.wrapped
+        assert isinstance(breaker, CircuitBreakerToolset)
+        toolset = breaker.wrapped
+        assert isinstance(toolset, CachingToolset)
+        # The cache sits in front of the per-call timeout
+        assert toolset.wrapped.wrapped is manager.get_server_by_name("local")
+        assert toolset.ttl_for("local_get_rosters") == 60
+
+    def test_cache_can_be_disabled(self):
+        """Without the cache, agents get the raw server."""
+        manager = MCPManager(enable_tool_cache=False)
+        manager.add_sse_server(url="http://localhost:9/sse", name="local")
+
+        (timed,) = manager.get_servers()
+        assert not isinstance(timed.wrapped.wrapped, CachingToolset)
@@ -0,0 +1,287 @@
+"""Tests for MCP health checks and circuit breaking."""
+
+import asyncio
+import time
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+from pydantic_ai.toolsets import FunctionToolset
+
+from kraftbot.config.settings import settings
+from kraftbot.mcp.circuit import CircuitBreakerToolset
+from kraftbot.mcp.health import CircuitBreaker, ServerHealth, load_health
+from kraftbot.mcp.manager import MCPManager
+from kraftbot.mcp.servers import MCPServerConfig, MCPTransportType
+from kraftbot.utils.cache import TieredCache
+from tests.unit.test_mcp_manager import FakeToolServer
+
+
+class DownServer(FakeToolServer):
+    """Fake server that refuses connections."""
+
+    def __init__(self):
+        super().__init__([])
+
+    async def __aenter__(self):
+        self.opened += 1
+        raise ConnectionRefusedError("connection refused")
+
+
+class FlakyServer(FakeToolServer):
+    """Fake server that refuses its first connection."""
+
+    def __init__(self):
+        super().__init__(["get_rosters"])
+
+    async def __aenter__(self):
+        self.opened += 1
+        if self.opened == 1:
+            raise ConnectionRefusedError("connection refused")
+        return self
+
+
+class DownToolset(FunctionToolset):
+    """Toolset whose server refuses connections."""
+
+    async def __aenter__(self):
+        raise ConnectionRefusedError("connection refused")
+
+
+def make_health_manager(servers, store=None):
+    """Create a manager with fake servers and in-memory stores."""
+    manager = MCPManager(
+        enable_tool_cache=False,
+        tool_index_cache=TieredCache("t"),
+        health_store=store or TieredCache("h"),
+    )
+    for name, server in servers.items():
+        config = MCPServerConfig(
+            name=name, transport_type=MCPTransportType.STDIO, command=name
+        )
+        manager._register(name, server, config)
+    return manager
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state changes."""
+
+    def test_opens_after_threshold_and_half_opens(self):
+        """Consecutive failures open the circuit until the reset timeout."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.available
+
+        time.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.available
+
+        # A failed trial reopens at once; a success closes
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_one_trial(self):
+        """Only one caller gets through a half-open circuit until it reports."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        assert [breaker.allow_request() for _ in range(3)] == [True, False, False]
+        breaker.record_success()
+        assert breaker.allow_request()
+
+    def test_trip_opens_immediately(self):
+        """A tripped breaker opens without reaching the threshold."""
+        breaker = CircuitBreaker(failure_threshold=5)
+        breaker.record_failure(trip=True)
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestCircuitBreakerToolset:
+    """Test leaving failing servers out of runs."""
+
+    def test_open_circuit_hides_server(self):
+        """An open server is neither entered nor offers tools."""
+        server = FakeToolServer(["get_rosters"])
+        health = ServerHealth("sleeper", CircuitBreaker())
+        health.record_failure("down", trip=True)
+        toolset = CircuitBreakerToolset(wrapped=server, health=health)
+
+        async def scenario():
+            async with toolset:
+                return await toolset.get_tools(None)
+
+        assert asyncio.run(scenario()) == {}
+        assert server.opened == 0
+        assert server.closed == 0
+
+    def test_half_open_lets_one_run_through(self):
+        """Concurrent runs on a half-open server: one trial, the rest skip it."""
+        server = FakeToolServer(["get_rosters"])
+        health = ServerHealth(
+            "sleeper", CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        )
+        health.record_failure("down")
+        time.sleep(0.06)
+        toolset = CircuitBreakerToolset(wrapped=server, health=health)
+        all_entered = asyncio.Event()
+        entered = []
+
+        async def run():
+            async with toolset:
+                entered.append(None)
+                if len(entered) == 3:
+                    all_entered.set()
+                await all_entered.wait()
+                return len(await toolset.get_tools(None))
+
+        async def scenario():
+            return await asyncio.gather(run(), run(), run())
+
+        assert sorted(asyncio.run(scenario())) == [0, 0, 1]
+        assert server.opened == 1
+        assert health.breaker.state == CircuitBreaker.CLOSED
+
+    def test_connection_failure_trips(self):
+        """A server that can't be entered is skipped and its circuit opened."""
+        server = DownServer()
+        health = ServerHealth("sleeper", CircuitBreaker(failure_threshold=3))
+        toolset = CircuitBreakerToolset(wrapped=server, health=health)
+
+        async def scenario():
+            async with toolset:
+                pass
+
+        asyncio.run(scenario())
+        assert health.breaker.state == CircuitBreaker.OPEN
+        assert health.last_error == "connection refused"
+        assert server.closed == 0
+
+    def test_exits_match_their_own_runs(self):
+        """A run that skipped the server never exits another run's enter."""
+        server = FakeToolServer(["get_rosters"])
+        health = ServerHealth("sleeper", CircuitBreaker())
+        toolset = CircuitBreakerToolset(wrapped=server, health=health)
+        tripped = asyncio.Event()
+        skipped_entered = asyncio.Event()
+        entered_done = asyncio.Event()
+
+        async def entered_run():
+            async with toolset:
+                health.record_failure("down", trip=True)
+                tripped.set()
+                await skipped_entered.wait()
+            # This run's exit closes the server it entered
+            assert server.closed == 1
+            entered_done.set()
+
+        async def skipped_run():
+            await tripped.wait()
+            async with toolset:
+                assert await toolset.get_tools(None) == {}
+                skipped_entered.set()
+                await entered_done.wait()
+
+        async def scenario():
+            await asyncio.gather(entered_run(), skipped_run())
+
+        asyncio.run(scenario())
+        assert server.opened == 1
+        assert server.closed == 1
+
+    def test_agent_runs_without_down_server(self):
+        """Runs degrade instead of failing when a server is down."""
+        health = ServerHealth("sleeper", CircuitBreaker())
+        agent = Agent(
+            FunctionModel(lambda messages, info: ModelResponse([TextPart("ok")])),
+            toolsets=[CircuitBreakerToolset(wrapped=DownToolset(), health=health)],
+        )
+
+        assert agent.run_sync("Start?").output == "ok"
+        assert not health.breaker.available
+
+
+class TestMCPManagerHealth:
+    """Test health probes and breakers in the manager."""
+
+    def test_failed_connection_opens_circuit(self):
+        """Servers that fail to connect are reported and left out."""
+        manager = make_health_manager(
+            {"down": DownServer(), "up": FakeToolServer(["get_rosters"])}
+        )
+
+        async def scenario():
+            async with manager:
+                return {info.name: info for info in manager.get_all_server_info()}
+
+        infos = asyncio.run(scenario())
+        assert infos["down"].circuit == "open"
+        assert infos["down"].status == "error"
+        assert infos["up"].circuit == "closed"
+        down_toolset = manager._toolsets["down"].wrapped
+        assert not down_toolset.available
+
+    def test_check_health_probes_concurrently(self):
+        """Probes run at once and record latency percentiles and snapshots."""
+        store = TieredCache("h")
+        servers = {
+            "sleeper": FakeToolServer(["get_rosters"], delay=0.1),
+            "espn": FakeToolServer([], delay=0.1, error=RuntimeError("bad gateway")),
+        }
+        manager = make_health_manager(servers, store)
+
+        start = time.perf_counter()
+        asyncio.run(manager.check_health())
+
+        assert time.perf_counter() - start < 0.18
+        info = manager.get_server_info("sleeper")
+        assert info.latency_p50_ms == pytest.approx(100, abs=50)
+        assert info.last_check is not None
+        espn = manager.get_server_health("espn")
+        assert espn.probe_failures == 1
+        assert espn.breaker.state == "closed"
+        assert manager.get_server_info("espn").error_message == "bad gateway"
+
+        snapshot = load_health(store, manager._configs["sleeper"])
+        assert snapshot["circuit"] == "closed"
+        assert snapshot["probes"] == 1
+
+    def test_open_servers_are_not_probed(self):
+        """Probes skip open circuits until they are half open."""
+        server = FakeToolServer(["get_rosters"])
+        manager = make_health_manager({"sleeper": server})
+        manager.get_server_health("sleeper").record_failure("down", trip=True)
+
+        asyncio.run(manager.check_health())
+
+        assert server.listed == 0
+
+    def test_recovered_server_rejoins_sessions(self, monkeypatch):
+        """A server that failed to connect is held open again once it recovers."""
+        monkeypatch.setattr(settings, "mcp_health_interval", 0.02)
+        monkeypatch.setattr(settings, "mcp_breaker_reset", 0.02)
+        server = FlakyServer()
+        manager = make_health_manager({"sleeper": server})
+
+        async def scenario():
+            async with manager:
+                assert manager.get_server_info("sleeper").circuit == "open"
+                for _ in range(100):
+                    if "sleeper" in manager._connected:
+                        break
+                    await asyncio.sleep(0.02)
+                return manager.get_server_info("sleeper")
+
+        info = asyncio.run(scenario())
+        assert info.status == "connected"
+        assert info.circuit == "closed"
+        # Every enter but the refused first one was closed again on exit
+        assert server.opened >= 3
+        assert server.closed == server.opened - 1
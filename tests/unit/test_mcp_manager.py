@@ -0,0 +1,218 @@
+"""Tests for MCP manager session handling."""
+
+import asyncio
+import time
+
+import anyio
+from mcp.types import Tool
+
+from kraftbot.mcp.manager import MCPManager, is_connection_error
+from kraftbot.mcp.servers import MCPServerConfig, MCPTransportType
+from kraftbot.utils.cache import TieredCache
+
+
+class FakeServer:
+    """Async context manager that counts how often it is opened."""
+
+    def __init__(self):
+        self.opened = 0
+        self.closed = 0
+
+    async def __aenter__(self):
+        self.opened += 1
+        return self
+
+    async def __aexit__(self, *args):
+        self.closed += 1
+
+
+def make_manager():
+    """Create a manager holding a single fake server."""
+    manager = MCPManager()
+    server = FakeServer()
+    manager._servers["fake"] = server
+    return manager, server
+
+
+class TestMCPManagerSessions:
+    """Test persistent MCP sessions."""
+
+    def test_connect_opens_once(self):
+        """Nested connects share one session until the last disconnect."""
+        manager, server = make_manager()
+
+        async def scenario():
+            async with manager:
+                async with manager:
+                    assert manager.is_connected
+                    assert server.opened == 1
+                assert manager.is_connected
+                assert server.closed == 0
+            assert not manager.is_connected
+
+        asyncio.run(scenario())
+        assert server.opened == 1
+        assert server.closed == 1
+
+    def test_reconnect(self):
+        """Reconnecting closes and re-opens every server."""
+        manager, server = make_manager()
+
+        async def scenario():
+            async with manager:
+                await manager.reconnect()
+                assert manager.is_connected
+
+        asyncio.run(scenario())
+        assert server.opened == 2
+        assert server.closed == 2
+
+    def test_reconnect_without_session_is_noop(self):
+        """Reconnect does nothing when no session is held."""
+        manager, server = make_manager()
+
+        asyncio.run(manager.reconnect())
+        assert server.opened == 0
+
+    def test_is_connection_error(self):
+        """Connection errors are detected even when wrapped."""
+        assert is_connection_error(anyio.ClosedResourceError())
+        assert not is_connection_error(ValueError("bad args"))
+
+        try:
+            try:
+                raise ConnectionResetError("reset")
+            except ConnectionResetError as inner:
+                raise RuntimeError("run failed") from inner
+        except RuntimeError as outer:
+            assert is_connection_error(outer)
+
+
+class FakeToolServer(FakeServer):
+    """Fake server that lists tools after a delay."""
+
+    def __init__(self, tools, delay=0.0, error=None):
+        super().__init__()
+        self.tools = tools
+        self.delay = delay
+        self.error = error
+        self.listed = 0
+
+    async def list_tools(self):
+        self.listed += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [
+            Tool(name=name, description=f"{name} tool", inputSchema={"type": "object"})
+            for name in self.tools
+        ]
+
+    async def get_tools(self, ctx):
+        return {name: None for name in self.tools}
+
+
+def make_discovery_manager(store, servers, version=None):
+    """Create a manager with fake tool servers and a shared index store."""
+    manager = MCPManager(enable_tool_cache=False, tool_index_cache=store)
+    for name, server in servers.items():
+        config = MCPServerConfig(
+            name=name,
+            transport_type=MCPTransportType.STDIO,
+            command=name,
+            tool_prefix=name,
+            version=version,
+        )
+        manager._register(name, server, config)
+    return manager
+
+
+class TestToolDiscovery:
+    """Test MCP tool discovery and the tool index."""
+
+    def test_refresh_lists_servers_concurrently(self):
+        """Every server is queried at once and indexed under prefixed names."""
+        servers = {
+            "sleeper": FakeToolServer(["get_rosters", "get_players"], delay=0.2),
+            "espn": FakeToolServer(["get_scores"], delay=0.2),
+        }
+        manager = make_discovery_manager(TieredCache("t"), servers)
+        assert manager.get_available_tools() == []
+
+        start = time.perf_counter()
+        counts = asyncio.run(manager.refresh_tools())
+
+        assert time.perf_counter() - start < 0.35
+        assert counts == {"sleeper": 2, "espn": 1}
+        assert sorted(manager.get_available_tools()) == [
+            "espn_get_scores",
+            "sleeper_get_players",
+            "sleeper_get_rosters",
+        ]
+        entry = manager.tool_index.get("sleeper_get_rosters")
+        assert entry.server == "sleeper"
+        assert entry.schema == {"type": "object"}
+        info = manager.get_server_info("sleeper")
+        assert info.tools_count == 2
+        assert info.last_refresh is not None
+        assert info.status == "disconnected"
+
+    def test_cold_start_uses_cached_tools(self):
+        """A new manager indexes cached tools without asking the server."""
+        store = TieredCache("t")
+        asyncio.run(
+            make_discovery_manager(
+                store, {"sleeper": FakeToolServer(["get_rosters"])}
+            ).refresh_tools()
+        )
+
+        server = FakeToolServer(["get_rosters"])
+        manager = make_discovery_manager(store, {"sleeper": server})
+
+        async def scenario():
+            async with manager:
+                await manager.wait_for_discovery()
+                return manager.get_server_info("sleeper")
+
+        info = asyncio.run(scenario())
+        assert manager.get_available_tools() == ["sleeper_get_rosters"]
+        assert manager.tool_index.sources["sleeper"] == "cache"
+        assert server.listed == 0
+        assert info.tools_count == 1
+
+        upgraded = make_discovery_manager(
+            store, {"sleeper": FakeToolServer(["get_rosters"])}, version="2"
+        )
+        assert upgraded.get_available_tools() == []
+
+    def test_connect_discovers_in_background(self):
+        """Opening sessions refreshes servers that were never discovered."""
+        server = FakeToolServer(["get_rosters"])
+        manager = make_discovery_manager(TieredCache("t"), {"sleeper": server})
+
+        async def scenario():
+            async with manager:
+                await manager.wait_for_discovery()
+                return manager.get_server_info("sleeper")
+
+        info = asyncio.run(scenario())
+        assert server.listed == 1
+        assert info.tools_count == 1
+
+    def test_failed_refresh_keeps_cached_tools(self):
+        """A server that fails to list keeps its tools and reports the error."""
+        store = TieredCache("t")
+        asyncio.run(
+            make_discovery_manager(
+                store, {"sleeper": FakeToolServer(["get_rosters"])}
+            ).refresh_tools()
+        )
+        manager = make_discovery_manager(
+            store,
+            {"sleeper": FakeToolServer([], error=RuntimeError("server down"))},
+        )
+
+        assert asyncio.run(manager.refresh_tools()) == {}
+        info = manager.get_server_info("sleeper")
+        assert info.tools_count == 1
+        assert info.error_message == "server down"
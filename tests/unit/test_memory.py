@@ -0,0 +1,107 @@
+"""Tests for token-budgeted conversation memory."""
+
+from pydantic_ai.messages import (
+    ModelRequest,
+    ModelResponse,
+    SystemPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from kraftbot.core.memory import COMPACTED_MARKER, ConversationMemory, split_turns
+
+
+def make_turn(question, tool_result=None, system_prompt=None):
+    """Build the messages for one user turn, optionally with a tool call."""
+    request_parts = [UserPromptPart(content=question)]
+    if system_prompt:
+        request_parts.insert(0, SystemPromptPart(content=system_prompt))
+    messages = [ModelRequest(parts=request_parts)]
+
+    if tool_result is not None:
+        messages.append(
+            ModelResponse(
+                parts=[ToolCallPart(tool_name="get_rosters", args={}, tool_call_id="1")]
+            )
+        )
+        messages.append(
+            ModelRequest(
+                parts=[
+                    ToolReturnPart(
+                        tool_name="get_rosters", content=tool_result, tool_call_id="1"
+                    )
+                ]
+            )
+        )
+
+    messages.append(ModelResponse(parts=[TextPart(content=f"answer to {question}")]))
+    return messages
+
+
+class TestConversationMemory:
+    """Test ConversationMemory."""
+
+    def test_split_turns(self):
+        """Tool calls and returns stay in the turn that made them."""
+        messages = make_turn("q1", tool_result="data") + make_turn("q2")
+        turns = split_turns(messages)
+
+        assert [len(turn) for turn in turns] == [4, 2]
+
+    def test_sessions_are_isolated(self):
+        """Each session id has its own history."""
+        memory = ConversationMemory(token_budget=10000)
+        memory.save("a", make_turn("q1"))
+
+        assert len(memory.get_history("a")) == 2
+        assert memory.get_history("b") == []
+
+    def test_old_tool_returns_are_compacted(self):
+        """Tool results from earlier turns are replaced with summaries."""
+        memory = ConversationMemory(token_budget=100000, summary_chars=20)
+        big_result = "x" * 5000
+        memory.save(
+            "a", make_turn("q1", tool_result=big_result) + make_turn("q2", big_result)
+        )
+
+        history = memory.get_history("a")
+        first_return = history[2].parts[0]
+        last_return = history[6].parts[0]
+        assert first_return.content.startswith(COMPACTED_MARKER)
+        assert len(first_return.content) < 200
+        assert last_return.content == big_result
+
+    def test_trims_to_budget_and_keeps_system_prompt(self):
+        """The oldest turns are dropped but the system prompt is carried over."""
+        memory = ConversationMemory(token_budget=60)
+        messages = make_turn("q0", system_prompt="be helpful")
+        for i in range(1, 20):
+            messages += make_turn(f"question number {i} " + "padding " * 5)
+        memory.save("a", messages)
+
+        history = memory.get_history("a")
+        assert len(history) < len(messages)
+        assert isinstance(history[0].parts[0], SystemPromptPart)
+        assert history[0].parts[0].content == "be helpful"
+        assert isinstance(history[0].parts[1], UserPromptPart)
+        assert memory.estimate_tokens("a") <= 60 or len(split_turns(history)) == 1
+
+    def test_record_exchange(self):
+        """Exchanges served without the model are remembered with the system prompt."""
+        memory = ConversationMemory(token_budget=10000)
+        memory.record_exchange("a", "system", "question", "answer")
+
+        history = memory.get_history("a")
+        assert isinstance(history[0].parts[0], SystemPromptPart)
+        assert history[1].parts[0].content == "answer"
+
+    def test_max_sessions(self):
+        """The least recently used session is dropped past the limit."""
+        memory = ConversationMemory(token_budget=10000, max_sessions=2)
+        for session_id in ("a", "b", "c"):
+            memory.save(session_id, make_turn("q"))
+
+        assert not memory.has_history("a")
+        assert memory.has_history("c")
@@ -0,0 +1,155 @@
+"""Tests for the local OpenTelemetry metrics exporter."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from kraftbot.core.models import RunTelemetry
+from kraftbot.mcp.metrics import TimedToolset
+from kraftbot.server.app import create_app
+from kraftbot.utils.metrics import LocalMetrics
+from tests.unit.test_mcp_cache import FakeToolset, make_toolset
+from tests.unit.test_server import make_pool
+
+
+@pytest.fixture
+def local_metrics(monkeypatch):
+    """A fresh process-wide LocalMetrics."""
+    metrics = LocalMetrics()
+    monkeypatch.setattr("kraftbot.utils.metrics._local_metrics", metrics)
+    yield metrics
+    metrics.shutdown()
+
+
+def make_run(**kwargs) -> RunTelemetry:
+    """Build a finished run."""
+    values = dict(
+        model_name="test/model",
+        system_prompt_hash="abc",
+        started_at=time.time(),
+        time_to_first_token=0.3,
+        duration=1.2,
+        input_tokens=100,
+        output_tokens=40,
+        cache_read_tokens=80,
+    )
+    values.update(kwargs)
+    return RunTelemetry(**values)
+
+
+class TestLocalMetrics:
+    """Test LocalMetrics recording and Prometheus rendering."""
+
+    def test_runs_render_as_prometheus(self, local_metrics):
+        """Runs become counters and latency histograms."""
+        local_metrics.record_run(make_run())
+        local_metrics.record_run(make_run(cached=True))
+        local_metrics.record_run(make_run(error="boom"))
+
+        text = local_metrics.prometheus_text()
+
+        assert "# TYPE kraftbot_runs_total counter" in text
+        assert (
+            'kraftbot_runs_total{model="test/model",status="ok",cached="false"} 1'
+            in text
+        )
+        assert 'cached="true"} 1' in text
+        assert 'status="error",cached="false"} 1' in text
+        assert "# TYPE kraftbot_run_duration_seconds histogram" in text
+        assert (
+            'kraftbot_run_duration_seconds_bucket{model="test/model",status="ok",'
+            'le="1.0"} 0' in text
+        )
+        assert (
+            'kraftbot_run_duration_seconds_bucket{model="test/model",status="ok",'
+            'le="2.5"} 1' in text
+        )
+        assert 'kraftbot_tokens_total{model="test/model",type="cache_read"} 160' in text
+
+    def test_label_values_are_escaped(self, local_metrics):
+        """Quotes in tool names can't break the exposition format."""
+        local_metrics.record_tool_call('say "hi"', 0.01)
+
+        assert 'tool="say \\"hi\\""' in local_metrics.prometheus_text()
+
+    def test_file_export_writes_otlp_json(self, tmp_path):
+        """The file exporter appends OTLP JSON lines on its own thread."""
+        path = tmp_path / "metrics.jsonl"
+        metrics = LocalMetrics(export_file=str(path), export_interval=60)
+        metrics.record_run(make_run())
+
+        metrics.shutdown()
+
+        (line,) = path.read_text().splitlines()
+        names = [
+            metric["name"]
+            for resource in json.loads(line)["resourceMetrics"]
+            for scope in resource["scopeMetrics"]
+            for metric in scope["metrics"]
+        ]
+        assert "kraftbot.runs" in names
+        assert "kraftbot.run.duration" in names
+
+
+class TestToolMetrics:
+    """Test that MCP tool calls and cache lookups are counted."""
+
+    def test_tool_calls_are_recorded(self, local_metrics):
+        """Successful and failed calls are counted with their latency."""
+        toolset = TimedToolset(wrapped=FakeToolset())
+
+        asyncio.run(toolset.call_tool("get_rosters", {}, None, None))
+        with pytest.raises(AttributeError):
+            asyncio.run(
+                TimedToolset(wrapped=object()).call_tool("get_rosters", {}, None, None)
+            )
+
+        text = local_metrics.prometheus_text()
+        assert 'kraftbot_mcp_tool_calls_total{tool="get_rosters",status="ok"} 1' in text
+        assert (
+            'kraftbot_mcp_tool_calls_total{tool="get_rosters",status="error"} 1' in text
+        )
+        assert 'kraftbot_mcp_tool_duration_seconds_count{tool="get_rosters"} 2' in text
+
+    def test_tool_cache_hits_and_misses(self, local_metrics):
+        """The tool result cache reports its hit rate."""
+        toolset, _ = make_toolset(default_ttl=60)
+
+        async def run():
+            await toolset.call_tool("get_rosters", {}, None, None)
+            await toolset.call_tool("get_rosters", {}, None, None)
+
+        asyncio.run(run())
+
+        text = local_metrics.prometheus_text()
+        assert 'kraftbot_mcp_tool_cache_total{result="miss"} 1' in text
+        assert 'kraftbot_mcp_tool_cache_total{result="hit"} 1' in text
+
+
+class TestMetricsEndpoint:
+    """Test GET /metrics in serve mode."""
+
+    def test_serves_prometheus_text(self, local_metrics):
+        """Recorded metrics are exposed for scraping."""
+        local_metrics.record_run(make_run())
+
+        with TestClient(create_app(make_pool())) as client:
+            response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "kraftbot_runs_total" in response.text
+
+    def test_disabled_returns_404(self, monkeypatch):
+        """No metrics are served when export is turned off."""
+        monkeypatch.setattr(
+            "kraftbot.utils.metrics.settings.enable_metrics_export", False
+        )
+
+        with TestClient(create_app(make_pool())) as client:
+            response = client.get("/metrics")
+
+        assert response.status_code == 404
@@ -0,0 +1,127 @@
+"""Tests for measured model latency stats."""
+
+import asyncio
+import json
+
+import pytest
+
+from kraftbot.core.model_stats import ModelStatsStore, percentile
+
+
+def test_percentile():
+    """Percentiles interpolate between samples."""
+    assert percentile([], 0.5) is None
+    assert percentile([3.0], 0.95) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 0.5) == 2.5
+    assert percentile(list(range(101)), 0.95) == pytest.approx(95.0)
+
+
+class TestModelStatsStore:
+    """Test recording and summarising runs."""
+
+    def test_record_and_summarise(self, tmp_path):
+        """Summaries report p50/p95 TTFT and generation throughput."""
+        store = ModelStatsStore(tmp_path / "stats.jsonl")
+        for ttft in [0.1, 0.2, 0.3, 0.4, 1.0]:
+            store.record("x/fast", ttft, ttft + 1.0, 100)
+        store.record("y/slow", None, 2.0, 0)
+
+        stats = store.summaries()
+
+        fast = stats["x/fast"]
+        assert fast.runs == 5
+        assert fast.ttft_p50 == pytest.approx(0.3)
+        assert fast.ttft_p95 == pytest.approx(0.88)
+        # 100 tokens over the one second after the first token
+        assert fast.tokens_per_second_p50 == pytest.approx(100.0)
+        assert stats["y/slow"].ttft_p50 is None
+        assert stats["y/slow"].tokens_per_second_p50 is None
+
+    def test_keeps_recent_samples(self, tmp_path):
+        """Only the most recent runs count, and old lines are compacted away."""
+        path = tmp_path / "stats.jsonl"
+        store = ModelStatsStore(path, max_samples=3)
+        for ttft in range(200):
+            store.record("x/fast", float(ttft), ttft + 1.0, 10)
+
+        stats = store.summaries()["x/fast"]
+
+        assert stats.runs == 3
+        assert stats.ttft_p50 == 198.0
+        assert len(path.read_text().splitlines()) <= 2 * 3 + 100
+        assert ModelStatsStore(path, max_samples=3).summary("x/fast") == stats
+
+    def test_lookups_stay_in_memory(self, tmp_path):
+        """After the first read, summaries come from memory and follow record()."""
+        path = tmp_path / "stats.jsonl"
+        store = ModelStatsStore(path)
+        store.record("x/fast", 0.5, 1.5, 10)
+        path.unlink()
+
+        assert store.summary("x/fast").runs == 1
+        store.record("x/fast", 0.7, 1.7, 10)
+        assert store.summary("x/fast").runs == 2
+        assert store.summary("y/unknown") is None
+
+    def test_ignores_partial_lines(self, tmp_path):
+        """A torn write doesn't break summaries."""
+        path = tmp_path / "stats.jsonl"
+        path.write_text(
+            json.dumps({"model": "x/fast", "ts": 1.0, "ttft": 0.5, "tps": 10.0})
+            + '\n{"model": "x/f'
+        )
+
+        assert ModelStatsStore(path).summaries()["x/fast"].runs == 1
+
+    def test_missing_file(self, tmp_path):
+        """No file means no stats."""
+        assert ModelStatsStore(tmp_path / "missing.jsonl").summaries() == {}
+
+
+def test_streamed_runs_are_recorded(monkeypatch, isolated_model_stats):
+    """The agent records TTFT and throughput for completed streamed runs."""
+    from tests.unit.test_agent import make_agent
+
+    agent = make_agent(monkeypatch, ["Hello", " world"])
+
+    async def run():
+        return [event async for event in agent.stream_events("Hi", "u", "s")]
+
+    asyncio.run(run())
+
+    stats = isolated_model_stats.summaries()["test/model"]
+    assert stats.runs == 1
+    assert stats.ttft_p50 is not None
+
+
+def test_first_response_excludes_tool_calls(monkeypatch, isolated_model_stats):
+    """Time to first response stops at the tool call; TTFT waits for the tool."""
+    from pydantic_ai import Agent
+    from pydantic_ai.messages import ToolReturnPart
+    from pydantic_ai.models.function import DeltaToolCall, FunctionModel
+
+    from tests.unit.test_agent import make_agent
+
+    agent = make_agent(monkeypatch, [])
+
+    async def stream_function(messages, info):
+        if isinstance(messages[-1].parts[-1], ToolReturnPart):
+            yield "Start Bijan"
+        else:
+            yield {0: DeltaToolCall(name="get_roster", json_args="{}")}
+
+    agent.agent = Agent(FunctionModel(stream_function=stream_function))
+
+    @agent.agent.tool_plain
+    async def get_roster() -> str:
+        await asyncio.sleep(0.2)
+        return "Bijan Robinson, RB"
+
+    async def run():
+        return [event async for event in agent.stream_events("Hi", "u", "s")]
+
+    asyncio.run(run())
+
+    stats = isolated_model_stats.summaries()["test/model"]
+    assert stats.ttft_p50 >= 0.2
+    assert stats.first_response_p50 < 0.1
@@ -0,0 +1,81 @@
+"""Tests for provider prompt caching."""
+
+import asyncio
+
+from pydantic_ai.messages import ModelRequest, SystemPromptPart, UserPromptPart
+from pydantic_ai.providers.openrouter import OpenRouterProvider
+from pydantic_ai.usage import RunUsage
+
+from kraftbot.core.agent import PydanticAIAgent
+from kraftbot.core.prompt_cache import PromptCachingChatModel, mark_cache_breakpoint
+
+EPHEMERAL = {"type": "ephemeral"}
+
+
+def map_messages(model_name):
+    """Map a system prompt and question the way a request would."""
+    model = PromptCachingChatModel(
+        model_name, provider=OpenRouterProvider(api_key="test")
+    )
+    request = ModelRequest(
+        parts=[
+            SystemPromptPart(content="You are KraftBot"),
+            UserPromptPart(content="Who should I start?"),
+        ]
+    )
+    return asyncio.run(model._map_messages([request]))
+
+
+class TestMarkCacheBreakpoint:
+    """Test mark_cache_breakpoint."""
+
+    def test_marks_last_system_message(self):
+        """The breakpoint goes after the system prompt, before the question."""
+        messages = [
+            {"role": "system", "content": "Rules"},
+            {"role": "system", "content": "Roster format"},
+            {"role": "user", "content": "Who should I start?"},
+        ]
+
+        assert mark_cache_breakpoint(messages)
+
+        assert messages[0]["content"] == "Rules"
+        assert messages[1]["content"] == [
+            {"type": "text", "text": "Roster format", "cache_control": EPHEMERAL}
+        ]
+        assert messages[2] == {"role": "user", "content": "Who should I start?"}
+
+    def test_no_system_prompt(self):
+        """Without a system prompt nothing is marked."""
+        messages = [{"role": "user", "content": "Hi"}]
+
+        assert not mark_cache_breakpoint(messages)
+        assert messages == [{"role": "user", "content": "Hi"}]
+
+
+class TestPromptCachingChatModel:
+    """Test PromptCachingChatModel."""
+
+    def test_anthropic_requests_mark_system_prompt(self):
+        """Anthropic models get an explicit cache breakpoint."""
+        system, user = map_messages("anthropic/claude-3.5-sonnet")
+
+        assert system["content"][-1]["cache_control"] == EPHEMERAL
+        assert user["content"] == "Who should I start?"
+
+    def test_automatic_caching_models_unchanged(self):
+        """OpenAI models cache prefixes themselves, so nothing is added."""
+        system, _ = map_messages("openai/gpt-4o")
+
+        assert system["content"] == "You are KraftBot"
+
+
+def test_usage_reports_cache_tokens():
+    """Prompt cache reads and writes are part of the run's usage."""
+    usage = PydanticAIAgent._usage_to_dict(
+        RunUsage(input_tokens=1200, output_tokens=80, cache_read_tokens=1024)
+    )
+
+    assert usage["cache_read_tokens"] == 1024
+    assert usage["cache_write_tokens"] == 0
+    assert usage["total_tokens"] == 1280
@@ -1,8 +1,12 @@
 """Tests for prompt loader utility."""
 
+import asyncio
 import tempfile
 from pathlib import Path
+
 import pytest
+
+from kraftbot.core.cache import hash_text
 from kraftbot.utils.prompt_loader import PromptLoader
 
 
@@ -81,4 +85,51 @@ class TestPromptLoader:
         assert "italic text" in cleaned
         assert "List item" in cleaned
         # Should not contain markdown symbols
-        assert "**" not in cleaned
\ No newline at end of file
+        assert "**" not in cleaned
+
+    def test_prompt_compiled_once_until_changed(self, monkeypatch):
+        """Unchanged files are served from cache; edits are picked up."""
+        prompt_file = Path(self.temp_dir) / "cached.md"
+        prompt_file.write_text("# Cached\n\nFirst **version**")
+        compiles = []
+        compile_ = self.prompt_loader._compile
+        monkeypatch.setattr(
+            self.prompt_loader,
+            "_compile",
+            lambda *args: compiles.append(args) or compile_(*args),
+        )
+
+        first = self.prompt_loader.get_prompt("cached")
+        assert self.prompt_loader.get_prompt("cached") is first
+        assert self.prompt_loader.validate_prompt("cached") == (True, None)
+        assert len(compiles) == 1
+        assert first.text == "Cached\n\nFirst version"
+        assert first.tokens > 0
+        assert first.hash == hash_text(first.text)
+
+        prompt_file.write_text("# Cached\n\nSecond, longer version")
+        second = self.prompt_loader.get_prompt("cached")
+        assert second.text == "Cached\n\nSecond, longer version"
+        assert second.hash != first.hash
+        assert len(compiles) == 2
+
+    def test_watcher_reloads_changed_prompts(self):
+        """While watching, edits are reloaded in the background."""
+        prompt_file = Path(self.temp_dir) / "watched.md"
+        prompt_file.write_text("Start your studs")
+
+        async def scenario():
+            first = self.prompt_loader.get_prompt("watched")
+            self.prompt_loader.start_watching(interval=0.01)
+            try:
+                prompt_file.write_text("Start your studs, bench your duds")
+                # Until the watcher runs, lookups don't touch the file
+                assert self.prompt_loader.get_prompt("watched") is first
+                await asyncio.sleep(0.1)
+                return self.prompt_loader.get_prompt("watched")
+            finally:
+                await self.prompt_loader.stop_watching()
+
+        reloaded = asyncio.run(scenario())
+        assert reloaded.text == "Start your studs, bench your duds"
+        assert not self.prompt_loader.is_watching
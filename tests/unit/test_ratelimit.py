@@ -0,0 +1,179 @@
+"""Tests for client-side rate limiting and retries."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+
+from kraftbot.core.ratelimit import (
+    RateLimitedModel,
+    RateLimiter,
+    TokenBucket,
+    retry_after_seconds,
+)
+
+
+def http_error(status_code, headers=None):
+    """A ModelHTTPError caused by an HTTP response with the given headers."""
+    cause = Exception("upstream")
+    cause.response = httpx.Response(status_code, headers=headers or {})
+    error = ModelHTTPError(status_code=status_code, model_name="test/model")
+    error.__cause__ = cause
+    return error
+
+
+def flaky_model(failures):
+    """Model that raises the given errors before answering."""
+    calls = []
+
+    def respond(messages, info):
+        calls.append(1)
+        if len(calls) <= len(failures):
+            raise failures[len(calls) - 1]
+        return ModelResponse(parts=[TextPart("ok")])
+
+    return FunctionModel(respond), calls
+
+
+class TestTokenBucket:
+    """Test TokenBucket."""
+
+    def test_delay_when_empty(self):
+        """An empty bucket reports how long until it refills."""
+        bucket = TokenBucket(per_minute=60)
+        bucket.take(60)
+
+        assert bucket.delay_for(1) == pytest.approx(1.0, abs=0.05)
+        assert bucket.delay_for(0) == 0
+
+    def test_debits_can_go_negative(self):
+        """Underestimated usage is paid back by later callers."""
+        bucket = TokenBucket(per_minute=600)
+        bucket.take(600 + 60)
+
+        assert bucket.delay_for(60) == pytest.approx(12.0, abs=0.1)
+
+
+class TestRateLimiter:
+    """Test RateLimiter."""
+
+    def test_rpm_limit_spaces_requests(self):
+        """Requests beyond the budget wait for the bucket to refill."""
+        limiter = RateLimiter("m", rpm=600)
+        limiter.requests.take(600)
+
+        async def scenario():
+            start = time.perf_counter()
+            await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(scenario())
+        assert elapsed >= 0.25
+        assert limiter.metrics()["throttled"] == 3
+
+    def test_rate_limited_halves_rate_and_blocks(self):
+        """A 429 blocks callers and halves the rate; successes recover it."""
+        limiter = RateLimiter("m", rpm=100)
+        limiter.on_rate_limited(0.5)
+
+        assert limiter.current_rpm == 50
+        assert limiter.blocked_until > time.monotonic()
+        limiter.on_success()
+        assert limiter.current_rpm == 51
+
+    def test_learns_a_limit_without_one_configured(self):
+        """Without a configured rpm a 429 still creates an adaptive limit."""
+        limiter = RateLimiter("m")
+        limiter.on_rate_limited(0)
+
+        assert limiter.current_rpm is not None
+
+
+class TestRetryAfter:
+    """Test Retry-After parsing."""
+
+    def test_seconds_header(self):
+        """Retry-After in seconds is read from the wrapped HTTP response."""
+        assert retry_after_seconds(http_error(429, {"Retry-After": "3"})) == 3.0
+
+    def test_openrouter_reset_header(self):
+        """OpenRouter's reset timestamp (in ms) is used when present."""
+        reset = str(int((time.time() + 5) * 1000))
+        delay = retry_after_seconds(http_error(429, {"X-RateLimit-Reset": reset}))
+
+        assert 3 < delay <= 5
+
+    def test_no_header(self):
+        """Errors without headers have no Retry-After."""
+        assert retry_after_seconds(http_error(429)) is None
+
+
+class TestRateLimitedModel:
+    """Test RateLimitedModel retries."""
+
+    def test_retries_429_then_succeeds(self):
+        """429s are retried after Retry-After and reported to the limiter."""
+        wrapped, calls = flaky_model([http_error(429, {"Retry-After": "0.01"})])
+        limiter = RateLimiter("m", adaptive=False)
+        agent = Agent(RateLimitedModel(wrapped, [limiter], base_delay=0.01))
+
+        result = asyncio.run(agent.run("q"))
+
+        assert result.output == "ok"
+        assert len(calls) == 2
+        metrics = limiter.metrics()
+        assert metrics["rate_limited"] == 1
+        assert metrics["retries"] == 1
+        assert metrics["requests"] == 2
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent failures are raised once retries run out."""
+        wrapped, calls = flaky_model([http_error(503)] * 5)
+        agent = Agent(
+            RateLimitedModel(
+                wrapped, [RateLimiter("m")], max_retries=2, base_delay=0.001
+            )
+        )
+
+        with pytest.raises(ModelHTTPError):
+            asyncio.run(agent.run("q"))
+        assert len(calls) == 3
+
+    def test_client_errors_are_not_retried(self):
+        """Errors like 400 fail immediately."""
+        wrapped, calls = flaky_model([http_error(400)])
+        agent = Agent(RateLimitedModel(wrapped, [RateLimiter("m")]))
+
+        with pytest.raises(ModelHTTPError):
+            asyncio.run(agent.run("q"))
+        assert len(calls) == 1
+
+    def test_stream_retries_before_output(self):
+        """Streamed requests are retried when opening the stream fails."""
+        calls = []
+
+        async def stream(messages, info):
+            calls.append(1)
+            if len(calls) == 1:
+                raise http_error(429)
+            yield "streamed ok"
+
+        agent = Agent(
+            RateLimitedModel(
+                FunctionModel(stream_function=stream),
+                [RateLimiter("m", adaptive=False)],
+                base_delay=0.001,
+            )
+        )
+
+        async def scenario():
+            async with agent.run_stream("q") as result:
+                return await result.get_output()
+
+        assert asyncio.run(scenario()) == "streamed ok"
+        assert len(calls) == 2
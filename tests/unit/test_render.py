@@ -0,0 +1,103 @@
+"""Tests for the incremental Markdown renderer."""
+
+from rich.console import Console
+from rich.markdown import Markdown
+
+from kraftbot.cli.render import IncrementalMarkdown
+
+SAMPLE = """# Week 4 Lineup
+
+Start these players:
+
+| Slot | Player | Proj |
+|------|--------|------|
+| QB | Jalen Hurts | 22.1 |
+| RB | Bijan Robinson | 18.4 |
+
+1. Check injuries
+
+2. Set the lineup
+   before kickoff
+
+```python
+lineup = {}
+
+print(lineup)
+```
+
+Good luck!
+"""
+
+
+def render(renderable, width=80):
+    """Render to plain text."""
+    console = Console(width=width, color_system=None, force_terminal=False)
+    with console.capture() as capture:
+        console.print(renderable)
+    return capture.get()
+
+
+class TestIncrementalMarkdown:
+    """Test IncrementalMarkdown."""
+
+    def test_matches_full_render(self):
+        """Rendering in pieces gives the same output as one full parse."""
+        renderer = IncrementalMarkdown()
+        for i in range(0, len(SAMPLE), 7):
+            renderer.append(SAMPLE[i : i + 7])
+
+        assert renderer.text == SAMPLE
+        assert render(renderer) == render(Markdown(SAMPLE))
+
+    def test_code_fences_are_one_block(self):
+        """Blank lines inside a code fence don't split the block."""
+        renderer = IncrementalMarkdown("```\na\n\nb\n```\n\nafter\n")
+
+        assert renderer.finished_blocks == 1
+
+    def test_finished_blocks_are_parsed_once(self, monkeypatch):
+        """Refreshes only re-parse the trailing open block."""
+        parsed = []
+
+        class CountingMarkdown(Markdown):
+            def __init__(self, text, **kwargs):
+                parsed.append(text)
+                super().__init__(text, **kwargs)
+
+        monkeypatch.setattr("kraftbot.cli.render.Markdown", CountingMarkdown)
+        renderer = IncrementalMarkdown()
+        for i in range(0, len(SAMPLE), 20):
+            renderer.append(SAMPLE[i : i + 20])
+            render(renderer)
+
+        assert renderer.finished_blocks >= 4
+        finished = [text for text in parsed if text.endswith("\n\n")]
+        assert len(finished) == len(set(finished))
+
+    def test_long_tables_finish_in_row_groups(self, monkeypatch):
+        """Completed table rows are finished in groups instead of re-parsed."""
+        parsed = []
+
+        class CountingMarkdown(Markdown):
+            def __init__(self, text, **kwargs):
+                parsed.append(text)
+                super().__init__(text, **kwargs)
+
+        monkeypatch.setattr("kraftbot.cli.render.Markdown", CountingMarkdown)
+        monkeypatch.setattr("kraftbot.cli.render.TABLE_ROW_GROUP", 3)
+        header = "| Player | Pos |\n|--------|-----|\n"
+        rows = [f"| Player {n} | RB |\n" for n in range(7)]
+        text = "Waiver targets:\n\n" + header + "".join(rows) + "\nGood luck!\n"
+
+        renderer = IncrementalMarkdown()
+        for i in range(0, len(text), 5):
+            renderer.append(text[i : i + 5])
+            render(renderer)
+
+        assert renderer.finished_blocks == 4
+        assert max(text.count("| RB |") for text in parsed) == 3
+        output = render(renderer)
+        assert all(f"Player {n}" in output for n in range(7))
+        assert output.count("Pos") == 3
+        group = header + "".join(rows[:3])
+        assert render(Markdown(group)).strip() in output
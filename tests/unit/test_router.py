@@ -0,0 +1,214 @@
+"""Tests for automatic model routing."""
+
+import asyncio
+
+from kraftbot.config.settings import ModelConfig
+from kraftbot.core.batch import BatchItem, BatchRunner
+from kraftbot.core.model_stats import ModelStats
+from kraftbot.core.models import StreamEnd, StreamStart, TextDelta
+from kraftbot.core.router import ModelRouter, RoutedAgent
+from kraftbot.mcp.manager import MCPManager
+
+MODELS = {
+    "x/strong": ModelConfig(
+        name="x/strong",
+        provider="X",
+        context_length=200000,
+        prompt_price=3.0,
+        completion_price=15.0,
+        quality=5,
+    ),
+    "x/mid": ModelConfig(
+        name="x/mid",
+        provider="X",
+        context_length=128000,
+        prompt_price=1.0,
+        completion_price=4.0,
+        quality=4,
+    ),
+    "x/cheap": ModelConfig(
+        name="x/cheap",
+        provider="X",
+        context_length=8000,
+        prompt_price=0.1,
+        completion_price=0.4,
+        quality=2,
+    ),
+}
+
+
+def make_router(**kwargs) -> ModelRouter:
+    kwargs.setdefault("stats", {})
+    kwargs.setdefault("latency_slo", 0)
+    kwargs.setdefault("cost_budget", 0)
+    return ModelRouter(models=dict(MODELS), **kwargs)
+
+
+class TestClassify:
+    """Test prompt classification."""
+
+    def test_lookup_is_simple(self):
+        """Short factual questions are simple but may need tools."""
+        assert ModelRouter.classify("Is Davante Adams playing?") == ("simple", True)
+        assert ModelRouter.classify("Who won the 2020 Super Bowl?") == (
+            "simple",
+            False,
+        )
+
+    def test_analysis_is_complex(self):
+        """Trade and strategy questions are complex."""
+        complexity, _ = ModelRouter.classify("Should I trade my RB1 for two WR2s?")
+        assert complexity == "complex"
+
+    def test_long_prompt_is_complex(self):
+        """Long prompts are complex whatever their wording."""
+        assert ModelRouter.classify("word " * 200)[0] == "complex"
+
+    def test_follow_up_stays_complex(self):
+        """Short follow-ups in a complex conversation keep the strong model."""
+        previous = make_router().route("Analyze my trade options")
+
+        complexity, needs_tools = ModelRouter.classify(
+            "What about Jefferson?", previous
+        )
+
+        assert complexity == "complex"
+        assert needs_tools
+
+
+class TestRoute:
+    """Test model selection."""
+
+    def test_simple_goes_to_cheapest(self):
+        """Simple prompts pick the cheapest model."""
+        decision = make_router().route("Who won the 2020 Super Bowl?")
+
+        assert decision.model_name == "x/cheap"
+        assert decision.complexity == "simple"
+        assert decision.estimated_cost is not None
+
+    def test_complex_goes_to_strongest(self):
+        """Complex prompts pick the highest quality model."""
+        decision = make_router().route("Explain my playoff strategy")
+
+        assert decision.model_name == "x/strong"
+
+    def test_context_length_filters(self):
+        """Models whose context can't hold the request are skipped."""
+        decision = make_router().route("Is he playing?", history_tokens=10000)
+
+        assert decision.model_name == "x/mid"
+
+    def test_tool_support_filters(self):
+        """Models without tool calling are skipped when tools are needed."""
+        models = dict(MODELS)
+        models["x/cheap"] = MODELS["x/cheap"].model_copy(
+            update={"supports_tools": False}
+        )
+        router = ModelRouter(models=models, stats={}, latency_slo=0, cost_budget=0)
+
+        assert router.route("Is Davante Adams playing?").model_name == "x/mid"
+        assert router.route("Who won the 2020 Super Bowl?").model_name == "x/cheap"
+
+    def test_latency_slo(self):
+        """Models measured slower than the SLO are skipped, then relaxed."""
+        stats = {
+            "x/cheap": ModelStats(model_name="x/cheap", ttft_p50=2.0, ttft_p95=5.0),
+            "x/mid": ModelStats(model_name="x/mid", ttft_p50=0.4, ttft_p95=0.8),
+        }
+
+        decision = make_router(stats=stats, latency_slo=1.0).route("Who won?")
+        assert decision.model_name == "x/mid"
+        assert decision.ttft_p95 == 0.8
+
+        # Unmeasured models are allowed, so measure every model for this case
+        stats["x/strong"] = ModelStats(
+            model_name="x/strong", ttft_p50=1.0, ttft_p95=3.0
+        )
+        decision = make_router(stats=stats, latency_slo=0.1).route("Who won?")
+        assert decision.model_name == "x/cheap"
+        assert "latency SLO" in decision.reason
+
+    def test_no_response_cap_keeps_output_estimate(self, monkeypatch):
+        """MAX_RESPONSE_TOKENS=0 means no cap, not zero output tokens."""
+        prompt = "Explain my playoff strategy"
+        monkeypatch.setattr("kraftbot.core.router.settings.max_response_tokens", 10**6)
+        uncapped = make_router().route(prompt).estimated_cost
+
+        monkeypatch.setattr("kraftbot.core.router.settings.max_response_tokens", 0)
+        decision = make_router().route(prompt)
+
+        assert decision.estimated_cost == uncapped
+        assert decision.estimated_cost > MODELS["x/strong"].estimate_cost(
+            decision.input_tokens, 0
+        )
+
+    def test_cost_budget(self):
+        """Complex prompts fall back to a weaker model within budget."""
+        decision = make_router(cost_budget=0.01).route("Explain my playoff strategy")
+
+        assert decision.model_name == "x/mid"
+
+    def test_no_candidates_uses_default(self):
+        """With nothing eligible the default model answers."""
+        router = ModelRouter(models={}, stats={})
+
+        assert "default model" in router.route("hi").reason
+
+
+class FakeAgent:
+    """Stand-in for PydanticAIAgent that answers with its model name."""
+
+    def __init__(self, model_name, memory=None, **kwargs):
+        self.model_name = model_name
+        self.memory = memory
+        self.last_usage = {}
+
+    async def stream_events(self, prompt, user_id="user", session_id="default"):
+        yield StreamStart(model_name=self.model_name, session_id=session_id)
+        yield TextDelta(text=self.model_name)
+        self.last_usage = {"total_tokens": 3}
+        yield StreamEnd(response=self.model_name, usage=self.last_usage)
+
+
+def make_routed_agent():
+    return RoutedAgent(
+        openrouter_api_key="test",
+        enable_logfire=False,
+        router=make_router(),
+        mcp_manager=MCPManager(enable_tool_cache=False),
+        agent_factory=FakeAgent,
+    )
+
+
+class TestRoutedAgent:
+    """Test the routing agent facade."""
+
+    def test_routes_each_prompt(self):
+        """Each prompt is answered by its routed model, sharing one memory."""
+        agent = make_routed_agent()
+
+        async def run(prompt):
+            return [e async for e in agent.stream_events(prompt, "u", prompt)]
+
+        simple = asyncio.run(run("Who won the 2020 Super Bowl?"))
+        complex_ = asyncio.run(run("Explain my playoff strategy"))
+
+        assert simple[0].model_name == "x/cheap"
+        assert "simple prompt" in simple[0].route_reason
+        assert complex_[-1].response == "x/strong"
+        assert agent.last_usage == {"total_tokens": 3}
+        assert {a.memory for a in agent._agents.values()} == {agent.memory}
+
+    def test_batch_records_routed_model(self):
+        """Batch results name the model each item was routed to."""
+        agent = make_routed_agent()
+        items = [
+            BatchItem(id="1", prompt="Who won the 2020 Super Bowl?"),
+            BatchItem(id="2", prompt="Explain my playoff strategy"),
+        ]
+
+        results = asyncio.run(BatchRunner(agent, concurrency=2).run(items, print))
+
+        models = {result.id: result.model_name for result in results}
+        assert models == {"1": "x/cheap", "2": "x/strong"}
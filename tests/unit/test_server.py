@@ -0,0 +1,161 @@
+"""Tests for the HTTP serve mode and agent pool."""
+
+import asyncio
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from kraftbot.core.models import StreamEnd, StreamStart, TextDelta
+from kraftbot.mcp.manager import MCPManager
+from kraftbot.server.app import create_app
+from kraftbot.server.pool import AgentPool, PoolFullError
+
+
+class FakeAgent:
+    """Stand-in for PydanticAIAgent that streams a canned answer."""
+
+    def __init__(self, model_name, system_prompt=None, memory=None, **kwargs):
+        self.model_name = model_name
+        self.system_prompt = system_prompt
+        self.memory = memory if memory is not None else object()
+
+    async def stream_events(self, prompt, user_id="user", session_id="default"):
+        yield StreamStart(model_name=self.model_name, session_id=session_id)
+        if prompt == "fail":
+            yield StreamEnd(error="model unavailable")
+            return
+        yield TextDelta(text="Start ")
+        yield TextDelta(text="Bijan")
+        yield StreamEnd(response="Start Bijan", usage={"total_tokens": 9})
+
+
+def make_pool(**kwargs):
+    """Pool of fake agents with no MCP servers."""
+    return AgentPool(
+        agent_factory=FakeAgent,
+        mcp_manager=MCPManager(enable_tool_cache=False),
+        **kwargs,
+    )
+
+
+class TestAgentPool:
+    """Test AgentPool."""
+
+    def test_agents_are_reused_per_key(self):
+        """Agents return to the pool and share memory within a key."""
+        pool = make_pool(size=2)
+
+        async def scenario():
+            async with pool.acquire("m", "prompt") as first:
+                async with pool.acquire("m", "prompt") as second:
+                    pass
+            async with pool.acquire("m", "prompt") as third:
+                pass
+            async with pool.acquire("m", "other") as other:
+                pass
+            return first, second, third, other
+
+        first, second, third, other = asyncio.run(scenario())
+        assert first is not second
+        assert third in (first, second)
+        assert first.memory is second.memory
+        assert other.system_prompt == "other"
+        assert pool.stats()["pools"][0]["agents"] == 2
+
+    def test_least_recently_used_keys_are_evicted(self):
+        """Past max_pools, idle keys are dropped oldest first; busy ones stay."""
+        pool = make_pool(max_pools=2)
+
+        async def scenario():
+            async with pool.acquire("m", "busy"):
+                for prompt in ["v1", "v2", "v3"]:
+                    async with pool.acquire("m", prompt):
+                        pass
+                return [entry["system_prompt_hash"] for entry in pool.stats()["pools"]]
+
+        hashes = asyncio.run(scenario())
+        assert hashes == [
+            AgentPool.pool_key("m", prompt)[1][:12] for prompt in ["busy", "v3"]
+        ]
+        assert pool.stats()["evicted_pools"] == 2
+
+    def test_full_queue_is_rejected(self):
+        """Requests beyond the pool and queue are refused."""
+        pool = make_pool(size=1, max_queue=0)
+
+        async def scenario():
+            async with pool.acquire("m"):
+                with pytest.raises(PoolFullError):
+                    await pool.checkout("m")
+
+        asyncio.run(scenario())
+
+    def test_waiters_time_out(self):
+        """Queued requests give up after the queue timeout."""
+        pool = make_pool(size=1, max_queue=1, queue_timeout=0.01)
+
+        async def scenario():
+            async with pool.acquire("m"):
+                with pytest.raises(PoolFullError):
+                    await pool.checkout("m")
+            assert pool.stats()["waiting"] == 0
+
+        asyncio.run(scenario())
+
+    def test_zero_queue_timeout_is_kept(self, monkeypatch):
+        """An explicit 0 means don't wait, not the configured default."""
+        monkeypatch.setattr("kraftbot.server.pool.settings.serve_queue_timeout", 30.0)
+
+        assert make_pool(queue_timeout=0).queue_timeout == 0
+        assert make_pool().queue_timeout == 30.0
+
+
+class TestServeApp:
+    """Test the HTTP endpoints."""
+
+    def test_run_returns_json(self):
+        """/run returns the final response with usage."""
+        with TestClient(create_app(make_pool())) as client:
+            response = client.post("/run", json={"prompt": "Who should I start?"})
+
+        assert response.status_code == 200
+        assert response.json()["response"] == "Start Bijan"
+        assert response.json()["usage"] == {"total_tokens": 9}
+
+    def test_run_errors(self):
+        """Bad requests are 400s and model failures are 502s."""
+        with TestClient(create_app(make_pool())) as client:
+            missing = client.post("/run", json={})
+            bad_prompt = client.post(
+                "/run", json={"prompt": "q", "system_prompt": "../etc/passwd"}
+            )
+            failed = client.post("/run", json={"prompt": "fail"})
+
+        assert missing.status_code == 400
+        assert bad_prompt.status_code == 400
+        assert failed.status_code == 502
+        assert failed.json()["error"] == "model unavailable"
+
+    def test_stream_sends_sse_events(self):
+        """/stream sends start, delta and end events and frees the agent."""
+        pool = make_pool()
+        with TestClient(create_app(pool)) as client:
+            with client.stream("POST", "/stream", json={"prompt": "q"}) as response:
+                body = "".join(response.iter_text())
+            health = client.get("/health").json()
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            line[len("event: ") :]
+            for line in body.splitlines()
+            if line.startswith("event: ")
+        ]
+        assert events == ["start", "delta", "delta", "end"]
+        data = [
+            json.loads(line[len("data: ") :])
+            for line in body.splitlines()
+            if line.startswith("data: ")
+        ]
+        assert data[-1]["response"] == "Start Bijan"
+        assert health["pool"]["active"] == 0
@@ -1,8 +1,10 @@
 """Tests for configuration settings."""
 
 import os
+
 import pytest
-from kraftbot.config.settings import settings
+
+from kraftbot.config.settings import Settings, settings
 
 
 class TestSettings:
@@ -50,4 +52,14 @@ class TestSettings:
 
         # Test non-existent model
         config = settings.get_model_config("non-existent-model")
-        assert config is None
\ No newline at end of file
+        assert config is None
+
+    def test_cache_dir_from_environment(self, monkeypatch, tmp_path):
+        """KRAFTBOT_CACHE_DIR moves every on-disk cache."""
+        monkeypatch.setenv("KRAFTBOT_CACHE_DIR", str(tmp_path))
+
+        configured = Settings()
+
+        assert configured.cache_dir == str(tmp_path)
+        assert configured.get_cache_dir() == tmp_path
+        assert configured.get_metrics_path().parent == tmp_path
@@ -0,0 +1,142 @@
+"""Tests for CLI cold start time."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Modules the static commands (models, prompts, status, stats) must not load
+HEAVY_MODULES = [
+    "pydantic_ai",
+    "openai",
+    "mcp",
+    "prompt_toolkit",
+    "logfire",
+    "opentelemetry",
+]
+
+# Cold import budget for the CLI, overridable for slow CI machines
+STARTUP_BUDGET_MS = float(os.environ.get("KRAFTBOT_STARTUP_BUDGET_MS", "1500"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """Keep files written by CLI subprocesses (e.g. stats metrics) out of HOME"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter so nothing is already imported"""
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def run_cli(*argv: str) -> subprocess.CompletedProcess:
+    """Run `kraftbot <argv>` the way the installed entry point does"""
+    return subprocess.run(
+        [sys.executable, "-c", "from kraftbot.cli.app import main; main()", *argv],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+class TestLazyImports:
+    """Test that static commands skip the agent stack."""
+
+    @pytest.mark.parametrize("command", ["models", "prompts", "status", "stats"])
+    def test_static_commands_skip_heavy_imports(self, command):
+        """Listing commands run without importing the agent stack."""
+        result = run_python(
+            "import sys\n"
+            f"sys.argv = ['kraftbot', {command!r}]\n"
+            "from kraftbot.cli.app import main\n"
+            "try:\n"
+            "    main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+            "print('LOADED', loaded, file=sys.stderr)\n"
+        )
+
+        assert "LOADED []" in result.stderr, result.stderr
+
+    def test_package_exports_load_on_use(self):
+        """Top-level exports still resolve, importing the agent only then."""
+        result = run_python(
+            "import sys, kraftbot\n"
+            "assert 'pydantic_ai' not in sys.modules\n"
+            "from kraftbot import PydanticAIAgent\n"
+            "from kraftbot.core import CompareEngine\n"
+            "assert 'pydantic_ai' in sys.modules\n"
+            "print(PydanticAIAgent.__name__, CompareEngine.__name__)\n"
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert "PydanticAIAgent CompareEngine" in result.stdout
+
+    def test_import_leaves_plugins_enabled(self):
+        """Only the CLI entry point turns off the Logfire Pydantic plugin."""
+        env = {k: v for k, v in os.environ.items() if k != "PYDANTIC_DISABLE_PLUGINS"}
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import os, kraftbot.cli, kraftbot.cli.app\n"
+                "from kraftbot.cli import console\n"
+                "print(os.environ.get('PYDANTIC_DISABLE_PLUGINS'))\n",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=60,
+            env=env,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "None"
+
+    def test_unknown_export_raises(self):
+        """Unknown attributes still raise AttributeError."""
+        import kraftbot
+
+        with pytest.raises(AttributeError):
+            kraftbot.NotAThing
+
+
+class TestStartupBudget:
+    """Startup benchmarks for `kraftbot models`."""
+
+    def test_models_command_within_budget(self):
+        """A real `kraftbot models` run, interpreter start included, is fast."""
+        start = time.perf_counter()
+        result = run_cli("models")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        assert result.returncode == 0, result.stderr
+        assert "anthropic/" in result.stdout
+        assert elapsed_ms < STARTUP_BUDGET_MS, (
+            f"`kraftbot models` took {elapsed_ms:.0f}ms "
+            f"(budget {STARTUP_BUDGET_MS:.0f}ms)"
+        )
+
+    def test_cli_import_within_budget(self):
+        """Cold import of the CLI stays under the startup budget."""
+        result = run_python("import kraftbot.cli.app", "-X", "importtime")
+        assert result.returncode == 0, result.stderr
+
+        # -X importtime reports cumulative microseconds per module; the last
+        # line is the top-level import
+        last = result.stderr.strip().splitlines()[-1]
+        cumulative_ms = int(last.split("|")[1]) / 1000
+
+        assert cumulative_ms < STARTUP_BUDGET_MS, (
+            f"CLI import took {cumulative_ms:.0f}ms "
+            f"(budget {STARTUP_BUDGET_MS:.0f}ms); check for new top-level "
+            "imports of the agent stack in kraftbot/cli"
+        )
@@ -0,0 +1,155 @@
+"""Tests for per-run telemetry and the metrics store."""
+
+import asyncio
+import time
+
+from kraftbot.core.models import RunTelemetry, StreamEnd
+from kraftbot.core.telemetry import RunRecorder, TelemetryStore
+from kraftbot.mcp.metrics import TimedToolset, tool_timings
+from tests.unit.test_agent import collect, make_agent
+from tests.unit.test_mcp_cache import FakeToolset
+
+
+def make_run(**kwargs) -> RunTelemetry:
+    """Build a run with sensible defaults."""
+    values = dict(
+        model_name="test/model",
+        system_prompt_hash="abc",
+        started_at=time.time(),
+        time_to_first_token=0.2,
+        duration=1.0,
+        input_tokens=100,
+        output_tokens=50,
+    )
+    values.update(kwargs)
+    return RunTelemetry(**values)
+
+
+class TestRunRecorder:
+    """Test RunRecorder."""
+
+    def test_finish_summarizes_usage(self):
+        """Token counts come from usage and throughput excludes the TTFT."""
+        recorder = RunRecorder("test/model", "Be brief")
+        recorder.first_token()
+        recorder.tool_latencies["get_rosters"] = [0.1, 0.2]
+
+        telemetry = recorder.finish({"input_tokens": 10, "output_tokens": 20})
+
+        assert telemetry.input_tokens == 10
+        assert telemetry.output_tokens == 20
+        assert telemetry.tool_calls == 2
+        assert telemetry.time_to_first_token <= telemetry.duration
+        assert telemetry.tokens_per_second > 0
+
+
+class TestTimedToolset:
+    """Test TimedToolset."""
+
+    def test_records_calls_inside_block(self):
+        """Each call's latency lands in the active timings dict."""
+        toolset = TimedToolset(wrapped=FakeToolset(delay=0.01))
+
+        async def run():
+            with tool_timings({}) as timings:
+                await toolset.call_tool("get_rosters", {}, None, None)
+                await asyncio.create_task(
+                    toolset.call_tool("get_rosters", {}, None, None)
+                )
+            await toolset.call_tool("get_rosters", {}, None, None)
+            return timings
+
+        timings = asyncio.run(run())
+
+        assert list(timings) == ["get_rosters"]
+        assert len(timings["get_rosters"]) == 2
+        assert min(timings["get_rosters"]) >= 0.01
+
+
+class TestTelemetryStore:
+    """Test TelemetryStore."""
+
+    def test_run_stats_by_model(self, tmp_path):
+        """Percentiles skip cached and failed runs but count them."""
+        store = TelemetryStore(tmp_path / "metrics.sqlite3")
+        for duration in (1.0, 2.0, 3.0):
+            store.record(make_run(duration=duration))
+        store.record(make_run(duration=0.01, cached=True))
+        store.record(make_run(duration=9.0, error="boom"))
+        store.record(make_run(model_name="other/model"))
+
+        (model, other) = store.run_stats(group_by="model")
+
+        assert (model.key, model.runs, model.cached, model.errors) == (
+            "test/model",
+            5,
+            1,
+            1,
+        )
+        assert model.latency_p50 == 2.0
+        assert model.latency_p95 > 2.0
+        assert other.runs == 1
+        store.close()
+
+    def test_tool_stats_and_since(self, tmp_path):
+        """Tool calls are grouped by tool and filtered by run start time."""
+        store = TelemetryStore(tmp_path / "metrics.sqlite3")
+        store.record(make_run(started_at=100.0, tool_latencies={"get_rosters": [5.0]}))
+        store.record(
+            make_run(tool_latencies={"get_rosters": [0.1, 0.3], "get_matchups": [0.2]})
+        )
+
+        tools = store.tool_stats(since=time.time() - 60)
+
+        assert [(t.tool, t.calls) for t in tools] == [
+            ("get_rosters", 2),
+            ("get_matchups", 1),
+        ]
+        assert tools[0].latency_max == 0.3
+        assert len(store.run_stats(group_by="prompt")) == 1
+        assert store.run_stats(since=time.time() - 60)[0].runs == 1
+        store.close()
+
+    def test_prunes_oldest_runs(self, tmp_path):
+        """The store keeps roughly max_runs runs."""
+        store = TelemetryStore(tmp_path / "metrics.sqlite3", max_runs=10)
+        for _ in range(100):
+            store.record(make_run())
+
+        assert store.run_stats()[0].runs == 10
+        store.close()
+
+
+class TestAgentTelemetry:
+    """Test that agent runs record telemetry."""
+
+    def test_stream_attaches_and_records_telemetry(
+        self, monkeypatch, isolated_telemetry
+    ):
+        """Streamed runs carry their measurements and land in the store."""
+        agent = make_agent(monkeypatch, ["Start ", "your ", "RB2"])
+
+        end = collect(agent.stream_events("Who should I start?"))[-1]
+
+        assert isinstance(end, StreamEnd)
+        telemetry = end.telemetry
+        assert telemetry.model_name == "test/model"
+        assert telemetry.time_to_first_token is not None
+        assert telemetry.output_tokens > 0
+        assert not telemetry.cached
+        assert agent.last_telemetry == telemetry
+        assert isolated_telemetry.run_stats()[0].runs == 1
+
+    def test_cache_hits_are_recorded(self, monkeypatch, isolated_telemetry):
+        """A cached answer is recorded as a cached run."""
+        agent = make_agent(monkeypatch, ["Start your RB2"])
+
+        first = collect(agent.stream_events("Who should I start?"))[-1]
+        second = collect(
+            agent.stream_events("Who should I start?", session_id="other")
+        )[-1]
+
+        assert not first.telemetry.cached
+        assert second.telemetry.cached
+        (stats,) = isolated_telemetry.run_stats()
+        assert (stats.runs, stats.cached) == (2, 1)